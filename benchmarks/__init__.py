@@ -0,0 +1,6 @@
+"""
+Benchmarks do Painel de Acompanhamento Escolar.
+
+Cada módulo pode ser executado isoladamente, por exemplo:
+    python -m benchmarks.bench_write_queue
+"""
@@ -0,0 +1,105 @@
+"""
+Benchmark: sincronização incremental pelo change_log x releitura da tabela.
+
+    python -m benchmarks.bench_change_feed --students 20000 --assessments 10 --changes 500
+"""
+import argparse
+import random
+import time
+
+from benchmarks.common import criar_banco_temporario, imprimir_taxa
+from src.infrastructure.change_feed import ChangeFeed, latest
+
+
+def _popular(db, alunos: int, avaliacoes: int) -> float:
+    """Insere alunos, avaliações e notas; retorna o tempo só das notas."""
+    materia = db.subjects.id_for("Matemática", create=True)
+    conn = db.get_connection()
+    conn.executemany(
+        "INSERT INTO students (name, registration, email) VALUES (?, ?, ?)",
+        [(f"Aluno {i:06d}", f"M{i:06d}", f"m{i}@escola.com") for i in range(alunos)])
+    conn.executemany(
+        "INSERT INTO assessments (title, subject_id, max_score, weight, assessment_type, bimester, academic_year) "
+        "VALUES (?, ?, 10.0, 1.0, 'PROVA', 'PRIMEIRO', 2024)",
+        [(f"Prova {i:02d}", materia) for i in range(avaliacoes)])
+    conn.commit()
+    inicio = time.perf_counter()
+    conn.execute("""
+        INSERT INTO grades (student_id, assessment_id, score)
+        SELECT s.student_id, a.assessment_id, 7.0 FROM students s CROSS JOIN assessments a
+    """)
+    conn.commit()
+    segundos = time.perf_counter() - inicio
+    conn.close()
+    return segundos
+
+
+def _sem_triggers(db) -> None:
+    conn = db.get_connection()
+    for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' "
+                                "AND name LIKE 'trg_change_log_%'").fetchall():
+        conn.execute(f"DROP TRIGGER {name}")
+    conn.commit()
+    conn.close()
+
+
+def _alterar(db, total: int, mudancas: int) -> None:
+    conn = db.get_connection()
+    ids = random.Random(42).sample(range(1, total + 1), mudancas)
+    conn.executemany("UPDATE grades SET score = score + 0.5 WHERE grade_id = ?", [(i,) for i in ids])
+    conn.commit()
+    conn.close()
+
+
+def _releitura(db) -> int:
+    conn = db.get_connection()
+    try:
+        return len(conn.execute("SELECT grade_id, student_id, assessment_id, score FROM grades").fetchall())
+    finally:
+        conn.close()
+
+
+def _incremental(db, feed) -> int:
+    linhas = 0
+    conn = db.get_connection()
+    try:
+        for lote in feed.batches():
+            ids = [c.pk for c in latest(lote) if c.table == "grades" and c.op != "D"]
+            linhas += len(conn.execute(
+                "SELECT grade_id, student_id, assessment_id, score FROM grades "
+                f"WHERE grade_id IN ({', '.join('?' * len(ids))})", ids).fetchall())
+    finally:
+        conn.close()
+    return linhas
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--students", type=int, default=20_000)
+    parser.add_argument("--assessments", type=int, default=10)
+    parser.add_argument("--changes", type=int, default=500, help="notas alteradas entre duas sincronizações")
+    args = parser.parse_args(argv)
+    total = args.students * args.assessments
+
+    print("Custo de escrita dos triggers:")
+    sem = criar_banco_temporario("sem_triggers.db")
+    _sem_triggers(sem)
+    imprimir_taxa("  notas inseridas sem change_log", total, _popular(sem, args.students, args.assessments))
+    db = criar_banco_temporario()
+    imprimir_taxa("  notas inseridas com change_log", total, _popular(db, args.students, args.assessments))
+
+    feed = ChangeFeed(db, "warehouse", from_end=True)
+    _alterar(db, total, args.changes)
+    _releitura(db)  # aquece o cache de páginas
+
+    print(f"Sincronização depois de {args.changes} alterações:")
+    inicio = time.perf_counter()
+    linhas = _releitura(db)
+    imprimir_taxa("  releitura da tabela grades", linhas, time.perf_counter() - inicio)
+    inicio = time.perf_counter()
+    linhas = _incremental(db, feed)
+    imprimir_taxa("  incremental (change_log)", linhas, time.perf_counter() - inicio)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark: extrato de presença de um ano inteiro com datas em texto ISO x
+número do dia (date_storage "days"): tamanho dos índices e tempo das consultas.
+
+    python -m benchmarks.bench_date_storage --students 500 --extratos 2000
+"""
+import argparse
+import sqlite3
+import time
+from datetime import date, timedelta
+
+from benchmarks.common import criar_banco_temporario, cronometro, imprimir_taxa
+from src.application.services import ServicosDoAluno
+from src.infrastructure.database import (
+    AssessmentRepository, AttendanceRepository, GradeRepository, StudentRepository
+)
+from src.infrastructure.date_storage import converter_datas
+
+
+DISCIPLINAS = ["Matemática", "Língua Portuguesa", "Ciências", "História", "Geografia",
+               "Língua Inglesa", "Educação Física", "Arte"]
+DIAS_LETIVOS = 200
+
+
+def _popular(db, alunos: int) -> int:
+    materias = list(db.subjects.ids_for(DISCIPLINAS, create=True).values())
+    dias = [(date(2024, 2, 1) + timedelta(days=d)).isoformat() for d in range(DIAS_LETIVOS)]
+    conn = db.get_connection()
+    conn.executemany(
+        "INSERT INTO students (student_id, name, registration, email) VALUES (?, ?, ?, ?)",
+        [(i, f"Aluno {i}", f"D{i:06d}", f"d{i}@escola.com") for i in range(1, alunos + 1)])
+    conn.executemany(
+        "INSERT INTO attendance (student_id, subject_id, attendance_date, is_present, is_justified, justification) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        ((sid, materia, dia, 0 if i % 11 == 0 else 1, 1 if i % 11 == 0 else 0, "Atestado" if i % 11 == 0 else None)
+         for sid in range(1, alunos + 1) for materia in materias for i, dia in enumerate(dias)))
+    conn.commit()
+    total = conn.execute("SELECT COUNT(*) FROM attendance").fetchone()[0]
+    # O change_log da carga não interessa à medição
+    conn.execute("DELETE FROM change_log")
+    conn.commit()
+    conn.execute("VACUUM")
+    conn.close()
+    return total
+
+
+def _tamanhos(db) -> dict:
+    conn = sqlite3.connect(str(db.db_path))
+    try:
+        return dict(conn.execute(
+            "SELECT name, SUM(pgsize) FROM dbstat WHERE name LIKE '%attendance%' GROUP BY name"))
+    except sqlite3.OperationalError:
+        return {}  # SQLite sem a extensão dbstat
+    finally:
+        conn.close()
+
+
+def _medir(db, servicos, alunos: int, extratos: int) -> None:
+    print(f"  arquivo: {db.db_path.stat().st_size / 2**20:.1f} MiB")
+    for nome, tamanho in sorted(_tamanhos(db).items()):
+        print(f"    {nome:<38} {tamanho / 2**20:8.1f} MiB")
+    consultas = [((n * 7919) % alunos + 1, DISCIPLINAS[n % len(DISCIPLINAS)]) for n in range(extratos)]
+    servicos.consultar_extrato(1, DISCIPLINAS[0], date(2024, 1, 1), date(2024, 12, 31))  # aquece
+
+    inicio = time.perf_counter()
+    for sid, disciplina in consultas:
+        servicos.consultar_extrato(sid, disciplina, date(2024, 1, 1), date(2024, 12, 31))
+    imprimir_taxa("  extrato do ano (consultar_extrato)", extratos, time.perf_counter() - inicio)
+
+    # Só a varredura do intervalo no índice, sem montar objetos
+    subject_id = db.subjects.id_for(DISCIPLINAS[0])
+    inicio_ano, fim_ano = db.date_value(date(2024, 1, 1)), db.date_value(date(2024, 12, 31))
+    conn = db.get_connection()
+    inicio = time.perf_counter()
+    for sid, _ in consultas:
+        conn.execute("SELECT COUNT(*), SUM(is_present) FROM attendance "
+                     "WHERE student_id = ? AND subject_id = ? AND attendance_date BETWEEN ? AND ?",
+                     (sid, subject_id, inicio_ano, fim_ano)).fetchone()
+    imprimir_taxa("  varredura do ano (COUNT no índice)", extratos, time.perf_counter() - inicio)
+    inicio = time.perf_counter()
+    linhas = conn.execute("SELECT COUNT(*) FROM attendance WHERE attendance_date BETWEEN ? AND ?",
+                          (db.date_value(date(2024, 3, 1)), db.date_value(date(2024, 5, 31)))).fetchone()[0]
+    imprimir_taxa("  trimestre da escola (idx_attendance_date)", linhas, time.perf_counter() - inicio)
+    conn.close()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--students", type=int, default=500)
+    parser.add_argument("--extratos", type=int, default=2000, help="extratos anuais por modo")
+    args = parser.parse_args(argv)
+
+    db = criar_banco_temporario()
+    tempos = {}
+    with cronometro(tempos, "carga"):
+        total = _popular(db, args.students)
+    imprimir_taxa("carga (texto ISO)", total, tempos["carga"])
+    servicos = ServicosDoAluno(GradeRepository(db), AssessmentRepository(db),
+                               StudentRepository(db), AttendanceRepository(db))
+
+    print("\n== datas em texto ISO")
+    _medir(db, servicos, args.students, args.extratos)
+
+    with cronometro(tempos, "conversao"):
+        converter_datas(db, "days")
+    imprimir_taxa("\nconverter_datas(days) + VACUUM", total, tempos["conversao"])
+
+    print("\n== datas como número do dia")
+    _medir(db, servicos, args.students, args.extratos)
+
+
+if __name__ == "__main__":
+    main()
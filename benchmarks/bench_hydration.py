@@ -0,0 +1,117 @@
+"""
+Benchmark: hidratação de linhas de frequência em objetos Attendance,
+conversão anterior (sqlite3.Row + datetime.fromisoformat + Enum(valor)) x
+mapeadores posicionais com tabelas de lookup.
+
+    python -m benchmarks.bench_hydration --rows 1000000
+"""
+import argparse
+import sqlite3
+from datetime import date, datetime, timedelta
+from functools import partial
+
+from benchmarks.common import criar_banco_temporario, cronometro, imprimir_taxa
+from src.domain.models import Attendance, Bimester
+from src.infrastructure.database import _BIMESTERS, _attendance_from_row, _to_date, _ATTENDANCE_COLUMNS
+
+
+DISCIPLINAS = ["Matemática", "Português", "Ciências", "História", "Geografia"]
+DIAS_LETIVOS = 200
+LOTE = 5000
+
+
+def _popular(db, n_rows: int) -> None:
+    por_aluno = len(DISCIPLINAS) * DIAS_LETIVOS
+    n_alunos = max(1, -(-n_rows // por_aluno))
+    dias = [(date(2024, 2, 1) + timedelta(days=d)).isoformat() for d in range(DIAS_LETIVOS)]
+    materias = db.subjects.ids_for(DISCIPLINAS, create=True)
+    conn = db.get_connection()
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.executemany(
+        "INSERT INTO students (student_id, name, registration, email) VALUES (?, ?, ?, ?)",
+        [(i, f"Aluno {i}", f"H{i:06d}", f"h{i}@escola.com") for i in range(1, n_alunos + 1)])
+
+    def linhas():
+        count = 0
+        for sid in range(1, n_alunos + 1):
+            for subject in DISCIPLINAS:
+                for i, dia in enumerate(dias):
+                    if count == n_rows:
+                        return
+                    count += 1
+                    falta = i % 13 == 0
+                    yield sid, materias[subject], dia, 0 if falta else 1, 1 if falta else 0, "Atestado" if falta else None
+
+    conn.executemany("""
+        INSERT INTO attendance (student_id, subject_id, attendance_date, is_present, is_justified, justification)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, linhas())
+    conn.commit()
+    conn.close()
+
+
+def _percorrer(db, row_factory, converter) -> int:
+    """Lê todas as linhas em lotes e converte cada uma (sem acumular)."""
+    conn = db.get_connection()
+    conn.row_factory = row_factory
+    cursor = conn.execute(f"SELECT {_ATTENDANCE_COLUMNS} FROM attendance")
+    total = 0
+    while True:
+        lote = cursor.fetchmany(LOTE)
+        if not lote:
+            break
+        for row in lote:
+            converter(row)
+        total += len(lote)
+    conn.close()
+    return total
+
+
+# --- Conversão anterior (igual ao código antigo dos repositórios) ---
+
+def _attendance_anterior(r, subject_name) -> Attendance:
+    return Attendance(
+        attendance_id=r['attendance_id'],
+        subject=subject_name(r['subject_id']),
+        attendance_date=datetime.fromisoformat(r['attendance_date']).date() if r['attendance_date'] else None,
+        is_present=bool(r['is_present']),
+        justified=bool(r['is_justified']),
+        justification=r['justification']
+    )
+
+
+def _campos_anterior(r):
+    return datetime.fromisoformat(r['attendance_date']).date(), Bimester('PRIMEIRO')
+
+
+def _campos_novo(r):
+    return _to_date(r[3]), _BIMESTERS['PRIMEIRO']
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+
+    db = criar_banco_temporario()
+    tempos = {}
+    with cronometro(tempos, "carga"):
+        _popular(db, args.rows)
+    imprimir_taxa("carga das linhas", args.rows, tempos["carga"])
+
+    cenarios = [
+        ("só data+enum: Row + fromisoformat + Enum()", sqlite3.Row, _campos_anterior),
+        ("só data+enum: tupla + lookup", None, _campos_novo),
+        ("Attendance: Row + fromisoformat", sqlite3.Row,
+         partial(_attendance_anterior, subject_name=db.subjects.name_for)),
+        ("Attendance: tupla + _attendance_from_row", None,
+         partial(_attendance_from_row, subject_name=db.subjects.name_for)),
+    ]
+    for rotulo, factory, converter in cenarios:
+        with cronometro(tempos, rotulo):
+            n = _percorrer(db, factory, converter)
+        imprimir_taxa(rotulo, n, tempos[rotulo])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark: boletim da turma inteira com e sem identity map (unit_of_work).
+
+    python -m benchmarks.bench_identity_map --students 500 --assessments 8
+"""
+import argparse
+import time
+import tracemalloc
+
+from benchmarks.common import criar_banco_temporario, imprimir_taxa
+from src.domain.models import Bimester
+from src.infrastructure.database import GradeRepository
+from src.infrastructure.identity_map import unit_of_work
+
+
+def _popular(db, alunos: int, avaliacoes: int) -> None:
+    materia = db.subjects.id_for("Matemática", create=True)
+    conn = db.get_connection()
+    conn.executemany(
+        "INSERT INTO students (name, registration, email) VALUES (?, ?, ?)",
+        [(f"Aluno {i:05d}", f"M{i:05d}", f"m{i}@escola.com") for i in range(alunos)])
+    bimestres = [b.value for b in Bimester]
+    conn.executemany(
+        "INSERT INTO assessments (title, subject_id, max_score, weight, assessment_type, bimester, academic_year) "
+        "VALUES (?, ?, 10.0, 1.0, 'PROVA', ?, 2024)",
+        [(f"Prova {i:02d}", materia, bim) for bim in bimestres for i in range(avaliacoes)])
+    conn.execute("""
+        INSERT INTO grades (student_id, assessment_id, score)
+        SELECT s.student_id, a.assessment_id, 7.0 FROM students s CROSS JOIN assessments a
+    """)
+    conn.commit()
+    conn.close()
+
+
+def _boletins(repo, ids):
+    return [repo.find_by_student_and_bimester(sid, "Matemática", bim, 2024)
+            for sid in ids for bim in Bimester]
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--students", type=int, default=500)
+    parser.add_argument("--assessments", type=int, default=8, help="avaliações por bimestre")
+    args = parser.parse_args(argv)
+
+    db = criar_banco_temporario()
+    _popular(db, args.students, args.assessments)
+    repo = GradeRepository(db)
+    ids = list(range(1, args.students + 1))
+    notas = args.students * args.assessments * len(Bimester)
+    _boletins(repo, ids)  # aquece cache de páginas e statements
+
+    for rotulo, escopo in (("sem identity map", None), ("com unit_of_work()", unit_of_work)):
+        for medir_memoria in (False, True):
+            if medir_memoria:
+                tracemalloc.start()
+            inicio = time.perf_counter()
+            if escopo is None:
+                resultado = _boletins(repo, ids)
+            else:
+                with escopo() as uow:
+                    resultado = _boletins(repo, ids)
+            if not medir_memoria:
+                segundos = time.perf_counter() - inicio
+            else:
+                # Memória retida pelo resultado (Assessments duplicados ou compartilhados)
+                retida, _ = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+            del resultado
+        imprimir_taxa(rotulo, notas, segundos)
+        print(f"  memória retida pelas notas: {retida / 1024 / 1024:.1f} MiB")
+        if escopo is not None:
+            stats = uow.stats()
+            print(f"  Assessments montados: {stats['materialized']} de {stats['requested']} "
+                  f"(dedupe {stats['dedupe_ratio']:.1%})")
+
+
+if __name__ == "__main__":
+    main()
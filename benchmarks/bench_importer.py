@@ -0,0 +1,54 @@
+"""
+Benchmark: importação em massa de alunos, responsáveis e vínculos (CSV).
+
+    python -m benchmarks.bench_importer --students 100000
+"""
+import argparse
+import csv
+import tempfile
+from pathlib import Path
+
+from benchmarks.common import criar_banco_temporario, gerar_cpf, imprimir_taxa
+from src.infrastructure.importer import BulkImporter
+
+
+def gerar_csvs(pasta: Path, n: int):
+    alunos, pais, vinculos = pasta / "alunos.csv", pasta / "pais.csv", pasta / "vinculos.csv"
+    with open(alunos, "w", newline="", encoding="utf-8") as fa, \
+            open(pais, "w", newline="", encoding="utf-8") as fp, \
+            open(vinculos, "w", newline="", encoding="utf-8") as fv:
+        wa, wp, wv = csv.writer(fa), csv.writer(fp), csv.writer(fv)
+        wa.writerow(["name", "registration", "email"])
+        wp.writerow(["name", "email", "cpf"])
+        wv.writerow(["registration", "cpf", "relationship_type"])
+        for i in range(n):
+            cpf = gerar_cpf(i)
+            wa.writerow([f"Aluno {i}", f"M{i:07d}", f"aluno{i}@escola.com"])
+            wp.writerow([f"Responsável {i}", f"resp{i}@email.com", cpf])
+            wv.writerow([f"M{i:07d}", cpf, "Mãe"])
+    return str(alunos), str(pais), str(vinculos)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--students", type=int, default=100_000)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    alunos, pais, vinculos = gerar_csvs(Path(tempfile.mkdtemp()), args.students)
+    db = criar_banco_temporario()
+    total = 0.0
+    with BulkImporter(db, chunk_size=args.chunk_size) as importer:
+        for rotulo, metodo, path in (
+            ("alunos", importer.import_students, alunos),
+            ("responsáveis", importer.import_parents, pais),
+            ("vínculos", importer.import_links, vinculos),
+        ):
+            report = metodo(path)
+            total += report.seconds
+            imprimir_taxa(f"import {rotulo} ({len(report.errors)} erros)", report.inserted, report.seconds)
+    print(f"Total: {total:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
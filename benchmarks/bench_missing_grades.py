@@ -0,0 +1,95 @@
+"""
+Benchmark: notas faltantes da escola inteira (anti-join) x gerar todos os boletins.
+
+    python -m benchmarks.bench_missing_grades --classrooms 40 --students 35 --subjects 10
+"""
+import argparse
+import random
+import time
+
+from benchmarks.common import criar_banco_temporario, imprimir_taxa
+from src.application.services import ServicosDoAluno
+from src.domain.models import Bimester
+from src.infrastructure.database import (
+    AssessmentRepository, AttendanceRepository, GradeRepository, StudentRepository
+)
+
+_TURNOS = ("MANHA", "TARDE", "NOITE", "INTEGRAL")
+
+
+def _popular(db, turmas: int, por_turma: int, disciplinas: int, faltando: float) -> int:
+    materias = [db.subjects.id_for(f"Disciplina {i:02d}", create=True) for i in range(disciplinas)]
+    conn = db.get_connection()
+    conn.executemany(
+        "INSERT INTO teachers (name, email) VALUES (?, ?)",
+        [(f"Professor {i:02d}", f"p{i}@escola.com") for i in range(disciplinas)])
+    conn.executemany(
+        "INSERT INTO teacher_subjects (teacher_id, subject_id) VALUES (?, ?)",
+        [(i + 1, materia) for i, materia in enumerate(materias)])
+    conn.executemany(
+        "INSERT INTO classrooms (year, identifier, shift, education_level) VALUES (?, ?, ?, 'FUNDAMENTAL_II')",
+        [(f"{6 + i // 26 % 4}º Ano", chr(65 + i % 26), _TURNOS[i // 104]) for i in range(turmas)])
+    alunos = turmas * por_turma
+    conn.executemany(
+        "INSERT INTO students (name, registration, email) VALUES (?, ?, ?)",
+        [(f"Aluno {i:06d}", f"M{i:06d}", f"m{i}@escola.com") for i in range(alunos)])
+    conn.executemany(
+        "INSERT INTO classroom_enrollments (student_id, classroom_id, academic_year) VALUES (?, ?, 2024)",
+        [(i + 1, i // por_turma + 1) for i in range(alunos)])
+    conn.executemany(
+        "INSERT INTO assessments (title, subject_id, max_score, weight, assessment_type, bimester, academic_year) "
+        "VALUES (?, ?, 10.0, 1.0, 'PROVA', ?, 2024)",
+        [(f"Prova {n}", materia, bim.value) for materia in materias for bim in Bimester for n in (1, 2)])
+    conn.execute("""
+        INSERT INTO grades (student_id, assessment_id, score)
+        SELECT s.student_id, a.assessment_id, 7.0 FROM students s CROSS JOIN assessments a
+    """)
+    total = conn.execute("SELECT COUNT(*) FROM grades").fetchone()[0]
+    ids = random.Random(7).sample(range(1, total + 1), int(total * faltando))
+    conn.executemany("DELETE FROM grades WHERE grade_id = ?", [(i,) for i in ids])
+    conn.commit()
+    conn.close()
+    return len(ids)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--classrooms", type=int, default=40)
+    parser.add_argument("--students", type=int, default=35, help="alunos por turma")
+    parser.add_argument("--subjects", type=int, default=10)
+    parser.add_argument("--missing", type=float, default=0.03, help="fração de notas não lançadas")
+    parser.add_argument("--sample", type=int, default=100, help="alunos na medição de gerar_boletim")
+    args = parser.parse_args(argv)
+
+    db = criar_banco_temporario()
+    faltando = _popular(db, args.classrooms, args.students, args.subjects, args.missing)
+    servicos = ServicosDoAluno(GradeRepository(db), AssessmentRepository(db),
+                               StudentRepository(db), AttendanceRepository(db))
+    alunos = args.classrooms * args.students
+    print(f"{alunos} alunos, {args.subjects * 8} avaliações, {faltando} notas faltando")
+    servicos.detectar_notas_faltantes(2024)  # aquece cache de páginas e statements
+
+    inicio = time.perf_counter()
+    pendencias = servicos.detectar_notas_faltantes(2024)
+    imprimir_taxa("detector (uma consulta, anti-join)", sum(len(p.faltantes) for p in pendencias),
+                  time.perf_counter() - inicio)
+
+    # Boletim a boletim é lento demais para a escola toda: mede uma amostra e extrapola
+    amostra = min(args.sample, alunos)
+    disciplinas = [f"Disciplina {d:02d}" for d in range(args.subjects)]
+    inicio = time.perf_counter()
+    incompletos = sum(
+        servicos.gerar_boletim(sid, disciplina, 2024).situacao == "Incompleto"
+        for sid in range(1, amostra + 1) for disciplina in disciplinas
+    )
+    segundos = time.perf_counter() - inicio
+    imprimir_taxa(f"gerar_boletim ({amostra} alunos)", amostra * len(disciplinas), segundos)
+    print(f"  estimativa para a escola toda: {segundos * alunos / amostra:.1f}s")
+    # O boletim só acusa bimestre sem nenhuma nota; o detector acha cada avaliação faltante
+    pendentes = {(f.student_id, p.disciplina) for p in pendencias for f in p.faltantes if f.student_id <= amostra}
+    print(f"  na amostra: {incompletos} boletim(ns) Incompleto(s), {len(pendentes)} (aluno, disciplina) "
+          f"com pendência no detector")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmark: projeção leve (select) x list_all() — latência e memória alocada.
+
+    python -m benchmarks.bench_projection --students 50000
+"""
+import argparse
+import time
+import tracemalloc
+
+from benchmarks.common import criar_banco_temporario, imprimir_taxa
+from src.infrastructure.database import StudentRepository
+
+
+def _popular(db, n: int) -> None:
+    conn = db.get_connection()
+    conn.executemany(
+        "INSERT INTO students (name, registration, email) VALUES (?, ?, ?)",
+        [(f"Aluno {i:06d}", f"J{i:06d}", f"j{i}@escola.com") for i in range(n)])
+    conn.commit()
+    conn.close()
+
+
+def _medir(rotulo: str, n: int, func) -> None:
+    # Tempo e memória em execuções separadas (tracemalloc deixa tudo mais lento)
+    inicio = time.perf_counter()
+    resultado = func()
+    segundos = time.perf_counter() - inicio
+    assert len(resultado) == n
+    del resultado
+    tracemalloc.start()
+    func()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    imprimir_taxa(rotulo, n, segundos)
+    print(f"  pico de memória: {pico / 1024 / 1024:.1f} MiB")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--students", type=int, default=50000)
+    args = parser.parse_args(argv)
+
+    db = criar_banco_temporario()
+    _popular(db, args.students)
+    repo = StudentRepository(db)
+    n = args.students
+
+    _medir("list_all() -> Student", n, repo.list_all)
+    _medir("select(campos, named=True)", n,
+           lambda: repo.select(("student_id", "registration", "name"), where={"active": 1},
+                               order_by="name", named=True))
+    _medir("select(campos) -> tuplas", n,
+           lambda: repo.select(("student_id", "registration", "name"), where={"active": 1}, order_by="name"))
+    _medir("select('student_id') -> ids", n,
+           lambda: repo.select("student_id", where={"active": 1}, order_by="name"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark: carga mista (leitores em threads + um escritor) com conexão por
+chamada, pool normal e pool de leitura read-only (com e sem WAL).
+
+    python -m benchmarks.bench_read_pool --readers 4 --seconds 3
+"""
+import argparse
+import threading
+import time
+
+from benchmarks.common import criar_banco_temporario
+from src.domain.models import Student
+from src.infrastructure.database import DatabaseManager, StudentRepository
+
+
+def _popular(db, n: int) -> None:
+    conn = db.get_connection()
+    conn.executemany(
+        "INSERT INTO students (name, registration, email) VALUES (?, ?, ?)",
+        [(f"Aluno {i:06d}", f"Q{i:06d}", f"q{i}@escola.com") for i in range(n)])
+    conn.commit()
+    conn.close()
+
+
+def _rodar(db, alunos: int, leitores: int, segundos: float):
+    repo = StudentRepository(db)
+    parar = threading.Event()
+    leituras = [0] * leitores
+    escritas = [0]
+
+    def ler(k):
+        i = k
+        while not parar.is_set():
+            repo.find_by_id(1 + (i * 7919) % alunos)
+            repo.select(("student_id", "name"), where={"registration": f"Q{i % alunos:06d}"})
+            leituras[k] += 2
+            i += 1
+
+    def escrever():
+        i = 0
+        while not parar.is_set():
+            repo.save(Student(name=f"Novo {i}", registration=f"N{time.perf_counter_ns()}",
+                              email=f"n{i}@escola.com"))
+            escritas[0] += 1
+            i += 1
+
+    threads = [threading.Thread(target=ler, args=(k,)) for k in range(leitores)]
+    threads.append(threading.Thread(target=escrever))
+    for t in threads:
+        t.start()
+    time.sleep(segundos)
+    parar.set()
+    for t in threads:
+        t.join()
+    return sum(leituras) / segundos, escritas[0] / segundos
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--students", type=int, default=20000)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args(argv)
+
+    configs = (
+        ("conexão por chamada", {}),
+        ("pool_size=8", {"pool_size": 8}),
+        ("read_pool_size=8", {"read_pool_size": 8}),
+        ("read_pool_size=8 + WAL", {"read_pool_size": 8, "journal_mode": "wal"}),
+    )
+    for rotulo, kwargs in configs:
+        base = criar_banco_temporario()
+        _popular(base, args.students)
+        db = DatabaseManager(str(base.db_path), **kwargs)
+        leituras, escritas = _rodar(db, args.students, args.readers, args.seconds)
+        db.close()
+        print(f"{rotulo:<26} leituras {leituras:>9,.0f}/s   escritas {escritas:>7,.0f}/s")
+
+
+if __name__ == "__main__":
+    main()
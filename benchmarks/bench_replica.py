@@ -0,0 +1,93 @@
+"""
+Benchmark: latência de relatório (boletins) com escritas concorrentes,
+lendo do arquivo x lendo da réplica em memória.
+
+    python -m benchmarks.bench_replica --students 300 --seconds 3
+"""
+import argparse
+import threading
+import time
+
+from benchmarks.common import criar_banco_temporario
+from src.application.services import ServicosDoAluno
+from src.domain.models import Bimester
+from src.infrastructure.database import (
+    AssessmentRepository, AttendanceRepository, GradeRepository, StudentRepository
+)
+
+
+def _popular(db, alunos: int) -> None:
+    materia = db.subjects.id_for("Matemática", create=True)
+    conn = db.get_connection()
+    conn.executemany(
+        "INSERT INTO students (name, registration, email) VALUES (?, ?, ?)",
+        [(f"Aluno {i:05d}", f"P{i:05d}", f"p{i}@escola.com") for i in range(alunos)])
+    conn.executemany(
+        "INSERT INTO assessments (title, subject_id, max_score, weight, assessment_type, bimester, academic_year) "
+        "VALUES (?, ?, 10.0, 1.0, 'PROVA', ?, 2024)",
+        [(f"Prova {i}", materia, b.value) for b in Bimester for i in range(3)])
+    conn.execute("""
+        INSERT INTO grades (student_id, assessment_id, score)
+        SELECT s.student_id, a.assessment_id, 7.0 FROM students s CROSS JOIN assessments a
+    """)
+    conn.commit()
+    conn.close()
+
+
+def _escritor(db, parar: threading.Event, contador: list) -> None:
+    """Lança notas em ritmo intenso (uma transação por nota, como o lançamento manual)."""
+    conn = db.get_connection()
+    i = 0
+    while not parar.is_set():
+        conn.execute("UPDATE grades SET score = ? WHERE grade_id = ?", ((i % 97) / 10, 1 + i % 1000))
+        conn.commit()
+        contador[0] += 1
+        i += 1
+        time.sleep(0.0005)
+    conn.close()
+
+
+def _medir(db, alunos: int, segundos: float):
+    servicos = ServicosDoAluno(GradeRepository(db), AssessmentRepository(db),
+                               StudentRepository(db), AttendanceRepository(db))
+    parar = threading.Event()
+    escritas = [0]
+    escritor = threading.Thread(target=_escritor, args=(db, parar, escritas))
+    escritor.start()
+    latencias = []
+    fim = time.perf_counter() + segundos
+    sid = 0
+    while time.perf_counter() < fim:
+        inicio = time.perf_counter()
+        servicos.gerar_boletim(1 + sid % alunos, "Matemática", 2024)
+        latencias.append(time.perf_counter() - inicio)
+        sid += 1
+    parar.set()
+    escritor.join()
+    latencias.sort()
+    return latencias, escritas[0]
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--students", type=int, default=300)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args(argv)
+
+    db = criar_banco_temporario()
+    _popular(db, args.students)
+
+    for rotulo in ("arquivo (get_connection)", "réplica em memória"):
+        if rotulo.startswith("réplica"):
+            db.enable_read_replica(refresh_interval=1.0)
+        latencias, escritas = _medir(db, args.students, args.seconds)
+        p50 = latencias[len(latencias) // 2] * 1000
+        p99 = latencias[int(len(latencias) * 0.99)] * 1000
+        print(f"{rotulo:<26} {len(latencias):>6} boletins  p50 {p50:6.2f} ms  p99 {p99:7.2f} ms  "
+              f"máx {latencias[-1] * 1000:7.1f} ms  | {escritas} notas gravadas")
+    print(f"réplica: {db.replica.stats()}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
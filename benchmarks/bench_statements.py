@@ -0,0 +1,66 @@
+"""
+Benchmark: statements preparados reaproveitados por conexão (cached_statements).
+
+    python -m benchmarks.bench_statements --writes 5000
+"""
+import argparse
+from datetime import date, timedelta
+
+from benchmarks.common import criar_banco_temporario, cronometro, imprimir_taxa
+from src.domain.models import Student, Assessment, Attendance, AssessmentType, Bimester
+from src.infrastructure.database import (
+    DatabaseManager, StudentRepository, AssessmentRepository, AttendanceRepository
+)
+
+
+CENARIOS = [
+    ("sem pool (conexão por chamada)", dict(pool_size=0)),
+    ("pool, cached_statements=0", dict(pool_size=1, cached_statements=0)),
+    ("pool, cached_statements=128", dict(pool_size=1, cached_statements=128)),
+]
+
+
+def _rodar(db: DatabaseManager, n: int) -> None:
+    aluno = StudentRepository(db).save(Student(name="Aluno", registration="P0001", email="p@escola.com"))
+    assessments = AssessmentRepository(db)
+    attendance = AttendanceRepository(db)
+    inicio = date(2024, 1, 1)
+    for i in range(n):
+        assessments.save(Assessment(
+            title=f"Atividade {i}", subject="Matemática", max_score=10.0, weight=1.0,
+            assessment_type=AssessmentType.TRABALHO, bimester=Bimester.PRIMEIRO, academic_year=2024))
+        attendance.save(Attendance(student=aluno, subject="Matemática",
+                                   attendance_date=inicio + timedelta(days=i)))
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--writes", type=int, default=5000, help="avaliações + presenças gravadas")
+    args = parser.parse_args(argv)
+
+    referencia = None  # parse+exec médio sem cache, para estimar o parse evitado
+    for rotulo, opcoes in CENARIOS:
+        base = criar_banco_temporario()
+        db = DatabaseManager(str(base.db_path), statement_stats=True, **opcoes)
+        conn = db.get_connection()
+        conn.execute("PRAGMA journal_mode = WAL")  # tira o fsync por commit da frente
+        conn.close()
+        db.statement_stats.reset()
+
+        tempos = {}
+        with cronometro(tempos, rotulo):
+            _rodar(db, args.writes)
+        db.close()
+        imprimir_taxa(rotulo, args.writes * 2, tempos[rotulo])
+        s = db.statement_stats.summary()
+        print(f"  statements: {s['statements']}  reaproveitados: {s['reuse_rate']:.1%}  "
+              f"parse+exec: {s['avg_prepare_execute_us']:.1f}us  exec: {s['avg_execute_us']:.1f}us")
+        if opcoes.get('cached_statements') == 0:
+            referencia = s['avg_prepare_execute_us']
+        elif referencia is not None and s['reused']:
+            evitado = (referencia - s['avg_execute_us']) * s['reused'] / 1e6
+            print(f"  parse evitado (vs cached_statements=0): {evitado:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
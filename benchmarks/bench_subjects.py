@@ -0,0 +1,149 @@
+"""
+Benchmark: um ano de frequência com a disciplina em texto (até a versão 4)
+x subject_id no catálogo `subjects`: tamanho do arquivo, dos índices e das
+consultas.
+
+    python -m benchmarks.bench_subjects --students 500 --days 200
+"""
+import argparse
+import sqlite3
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from benchmarks.common import imprimir_taxa
+
+
+DISCIPLINAS = ["Matemática", "Língua Portuguesa", "Ciências", "História", "Geografia",
+               "Língua Inglesa", "Educação Física", "Arte", "Ensino Religioso", "Física"]
+
+# Mesmas colunas, restrições e índices da tabela attendance nas duas versões
+# (sem as FKs para alunos, que não mudam entre elas)
+_LAYOUTS = {
+    "texto (subject)": """
+        CREATE TABLE attendance (
+            attendance_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER NOT NULL,
+            subject VARCHAR(100) NOT NULL,
+            attendance_date DATE NOT NULL,
+            is_present BOOLEAN NOT NULL DEFAULT 1,
+            is_justified BOOLEAN NOT NULL DEFAULT 0,
+            justification TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE (student_id, subject, attendance_date)
+        );
+        CREATE INDEX idx_attendance_date ON attendance(attendance_date);
+        CREATE INDEX idx_attendance_student_subject ON attendance(student_id, subject);
+    """,
+    "id (subject_id)": """
+        CREATE TABLE subjects (
+            subject_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name VARCHAR(100) NOT NULL UNIQUE
+        );
+        CREATE TABLE attendance (
+            attendance_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER NOT NULL,
+            subject_id INTEGER NOT NULL REFERENCES subjects(subject_id),
+            attendance_date DATE NOT NULL,
+            is_present BOOLEAN NOT NULL DEFAULT 1,
+            is_justified BOOLEAN NOT NULL DEFAULT 0,
+            justification TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE (student_id, subject_id, attendance_date)
+        );
+        CREATE INDEX idx_attendance_date ON attendance(attendance_date);
+        CREATE INDEX idx_attendance_student_subject ON attendance(student_id, subject_id);
+    """,
+}
+
+# Frequência de um aluno numa disciplina (AttendanceRepository.find_by_student_and_period)
+_PERIODO = {
+    "texto (subject)": "SELECT attendance_date, is_present FROM attendance "
+                       "WHERE student_id = ? AND subject = ? AND attendance_date BETWEEN ? AND ?",
+    "id (subject_id)": "SELECT attendance_date, is_present FROM attendance "
+                       "WHERE student_id = ? AND subject_id = ? AND attendance_date BETWEEN ? AND ?",
+}
+
+# Presença por aluno e disciplina no ano (sharding.attendance_risk)
+_RISCO = {
+    "texto (subject)": "SELECT student_id, subject, COUNT(*), SUM(is_present) FROM attendance "
+                       "WHERE attendance_date BETWEEN ? AND ? GROUP BY student_id, subject",
+    "id (subject_id)": "SELECT t.student_id, s.name, COUNT(*), SUM(t.is_present) FROM attendance t "
+                       "JOIN subjects s ON s.subject_id = t.subject_id "
+                       "WHERE t.attendance_date BETWEEN ? AND ? GROUP BY t.student_id, t.subject_id",
+}
+
+
+def _popular(path: Path, layout: str, alunos: int, dias: int) -> None:
+    conn = sqlite3.connect(str(path))
+    conn.executescript(_LAYOUTS[layout])
+    if layout.startswith("id"):
+        conn.executemany("INSERT INTO subjects (name) VALUES (?)", [(d,) for d in DISCIPLINAS])
+        chaves = range(1, len(DISCIPLINAS) + 1)
+        coluna = "subject_id"
+    else:
+        chaves = DISCIPLINAS
+        coluna = "subject"
+    datas = [(date(2024, 2, 1) + timedelta(days=d)).isoformat() for d in range(dias)]
+    conn.executemany(
+        f"INSERT INTO attendance (student_id, {coluna}, attendance_date, is_present, is_justified, "
+        f"justification) VALUES (?, ?, ?, ?, ?, ?)",
+        ((sid, chave, dia, 0 if i % 17 == 0 else 1, 1 if i % 17 == 0 else 0,
+          "Atestado" if i % 17 == 0 else None)
+         for sid in range(1, alunos + 1) for chave in chaves for i, dia in enumerate(datas)))
+    conn.commit()
+    conn.execute("VACUUM")
+    conn.close()
+
+
+def _tamanhos(path: Path) -> dict:
+    """Bytes por tabela/índice (dbstat), ou {} se o SQLite não tiver a extensão."""
+    conn = sqlite3.connect(str(path))
+    try:
+        return dict(conn.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name"))
+    except sqlite3.OperationalError:
+        return {}
+    finally:
+        conn.close()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--students", type=int, default=500)
+    parser.add_argument("--days", type=int, default=200, help="dias letivos no ano")
+    parser.add_argument("--lookups", type=int, default=20000, help="consultas por aluno+disciplina")
+    args = parser.parse_args(argv)
+
+    pasta = Path(tempfile.mkdtemp(prefix="school-bench-"))
+    linhas = args.students * len(DISCIPLINAS) * args.days
+    print(f"{linhas} presenças ({args.students} alunos x {len(DISCIPLINAS)} disciplinas x {args.days} dias)")
+    for numero, layout in enumerate(_LAYOUTS):
+        path = pasta / f"frequencia_{numero}.db"
+        inicio = time.perf_counter()
+        _popular(path, layout, args.students, args.days)
+        print(f"\n== {layout}")
+        imprimir_taxa("carga + VACUUM", linhas, time.perf_counter() - inicio)
+
+        print(f"  arquivo: {path.stat().st_size / 2**20:8.1f} MiB")
+        for nome, tamanho in sorted(_tamanhos(path).items()):
+            if nome.startswith(("attendance", "sqlite_autoindex_attendance", "idx_attendance")):
+                print(f"    {nome:<40} {tamanho / 2**20:8.1f} MiB")
+
+        conn = sqlite3.connect(str(path))
+        ids = {d: i for i, d in enumerate(DISCIPLINAS, start=1)}
+        chaves = [ids[d] for d in DISCIPLINAS] if layout.startswith("id") else DISCIPLINAS
+        consultas = [((n * 7919) % args.students + 1, chaves[n % len(chaves)]) for n in range(args.lookups)]
+        inicio = time.perf_counter()
+        for sid, chave in consultas:
+            conn.execute(_PERIODO[layout], (sid, chave, "2024-03-01", "2024-06-30")).fetchall()
+        imprimir_taxa("  frequência aluno+disciplina", args.lookups, time.perf_counter() - inicio)
+
+        inicio = time.perf_counter()
+        grupos = conn.execute(_RISCO[layout], ("2024-01-01", "2024-12-31")).fetchall()
+        imprimir_taxa("  presença por aluno e disciplina", len(grupos), time.perf_counter() - inicio)
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
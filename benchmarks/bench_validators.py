@@ -0,0 +1,75 @@
+"""
+Microbenchmark: validadores de src/utils.py (padrões compilados, tabela de
+dígitos do CPF e APIs em lote) comparados à implementação anterior.
+
+    python -m benchmarks.bench_validators --n 200000
+"""
+import argparse
+import re
+import time
+
+from benchmarks.common import gerar_cpf
+from src import utils
+
+
+# --- Implementação anterior (re.match/re.sub com string e int() por dígito) ---
+
+def _validar_cpf_anterior(cpf: str) -> bool:
+    if not cpf:
+        return False
+    numeros = re.sub(r'[^0-9]', '', cpf)
+    if len(numeros) != 11 or numeros == numeros[0] * 11:
+        return False
+    soma = 0
+    for i in range(9):
+        soma += int(numeros[i]) * (10 - i)
+    primeiro = (soma * 10 % 11) % 10
+    soma = 0
+    for i in range(10):
+        soma += int(numeros[i]) * (11 - i)
+    segundo = (soma * 10 % 11) % 10
+    return int(numeros[9]) == primeiro and int(numeros[10]) == segundo
+
+
+def _validar_email_anterior(email: str) -> bool:
+    if not email:
+        return False
+    email = email.strip().lower()
+    if not re.match(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', email):
+        return False
+    if len(email) < 5 or len(email) > 254:
+        return False
+    return len(email.split('@')[0]) <= 64
+
+
+def _medir(rotulo: str, func, dados, base: float = None) -> float:
+    inicio = time.perf_counter()
+    func(dados)
+    segundos = time.perf_counter() - inicio
+    ganho = f"  ({base / segundos:4.2f}x)" if base else ""
+    print(f"{rotulo:<42} {segundos * 1e9 / len(dados):8.0f} ns/item{ganho}")
+    return segundos
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--n", type=int, default=200_000)
+    args = parser.parse_args(argv)
+
+    cpfs = [gerar_cpf(i) for i in range(args.n)]
+    formatados = [utils.formatar_cpf(c) for c in cpfs]
+    emails = [f"aluno.{i}@escola.com.br" for i in range(args.n)]
+
+    base = _medir("validar_cpf anterior", lambda d: [_validar_cpf_anterior(c) for c in d], cpfs)
+    _medir("validar_cpf", lambda d: [utils.validar_cpf(c) for c in d], cpfs, base)
+    _medir("validar_cpfs (lote)", utils.validar_cpfs, cpfs, base)
+    base = _medir("validar_cpf anterior (formatado)",
+                  lambda d: [_validar_cpf_anterior(c) for c in d], formatados)
+    _medir("validar_cpfs (lote, formatado)", utils.validar_cpfs, formatados, base)
+    base = _medir("validar_email anterior", lambda d: [_validar_email_anterior(e) for e in d], emails)
+    _medir("validar_email", lambda d: [utils.validar_email(e) for e in d], emails, base)
+    _medir("validar_emails (lote)", utils.validar_emails, emails, base)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Benchmark: vínculos com rowid (até a versão 6) x WITHOUT ROWID (versão 7),
+e frequência/matrículas também WITHOUT ROWID (layout medido e não adotado:
+os ids da API exigiriam um contador mantido à mão). Tamanho das
+tabelas/índices e das buscas.
+
+    python -m benchmarks.bench_without_rowid --students 500 --days 200
+"""
+import argparse
+import sqlite3
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from benchmarks.common import imprimir_taxa
+
+
+DISCIPLINAS = 8
+
+# Mesmas colunas, chaves e índices do schema (sem as FKs, que não mudam)
+_ATTENDANCE_ROWID = """
+    CREATE TABLE attendance (
+        attendance_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        student_id INTEGER NOT NULL, subject_id INTEGER NOT NULL, attendance_date DATE NOT NULL,
+        is_present BOOLEAN NOT NULL DEFAULT 1, is_justified BOOLEAN NOT NULL DEFAULT 0,
+        justification TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE (student_id, subject_id, attendance_date)
+    );
+    CREATE INDEX idx_attendance_date ON attendance(attendance_date);
+    CREATE INDEX idx_attendance_student_subject ON attendance(student_id, subject_id);
+    CREATE TABLE classroom_enrollments (
+        enrollment_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        student_id INTEGER NOT NULL, classroom_id INTEGER NOT NULL, academic_year INTEGER NOT NULL,
+        enrollment_date DATE NOT NULL DEFAULT CURRENT_DATE, status VARCHAR(20) NOT NULL DEFAULT 'ACTIVE',
+        UNIQUE (student_id, classroom_id, academic_year)
+    );
+    CREATE INDEX idx_enrollment_roster ON classroom_enrollments(classroom_id, academic_year, status, student_id);
+    CREATE INDEX idx_enrollment_student_year
+        ON classroom_enrollments(student_id, academic_year, status, classroom_id);
+"""
+
+_LINKS = """
+    CREATE TABLE student_parent (
+        student_id INTEGER NOT NULL, parent_id INTEGER NOT NULL,
+        relationship_type VARCHAR(50) DEFAULT 'Responsável', created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (student_id, parent_id)
+    ){};
+    CREATE INDEX idx_student_parent_parent ON student_parent(parent_id, student_id);
+"""
+
+_LAYOUTS = {
+    "rowid (versão 6)": _ATTENDANCE_ROWID + _LINKS.format(""),
+    "vínculos WITHOUT ROWID (versão 7)": _ATTENDANCE_ROWID + _LINKS.format(" WITHOUT ROWID"),
+    "tudo WITHOUT ROWID (não adotado)": """
+        CREATE TABLE attendance (
+            attendance_id INTEGER NOT NULL UNIQUE,
+            student_id INTEGER NOT NULL, subject_id INTEGER NOT NULL, attendance_date DATE NOT NULL,
+            is_present BOOLEAN NOT NULL DEFAULT 1, is_justified BOOLEAN NOT NULL DEFAULT 0,
+            justification TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (student_id, subject_id, attendance_date)
+        ) WITHOUT ROWID;
+        CREATE INDEX idx_attendance_date ON attendance(attendance_date);
+        CREATE TABLE classroom_enrollments (
+            enrollment_id INTEGER NOT NULL UNIQUE,
+            student_id INTEGER NOT NULL, classroom_id INTEGER NOT NULL, academic_year INTEGER NOT NULL,
+            enrollment_date DATE NOT NULL DEFAULT CURRENT_DATE, status VARCHAR(20) NOT NULL DEFAULT 'ACTIVE',
+            PRIMARY KEY (student_id, academic_year, classroom_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX idx_enrollment_roster ON classroom_enrollments(classroom_id, academic_year, status, student_id);
+    """ + _LINKS.format(" WITHOUT ROWID"),
+}
+
+# Buscas dos repositórios (nome, SQL); os parâmetros saem de _parametros
+_BUSCAS = [
+    ("frequência aluno+disciplina (4 meses)",
+     "SELECT attendance_id, attendance_date, is_present, is_justified, justification FROM attendance "
+     "WHERE student_id = ? AND subject_id = ? AND attendance_date BETWEEN '2024-03-01' AND '2024-06-30' "
+     "ORDER BY attendance_date"),
+    ("presença num dia (chave completa)",
+     "SELECT attendance_id, is_present FROM attendance "
+     "WHERE student_id = ? AND subject_id = ? AND attendance_date = '2024-04-10'"),
+    ("frequência por attendance_id",
+     "SELECT student_id, is_present FROM attendance WHERE attendance_id = ?"),
+    ("turma atual do aluno",
+     "SELECT classroom_id FROM classroom_enrollments "
+     "WHERE student_id = ? AND academic_year = 2024 AND status = 'ACTIVE'"),
+    ("responsáveis do aluno",
+     "SELECT parent_id, relationship_type FROM student_parent WHERE student_id = ?"),
+    ("filhos do responsável",
+     "SELECT student_id, relationship_type FROM student_parent WHERE parent_id = ?"),
+]
+
+
+def _popular(path: Path, layout: str, alunos: int, dias: int) -> float:
+    conn = sqlite3.connect(str(path))
+    conn.executescript(_LAYOUTS[layout])
+    datas = [(date(2024, 2, 1) + timedelta(days=d)).isoformat() for d in range(dias)]
+    inicio = time.perf_counter()
+    linhas = ((sid, materia, dia, 0 if i % 17 == 0 else 1, 1 if i % 17 == 0 else 0,
+               "Atestado" if i % 17 == 0 else None)
+              for sid in range(1, alunos + 1) for materia in range(1, DISCIPLINAS + 1)
+              for i, dia in enumerate(datas))
+    conn.executemany(
+        "INSERT INTO attendance (attendance_id, student_id, subject_id, attendance_date, is_present, "
+        "is_justified, justification) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        ((n,) + linha for n, linha in enumerate(linhas, start=1)))
+    conn.executemany(
+        "INSERT INTO classroom_enrollments (enrollment_id, student_id, classroom_id, academic_year, status) "
+        "VALUES (?, ?, ?, ?, ?)",
+        ((n, sid, sid // 30 + ano, ano, 'ACTIVE' if ano == 2024 else 'COMPLETED')
+         for n, (sid, ano) in enumerate(((s, a) for s in range(1, alunos + 1) for a in (2022, 2023, 2024)),
+                                        start=1)))
+    conn.executemany(
+        "INSERT INTO student_parent (student_id, parent_id, relationship_type) VALUES (?, ?, ?)",
+        # Irmãos dois a dois: cada responsável tem dois filhos
+        ((sid, (sid + 1) // 2 + k * alunos, "Mãe" if k else "Pai")
+         for sid in range(1, alunos + 1) for k in (0, 1)))
+    conn.commit()
+    segundos = time.perf_counter() - inicio
+    conn.execute("VACUUM")
+    conn.close()
+    return segundos
+
+
+def _tamanhos(path: Path) -> dict:
+    """Bytes por tabela/índice (dbstat), ou {} se o SQLite não tiver a extensão."""
+    conn = sqlite3.connect(str(path))
+    try:
+        return dict(conn.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name"))
+    except sqlite3.OperationalError:
+        return {}
+    finally:
+        conn.close()
+
+
+def _parametros(nome: str, n: int, alunos: int, linhas: int) -> tuple:
+    sid = (n * 7919) % alunos + 1
+    if nome.startswith(("frequência aluno", "presença")):
+        return sid, n % DISCIPLINAS + 1
+    if nome.startswith("frequência por"):
+        return ((n * 104729) % linhas + 1,)
+    if nome.startswith("filhos"):
+        return ((sid + 1) // 2,)
+    return (sid,)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--students", type=int, default=500)
+    parser.add_argument("--days", type=int, default=200, help="dias letivos no ano")
+    parser.add_argument("--lookups", type=int, default=20000, help="buscas de cada tipo")
+    args = parser.parse_args(argv)
+
+    pasta = Path(tempfile.mkdtemp(prefix="school-bench-"))
+    linhas = args.students * DISCIPLINAS * args.days
+    print(f"{linhas} presenças ({args.students} alunos x {DISCIPLINAS} disciplinas x {args.days} dias)")
+    for numero, layout in enumerate(_LAYOUTS):
+        path = pasta / f"layout_{numero}.db"
+        segundos = _popular(path, layout, args.students, args.days)
+        print(f"\n== {layout}")
+        imprimir_taxa("carga", linhas, segundos)
+        print(f"  arquivo: {path.stat().st_size / 2**20:8.1f} MiB")
+        for nome, tamanho in sorted(_tamanhos(path).items()):
+            if not nome.startswith("sqlite_s"):  # sqlite_schema, sqlite_sequence
+                print(f"    {nome:<40} {tamanho / 2**20:8.2f} MiB")
+
+        conn = sqlite3.connect(str(path))
+        for nome, sql in _BUSCAS:
+            consultas = [_parametros(nome, n, args.students, linhas) for n in range(args.lookups)]
+            plano = conn.execute(f"EXPLAIN QUERY PLAN {sql}", consultas[0]).fetchall()[-1][3]
+            inicio = time.perf_counter()
+            for params in consultas:
+                conn.execute(sql, params).fetchall()
+            imprimir_taxa(f"  {nome}", args.lookups, time.perf_counter() - inicio)
+            print(f"      {plano}")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark: save() por thread x WriteQueue com group commit.
+
+    python -m benchmarks.bench_write_queue --threads 8 --writes 200
+"""
+import argparse
+import threading
+from datetime import date, timedelta
+
+from benchmarks.common import criar_banco_temporario, cronometro, imprimir_taxa
+from src.domain.models import Student, Attendance
+from src.infrastructure.database import StudentRepository, AttendanceRepository
+from src.infrastructure.write_queue import WriteQueue
+
+
+def _preparar(n_threads: int):
+    db = criar_banco_temporario()
+    repo = StudentRepository(db)
+    alunos = [
+        repo.save(Student(name=f"Aluno {i:03d}", registration=f"B{i:05d}", email=f"b{i}@escola.com"))
+        for i in range(n_threads)
+    ]
+    return db, alunos
+
+
+def _presencas(aluno, n: int, subject: str):
+    inicio = date(2024, 1, 1)
+    return [
+        Attendance(student=aluno, subject=subject, attendance_date=inicio + timedelta(days=d))
+        for d in range(n)
+    ]
+
+
+def _rodar_threads(alvo, n_threads: int) -> None:
+    threads = [threading.Thread(target=alvo, args=(i,)) for i in range(n_threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--writes", type=int, default=200, help="escritas por thread")
+    args = parser.parse_args(argv)
+    total = args.threads * args.writes
+    tempos = {}
+
+    # 1) Um save() (uma transação + fsync) por escrita
+    db, alunos = _preparar(args.threads)
+    repo = AttendanceRepository(db)
+
+    def direto(i):
+        for att in _presencas(alunos[i], args.writes, "Direto"):
+            repo.save(att)
+
+    with cronometro(tempos, "direto"):
+        _rodar_threads(direto, args.threads)
+    imprimir_taxa("AttendanceRepository.save()", total, tempos["direto"])
+
+    # 2) Mesmas escritas via WriteQueue
+    db, alunos = _preparar(args.threads)
+    with WriteQueue(db) as fila:
+        def enfileirado(i):
+            futures = [fila.submit_attendance(att)
+                       for att in _presencas(alunos[i], args.writes, "Fila")]
+            for f in futures:
+                f.result()
+
+        with cronometro(tempos, "fila"):
+            _rodar_threads(enfileirado, args.threads)
+    imprimir_taxa("WriteQueue.submit_attendance()", total, tempos["fila"])
+    print(f"  lotes gravados: {fila.batches_committed} "
+          f"(média {fila.writes_committed / max(fila.batches_committed, 1):.0f} escritas/lote)")
+
+
+if __name__ == "__main__":
+    main()
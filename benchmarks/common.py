@@ -0,0 +1,45 @@
+"""Funções de apoio compartilhadas pelos benchmarks."""
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from src.infrastructure.database import DatabaseManager
+
+
+SCHEMA_FILE = Path(__file__).parent.parent / "src" / "infrastructure" / "schema.sql"
+
+
+def criar_banco_temporario(nome: str = "bench.db") -> DatabaseManager:
+    """Cria um banco vazio (com schema) num diretório temporário."""
+    tmp_dir = Path(tempfile.mkdtemp(prefix="school-bench-"))
+    manager = DatabaseManager(str(tmp_dir / nome))
+    conn = manager.get_connection()
+    with open(SCHEMA_FILE, 'r', encoding='utf-8') as f:
+        conn.executescript(f.read())
+    conn.commit()
+    conn.close()
+    return manager
+
+
+@contextmanager
+def cronometro(resultado: dict, chave: str):
+    """Mede o tempo do bloco e guarda em resultado[chave] (segundos)."""
+    inicio = time.perf_counter()
+    yield
+    resultado[chave] = time.perf_counter() - inicio
+
+
+def imprimir_taxa(rotulo: str, quantidade: int, segundos: float) -> None:
+    """Imprime quantidade, tempo e taxa por segundo."""
+    taxa = quantidade / segundos if segundos > 0 else float("inf")
+    print(f"{rotulo:<40} {quantidade:>9} em {segundos:8.3f}s  ({taxa:,.0f}/s)")
+
+
+def gerar_cpf(n: int) -> str:
+    """Gera um CPF válido e único a partir de um número sequencial."""
+    base = [int(d) for d in f"{n + 100000000:09d}"[-9:]]
+    for peso_inicial in (10, 11):
+        soma = sum(d * (peso_inicial - i) for i, d in enumerate(base))
+        base.append(soma * 10 % 11 % 10)
+    return "".join(map(str, base))
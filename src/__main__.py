@@ -0,0 +1,6 @@
+"""Permite `python -m src <comando>` (ver src/cli.py)."""
+import sys
+
+from src.cli import main
+
+sys.exit(main())
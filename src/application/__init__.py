@@ -3,5 +3,8 @@ from .services import (
     ServicosDoAluno,
     ServicosSecretaria,
     BoletimDisciplina,
-    ExtratoPresenca
+    ExtratoPresenca,
+    ResultadoLote,
+    PainelAluno,
+    PainelResponsavel
 )
\ No newline at end of file
@@ -1,10 +1,15 @@
 # Serviços do sistema escolar
 # Dividido em 2 classes: ServicosDoAluno e ServicosSecretaria
-from dataclasses import dataclass
+from collections import OrderedDict
+from dataclasses import dataclass, field
+import threading
+import time
 from datetime import date, datetime
-from typing import Dict, List, Optional
+from itertools import groupby
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
-from src.domain.models import Bimester, Grade, Attendance
+from src.domain.models import Bimester, Grade, Attendance, RELATIONSHIP_TYPES
+from src.infrastructure.profiling import profiled
 
 
 # --- Dataclasses auxiliares ---
@@ -56,18 +61,132 @@ class ExtratoPresenca:
         )
 
 
+@dataclass
+class ResultadoLote:
+    """Resultado de uma operação em lote da secretaria.
+
+    `processados` e `duplicados` trazem as tuplas de entrada; `erros` traz
+    (tupla, motivo) para o que foi rejeitado na validação.
+    """
+    processados: List[tuple] = field(default_factory=list)
+    duplicados: List[tuple] = field(default_factory=list)
+    erros: List[Tuple[tuple, str]] = field(default_factory=list)
+
+    def __str__(self):
+        return (
+            f"Processados: {len(self.processados)} | "
+            f"Duplicados: {len(self.duplicados)} | "
+            f"Erros: {len(self.erros)}"
+        )
+
+
+@dataclass
+class PainelAluno:
+    """Resumo de um filho no painel do responsável."""
+    student_id: int
+    nome: str
+    matricula: str
+    parentesco: str
+    boletins: List[BoletimDisciplina] = field(default_factory=list)
+    frequencia: Dict[str, float] = field(default_factory=dict)  # disciplina -> % presença
+
+    def __str__(self):
+        linhas = [f"\n{self.nome} ({self.matricula}) - {self.parentesco}"]
+        for boletim in self.boletins:
+            freq = self.frequencia.get(boletim.disciplina)
+            linhas.append(
+                f"  {boletim.disciplina}: média {boletim.media_anual or 'N/A'} "
+                f"({boletim.situacao}), presença {f'{freq:.1f}%' if freq is not None else 'N/A'}"
+            )
+        return "\n".join(linhas)
+
+
+@dataclass
+class PainelResponsavel:
+    """Boletins e frequência de todos os filhos de um responsável no ano."""
+    parent_id: int
+    ano: int
+    alunos: List[PainelAluno]
+    gerado_em: datetime
+
+    def __str__(self):
+        return f"Painel do responsável {self.parent_id} - {self.ano}" + "".join(map(str, self.alunos))
+
+
+@dataclass
+class NotaFaltante:
+    """Avaliação do ano sem nota lançada para um aluno matriculado."""
+    student_id: int
+    aluno: str
+    classroom_id: int
+    assessment_id: int
+    avaliacao: str
+    bimestre: Bimester
+
+
+@dataclass
+class PendenciasDisciplina:
+    """Notas faltantes de um professor numa disciplina (todas as turmas dele)."""
+    teacher_id: Optional[int]  # None: nenhum professor definido para a disciplina
+    professor: Optional[str]
+    disciplina: str
+    faltantes: List[NotaFaltante] = field(default_factory=list)
+
+    @property
+    def alunos(self) -> int:
+        """Alunos com pelo menos uma nota faltando (boletim ficaria Incompleto)."""
+        return len({f.student_id for f in self.faltantes})
+
+    def __str__(self):
+        return (
+            f"{self.professor or 'Sem professor'} - {self.disciplina}: "
+            f"{len(self.faltantes)} nota(s) faltando, {self.alunos} aluno(s)"
+        )
+
+
+def _montar_boletim(disciplina: str, medias: Dict[Bimester, Optional[float]],
+                    media_aprovacao: float) -> BoletimDisciplina:
+    """Média anual e situação a partir das médias bimestrais."""
+    medias_validas = [m for m in medias.values() if m is not None]
+
+    if not medias_validas:
+        media_anual = None
+        situacao = "Incompleto"
+    elif len(medias_validas) < 4:
+        media_anual = round(sum(medias_validas) / len(medias_validas), 2)
+        situacao = "Incompleto"
+    else:
+        media_anual = round(sum(medias_validas) / 4, 2)
+        situacao = "Aprovado" if media_anual >= media_aprovacao else "Reprovado"
+
+    return BoletimDisciplina(
+        disciplina=disciplina,
+        media_1bim=medias.get(Bimester.PRIMEIRO),
+        media_2bim=medias.get(Bimester.SEGUNDO),
+        media_3bim=medias.get(Bimester.TERCEIRO),
+        media_4bim=medias.get(Bimester.QUARTO),
+        media_anual=media_anual,
+        situacao=situacao
+    )
+
+
 # --- Serviços do Aluno (notas, médias, boletim e frequência) ---
 
+@profiled
 class ServicosDoAluno:
     """Tudo relacionado ao aluno: notas, médias, boletim e frequência."""
 
     MEDIA_APROVACAO = 6.0
 
-    def __init__(self, grade_repo, assessment_repo, student_repo, attendance_repo):
+    def __init__(self, grade_repo, assessment_repo, student_repo, attendance_repo, media_cache=None):
         self.grade_repo = grade_repo
         self.assessment_repo = assessment_repo
         self.student_repo = student_repo
         self.attendance_repo = attendance_repo
+        # Cache opcional das médias bimestrais (AverageCache)
+        self.media_cache = media_cache
+        if media_cache is not None:
+            media_cache.attach(grade_repo, assessment_repo)
 
     def lancar_nota(self, student_id: int, assessment_id: int, score: float, graded_by: str) -> Grade:
         """Lança nota de um aluno em uma avaliação."""
@@ -96,9 +215,24 @@ class ServicosDoAluno:
     def calcular_media_bimestral(self, student_id: int, subject: str,
                                   bimester: Bimester, year: int) -> Optional[float]:
         """Calcula média ponderada do aluno no bimestre."""
-        grades = self.grade_repo.find_by_student_and_bimester(
-            student_id, subject, bimester, year
-        )
+        cache = self.media_cache
+        if cache is None:
+            return self._media_ponderada(
+                self.grade_repo.find_by_student_and_bimester(student_id, subject, bimester, year))
+
+        chave = cache.key(student_id, subject, bimester, year)
+        media = cache.get(chave)
+        if media is not cache.MISSING:
+            return media
+        geracao = cache.generation
+        # Do arquivo, não da réplica: o valor fica no cache até o próximo save
+        grades = self.grade_repo.find_by_student_and_bimester(student_id, subject, bimester, year, fresh=True)
+        media = self._media_ponderada(grades)
+        cache.put(chave, media, (g.assessment.id for g in grades if g.assessment), generation=geracao)
+        return media
+
+    @staticmethod
+    def _media_ponderada(grades: List[Grade]) -> Optional[float]:
         if not grades:
             return None
 
@@ -115,32 +249,82 @@ class ServicosDoAluno:
         return round(total_nota / total_peso, 2)
 
     def gerar_boletim(self, student_id: int, subject: str, year: int) -> BoletimDisciplina:
-        """Gera o boletim anual de uma disciplina."""
-        medias = {}
-        for bimester in Bimester:
-            medias[bimester] = self.calcular_media_bimestral(student_id, subject, bimester, year)
-
-        medias_validas = [m for m in medias.values() if m is not None]
-
-        if not medias_validas:
-            media_anual = None
-            situacao = "Incompleto"
-        elif len(medias_validas) < 4:
-            media_anual = round(sum(medias_validas) / len(medias_validas), 2)
-            situacao = "Incompleto"
-        else:
-            media_anual = round(sum(medias_validas) / 4, 2)
-            situacao = "Aprovado" if media_anual >= self.MEDIA_APROVACAO else "Reprovado"
-
-        return BoletimDisciplina(
-            disciplina=subject,
-            media_1bim=medias[Bimester.PRIMEIRO],
-            media_2bim=medias[Bimester.SEGUNDO],
-            media_3bim=medias[Bimester.TERCEIRO],
-            media_4bim=medias[Bimester.QUARTO],
-            media_anual=media_anual,
-            situacao=situacao
-        )
+        """Gera o boletim anual de uma disciplina.
+
+        Os quatro bimestres saem de duas projeções (avaliações do ano e notas
+        do aluno nelas), sem montar Grade/Assessment; com cache, só os
+        bimestres que faltam vão ao banco.
+        """
+        cache = self.media_cache
+        if cache is None:
+            return _montar_boletim(subject, self._medias_do_ano(student_id, subject, year, Bimester)[0],
+                                   self.MEDIA_APROVACAO)
+
+        chaves = {bimester: cache.key(student_id, subject, bimester, year) for bimester in Bimester}
+        medias = {bimester: cache.get(chave) for bimester, chave in chaves.items()}
+        faltam = [bimester for bimester, media in medias.items() if media is cache.MISSING]
+        if faltam:
+            geracao = cache.generation
+            calculadas, avaliacoes = self._medias_do_ano(student_id, subject, year, faltam, fresh=True)
+            for bimester in faltam:
+                medias[bimester] = calculadas[bimester]
+                cache.put(chaves[bimester], calculadas[bimester], avaliacoes[bimester], generation=geracao)
+        return _montar_boletim(subject, medias, self.MEDIA_APROVACAO)
+
+    def _medias_do_ano(self, student_id: int, subject: str, year: int, bimestres: Iterable[Bimester],
+                       fresh: bool = False):
+        """({bimestre: média}, {bimestre: [assessment_id com nota]}) dos bimestres pedidos.
+
+        fresh=True ignora a réplica (médias que vão para o cache).
+        """
+        bimestres = list(bimestres)
+        provas = self.assessment_repo.select(
+            ("assessment_id", "bimester", "weight"),
+            where={"subject": subject, "academic_year": year, "bimester": [b.value for b in bimestres]},
+            year=year, fresh=fresh)
+        notas = self.grade_repo.select(
+            ("assessment_id", "score"),
+            where={"student_id": student_id, "assessment_id": [p[0] for p in provas]},
+            year=year, fresh=fresh) if provas else []
+
+        avaliacao = {assessment_id: (bimester, weight) for assessment_id, bimester, weight in provas}
+        somas = {b.value: [0.0, 0.0] for b in bimestres}
+        avaliacoes = {b: [] for b in bimestres}
+        for assessment_id, score in notas:
+            bimester, peso = avaliacao[assessment_id]
+            somas[bimester][0] += float(score) * peso
+            somas[bimester][1] += peso
+            avaliacoes[Bimester(bimester)].append(assessment_id)
+        # Mesma regra de _media_ponderada: sem nota ou peso total 0 -> None
+        medias = {b: round(somas[b.value][0] / somas[b.value][1], 2) if somas[b.value][1] else None
+                  for b in bimestres}
+        return medias, avaliacoes
+
+    def iterar_notas_faltantes(self, year: int,
+                               classroom_id: Optional[int] = None) -> Iterator[PendenciasDisciplina]:
+        """Pendências de lançamento por professor e disciplina, uma de cada vez.
+
+        Encontra as lacunas antes do fechamento sem gerar boletim nenhum: uma
+        única consulta (alunos ativos x avaliações do ano, sem nota), lida em
+        streaming. A memória fica limitada ao maior grupo.
+        """
+        linhas = self.grade_repo.iter_missing(year, classroom_id)
+        for (teacher_id, professor, disciplina), grupo in groupby(linhas, key=lambda r: r[:3]):
+            yield PendenciasDisciplina(
+                teacher_id=teacher_id,
+                professor=professor,
+                disciplina=disciplina,
+                faltantes=[
+                    NotaFaltante(student_id=r[4], aluno=r[5], classroom_id=r[3],
+                                 assessment_id=r[6], avaliacao=r[7], bimestre=Bimester(r[8]))
+                    for r in grupo
+                ]
+            )
+
+    def detectar_notas_faltantes(self, year: int,
+                                 classroom_id: Optional[int] = None) -> List[PendenciasDisciplina]:
+        """Todas as pendências da turma (ou da escola, sem classroom_id) no ano."""
+        return list(self.iterar_notas_faltantes(year, classroom_id))
 
     def consultar_extrato(self, student_id: int, subject: str,
                           start_date: date, end_date: date) -> ExtratoPresenca:
@@ -170,21 +354,34 @@ class ServicosDoAluno:
 
 # --- Serviços de Secretaria (matrículas e vínculos) ---
 
+@profiled
 class ServicosSecretaria:
     """Matrículas em turmas e vínculos responsável-aluno."""
 
-    def __init__(self, student_repo, classroom_repo, parent_repo):
+    SITUACOES_FINAIS = ('TRANSFERRED', 'WITHDRAWN', 'COMPLETED')
+
+    def __init__(self, student_repo, classroom_repo, parent_repo, painel_ttl: float = 0.0,
+                 painel_max_entries: int = 1024):
+        if painel_max_entries < 1:
+            raise ValueError("painel_max_entries deve ser >= 1")
         self.student_repo = student_repo
         self.classroom_repo = classroom_repo
         self.parent_repo = parent_repo
+        # Cache do painel (LRU): (parent_id, ano) -> (expira_em, painel); ttl 0 desliga
+        self.painel_ttl = painel_ttl
+        self.painel_max_entries = painel_max_entries
+        self._cache_painel: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._cache_painel_lock = threading.Lock()
 
     def matricular_aluno(self, student_id: int, classroom_id: int, academic_year: int = 2024):
         """Matricula um estudante em uma turma."""
-        student = self.student_repo.find_by_id(student_id)
+        # Só nome e situação: projeção, sem montar Student
+        student = self.student_repo.select(("name", "active"), where={"student_id": student_id})
         if not student:
             raise ValueError(f"Estudante {student_id} não encontrado.")
-        if not student.active:
-            raise ValueError(f"Estudante {student.name} não está ativo.")
+        nome, ativo = student[0]
+        if not ativo:
+            raise ValueError(f"Estudante {nome} não está ativo.")
 
         classroom = self.classroom_repo.find_by_id(classroom_id)
         if not classroom:
@@ -193,22 +390,92 @@ class ServicosSecretaria:
         self.classroom_repo.add_student_to_classroom(classroom_id, student_id, academic_year)
         return classroom
 
+    def matricular_em_lote(self, matriculas: Iterable[Tuple[int, int]],
+                           academic_year: int = 2024) -> ResultadoLote:
+        """Matricula vários (student_id, classroom_id) de uma vez.
+
+        Valida alunos e turmas com uma consulta IN para cada e grava tudo numa
+        única transação. Pares inválidos vão para `erros`; matrículas que já
+        existiam (ou repetidas na lista) vão para `duplicados`.
+        """
+        matriculas = list(matriculas)
+        resultado = ResultadoLote()
+        validos = self._validar_lote(matriculas, resultado)
+        if validos:
+            resultado.processados, resultado.duplicados = \
+                self.classroom_repo.enroll_many(validos, academic_year)
+        return resultado
+
+    def transferir_em_lote(self, transferencias: Iterable[Tuple[int, int, int]],
+                           academic_year: int = 2024) -> ResultadoLote:
+        """Transfere vários (student_id, turma_origem, turma_destino) de uma vez.
+
+        A matrícula de origem vira TRANSFERRED e a de destino é criada, tudo na
+        mesma transação.
+        """
+        transferencias = list(transferencias)
+        resultado = ResultadoLote()
+        destinos = self.classroom_repo.existing_ids(t[2] for t in transferencias)
+        validos = []
+        for item in transferencias:
+            if item[2] not in destinos:
+                resultado.erros.append((item, f"Turma {item[2]} não encontrada."))
+            else:
+                validos.append(item)
+        if validos:
+            feitos, rejeitados = self.classroom_repo.transfer_many(validos, academic_year)
+            resultado.processados = feitos
+            for sid, origem, destino, motivo in rejeitados:
+                item = (sid, origem, destino)
+                if motivo.startswith("já matriculado"):
+                    resultado.duplicados.append(item)
+                else:
+                    resultado.erros.append((item, f"Estudante {sid} {motivo}."))
+        return resultado
+
+    def alterar_situacao_em_lote(self, matriculas: Iterable[Tuple[int, int]], situacao: str,
+                                 academic_year: int = 2024) -> ResultadoLote:
+        """Encerra várias matrículas ativas (student_id, classroom_id).
+
+        `situacao` deve ser TRANSFERRED, WITHDRAWN ou COMPLETED; só matrículas
+        ACTIVE mudam, as demais vão para `erros`.
+        """
+        if situacao not in self.SITUACOES_FINAIS:
+            raise ValueError(f"Situação de matrícula inválida: {situacao}")
+        resultado = ResultadoLote()
+        alterados, ausentes = self.classroom_repo.set_status_many(
+            list(matriculas), academic_year, situacao)
+        resultado.processados = alterados
+        resultado.erros = [(item, "Matrícula ativa não encontrada.") for item in ausentes]
+        return resultado
+
+    def _validar_lote(self, matriculas: List[Tuple[int, int]], resultado: ResultadoLote) -> list:
+        """Separa os pares válidos; os inválidos vão para resultado.erros."""
+        alunos = self.student_repo.get_active_by_ids(m[0] for m in matriculas)
+        turmas = self.classroom_repo.existing_ids(m[1] for m in matriculas)
+        validos = []
+        for item in matriculas:
+            student_id, classroom_id = item
+            if student_id not in alunos:
+                resultado.erros.append((item, f"Estudante {student_id} não encontrado."))
+            elif not alunos[student_id]:
+                resultado.erros.append((item, f"Estudante {student_id} não está ativo."))
+            elif classroom_id not in turmas:
+                resultado.erros.append((item, f"Turma {classroom_id} não encontrada."))
+            else:
+                validos.append(item)
+        return validos
+
     def vincular_responsavel(self, parent_id: int, student_id: int,
                              relationship_type: str = "Responsável") -> bool:
         """Vincula um responsável a um aluno."""
-        parent = self.parent_repo.find_by_id(parent_id)
-        if not parent:
+        if not self._responsavel_existe(parent_id):
             raise ValueError(f"Responsável {parent_id} não encontrado.")
 
-        student = self.student_repo.find_by_id(student_id)
-        if not student:
+        if not self._aluno_existe(student_id):
             raise ValueError(f"Estudante {student_id} não encontrado.")
 
-        valid_types = [
-            "Pai", "Mãe", "Responsável", "Tutor", "Tutora",
-            "Avô", "Avó", "Tio", "Tia", "Padrasto", "Madrasta"
-        ]
-        if relationship_type not in valid_types:
+        if relationship_type not in RELATIONSHIP_TYPES:
             raise ValueError(f"Tipo de relacionamento inválido: {relationship_type}")
 
         return self.parent_repo.link_to_student(parent_id, student_id, relationship_type)
@@ -219,14 +486,96 @@ class ServicosSecretaria:
 
     def listar_alunos_do_responsavel(self, parent_id: int) -> List[int]:
         """Lista todos os alunos vinculados a um responsável."""
-        parent = self.parent_repo.find_by_id(parent_id)
-        if not parent:
+        if not self._responsavel_existe(parent_id):
             raise ValueError(f"Responsável {parent_id} não encontrado.")
         return self.parent_repo.get_students(parent_id)
 
     def listar_responsaveis_do_aluno(self, student_id: int) -> List[int]:
         """Lista todos os responsáveis vinculados a um aluno."""
-        student = self.student_repo.find_by_id(student_id)
-        if not student:
+        if not self._aluno_existe(student_id):
             raise ValueError(f"Estudante {student_id} não encontrado.")
         return self.parent_repo.get_parents_by_student(student_id)
+
+    def _aluno_existe(self, student_id: int) -> bool:
+        return bool(self.student_repo.select("student_id", where={"student_id": student_id}))
+
+    def _responsavel_existe(self, parent_id: int) -> bool:
+        return bool(self.parent_repo.select("parent_id", where={"parent_id": parent_id}))
+
+    def painel_do_responsavel(self, parent_id: int, year: int) -> PainelResponsavel:
+        """Boletins e frequência de todos os filhos do responsável no ano.
+
+        Usa 3 consultas, independente do número de filhos e disciplinas. Com
+        `painel_ttl` > 0, atualizações repetidas dentro do prazo reaproveitam
+        o resultado anterior.
+        """
+        chave = (parent_id, year)
+        if self.painel_ttl > 0:
+            em_cache = self._painel_em_cache(chave)
+            if em_cache is not None:
+                return em_cache
+
+        dados = self.parent_repo.get_dashboard_data(parent_id, year)
+        if dados is None:
+            raise ValueError(f"Responsável {parent_id} não encontrado.")
+
+        medias: Dict[int, Dict[str, Dict[Bimester, Optional[float]]]] = {}
+        for student_id, subject, bimester, total_nota, total_peso in dados['grades']:
+            media = round(total_nota / total_peso, 2) if total_peso else None
+            medias.setdefault(student_id, {}).setdefault(subject, {})[Bimester(bimester)] = media
+
+        frequencia: Dict[int, Dict[str, float]] = {}
+        for student_id, subject, total, presencas in dados['attendance']:
+            frequencia.setdefault(student_id, {})[subject] = round(presencas / total * 100, 1)
+
+        alunos = []
+        for student_id, nome, matricula, parentesco in dados['students']:
+            disciplinas = medias.get(student_id, {})
+            alunos.append(PainelAluno(
+                student_id=student_id,
+                nome=nome,
+                matricula=matricula,
+                parentesco=parentesco,
+                boletins=[
+                    _montar_boletim(subject, disciplinas[subject], ServicosDoAluno.MEDIA_APROVACAO)
+                    for subject in sorted(disciplinas)
+                ],
+                frequencia=frequencia.get(student_id, {})
+            ))
+
+        painel = PainelResponsavel(parent_id=parent_id, ano=year, alunos=alunos, gerado_em=datetime.now())
+        if self.painel_ttl > 0:
+            self._guardar_painel(chave, painel)
+        return painel
+
+    def limpar_cache_painel(self, parent_id: Optional[int] = None) -> None:
+        """Descarta o painel em cache (de um responsável ou de todos)."""
+        with self._cache_painel_lock:
+            if parent_id is None:
+                self._cache_painel.clear()
+            else:
+                for chave in [k for k in self._cache_painel if k[0] == parent_id]:
+                    del self._cache_painel[chave]
+
+    def _painel_em_cache(self, chave: tuple) -> Optional[PainelResponsavel]:
+        with self._cache_painel_lock:
+            em_cache = self._cache_painel.get(chave)
+            if em_cache is None:
+                return None
+            if em_cache[0] <= time.monotonic():
+                del self._cache_painel[chave]  # vencido
+                return None
+            self._cache_painel.move_to_end(chave)
+            return em_cache[1]
+
+    def _guardar_painel(self, chave: tuple, painel: PainelResponsavel) -> None:
+        agora = time.monotonic()
+        with self._cache_painel_lock:
+            self._cache_painel[chave] = (agora + self.painel_ttl, painel)
+            self._cache_painel.move_to_end(chave)
+            # Vencidos do começo (menos usados) saem já; o limite segura o resto
+            while self._cache_painel:
+                _, (expira_em, _) = next(iter(self._cache_painel.items()))
+                if expira_em > agora and len(self._cache_painel) <= self.painel_max_entries:
+                    break
+                self._cache_painel.popitem(last=False)
@@ -0,0 +1,176 @@
+"""
+Linha de comando do sistema: python -m src <comando>.
+
+Cada subcomando importa só o que usa. Tarefas curtas de cron (ex.: a lista
+de alunos em risco) não carregam serviços, importador, exportador nem
+benchmarks, então a partida fica na casa das dezenas de milissegundos.
+
+Uso:
+    python -m src init [--reset]
+    python -m src migrate [--target N]
+    python -m src import --students alunos.csv --parents responsaveis.csv
+    python -m src export grades --year 2024 -o notas.csv
+    python -m src report risk --year 2024 --limit 75
+    python -m src report boletim --student 1 --subject Matemática --year 2024
+    python -m src report missing --year 2024 --classroom 3
+    python -m src backup backup --keep 7
+    python -m src changes status
+    python -m src dates convert --to days
+    python -m src bench projection --students 50000
+"""
+import argparse
+import sys
+from importlib import import_module
+
+# Subcomandos que repassam os argumentos à CLI do próprio módulo
+_DELEGATED = {
+    'import': ('src.infrastructure.importer', "importa alunos, responsáveis e vínculos (CSV)"),
+    'export': ('src.infrastructure.exporter', "exporta notas, frequência ou boletins"),
+    'backup': ('src.infrastructure.backup', "backup a quente, listagem e restauração"),
+    'changes': ('src.infrastructure.change_feed', "consumidores e poda do feed de alterações"),
+    'dates': ('src.infrastructure.date_storage', "formato das datas: texto ISO ou número do dia"),
+}
+
+
+# =============================================
+# COMANDOS
+# =============================================
+
+def _cmd_init(args) -> int:
+    from src.infrastructure.database import DatabaseManager
+
+    db = DatabaseManager(args.db)
+    if args.reset:
+        db.reset_database()
+    elif db.db_path.exists() and db.db_path.stat().st_size > 0:
+        print(f"❌ Banco já existe: {db.db_path} (use --reset para recriar ou 'migrate' para atualizar)")
+        return 1
+    return 0 if db.initialize_database(verbose=not args.quiet) else 1
+
+
+def _cmd_migrate(args) -> int:
+    from src.infrastructure.database import DatabaseManager
+    from src.infrastructure.migrations import migrar, versao_atual
+
+    db = DatabaseManager(args.db)
+    aplicadas = migrar(db, target=args.target, verbose=True)
+    if not aplicadas:
+        print(f"Banco já está na versão {versao_atual(db)}")
+    return 0
+
+
+def _cmd_report_risk(args) -> int:
+    from src.infrastructure.database import DatabaseManager
+    from src.infrastructure.sharding import attendance_risk
+
+    linhas = attendance_risk(DatabaseManager(args.db), args.year, args.limit)
+    for r in sorted(linhas, key=lambda r: (r['percentual_presenca'], r['name'])):
+        print(f"{r['registration']}\t{r['name']}\t{r['subject']}\t"
+              f"{r['presencas']}/{r['total_aulas']}\t{r['percentual_presenca']}%")
+    print(f"{len(linhas)} aluno(s)/disciplina(s) abaixo de {args.limit}% em {args.year}", file=sys.stderr)
+    return 0
+
+
+def _cmd_report_boletim(args) -> int:
+    from src.application.services import ServicosDoAluno
+    from src.infrastructure.database import (
+        DatabaseManager, AssessmentRepository, AttendanceRepository, GradeRepository, StudentRepository
+    )
+
+    db = DatabaseManager(args.db)
+    servicos = ServicosDoAluno(GradeRepository(db), AssessmentRepository(db),
+                               StudentRepository(db), AttendanceRepository(db))
+    print(servicos.gerar_boletim(args.student, args.subject, args.year))
+    return 0
+
+
+def _cmd_report_missing(args) -> int:
+    from src.application.services import ServicosDoAluno
+    from src.infrastructure.database import (
+        DatabaseManager, AssessmentRepository, AttendanceRepository, GradeRepository, StudentRepository
+    )
+
+    db = DatabaseManager(args.db)
+    servicos = ServicosDoAluno(GradeRepository(db), AssessmentRepository(db),
+                               StudentRepository(db), AttendanceRepository(db))
+    total = 0
+    for pendencia in servicos.iterar_notas_faltantes(args.year, args.classroom):
+        print(pendencia)
+        for f in pendencia.faltantes:
+            print(f"  turma {f.classroom_id}\t{f.aluno}\t{f.avaliacao} ({f.bimestre.value})")
+        total += len(pendencia.faltantes)
+    print(f"{total} nota(s) faltando em {args.year}", file=sys.stderr)
+    return 0
+
+
+def _cmd_bench(argv) -> int:
+    if not argv or argv[0] in ("-h", "--help", "--list"):
+        from pathlib import Path
+
+        pasta = Path(__file__).resolve().parent.parent / "benchmarks"
+        nomes = sorted(p.stem[len("bench_"):] for p in pasta.glob("bench_*.py"))
+        print("uso: python -m src bench <nome> [argumentos do benchmark]")
+        print("benchmarks: " + ", ".join(nomes))
+        return 0
+    try:
+        module = import_module(f"benchmarks.bench_{argv[0]}")
+    except ModuleNotFoundError:
+        print(f"❌ Benchmark desconhecido: {argv[0]} (veja python -m src bench --list)", file=sys.stderr)
+        return 2
+    module.main(argv[1:])
+    return 0
+
+
+# =============================================
+# PARSER
+# =============================================
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m src", description="Sistema de acompanhamento escolar.")
+    sub = parser.add_subparsers(dest="command", required=True, metavar="comando")
+
+    init = sub.add_parser("init", help="cria o banco a partir do schema.sql")
+    init.add_argument("--db", help="arquivo do banco (padrão: school.db do projeto)")
+    init.add_argument("--reset", action="store_true", help="apaga o banco existente antes")
+    init.add_argument("-q", "--quiet", action="store_true")
+    init.set_defaults(handler=_cmd_init)
+
+    migrate = sub.add_parser("migrate", help="aplica as migrações pendentes")
+    migrate.add_argument("--db", help="arquivo do banco (padrão: school.db do projeto)")
+    migrate.add_argument("--target", type=int, help="versão final (padrão: a mais recente)")
+    migrate.set_defaults(handler=_cmd_migrate)
+
+    report = sub.add_parser("report", help="relatórios")
+    report_sub = report.add_subparsers(dest="report", required=True, metavar="relatorio")
+    risk = report_sub.add_parser("risk", help="alunos com frequência abaixo do limite")
+    risk.add_argument("--db", help="arquivo do banco (padrão: school.db do projeto)")
+    risk.add_argument("--year", type=int, required=True, help="ano letivo")
+    risk.add_argument("--limit", type=float, default=75.0, help="percentual mínimo de presença")
+    risk.set_defaults(handler=_cmd_report_risk)
+    boletim = report_sub.add_parser("boletim", help="boletim anual de um aluno numa disciplina")
+    boletim.add_argument("--db", help="arquivo do banco (padrão: school.db do projeto)")
+    boletim.add_argument("--student", type=int, required=True, help="ID do aluno")
+    boletim.add_argument("--subject", required=True, help="disciplina")
+    boletim.add_argument("--year", type=int, required=True, help="ano letivo")
+    boletim.set_defaults(handler=_cmd_report_boletim)
+    missing = report_sub.add_parser("missing", help="notas faltantes por professor e disciplina")
+    missing.add_argument("--db", help="arquivo do banco (padrão: school.db do projeto)")
+    missing.add_argument("--year", type=int, required=True, help="ano letivo")
+    missing.add_argument("--classroom", type=int, help="só esta turma (padrão: a escola toda)")
+    missing.set_defaults(handler=_cmd_report_missing)
+
+    # Só para aparecerem no --help; main() repassa antes do parse
+    for name, (_, help_text) in _DELEGATED.items():
+        sub.add_parser(name, help=help_text, add_help=False)
+    sub.add_parser("bench", help="roda um benchmark de benchmarks/", add_help=False)
+    return parser
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv and argv[0] in _DELEGATED:
+        return import_module(_DELEGATED[argv[0]][0]).main(argv[1:])
+    if argv and argv[0] == "bench":
+        return _cmd_bench(argv[1:])
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
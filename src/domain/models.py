@@ -163,6 +163,13 @@ class Teacher:
         )
 
 
+# Tipos de vínculo responsável-aluno aceitos
+RELATIONSHIP_TYPES = (
+    "Pai", "Mãe", "Responsável", "Tutor", "Tutora",
+    "Avô", "Avó", "Tio", "Tia", "Padrasto", "Madrasta"
+)
+
+
 class Parent:
     """Dados do responsável (pai, mãe, etc)."""
 
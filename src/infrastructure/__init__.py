@@ -1,25 +1,47 @@
-"""Banco de dados e repositórios."""
+"""Banco de dados e repositórios.
 
-from .database import (
-    DatabaseManager,
-    get_database,
-    StudentRepository,
-    TeacherRepository,
-    ParentRepository,
-    ClassroomRepository,
-    AssessmentRepository,
-    GradeRepository,
-    AttendanceRepository
-)
+Os nomes abaixo são carregados sob demanda: importar um submódulo (ex.:
+src.infrastructure.migrations, usado pela linha de comando) não carrega
+database, sharding, write_queue etc. junto.
+"""
+from importlib import import_module
 
-__all__ = [
-    'DatabaseManager',
-    'get_database',
-    'StudentRepository',
-    'TeacherRepository',
-    'ParentRepository',
-    'ClassroomRepository',
-    'AssessmentRepository',
-    'GradeRepository',
-    'AttendanceRepository',
-]
+# nome exportado -> submódulo onde ele está
+_EXPORTS = {
+    'DatabaseManager': 'database',
+    'get_database': 'database',
+    'StudentRepository': 'database',
+    'TeacherRepository': 'database',
+    'ParentRepository': 'database',
+    'ClassroomRepository': 'database',
+    'AssessmentRepository': 'database',
+    'GradeRepository': 'database',
+    'AttendanceRepository': 'database',
+    'WriteQueue': 'write_queue',
+    'ShardedDatabaseManager': 'sharding',
+    'ShardedRepository': 'sharding',
+    'AverageCache': 'average_cache',
+    'IdentityMap': 'identity_map',
+    'unit_of_work': 'identity_map',
+    'ReadReplica': 'replica',
+    'ChangeFeed': 'change_feed',
+    'SubjectCatalog': 'subjects',
+    'ServiceProfiler': 'profiling',
+    'profile_services': 'profiling',
+    'enable_profiling': 'profiling',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,178 @@
+"""
+Encerramento do ano letivo: move um ano fechado para um arquivo morto.
+
+Avaliações, notas, frequência e matrículas do ano saem do banco principal
+e vão para um arquivo SQLite separado (somente leitura), opcionalmente
+compactado com VACUUM e gzip. O ano fica registrado em `archived_years`, e
+os repositórios anexam (ATTACH) o arquivo só quando um ano passado é
+consultado (ver DatabaseManager.attach_archive).
+
+Uso:
+    encerrar_ano_letivo(get_database(), 2023, vacuum=True, compress=False)
+"""
+import gzip
+import os
+import shutil
+import sqlite3
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+# Índices recriados no arquivo morto (o CREATE TABLE ... AS não copia índices)
+_ARCHIVE_INDEXES = [
+    "CREATE UNIQUE INDEX arq.idx_arq_assessment ON assessments(assessment_id)",
+    "CREATE INDEX arq.idx_arq_assessment_subject ON assessments(subject_id, bimester)",
+    "CREATE UNIQUE INDEX arq.idx_arq_grade ON grades(student_id, assessment_id)",
+    "CREATE UNIQUE INDEX arq.idx_arq_attendance ON attendance(student_id, subject_id, attendance_date)",
+    "CREATE INDEX arq.idx_arq_attendance_date ON attendance(attendance_date)",
+    "CREATE INDEX arq.idx_arq_enrollment ON classroom_enrollments(classroom_id, academic_year, status, student_id)",
+]
+
+
+@dataclass
+class ArchivedYear:
+    """Resumo do encerramento de um ano letivo."""
+    academic_year: int
+    path: Path
+    rows: Dict[str, int]
+    size_bytes: int
+
+    def __str__(self):
+        total = sum(self.rows.values())
+        return (
+            f"Ano {self.academic_year} arquivado em {self.path} "
+            f"({total} linhas, {self.size_bytes / 1024:.0f} KiB)"
+        )
+
+
+def encerrar_ano_letivo(db_manager, year: int, archive_dir: Optional[str] = None,
+                        vacuum: bool = True, compress: bool = False) -> ArchivedYear:
+    """Move o ano letivo `year` para um arquivo morto somente leitura."""
+    if year >= date.today().year:
+        raise ValueError(f"Ano letivo {year} ainda não foi encerrado.")
+
+    folder = Path(archive_dir) if archive_dir else db_manager.db_path.parent / "arquivo"
+    folder.mkdir(parents=True, exist_ok=True)
+    path = folder / f"{db_manager.db_path.stem}_{year}.db"
+    if path.exists() or path.with_suffix(".db.gz").exists():
+        raise ValueError(f"Já existe arquivo morto para {year}: {path}")
+
+    conn = db_manager.get_connection()
+    conn.isolation_level = None
+    try:
+        _ensure_archived_years_table(conn)
+        if conn.execute("SELECT 1 FROM archived_years WHERE academic_year = ?", (year,)).fetchone():
+            raise ValueError(f"Ano letivo {year} já está arquivado.")
+
+        conn.execute("ATTACH DATABASE ? AS arq", (str(path),))
+        try:
+            rows = _move_year(conn, year, path, db_manager.date_value)
+        finally:
+            conn.execute("DETACH DATABASE arq")
+    except BaseException:
+        if path.exists():
+            path.unlink()
+        raise
+    finally:
+        conn.close()
+
+    if vacuum:
+        archive = sqlite3.connect(str(path))
+        archive.execute("VACUUM")
+        archive.close()
+    if compress:
+        compressed = path.with_suffix(".db.gz")
+        with open(path, "rb") as src, gzip.open(compressed, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        path.unlink()
+        path = compressed
+        _update_path(db_manager, year, path)
+    os.chmod(path, 0o444)
+
+    return ArchivedYear(academic_year=year, path=path, rows=rows, size_bytes=path.stat().st_size)
+
+
+def listar_anos_arquivados(db_manager) -> List[int]:
+    """Anos letivos já movidos para arquivo morto."""
+    conn = db_manager.get_connection()
+    try:
+        return [r[0] for r in conn.execute("SELECT academic_year FROM archived_years ORDER BY academic_year")]
+    except sqlite3.OperationalError:
+        return []
+    finally:
+        conn.close()
+
+
+def _ensure_archived_years_table(conn) -> None:
+    # Bancos criados antes desta tabela existir no schema.sql
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS archived_years (
+            academic_year INTEGER PRIMARY KEY,
+            path TEXT NOT NULL,
+            archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            CONSTRAINT chk_archived_year CHECK (academic_year >= 2000)
+        )
+    """)
+
+
+def _change_log_position(conn) -> Optional[int]:
+    """Último seq do change_log (None em bancos anteriores à migração 4)."""
+    try:
+        return conn.execute("SELECT COALESCE(MAX(seq), 0) FROM main.change_log").fetchone()[0]
+    except sqlite3.OperationalError:
+        return None
+
+
+def _move_year(conn, year: int, path: Path, date_value) -> Dict[str, int]:
+    """Copia o ano para `arq` e apaga do principal, numa única transação."""
+    start, end = date_value(date(year, 1, 1)), date_value(date(year, 12, 31))
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        change_seq = _change_log_position(conn)
+        conn.execute("CREATE TABLE arq.assessments AS SELECT * FROM main.assessments WHERE academic_year = ?",
+                     (year,))
+        conn.execute("""
+            CREATE TABLE arq.grades AS
+            SELECT g.* FROM main.grades g
+            WHERE g.assessment_id IN (SELECT assessment_id FROM arq.assessments)
+        """)
+        conn.execute("CREATE TABLE arq.attendance AS SELECT * FROM main.attendance "
+                     "WHERE attendance_date BETWEEN ? AND ?", (start, end))
+        conn.execute("CREATE TABLE arq.classroom_enrollments AS SELECT * FROM main.classroom_enrollments "
+                     "WHERE academic_year = ?", (year,))
+        for sql in _ARCHIVE_INDEXES:
+            conn.execute(sql)
+
+        rows = {
+            table: conn.execute(f"SELECT COUNT(*) FROM arq.{table}").fetchone()[0]
+            for table in ("assessments", "grades", "attendance", "classroom_enrollments")
+        }
+
+        # Notas antes das avaliações (FK com ON DELETE RESTRICT)
+        conn.execute("DELETE FROM main.grades WHERE assessment_id IN (SELECT assessment_id FROM arq.assessments)")
+        conn.execute("DELETE FROM main.assessments WHERE academic_year = ?", (year,))
+        conn.execute("DELETE FROM main.attendance WHERE attendance_date BETWEEN ? AND ?", (start, end))
+        conn.execute("DELETE FROM main.classroom_enrollments WHERE academic_year = ?", (year,))
+        if change_seq is not None:
+            # Arquivar é mover, não apagar: o feed de alterações não recebe esses 'D'
+            conn.execute("DELETE FROM main.change_log WHERE seq > ?", (change_seq,))
+        conn.execute("INSERT INTO main.archived_years (academic_year, path) VALUES (?, ?)",
+                     (year, str(path.resolve())))
+        conn.execute("COMMIT")
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    return rows
+
+
+def _update_path(db_manager, year: int, path: Path) -> None:
+    conn = db_manager.get_connection()
+    try:
+        conn.execute("UPDATE archived_years SET path = ? WHERE academic_year = ?",
+                     (str(path.resolve()), year))
+        conn.commit()
+    finally:
+        conn.close()
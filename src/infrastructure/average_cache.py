@@ -0,0 +1,365 @@
+"""
+Cache das médias bimestrais (ServicosDoAluno.calcular_media_bimestral).
+
+A chave é (student_id, disciplina, bimestre, ano). O cache tem tamanho
+máximo (descarta a menos usada, LRU) e é invalidado com precisão pelos
+repositórios: GradeRepository.save derruba a média do aluno naquele
+bimestre; AssessmentRepository.save derruba a média de todos os alunos da
+avaliação (mudança de peso afeta todos).
+
+Opcionalmente persiste numa tabela auxiliar (`average_cache`) para
+sobreviver a reinícios. A gravação não acontece no caminho de leitura: as
+médias novas se acumulam e vão para o banco numa transação só (a cada
+`flush_every` médias ou em flush()). Dentro dessa transação, com o lock de
+escrita, cada média é recalculada a partir de `grades`/`assessments`, então
+o que fica gravado é o estado do banco no COMMIT, mesmo que outro processo
+tenha alterado notas depois da leitura. Escritas posteriores apagam a linha
+pelos triggers em `grades` e `assessments`. O cache em memória enxerga as
+escritas dos repositórios e das filas de escrita ligados a ele (attach()).
+
+Uso:
+    cache = AverageCache(max_entries=50_000, db_manager=db, persist=True)
+    servicos = ServicosDoAluno(grade_repo, assessment_repo, student_repo,
+                               attendance_repo, media_cache=cache)
+    cache.attach(write_queue=fila)   # notas gravadas pela WriteQueue
+    print(cache.stats())
+    cache.flush()                    # grava as médias pendentes antes de sair
+"""
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+# Tupla (student_id, disciplina, bimestre, ano)
+CacheKey = Tuple[int, str, str, int]
+
+_MISSING = object()
+
+_TABLE_SQL = [
+    """
+    CREATE TABLE IF NOT EXISTS average_cache (
+        student_id INTEGER NOT NULL,
+        subject VARCHAR(100) NOT NULL,
+        bimester VARCHAR(20) NOT NULL,
+        academic_year INTEGER NOT NULL,
+        media REAL,
+        assessment_ids TEXT NOT NULL DEFAULT '',
+        PRIMARY KEY (subject, bimester, academic_year, student_id)
+    )
+    """,
+    # Nota inserida/alterada/apagada: só a média daquele aluno no bimestre
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_average_cache_grade_ins AFTER INSERT ON grades
+    BEGIN
+        DELETE FROM average_cache
+        WHERE student_id = NEW.student_id
+          AND (subject, bimester, academic_year) =
+              (SELECT s.name, a.bimester, a.academic_year FROM assessments a
+               JOIN subjects s ON s.subject_id = a.subject_id
+               WHERE a.assessment_id = NEW.assessment_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_average_cache_grade_upd AFTER UPDATE ON grades
+    BEGIN
+        DELETE FROM average_cache
+        WHERE student_id IN (OLD.student_id, NEW.student_id)
+          AND (subject, bimester, academic_year) IN
+              (SELECT s.name, a.bimester, a.academic_year FROM assessments a
+               JOIN subjects s ON s.subject_id = a.subject_id
+               WHERE a.assessment_id IN (OLD.assessment_id, NEW.assessment_id));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_average_cache_grade_del AFTER DELETE ON grades
+    BEGIN
+        DELETE FROM average_cache
+        WHERE student_id = OLD.student_id
+          AND (subject, bimester, academic_year) =
+              (SELECT s.name, a.bimester, a.academic_year FROM assessments a
+               JOIN subjects s ON s.subject_id = a.subject_id
+               WHERE a.assessment_id = OLD.assessment_id);
+    END
+    """,
+    # Avaliação alterada: todos os alunos do bimestre antigo e do novo
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_average_cache_assessment_upd AFTER UPDATE ON assessments
+    BEGIN
+        DELETE FROM average_cache
+        WHERE (subject = (SELECT name FROM subjects WHERE subject_id = OLD.subject_id)
+               AND bimester = OLD.bimester AND academic_year = OLD.academic_year)
+           OR (subject = (SELECT name FROM subjects WHERE subject_id = NEW.subject_id)
+               AND bimester = NEW.bimester AND academic_year = NEW.academic_year);
+    END
+    """,
+]
+
+
+class AverageCache:
+    """Cache LRU de médias bimestrais com invalidação por nota/avaliação."""
+
+    MISSING = _MISSING
+
+    def __init__(self, max_entries: int = 10000, db_manager=None, persist: bool = False,
+                 flush_every: int = 256):
+        if max_entries < 1:
+            raise ValueError("max_entries deve ser >= 1")
+        if flush_every < 1:
+            raise ValueError("flush_every deve ser >= 1")
+        if persist and db_manager is None:
+            raise ValueError("persist=True exige db_manager")
+        self.max_entries = max_entries
+        self.db_manager = db_manager
+        self.persist = persist
+        self.flush_every = flush_every
+        # Médias ainda não gravadas na tabela (só com persist=True)
+        self._pending: Dict[CacheKey, Tuple[Optional[float], Tuple[int, ...]]] = {}
+        self._entries: "OrderedDict[CacheKey, Optional[float]]" = OrderedDict()
+        # Índices para invalidação: avaliação -> chaves, (disciplina, bim, ano) -> chaves
+        self._by_assessment: Dict[int, Set[CacheKey]] = {}
+        self._by_group: Dict[Tuple[str, str, int], Set[CacheKey]] = {}
+        self._assessments_of: Dict[CacheKey, Tuple[int, ...]] = {}
+        self._lock = threading.Lock()
+        # Muda a cada save observado; put() com geração antiga é ignorado
+        self.generation = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+        if persist:
+            self._ensure_table()
+            self._load()
+
+    # --- Leitura e escrita ---
+
+    @staticmethod
+    def key(student_id: int, subject: str, bimester, year: int) -> CacheKey:
+        return (student_id, subject, getattr(bimester, 'value', bimester), year)
+
+    def get(self, key: CacheKey):
+        """Valor em cache ou o sentinela `AverageCache.MISSING`."""
+        with self._lock:
+            value = self._entries.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return value
+
+    def put(self, key: CacheKey, media: Optional[float], assessment_ids: Iterable[int] = (),
+            generation: Optional[int] = None) -> None:
+        """Guarda a média (None também é resultado válido: sem notas).
+
+        Passe a `generation` lida antes de consultar o banco: se algum save
+        aconteceu no meio, o valor pode estar velho e não é guardado.
+        """
+        ids = tuple(sorted(set(assessment_ids)))
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._store(key, media, ids)
+            if not self.persist:
+                return
+            self._pending[key] = (media, ids)
+            if len(self._pending) < self.flush_every:
+                return
+        self.flush()
+
+    # --- Invalidação ---
+
+    def attach(self, grade_repo=None, assessment_repo=None, write_queue=None) -> None:
+        """Registra a invalidação nos saves dos repositórios e nas notas da
+        WriteQueue (idempotente)."""
+        if grade_repo is not None and self.on_grade_saved not in grade_repo.save_listeners:
+            grade_repo.save_listeners.append(self.on_grade_saved)
+        if write_queue is not None and self.on_grade_saved not in write_queue.grade_listeners:
+            write_queue.grade_listeners.append(self.on_grade_saved)
+        if assessment_repo is not None and self.on_assessment_saved not in assessment_repo.save_listeners:
+            assessment_repo.save_listeners.append(self.on_assessment_saved)
+
+    def on_grade_saved(self, grade) -> None:
+        student_id = grade.student.id if grade.student else None
+        assessment = grade.assessment
+        if student_id is None or assessment is None:
+            self.clear()
+            return
+        with self._lock:
+            self.generation += 1
+            stale = {k for k in self._by_assessment.get(assessment.id, ()) if k[0] == student_id}
+            if assessment.subject and assessment.bimester:
+                stale.add(self.key(student_id, assessment.subject, assessment.bimester,
+                                   assessment.academic_year))
+            self._drop(stale)
+
+    def on_assessment_saved(self, assessment) -> None:
+        with self._lock:
+            self.generation += 1
+            stale = set(self._by_assessment.get(assessment.id, ()))
+            group = (assessment.subject, getattr(assessment.bimester, 'value', assessment.bimester),
+                     assessment.academic_year)
+            stale |= self._by_group.get(group, set())
+            self._drop(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self.invalidations += len(self._entries)
+            self._pending.clear()
+            self._entries.clear()
+            self._by_assessment.clear()
+            self._by_group.clear()
+            self._assessments_of.clear()
+        if self.persist:
+            conn = self.db_manager.get_connection()
+            try:
+                conn.execute("DELETE FROM average_cache")
+                conn.commit()
+            finally:
+                conn.close()
+
+    # --- Métricas ---
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> dict:
+        return {
+            'size': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hit_rate, 4),
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+            'pending': len(self._pending),
+        }
+
+    def __len__(self):
+        return len(self._entries)
+
+    # --- Interno (chamar com o lock) ---
+
+    def _store(self, key: CacheKey, media: Optional[float], ids: Tuple[int, ...]) -> None:
+        if key in self._entries:
+            self._unindex(key)
+        self._entries[key] = media
+        self._entries.move_to_end(key)
+        self._assessments_of[key] = ids
+        for assessment_id in ids:
+            self._by_assessment.setdefault(assessment_id, set()).add(key)
+        self._by_group.setdefault(key[1:], set()).add(key)
+        while len(self._entries) > self.max_entries:
+            oldest, _ = self._entries.popitem(last=False)
+            self._unindex(oldest)
+            self.evictions += 1
+
+    def _drop(self, keys: Set[CacheKey]) -> None:
+        for key in keys:
+            self._pending.pop(key, None)
+            if key in self._entries:
+                del self._entries[key]
+                self._unindex(key)
+                self.invalidations += 1
+
+    def _unindex(self, key: CacheKey) -> None:
+        for assessment_id in self._assessments_of.pop(key, ()):
+            keys = self._by_assessment.get(assessment_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_assessment[assessment_id]
+        keys = self._by_group.get(key[1:])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_group[key[1:]]
+
+    # --- Persistência ---
+
+    def _ensure_table(self) -> None:
+        conn = self.db_manager.get_connection()
+        try:
+            for sql in _TABLE_SQL:
+                conn.execute(sql)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _load(self) -> None:
+        conn = self.db_manager.get_connection()
+        try:
+            rows = conn.execute("""
+                SELECT student_id, subject, bimester, academic_year, media, assessment_ids
+                FROM average_cache LIMIT ?
+            """, (self.max_entries,)).fetchall()
+        finally:
+            conn.close()
+        with self._lock:
+            for r in rows:
+                ids = tuple(int(i) for i in r[5].split(',') if i)
+                self._store((r[0], r[1], r[2], r[3]), r[4], ids)
+
+    def flush(self) -> int:
+        """Grava as médias pendentes numa transação só; retorna quantas gravou.
+
+        Cada média de ano não arquivado é recalculada das notas com o lock de
+        escrita (BEGIN IMMEDIATE): nenhum COMMIT de outro processo cabe entre
+        a leitura e a gravação, e os seguintes apagam a linha pelos triggers.
+        Anos arquivados não mudam mais: vai o valor em memória.
+        """
+        if not self.persist:
+            return 0
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        conn = self.db_manager.get_connection()
+        conn.isolation_level = None
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                archived = self._archived_years(conn)
+                rows = []
+                for key, (media, ids) in pending.items():
+                    if key[3] not in archived:
+                        media, ids = self._recompute(conn, key)
+                    rows.append(key + (media, ",".join(map(str, ids))))
+                conn.executemany("""
+                    INSERT OR REPLACE INTO average_cache
+                        (student_id, subject, bimester, academic_year, media, assessment_ids)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, rows)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+        return len(rows)
+
+    @staticmethod
+    def _archived_years(conn) -> Set[int]:
+        try:
+            return {r[0] for r in conn.execute("SELECT academic_year FROM archived_years")}
+        except sqlite3.OperationalError:
+            return set()  # banco antigo, sem a tabela archived_years
+
+    @staticmethod
+    def _recompute(conn, key: CacheKey) -> Tuple[Optional[float], Tuple[int, ...]]:
+        """Média ponderada da chave direto das notas (mesma regra do serviço)."""
+        rows = conn.execute("""
+            SELECT g.score, a.weight, a.assessment_id
+            FROM grades g
+            JOIN assessments a ON g.assessment_id = a.assessment_id
+            WHERE g.student_id = ? AND a.subject_id = (SELECT subject_id FROM subjects WHERE name = ?)
+              AND a.bimester = ? AND a.academic_year = ?
+        """, key).fetchall()
+        total_nota = sum(r[0] * r[1] for r in rows)
+        total_peso = sum(r[1] for r in rows)
+        media = round(total_nota / total_peso, 2) if total_peso else None
+        return media, tuple(sorted({r[2] for r in rows}))
@@ -0,0 +1,249 @@
+"""
+Backup a quente do banco principal (API de backup do SQLite).
+
+A cópia é feita em passos de `pages` páginas, com uma pausa entre eles. O
+resultado é sempre um retrato consistente do banco, e o comportamento
+depende do journal_mode:
+
+- WAL: a cópia roda dentro de uma transação de leitura aberta antes do
+  primeiro passo. O retrato é o daquele instante, quem lança notas nunca
+  espera e a cópia não recomeça.
+- Demais modos (padrão do projeto): durante cada passo o banco fica com trava
+  de leitura e escritores esperam só aquele trecho. Se outra conexão gravar
+  no meio, o SQLite recomeça a cópia do zero; com escritas contínuas isso
+  não terminaria, então depois de `max_restarts` recomeços o resto é copiado
+  num passo único (a espera aparece em `max_lock_seconds`).
+
+Cada backup vira um arquivo novo em `backups/` com data e hora no nome; os
+mais antigos além de `keep` são apagados. Arquivos mortos de anos encerrados
+(ver archive.py) ficam fora: já são somente leitura e têm cópia própria.
+
+Uso:
+    python -m src.infrastructure.backup backup --keep 7
+    python -m src.infrastructure.backup restore backups/school_....db /tmp/restaurado.db
+
+    resultado = fazer_backup(get_database(), keep=7)
+    print(resultado)        # páginas/s e tempo em que escritores esperaram
+    restaurar_backup(listar_backups(get_database())[-1], "/tmp/school_restaurado.db")
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+from src.infrastructure.database import DatabaseManager
+
+
+@dataclass
+class BackupResult:
+    """Resumo de um backup."""
+    path: Path
+    pages: int
+    seconds: float
+    steps: int
+    restarts: int              # cópias recomeçadas por escrita de outra conexão
+    locked_seconds: float      # soma dos passos (origem travada para escrita); 0 em WAL
+    max_lock_seconds: float    # maior passo: pior espera de um escritor
+    journal_mode: str = ""
+    single_step: bool = False  # terminou num passo único (max_restarts atingido)
+    removed: List[Path] = field(default_factory=list)
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages / self.seconds if self.seconds > 0 else 0.0
+
+    def __str__(self):
+        return (
+            f"Backup em {self.path} ({self.pages} páginas em {self.seconds:.2f}s, "
+            f"{self.pages_per_second:,.0f} páginas/s; escritores bloqueados "
+            f"{self.locked_seconds * 1000:.0f} ms no total, no máximo "
+            f"{self.max_lock_seconds * 1000:.1f} ms seguidos)"
+        )
+
+
+class _TooManyRestarts(Exception):
+    pass
+
+
+def fazer_backup(db_manager, backup_dir: Optional[str] = None, keep: int = 7,
+                 pages: int = 256, pause: float = 0.005, max_restarts: int = 3) -> BackupResult:
+    """Copia o banco em passos de `pages` páginas, com `pause` segundos entre eles.
+
+    Mantém só os `keep` backups mais recentes (keep=0 não apaga nenhum).
+    """
+    if pages < 1:
+        raise ValueError("pages deve ser >= 1")
+    if keep < 0:
+        raise ValueError("keep deve ser >= 0")
+
+    folder = _backup_dir(db_manager, backup_dir)
+    folder.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    path = folder / f"{db_manager.db_path.stem}_{stamp}.db"
+    partial = path.with_suffix(".db.partial")
+
+    steps = []
+    restarts = 0
+    remaining_before = None
+    step_start = time.perf_counter()
+
+    def progress(status, remaining, total):
+        nonlocal step_start, restarts, remaining_before
+        steps.append(time.perf_counter() - step_start)
+        # Recomeço: um passo que rodou sem travar e não diminuiu o que falta
+        if status == sqlite3.SQLITE_OK and remaining_before is not None and remaining >= remaining_before:
+            restarts += 1
+            if restarts > max_restarts:
+                raise _TooManyRestarts()
+        remaining_before = remaining
+        if remaining and pause > 0:
+            time.sleep(pause)
+        step_start = time.perf_counter()
+
+    source = sqlite3.connect(str(db_manager.db_path), timeout=30.0, isolation_level=None)
+    target = sqlite3.connect(str(partial))
+    single_step = False
+    try:
+        journal_mode = source.execute("PRAGMA journal_mode").fetchone()[0].lower()
+        wal = journal_mode == "wal"
+        if wal:
+            # Fixa o retrato: os passos leem dele e escritas de outras conexões não recomeçam a cópia
+            source.execute("BEGIN")
+            source.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+        inicio = time.perf_counter()
+        try:
+            source.backup(target, pages=pages, progress=progress)
+        except _TooManyRestarts:
+            single_step = True
+            step_start = time.perf_counter()
+            source.backup(target, pages=-1)
+            steps.append(time.perf_counter() - step_start)
+        seconds = time.perf_counter() - inicio
+        page_count = target.execute("PRAGMA page_count").fetchone()[0]
+    except BaseException:
+        target.close()
+        partial.unlink(missing_ok=True)
+        raise
+    finally:
+        source.close()
+    target.close()
+    # Só aparece com o nome final depois de completo (a rotação nunca vê cópia pela metade)
+    os.replace(partial, path)
+
+    return BackupResult(
+        path=path, pages=page_count, seconds=seconds, steps=len(steps), restarts=restarts,
+        locked_seconds=0.0 if wal else sum(steps),
+        max_lock_seconds=0.0 if wal else max(steps, default=0.0),
+        journal_mode=journal_mode, single_step=single_step,
+        removed=_rotate(db_manager, folder, keep) if keep else [],
+    )
+
+
+def listar_backups(db_manager, backup_dir: Optional[str] = None) -> List[Path]:
+    """Backups existentes, do mais antigo para o mais recente."""
+    folder = _backup_dir(db_manager, backup_dir)
+    if not folder.exists():
+        return []
+    # O carimbo no nome tem largura fixa, então a ordem alfabética é a cronológica
+    return sorted(folder.glob(f"{db_manager.db_path.stem}_*.db"))
+
+
+def restaurar_backup(snapshot, target_path, pages: int = -1) -> Path:
+    """Restaura um backup para um arquivo NOVO (não sobrescreve nada).
+
+    Com pages=-1 a cópia é feita num único passo, que é o mais rápido.
+    Para voltar o sistema ao backup, aponte o DatabaseManager para o arquivo
+    restaurado (ou troque o arquivo com a aplicação parada).
+    """
+    snapshot = Path(snapshot)
+    target_path = Path(target_path)
+    if not snapshot.exists():
+        raise ValueError(f"Backup não encontrado: {snapshot}")
+    if target_path.exists():
+        raise ValueError(f"Destino já existe: {target_path}")
+
+    target_path.parent.mkdir(parents=True, exist_ok=True)
+    partial = target_path.with_name(target_path.name + ".partial")
+    source = sqlite3.connect(f"{snapshot.resolve().as_uri()}?mode=ro", uri=True)
+    target = sqlite3.connect(str(partial))
+    try:
+        source.backup(target, pages=pages)
+        status = target.execute("PRAGMA quick_check").fetchone()[0]
+        if status != "ok":
+            raise ValueError(f"Backup corrompido ({snapshot}): {status}")
+    except BaseException:
+        target.close()
+        partial.unlink(missing_ok=True)
+        raise
+    finally:
+        source.close()
+    target.close()
+    os.replace(partial, target_path)
+    return target_path
+
+
+def _backup_dir(db_manager, backup_dir: Optional[str]) -> Path:
+    return Path(backup_dir) if backup_dir else db_manager.db_path.parent / "backups"
+
+
+def _rotate(db_manager, folder: Path, keep: int) -> List[Path]:
+    backups = listar_backups(db_manager, str(folder))
+    removed = backups[:-keep]
+    for path in removed:
+        path.unlink()
+    return removed
+
+
+# =============================================
+# LINHA DE COMANDO
+# =============================================
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.infrastructure.backup",
+        description="Backup a quente, listagem e restauração do banco."
+    )
+    parser.add_argument("--db", help="arquivo do banco (padrão: school.db do projeto)")
+    parser.add_argument("--dir", help="pasta dos backups (padrão: backups/ ao lado do banco)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    backup = sub.add_parser("backup", help="faz um backup agora")
+    backup.add_argument("--keep", type=int, default=7, help="quantos backups manter (0 = todos)")
+    backup.add_argument("--pages", type=int, default=256, help="páginas copiadas por passo")
+    backup.add_argument("--pause", type=float, default=0.005, help="pausa entre passos (s)")
+    backup.add_argument("--max-restarts", type=int, default=3,
+                        help="recomeços tolerados antes de copiar o resto num passo único")
+    sub.add_parser("list", help="lista os backups existentes")
+    restore = sub.add_parser("restore", help="restaura um backup para um arquivo novo")
+    restore.add_argument("snapshot")
+    restore.add_argument("target")
+    return parser
+
+
+def run(args) -> int:
+    if args.command == "restore":
+        print(f"Restaurado em {restaurar_backup(args.snapshot, args.target)}")
+        return 0
+    db_manager = DatabaseManager(args.db)
+    if args.command == "list":
+        for path in listar_backups(db_manager, args.dir):
+            print(f"{path}  ({path.stat().st_size / 1024:.0f} KiB)")
+        return 0
+    resultado = fazer_backup(db_manager, args.dir, keep=args.keep, pages=args.pages, pause=args.pause,
+                             max_restarts=args.max_restarts)
+    print(resultado)
+    for path in resultado.removed:
+        print(f"  removido: {path}")
+    return 0
+
+
+def main(argv=None) -> int:
+    return run(build_parser().parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,269 @@
+"""
+Feed de alterações (change data capture) para sistemas externos.
+
+Triggers do schema.sql registram em `change_log` cada INSERT, UPDATE e
+DELETE em `grades`, `attendance`, `classroom_enrollments` e `student_parent`:
+operação ('I', 'U', 'D'), tabela, chave (pk, e pk2 para student_parent),
+aluno e um `seq` crescente. O data warehouse e o serviço de SMS dos
+responsáveis leem só o que mudou desde o último `seq` processado, em vez de
+reler as tabelas inteiras.
+
+Cada consumidor tem um cursor durável em `change_log_consumers`. O cursor só
+avança com `ack()` (ou ao pedir o próximo lote em `batches()`), então uma
+falha no meio do lote faz o lote ser entregue de novo: a entrega é "pelo
+menos uma vez" e o consumidor deve aplicar as mudanças de forma idempotente
+(ex.: upsert pela chave). Entradas já processadas por todos os consumidores
+são apagadas por `prune_change_log()`.
+
+O log guarda só a chave. Para I/U o consumidor busca a linha atual
+(GradeRepository.find_by_ids e AttendanceRepository.find_by_ids; matrículas
+e vínculos, pela chave em classroom_enrollments/student_parent); para D a
+linha já não existe, por isso o student_id vai junto. Várias mudanças da mesma linha num lote podem ser
+reduzidas à última (ver `latest()`).
+
+Como o SQLite tem um escritor por vez, a ordem de `seq` é a ordem de commit:
+um consumidor nunca pula uma mudança que ainda não estava confirmada.
+
+Uso:
+    feed = ChangeFeed(get_database(), "warehouse", batch_size=1000)
+    for lote in feed.batches():
+        aplicar_no_warehouse(latest(lote))   # o cursor avança no próximo lote
+    prune_change_log(get_database())
+
+    python -m src.infrastructure.change_feed status
+    python -m src.infrastructure.change_feed prune
+"""
+import argparse
+import sys
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from src.infrastructure.database import DatabaseManager
+from src.infrastructure.migrations import CHANGE_LOG_TABLES
+
+
+class Change(NamedTuple):
+    """Uma entrada do change_log."""
+    seq: int
+    table: str
+    op: str           # 'I', 'U' ou 'D'
+    pk: int
+    pk2: Optional[int]  # parent_id em student_parent; None nas demais
+    student_id: Optional[int]
+    changed_at: str
+
+    @property
+    def key(self) -> Tuple[str, int, Optional[int]]:
+        return self.table, self.pk, self.pk2
+
+
+_COLUMNS = "seq, table_name, op, pk, pk2, student_id, changed_at"
+
+
+class ChangeFeed:
+    """Leitura incremental do change_log com cursor durável por consumidor."""
+
+    def __init__(self, db_manager, consumer: str, batch_size: int = 1000,
+                 tables: Optional[Iterable[str]] = None, from_end: bool = False):
+        """Registra o consumidor (se ainda não existir).
+
+        from_end=True começa do fim do log atual: útil para quem acabou de
+        fazer a carga completa e só quer o que mudar daqui em diante.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size deve ser >= 1")
+        self.tables = tuple(tables) if tables else None
+        unknown = set(self.tables or ()) - set(CHANGE_LOG_TABLES)
+        if unknown:
+            raise ValueError(f"Tabela(s) sem change_log: {', '.join(sorted(unknown))}")
+        self.db = db_manager
+        self.consumer = consumer
+        self.batch_size = batch_size
+
+        conn = self.db.get_connection()
+        try:
+            start = "(SELECT COALESCE(MAX(seq), 0) FROM change_log)" if from_end else "0"
+            conn.execute(
+                f"INSERT OR IGNORE INTO change_log_consumers (consumer, last_seq) VALUES (?, {start})",
+                (consumer,))
+            conn.commit()
+        finally:
+            conn.close()
+
+    @property
+    def position(self) -> int:
+        """Último seq confirmado (ack) por este consumidor."""
+        conn = self.db.get_read_connection()
+        try:
+            row = conn.execute("SELECT last_seq FROM change_log_consumers WHERE consumer = ?",
+                               (self.consumer,)).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            raise ValueError(f"Consumidor não registrado: {self.consumer}")
+        return row[0]
+
+    def read(self, after: Optional[int] = None, limit: Optional[int] = None) -> List[Change]:
+        """Próximas mudanças depois de `after` (padrão: o cursor), sem avançar o cursor."""
+        after = self.position if after is None else after
+        sql = f"SELECT {_COLUMNS} FROM change_log WHERE seq > ?"
+        params: list = [after]
+        if self.tables:
+            sql += f" AND table_name IN ({', '.join('?' * len(self.tables))})"
+            params.extend(self.tables)
+        sql += " ORDER BY seq LIMIT ?"
+        params.append(limit or self.batch_size)
+        conn = self.db.get_read_connection()
+        try:
+            return [Change(*row) for row in conn.execute(sql, params).fetchall()]
+        finally:
+            conn.close()
+
+    def ack(self, seq: int) -> None:
+        """Confirma tudo até `seq` (o cursor nunca volta; para isso use reset)."""
+        conn = self.db.get_connection()
+        try:
+            conn.execute("""
+                UPDATE change_log_consumers
+                SET last_seq = MAX(last_seq, ?), updated_at = CURRENT_TIMESTAMP
+                WHERE consumer = ?
+            """, (seq, self.consumer))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def batches(self) -> Iterator[List[Change]]:
+        """Lotes até o fim do log; o lote anterior é confirmado ao pedir o próximo.
+
+        Se o processamento de um lote falhar (exceção dentro do for), o
+        cursor fica antes dele e o lote volta na próxima execução.
+        """
+        after = self.position
+        while True:
+            lote = self.read(after)
+            if not lote:
+                return
+            yield lote
+            after = lote[-1].seq
+            self.ack(after)
+
+    def pending(self) -> int:
+        """Quantas mudanças ainda não foram confirmadas."""
+        sql = "SELECT COUNT(*) FROM change_log WHERE seq > ?"
+        params: list = [self.position]
+        if self.tables:
+            sql += f" AND table_name IN ({', '.join('?' * len(self.tables))})"
+            params.extend(self.tables)
+        conn = self.db.get_read_connection()
+        try:
+            return conn.execute(sql, params).fetchone()[0]
+        finally:
+            conn.close()
+
+    def reset(self, seq: int = 0) -> None:
+        """Volta (ou adianta) o cursor para `seq`, ex.: para reprocessar."""
+        conn = self.db.get_connection()
+        try:
+            conn.execute("UPDATE change_log_consumers SET last_seq = ?, updated_at = CURRENT_TIMESTAMP "
+                         "WHERE consumer = ?", (seq, self.consumer))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def unregister(self) -> None:
+        """Remove o consumidor; ele deixa de segurar a poda do log."""
+        conn = self.db.get_connection()
+        try:
+            conn.execute("DELETE FROM change_log_consumers WHERE consumer = ?", (self.consumer,))
+            conn.commit()
+        finally:
+            conn.close()
+
+
+def latest(changes: Iterable[Change]) -> List[Change]:
+    """Só a última mudança de cada linha, na ordem de seq.
+
+    Uma nota lançada e corrigida no mesmo lote vira uma única entrada; uma
+    linha inserida e apagada aparece só como 'D'.
+    """
+    last: Dict[Tuple[str, int, Optional[int]], Change] = {}
+    for change in changes:
+        last.pop(change.key, None)  # reinsere no fim: mantém a ordem de seq
+        last[change.key] = change
+    return list(last.values())
+
+
+def prune_change_log(db_manager) -> int:
+    """Apaga as entradas já confirmadas por todos os consumidores.
+
+    Sem nenhum consumidor registrado nada é apagado. Retorna quantas
+    entradas saíram.
+    """
+    conn = db_manager.get_connection()
+    try:
+        cursor = conn.execute("""
+            DELETE FROM change_log
+            WHERE seq <= (SELECT MIN(last_seq) FROM change_log_consumers)
+        """)
+        conn.commit()
+        return cursor.rowcount
+    finally:
+        conn.close()
+
+
+def consumer_status(db_manager) -> List[dict]:
+    """Cursor e pendências de cada consumidor."""
+    conn = db_manager.get_read_connection()
+    try:
+        rows = conn.execute("""
+            SELECT c.consumer, c.last_seq, c.updated_at,
+                   (SELECT COUNT(*) FROM change_log l WHERE l.seq > c.last_seq)
+            FROM change_log_consumers c
+            ORDER BY c.consumer
+        """).fetchall()
+    finally:
+        conn.close()
+    return [
+        {'consumer': r[0], 'last_seq': r[1], 'updated_at': r[2], 'pending': r[3]}
+        for r in rows
+    ]
+
+
+# =============================================
+# LINHA DE COMANDO
+# =============================================
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.infrastructure.change_feed",
+        description="Consumidores e poda do feed de alterações (change_log)."
+    )
+    parser.add_argument("--db", help="arquivo do banco (padrão: school.db do projeto)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("status", help="cursor e pendências de cada consumidor")
+    sub.add_parser("prune", help="apaga o que todos os consumidores já processaram")
+    reset = sub.add_parser("reset", help="move o cursor de um consumidor")
+    reset.add_argument("consumer")
+    reset.add_argument("--seq", type=int, default=0, help="novo cursor (padrão: 0, reprocessa tudo)")
+    return parser
+
+
+def run(args) -> int:
+    db_manager = DatabaseManager(args.db)
+    if args.command == "status":
+        for s in consumer_status(db_manager):
+            print(f"{s['consumer']:<20} seq {s['last_seq']:>10}  pendentes {s['pending']:>8}  ({s['updated_at']})")
+        return 0
+    if args.command == "prune":
+        print(f"{prune_change_log(db_manager)} entrada(s) removida(s) do change_log")
+        return 0
+    ChangeFeed(db_manager, args.consumer).reset(args.seq)
+    print(f"Cursor de {args.consumer} em {args.seq}")
+    return 0
+
+
+def main(argv=None) -> int:
+    return run(build_parser().parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,41 +1,344 @@
 """Banco de dados e repositórios."""
+import json
+import queue
 import sqlite3
+import threading
+import time
+from collections import OrderedDict, namedtuple
 from pathlib import Path
-from typing import List, Optional
-from datetime import datetime, date
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+from datetime import date
 
 from src.domain.models import (
     Student, Teacher, Parent,
     Classroom, Assessment, Grade, Attendance,
     EducationLevel, Shift, AssessmentType, Bimester
 )
+from src.infrastructure.date_storage import from_day_number, read_storage, to_db
+from src.infrastructure.identity_map import current_identity_map
+from src.infrastructure.profiling import track_connection
+from src.infrastructure.replica import ReadReplica
+from src.infrastructure.subjects import SubjectCatalog
 
 
 # =============================================
 # CONEXÃO COM O BANCO DE DADOS
 # =============================================
 
+class PooledConnection(sqlite3.Connection):
+    """Conexão cujo close() devolve ao pool em vez de fechar de fato."""
+
+    pool: Optional["ConnectionPool"] = None
+    read_only = False  # aberta com mode=ro + query_only (pool de leitura)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.release(self)
+        else:
+            super().close()
+
+    def dispose(self):
+        """Fecha a conexão de verdade."""
+        self.pool = None
+        super().close()
+
+
+class StatementStats:
+    """Instrumentação do cache de statements preparados (opcional).
+
+    Cada execute é classificado como "preparado agora" (parse + execução)
+    ou "reaproveitado" (só execução), espelhando o cache LRU que o sqlite3
+    mantém por conexão. A diferença entre as médias estima o custo do parse.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.prepared = 0
+        self.reused = 0
+        self.prepared_seconds = 0.0
+        self.reused_seconds = 0.0
+
+    def record(self, reused: bool, seconds: float) -> None:
+        with self._lock:
+            if reused:
+                self.reused += 1
+                self.reused_seconds += seconds
+            else:
+                self.prepared += 1
+                self.prepared_seconds += seconds
+
+    def summary(self) -> dict:
+        total = self.prepared + self.reused
+        avg_prepared = self.prepared_seconds / self.prepared if self.prepared else 0.0
+        avg_reused = self.reused_seconds / self.reused if self.reused else 0.0
+        return {
+            'statements': total,
+            'prepared': self.prepared,
+            'reused': self.reused,
+            'reuse_rate': round(self.reused / total, 4) if total else 0.0,
+            'avg_prepare_execute_us': round(avg_prepared * 1e6, 2),
+            'avg_execute_us': round(avg_reused * 1e6, 2),
+            # Parse evitado nos reaproveitados (estimativa)
+            'parse_saved_seconds': round(max(avg_prepared - avg_reused, 0.0) * self.reused, 6),
+        }
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor que mede cada execute e registra se o statement foi reaproveitado."""
+
+    def execute(self, sql, parameters=()):
+        conn = self.connection
+        reused = conn.track_statement(sql)
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            conn.statement_stats.record(reused, time.perf_counter() - start)
+
+    def executemany(self, sql, seq_of_parameters):
+        conn = self.connection
+        reused = conn.track_statement(sql)
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            conn.statement_stats.record(reused, time.perf_counter() - start)
+
+
+class InstrumentedConnection(PooledConnection):
+    """Conexão com registro dos statements preparados (ver StatementStats)."""
+
+    statement_stats: Optional[StatementStats] = None
+    cached_statements = 128
+    _prepared: Optional[OrderedDict] = None
+
+    def track_statement(self, sql: str) -> bool:
+        """Atualiza o LRU da conexão; True se o statement já estava preparado."""
+        if self._prepared is None:
+            self._prepared = OrderedDict()
+        if sql in self._prepared:
+            self._prepared.move_to_end(sql)
+            return True
+        if self.cached_statements > 0:
+            self._prepared[sql] = None
+            if len(self._prepared) > self.cached_statements:
+                self._prepared.popitem(last=False)
+        return False
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    # Connection.execute em C não passa por cursor(); redireciona aqui
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+class ConnectionPool:
+    """Mantém até `size` conexões ociosas para reaproveitar entre chamadas.
+
+    acquire() nunca bloqueia: se não houver conexão ociosa, abre uma nova.
+    As conexões podem trocar de thread (check_same_thread=False), mas cada
+    uma é usada por uma thread de cada vez.
+    """
+
+    def __init__(self, connect, size: int):
+        self._connect = connect
+        self._idle: "queue.LifoQueue" = queue.LifoQueue(maxsize=size)
+
+    def acquire(self) -> PooledConnection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+            conn.pool = self
+            return conn
+
+    def release(self, conn: PooledConnection) -> None:
+        # Desfaz transação esquecida e ajustes feitos por quem usou
+        if conn.in_transaction:
+            conn.rollback()
+        conn.row_factory = sqlite3.Row
+        conn.isolation_level = ""
+        conn.set_trace_callback(None)  # contador de statements do perfil (profiling.py)
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.dispose()
+
+    def close_all(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().dispose()
+            except queue.Empty:
+                return
+
+
+JOURNAL_MODES = ("delete", "truncate", "persist", "memory", "wal", "off")
+
+
 class DatabaseManager:
     """Gerencia conexões e inicialização do banco SQLite."""
 
-    def __init__(self, db_path: Optional[str] = None):
+    def __init__(self, db_path: Optional[str] = None, pool_size: int = 0,
+                 cached_statements: int = 128, statement_stats: bool = False,
+                 read_pool_size: int = 0, journal_mode: Optional[str] = None):
         if db_path:
             self.db_path = Path(db_path)
         else:
             base_dir = Path(__file__).parent
             self.db_path = base_dir / "school.db"
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # Statements preparados guardados por conexão; só ajudam com conexões
+        # de vida longa (pool), já que o cache morre com a conexão.
+        self.cached_statements = cached_statements
+        self.statement_stats = StatementStats() if statement_stats else None
+        if journal_mode is not None:
+            self.set_journal_mode(journal_mode)
+        # Leituras num pool próprio (mode=ro + query_only); o pool normal fica
+        # com as escritas e, por padrão, guarda um único escritor aquecido
+        if read_pool_size > 0 and pool_size == 0:
+            pool_size = 1
+        # pool_size = 0 mantém o comportamento original (uma conexão por chamada)
+        self.pool = ConnectionPool(self._connect_pooled, pool_size) if pool_size > 0 else None
+        self.read_pool = ConnectionPool(self._connect_readonly, read_pool_size) if read_pool_size > 0 else None
+        # Réplica em memória para relatórios (ver enable_read_replica)
+        self.replica = None
+        # Nome <-> subject_id das disciplinas (ver subjects.py)
+        self.subjects = SubjectCatalog(self)
+        # "iso" ou "days", lido de db_settings no primeiro uso (ver date_storage.py)
+        self._date_storage: Optional[str] = None
+
+    @property
+    def date_storage(self) -> str:
+        """Formato das datas de frequência/avaliações neste banco."""
+        if self._date_storage is None:
+            conn = self.get_read_connection()
+            try:
+                self._date_storage = read_storage(conn)
+            finally:
+                conn.close()
+        return self._date_storage
+
+    def date_value(self, value: Optional[date]):
+        """Data como gravada no banco (texto ISO ou número do dia), para INSERT e WHERE."""
+        return to_db(value, self.date_storage)
 
     def get_connection(self) -> sqlite3.Connection:
-        """Retorna uma nova conexão com o banco."""
-        conn = sqlite3.connect(str(self.db_path), timeout=30.0)
+        """Retorna uma conexão com o banco (nova ou reaproveitada do pool)."""
+        if self.pool is not None:
+            return track_connection(self.pool.acquire())
+        if self.statement_stats is not None:
+            return track_connection(self._connect(InstrumentedConnection, check_same_thread=True))
+        conn = sqlite3.connect(str(self.db_path), timeout=30.0, uri=True,
+                               cached_statements=self.cached_statements)
         conn.execute("PRAGMA foreign_keys = ON")
         conn.row_factory = sqlite3.Row
+        return track_connection(conn)
+
+    def get_read_connection(self) -> sqlite3.Connection:
+        """Conexão só para leitura: do pool read-only, se houver; senão a normal."""
+        if self.read_pool is not None:
+            return track_connection(self.read_pool.acquire())
+        return self.get_connection()
+
+    def get_report_connection(self) -> sqlite3.Connection:
+        """Conexão para relatórios: a réplica em memória, se ativa (pode estar atrasada)."""
+        if self.replica is not None:
+            return track_connection(self.replica.get_connection())
+        return self.get_read_connection()
+
+    def set_journal_mode(self, mode: str) -> str:
+        """Troca o journal_mode do arquivo (persistente no caso de WAL)."""
+        mode = mode.lower()
+        if mode not in JOURNAL_MODES:
+            raise ValueError(f"journal_mode inválido: {mode}")
+        conn = sqlite3.connect(str(self.db_path), timeout=30.0, uri=True)
+        try:
+            return conn.execute(f"PRAGMA journal_mode = {mode}").fetchall()[0][0]
+        finally:
+            conn.close()
+
+    def enable_read_replica(self, refresh_interval: float = 5.0, background: bool = True):
+        """Carrega uma cópia do banco em memória e passa os relatórios para ela."""
+        self.disable_read_replica()
+        self.replica = ReadReplica(self.db_path, refresh_interval, background)
+        return self.replica
+
+    def disable_read_replica(self) -> None:
+        if self.replica is not None:
+            self.replica.close()
+            self.replica = None
+
+    def _connect_pooled(self) -> PooledConnection:
+        factory = InstrumentedConnection if self.statement_stats is not None else PooledConnection
+        return self._connect(factory, check_same_thread=False)
+
+    def _connect_readonly(self) -> PooledConnection:
+        factory = InstrumentedConnection if self.statement_stats is not None else PooledConnection
+        return self._connect(factory, check_same_thread=False, read_only=True)
+
+    def _connect(self, factory, check_same_thread: bool, read_only: bool = False) -> PooledConnection:
+        target = f"{self.db_path.resolve().as_uri()}?mode=ro" if read_only else str(self.db_path)
+        conn = sqlite3.connect(target, timeout=30.0, uri=True, factory=factory,
+                               check_same_thread=check_same_thread,
+                               cached_statements=self.cached_statements)
+        if isinstance(conn, InstrumentedConnection):
+            conn.statement_stats = self.statement_stats
+            conn.cached_statements = self.cached_statements
+        if read_only:
+            conn.execute("PRAGMA query_only = ON")
+            conn.read_only = True
+        else:
+            conn.execute("PRAGMA foreign_keys = ON")
+        conn.row_factory = sqlite3.Row
         return conn
 
-    def initialize_database(self) -> bool:
+    def close(self) -> None:
+        """Fecha as conexões ociosas dos pools (e a réplica de leitura)."""
+        if self.pool is not None:
+            self.pool.close_all()
+        if self.read_pool is not None:
+            self.read_pool.close_all()
+        self.disable_read_replica()
+
+    def attach_archive(self, conn: sqlite3.Connection, year: int) -> str:
+        """Anexa o arquivo morto do ano (se houver) e retorna o schema a usar.
+
+        Anos a partir do atual nunca são arquivados, então a consulta à
+        tabela archived_years só acontece para anos passados.
+        Retorna "main" quando o ano está no banco principal.
+        """
+        if year >= date.today().year:
+            return "main"
+        try:
+            row = conn.execute(
+                "SELECT path FROM archived_years WHERE academic_year = ?", (year,)
+            ).fetchone()
+        except sqlite3.OperationalError:
+            return "main"  # banco antigo, sem a tabela archived_years
+        if row is None:
+            return "main"
+
+        schema = f"arquivo_{int(year)}"
+        attached = {r[1] for r in conn.execute("PRAGMA database_list")}
+        if schema not in attached:
+            path = Path(row[0])
+            if path.suffix == ".gz":
+                path = _decompress_archive(path)
+            conn.execute(f"ATTACH DATABASE ? AS {schema}",
+                         (f"{path.resolve().as_uri()}?mode=ro",))
+        return schema
+
+    def initialize_database(self, verbose: bool = True) -> bool:
         """Inicializa o banco executando schema.sql."""
-        print("\n=== INICIALIZANDO BANCO DE DADOS ===\n")
+        if verbose:
+            print("\n=== INICIALIZANDO BANCO DE DADOS ===\n")
 
         schema_file = Path(__file__).parent / "schema.sql"
 
@@ -51,10 +354,13 @@ class DatabaseManager:
             conn.executescript(schema_sql)
             conn.commit()
             conn.close()
+            self.subjects.clear()
+            self._date_storage = None
 
-            print(f"✅ Schema criado com sucesso!")
-            print(f"   Arquivo: {self.db_path}")
-            self._show_tables()
+            if verbose:
+                print(f"✅ Schema criado com sucesso!")
+                print(f"   Arquivo: {self.db_path}")
+                self._show_tables()
             return True
 
         except Exception as e:
@@ -78,12 +384,30 @@ class DatabaseManager:
 
     def reset_database(self):
         """Remove o arquivo do banco de dados."""
+        self.close()
+        self.subjects.clear()
+        self._date_storage = None
         if self.db_path.exists():
             self.db_path.unlink()
             print(f"🗑️  Banco removido: {self.db_path}")
         else:
             print("⚠️  Banco não existe")
 
+def _decompress_archive(path: Path) -> Path:
+    """Descompacta (uma vez) o arquivo morto .db.gz ao lado do original."""
+    target = path.with_suffix("")
+    if not target.exists():
+        # Caminho raro (ano compactado): gzip/shutil só são importados aqui
+        import gzip
+        import shutil
+
+        tmp = target.with_suffix(".tmp")
+        with gzip.open(path, "rb") as src, open(tmp, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        tmp.replace(target)
+    return target
+
+
 _db_instance = None
 
 
@@ -99,9 +423,281 @@ def get_database(db_path: Optional[str] = None) -> DatabaseManager:
 # REPOSITÓRIOS
 # =============================================
 
-class StudentRepository:
+# Limite seguro de parâmetros "?" por consulta (SQLite antigo: 999)
+MAX_SQL_VARIABLES = 900
+
+# Situações possíveis de uma matrícula (CHECK chk_enrollment_status)
+ENROLLMENT_STATUSES = ('ACTIVE', 'TRANSFERRED', 'WITHDRAWN', 'COMPLETED')
+
+# Projeção leve do roster: sem construir Student
+RosterEntry = namedtuple('RosterEntry', ['student_id', 'registration', 'name', 'status'])
+
+
+# Acima disso, find_by_ids usa tabela temporária em vez de blocos IN
+TEMP_TABLE_THRESHOLD = 10 * MAX_SQL_VARIABLES
+
+
+def _chunked(ids: List[int], size: int = MAX_SQL_VARIABLES) -> Iterator[List[int]]:
+    """Divide uma lista de IDs em blocos que cabem numa cláusula IN."""
+    for i in range(0, len(ids), size):
+        yield ids[i:i + size]
+
+
+def _rows_by_ids(conn: sqlite3.Connection, select_sql: str, key_column: str, ids: List[int]) -> list:
+    """Linhas de `select_sql` (sem WHERE) com `key_column` em `ids`.
+
+    Até TEMP_TABLE_THRESHOLD IDs: blocos IN (...) de MAX_SQL_VARIABLES.
+    Acima disso: os IDs vão para uma tabela temporária e a consulta é uma só
+    (em conexão query_only, que não cria tabela temporária, um array JSON).
+    """
+    if len(ids) <= TEMP_TABLE_THRESHOLD:
+        rows = []
+        for chunk in _chunked(ids):
+            rows.extend(conn.execute(
+                f"{select_sql} WHERE {key_column} IN ({','.join('?' * len(chunk))})", chunk))
+        return rows
+    if getattr(conn, 'read_only', False):
+        return conn.execute(f"{select_sql} WHERE {key_column} IN (SELECT value FROM json_each(?))",
+                            (json.dumps(ids),)).fetchall()
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS lookup_ids (id INTEGER PRIMARY KEY)")
+    try:
+        conn.executemany("INSERT OR IGNORE INTO temp.lookup_ids (id) VALUES (?)", ((i,) for i in ids))
+        return conn.execute(f"{select_sql} WHERE {key_column} IN (SELECT id FROM temp.lookup_ids)").fetchall()
+    finally:
+        conn.execute("DELETE FROM temp.lookup_ids")
+        conn.commit()
+
+
+# --- Conversão de linhas em objetos de domínio ---
+# Os mapeadores leem as colunas por posição (funcionam com tupla ou
+# sqlite3.Row) e convertem datas/enums por tabela de lookup, sem
+# Enum(valor) nem datetime.fromisoformat por linha.
+
+_BIMESTERS = {m.value: m for m in Bimester}
+_ASSESSMENT_TYPES = {m.value: m for m in AssessmentType}
+_SHIFTS = {m.value: m for m in Shift}
+_EDUCATION_LEVELS = {m.value: m for m in EducationLevel}
+
+# Datas se repetem muito (dias letivos); guarda as já convertidas
+_DATE_CACHE: Dict[object, date] = {}
+_DATE_CACHE_MAX = 20000
+
+
+def _to_date(value) -> Optional[date]:
+    """'AAAA-MM-DD' (com ou sem hora) ou número do dia (modo "days") -> date."""
+    if value is None:
+        return None
+    d = _DATE_CACHE.get(value)
+    if d is None:
+        d = from_day_number(value) if isinstance(value, int) else date.fromisoformat(value[:10])
+        if len(_DATE_CACHE) >= _DATE_CACHE_MAX:
+            _DATE_CACHE.clear()
+        _DATE_CACHE[value] = d
+    return d
+
+
+_CLASSROOM_COLUMNS = "classroom_id, year, identifier, shift, education_level, teacher_id"
+# A disciplina vem como subject_id; o mapeador recebe subject_name (o
+# SubjectCatalog.name_for do banco) para trocar pelo nome
+_ASSESSMENT_COLUMNS = ("assessment_id, title, subject_id, description, max_score, weight, "
+                       "assessment_type, bimester, academic_year, assessment_date")
+_ATTENDANCE_COLUMNS = ("attendance_id, student_id, subject_id, attendance_date, "
+                       "is_present, is_justified, justification")
+
+
+_STUDENT_COLUMNS = "student_id, name, registration, email, active"
+_PARENT_COLUMNS = "parent_id, name, email, cpf"
+
+
+def _student_from_row(r) -> Student:
+    return Student(student_id=r[0], name=r[1], registration=r[2], email=r[3], active=bool(r[4]))
+
+
+def _parent_from_row(r) -> Parent:
+    return Parent(parent_id=r[0], name=r[1], email=r[2], cpf=r[3])
+
+
+def _classroom_from_row(r) -> Classroom:
+    return Classroom(
+        classroom_id=r[0], year=r[1], identifier=r[2],
+        shift=_SHIFTS[r[3]], level=_EDUCATION_LEVELS[r[4]],
+        teacher_id=r[5]
+    )
+
+
+def _assessment_from_row(r, i: int = 0, subject_name: Optional[Callable] = None) -> Assessment:
+    """Colunas de _ASSESSMENT_COLUMNS a partir da posição `i`."""
+    return Assessment(
+        assessment_id=r[i], title=r[i + 1],
+        subject=subject_name(r[i + 2]) if subject_name else r[i + 2],
+        description=r[i + 3] or "",
+        max_score=float(r[i + 4]), weight=float(r[i + 5]),
+        assessment_type=_ASSESSMENT_TYPES[r[i + 6]],
+        bimester=_BIMESTERS[r[i + 7]],
+        academic_year=r[i + 8],
+        assessment_date=_to_date(r[i + 9])
+    )
+
+
+def _attendance_from_row(r, subject_name: Optional[Callable] = None) -> Attendance:
+    return Attendance(
+        attendance_id=r[0], subject=subject_name(r[2]) if subject_name else r[2],
+        attendance_date=_to_date(r[3]),
+        is_present=bool(r[4]), justified=bool(r[5]),
+        justification=r[6]
+    )
+
+
+# --- Identity map (ver identity_map.unit_of_work) ---
+
+def _hydrate(cls, key, mapper, row, *args):
+    """mapper(row, *args), ou o objeto já carregado no escopo atual."""
+    imap = current_identity_map()
+    if imap is None:
+        return mapper(row, *args)
+    return imap.get_or_build(cls, key, mapper, row, *args)
+
+
+def _cached(cls, key):
+    imap = current_identity_map()
+    return imap.get(cls, key) if imap is not None else None
+
+
+def _cached_many(cls, ids: List[int]):
+    """({id: objeto já carregado}, ids que faltam buscar)."""
+    imap = current_identity_map()
+    if imap is None:
+        return {}, ids
+    found = {}
+    for key in ids:
+        obj = imap.get(cls, key)
+        if obj is not None:
+            found[key] = obj
+    return found, [key for key in ids if key not in found]
+
+
+def _remember(cls, obj, loaded: bool = True):
+    imap = current_identity_map()
+    if imap is not None and obj is not None:
+        imap.add(cls, obj.id, obj, loaded)
+    return obj
+
+
+# --- Projeções leves (select) ---
+
+_PROJECTION_TYPES: Dict[tuple, type] = {}
+
+
+def _projection_type(table: str, fields: tuple) -> type:
+    """namedtuple da projeção, criado uma vez por (tabela, campos)."""
+    key = (table, fields)
+    row_type = _PROJECTION_TYPES.get(key)
+    if row_type is None:
+        name = "".join(part.title() for part in table.split("_")) + "Row"
+        row_type = _PROJECTION_TYPES[key] = namedtuple(name, fields)
+    return row_type
+
+
+class _Projection:
+    """select() dos repositórios: só as colunas pedidas, sem Row nem modelo.
+
+    Cada repositório define a tabela (`_TABLE`) e as colunas permitidas
+    (`_FIELDS`). Os valores vêm crus do banco (datas como gravadas, texto ISO
+    ou número do dia; booleanos 0/1); no filtro, `date` é convertido.
+    O campo "subject" é o nome da disciplina, resolvido a partir de subject_id.
+    """
+
+    _TABLE = ""
+    _FIELDS: tuple = ()
+
+    def _expression(self, column: str) -> str:
+        if column == "subject":
+            return f"(SELECT name FROM subjects WHERE subjects.subject_id = {self._TABLE}.subject_id)"
+        return column
+
+    def select(self, fields, where: Optional[dict] = None, order_by: Optional[str] = None,
+               limit: Optional[int] = None, named: bool = False, year: Optional[int] = None,
+               fresh: bool = False) -> list:
+        """Projeção de `fields` com filtro por igualdade.
+
+        fields: nome de uma coluna (retorna lista de valores) ou sequência
+                de colunas (retorna lista de tuplas; namedtuples com named=True).
+        where:  {coluna: valor}; None vira IS NULL e lista/tupla/set vira IN.
+        order_by: coluna, ou "-coluna" para ordem decrescente.
+        year:   relatório do ano letivo: lê pela conexão de relatórios (réplica)
+                e do arquivo morto do ano, se encerrado.
+        fresh:  com year, lê do arquivo mesmo com réplica ativa (ex.: valor
+                que vai para um cache invalidado pelos saves).
+
+        Ex: repo.select(("student_id", "name"), where={"active": 1}, order_by="name")
+        """
+        single = isinstance(fields, str)
+        columns = (fields,) if single else tuple(fields)
+        if not columns:
+            raise ValueError("Informe ao menos um campo.")
+        for column in columns:
+            self._check_field(column)
+
+        sql = [f"SELECT {', '.join(map(self._expression, columns))} FROM {{schema}}.{self._TABLE}"]
+        params: list = []
+        if where:
+            clauses = []
+            for column, value in where.items():
+                self._check_field(column)
+                if column == "subject" and value is not None:
+                    # Filtra pelo id (usa os índices); nome desconhecido não casa nada
+                    names = [value] if isinstance(value, str) else value
+                    column, value = "subject_id", list(self.db_manager.subjects.ids_for(names).values())
+                elif isinstance(value, date):
+                    value = self.db_manager.date_value(value)
+                if value is None:
+                    clauses.append(f"{column} IS NULL")
+                elif isinstance(value, (list, tuple, set, frozenset)):
+                    # Um único parâmetro para qualquer quantidade de valores
+                    clauses.append(f"{column} IN (SELECT value FROM json_each(?))")
+                    params.append(json.dumps(list(value)))
+                else:
+                    clauses.append(f"{column} = ?")
+                    params.append(value)
+            sql.append("WHERE " + " AND ".join(clauses))
+        if order_by:
+            column = order_by.lstrip("-")
+            self._check_field(column)
+            sql.append(f"ORDER BY {self._expression(column)}{' DESC' if order_by.startswith('-') else ''}")
+        if limit is not None:
+            sql.append("LIMIT ?")
+            params.append(int(limit))
+
+        if year is None or fresh:
+            conn = self.db_manager.get_read_connection()
+        else:
+            conn = self.db_manager.get_report_connection()
+        # Conexão emprestada (pool_size=0 ou do chamador): devolve como veio
+        row_factory = conn.row_factory
+        conn.row_factory = None
+        try:
+            schema = "main" if year is None else self.db_manager.attach_archive(conn, year)
+            rows = conn.execute(" ".join(sql).format(schema=schema), params).fetchall()
+        finally:
+            conn.row_factory = row_factory
+            conn.close()
+        if single:
+            return [r[0] for r in rows]
+        if named:
+            return list(map(_projection_type(self._TABLE, columns)._make, rows))
+        return rows
+
+    def _check_field(self, column: str) -> None:
+        if column not in self._FIELDS:
+            raise ValueError(f"Campo inválido para {self._TABLE}: {column}")
+
+
+class StudentRepository(_Projection):
     """Repositório de Alunos."""
 
+    _TABLE = "students"
+    _FIELDS = ("student_id", "name", "registration", "email", "active", "created_at")
+
     def __init__(self, db_manager):
         self.db_manager = db_manager
 
@@ -129,10 +725,14 @@ class StudentRepository:
             student.id = cursor.lastrowid
         conn.commit()
         conn.close()
+        _remember(Student, student, loaded=False)
         return student
 
     def find_by_id(self, student_id: int) -> Optional[Student]:
-        conn = self.db_manager.get_connection()
+        cached = _cached(Student, student_id)
+        if cached is not None:
+            return cached
+        conn = self.db_manager.get_read_connection()
         cursor = conn.cursor()
         cursor.execute(
             "SELECT student_id, name, registration, email, active FROM students WHERE student_id = ?",
@@ -140,18 +740,10 @@ class StudentRepository:
         )
         row = cursor.fetchone()
         conn.close()
-        if row:
-            return Student(
-                student_id=row['student_id'],
-                name=row['name'],
-                registration=row['registration'],
-                email=row['email'],
-                active=bool(row['active'])
-            )
-        return None
+        return _remember(Student, _student_from_row(row)) if row else None
 
     def list_all(self) -> List[Student]:
-        conn = self.db_manager.get_connection()
+        conn = self.db_manager.get_report_connection()
         cursor = conn.cursor()
         cursor.execute("SELECT student_id, name, registration, email, active FROM students WHERE active = 1 ORDER BY name")
         rows = cursor.fetchall()
@@ -162,23 +754,62 @@ class StudentRepository:
             for r in rows
         ]
 
+    def find_by_ids(self, student_ids: Iterable[int]) -> Dict[int, Student]:
+        """Vários alunos de uma vez: {id: Student} na ordem pedida (ausentes ficam de fora)."""
+        ids = list(dict.fromkeys(student_ids))
+        found, missing = _cached_many(Student, ids)
+        if not missing:
+            return {i: found[i] for i in ids if i in found}
+        conn = self.db_manager.get_read_connection()
+        conn.row_factory = None
+        try:
+            rows = _rows_by_ids(conn, f"SELECT {_STUDENT_COLUMNS} FROM students", "student_id", missing)
+        finally:
+            conn.close()
+        for r in rows:
+            found[r[0]] = _remember(Student, _student_from_row(r))
+        return {i: found[i] for i in ids if i in found}
+
+    def get_active_by_ids(self, student_ids: Iterable[int]) -> Dict[int, bool]:
+        """Situação (ativo ou não) dos alunos existentes, sem montar Student."""
+        ids = list(dict.fromkeys(student_ids))
+        conn = self.db_manager.get_read_connection()
+        cursor = conn.cursor()
+        result: Dict[int, bool] = {}
+        for chunk in _chunked(ids):
+            cursor.execute(
+                f"SELECT student_id, active FROM students WHERE student_id IN ({','.join('?' * len(chunk))})",
+                chunk
+            )
+            result.update((r[0], bool(r[1])) for r in cursor.fetchall())
+        conn.close()
+        return result
+
     def delete(self, student_id: int) -> bool:
         conn = self.db_manager.get_connection()
         cursor = conn.cursor()
         cursor.execute("DELETE FROM students WHERE student_id = ?", (student_id,))
         deleted = cursor.rowcount > 0
+        imap = current_identity_map()
+        if imap is not None:
+            imap.discard(Student, student_id)
         conn.commit()
         conn.close()
         return deleted
 
 
-class TeacherRepository:
+class TeacherRepository(_Projection):
     """Repositório de Professores."""
 
+    _TABLE = "teachers"
+    _FIELDS = ("teacher_id", "name", "email", "created_at")
+
     def __init__(self, db_manager):
         self.db_manager = db_manager
 
     def save(self, teacher: Teacher) -> Teacher:
+        # Antes de abrir a conexão: disciplina nova é cadastrada pelo catálogo
+        subject_ids = self.db_manager.subjects.ids_for(teacher.subjects, create=True)
         conn = self.db_manager.get_connection()
         cursor = conn.cursor()
         if teacher.id:
@@ -196,38 +827,43 @@ class TeacherRepository:
         cursor.execute("DELETE FROM teacher_subjects WHERE teacher_id = ?", (teacher.id,))
         for subject in teacher.subjects:
             cursor.execute(
-                "INSERT INTO teacher_subjects (teacher_id, subject) VALUES (?, ?)",
-                (teacher.id, subject)
+                "INSERT INTO teacher_subjects (teacher_id, subject_id) VALUES (?, ?)",
+                (teacher.id, subject_ids[subject])
             )
         conn.commit()
         conn.close()
+        _remember(Teacher, teacher, loaded=False)
         return teacher
 
     def find_by_id(self, teacher_id: int) -> Optional[Teacher]:
-        conn = self.db_manager.get_connection()
+        cached = _cached(Teacher, teacher_id)
+        if cached is not None:
+            return cached
+        conn = self.db_manager.get_read_connection()
         cursor = conn.cursor()
         cursor.execute("SELECT teacher_id, name, email FROM teachers WHERE teacher_id = ?", (teacher_id,))
         row = cursor.fetchone()
         if not row:
             conn.close()
             return None
-        cursor.execute("SELECT subject FROM teacher_subjects WHERE teacher_id = ?", (teacher_id,))
-        subjects = [r['subject'] for r in cursor.fetchall()]
+        cursor.execute("SELECT subject_id FROM teacher_subjects WHERE teacher_id = ?", (teacher_id,))
+        subjects = [self.db_manager.subjects.name_for(r[0]) for r in cursor.fetchall()]
         conn.close()
-        return Teacher(
+        return _remember(Teacher, Teacher(
             teacher_id=row['teacher_id'],
             name=row['name'], email=row['email'],
             subjects=subjects
-        )
+        ))
 
     def list_all(self) -> List[Teacher]:
-        conn = self.db_manager.get_connection()
+        conn = self.db_manager.get_report_connection()
         cursor = conn.cursor()
         cursor.execute("SELECT teacher_id, name, email FROM teachers ORDER BY name")
         teachers = []
+        subject_name = self.db_manager.subjects.name_for
         for row in cursor.fetchall():
-            cursor.execute("SELECT subject FROM teacher_subjects WHERE teacher_id = ?", (row['teacher_id'],))
-            subjects = [r['subject'] for r in cursor.fetchall()]
+            cursor.execute("SELECT subject_id FROM teacher_subjects WHERE teacher_id = ?", (row['teacher_id'],))
+            subjects = [subject_name(r[0]) for r in cursor.fetchall()]
             teachers.append(Teacher(
                 teacher_id=row['teacher_id'],
                 name=row['name'], email=row['email'],
@@ -236,10 +872,35 @@ class TeacherRepository:
         conn.close()
         return teachers
 
+    def find_by_ids(self, teacher_ids: Iterable[int]) -> Dict[int, Teacher]:
+        """Vários professores (com disciplinas) em duas consultas: {id: Teacher}."""
+        ids = list(dict.fromkeys(teacher_ids))
+        found, missing = _cached_many(Teacher, ids)
+        if not missing:
+            return {i: found[i] for i in ids if i in found}
+        conn = self.db_manager.get_read_connection()
+        conn.row_factory = None
+        try:
+            rows = _rows_by_ids(conn, "SELECT teacher_id, name, email FROM teachers", "teacher_id", missing)
+            subjects: Dict[int, List[str]] = {}
+            subject_name = self.db_manager.subjects.name_for
+            for teacher_id, subject_id in _rows_by_ids(
+                    conn, "SELECT teacher_id, subject_id FROM teacher_subjects", "teacher_id", [r[0] for r in rows]):
+                subjects.setdefault(teacher_id, []).append(subject_name(subject_id))
+        finally:
+            conn.close()
+        for r in rows:
+            found[r[0]] = _remember(
+                Teacher, Teacher(teacher_id=r[0], name=r[1], email=r[2], subjects=subjects.get(r[0], [])))
+        return {i: found[i] for i in ids if i in found}
+
 
-class ParentRepository:
+class ParentRepository(_Projection):
     """Repositório de Responsáveis."""
 
+    _TABLE = "parents"
+    _FIELDS = ("parent_id", "name", "email", "cpf", "created_at")
+
     def __init__(self, db_manager):
         self.db_manager = db_manager
 
@@ -259,24 +920,22 @@ class ParentRepository:
             parent.id = cursor.lastrowid
         conn.commit()
         conn.close()
+        _remember(Parent, parent, loaded=False)
         return parent
 
     def find_by_id(self, parent_id: int) -> Optional[Parent]:
-        conn = self.db_manager.get_connection()
+        cached = _cached(Parent, parent_id)
+        if cached is not None:
+            return cached
+        conn = self.db_manager.get_read_connection()
         cursor = conn.cursor()
         cursor.execute("SELECT parent_id, name, email, cpf FROM parents WHERE parent_id = ?", (parent_id,))
         row = cursor.fetchone()
         conn.close()
-        if row:
-            return Parent(
-                parent_id=row['parent_id'],
-                name=row['name'], email=row['email'],
-                cpf=row['cpf']
-            )
-        return None
+        return _remember(Parent, _parent_from_row(row)) if row else None
 
     def list_all(self) -> List[Parent]:
-        conn = self.db_manager.get_connection()
+        conn = self.db_manager.get_report_connection()
         cursor = conn.cursor()
         cursor.execute("SELECT parent_id, name, email, cpf FROM parents ORDER BY name")
         rows = cursor.fetchall()
@@ -287,6 +946,22 @@ class ParentRepository:
             for r in rows
         ]
 
+    def find_by_ids(self, parent_ids: Iterable[int]) -> Dict[int, Parent]:
+        """Vários responsáveis de uma vez: {id: Parent} na ordem pedida."""
+        ids = list(dict.fromkeys(parent_ids))
+        found, missing = _cached_many(Parent, ids)
+        if not missing:
+            return {i: found[i] for i in ids if i in found}
+        conn = self.db_manager.get_read_connection()
+        conn.row_factory = None
+        try:
+            rows = _rows_by_ids(conn, f"SELECT {_PARENT_COLUMNS} FROM parents", "parent_id", missing)
+        finally:
+            conn.close()
+        for r in rows:
+            found[r[0]] = _remember(Parent, _parent_from_row(r))
+        return {i: found[i] for i in ids if i in found}
+
     def link_to_student(self, parent_id: int, student_id: int, relationship: str = "Responsável") -> bool:
         conn = self.db_manager.get_connection()
         cursor = conn.cursor()
@@ -316,7 +991,7 @@ class ParentRepository:
 
     def get_students(self, parent_id: int) -> List[int]:
         """Retorna IDs dos alunos vinculados ao responsável."""
-        conn = self.db_manager.get_connection()
+        conn = self.db_manager.get_read_connection()
         cursor = conn.cursor()
         cursor.execute(
             "SELECT student_id FROM student_parent WHERE parent_id = ?",
@@ -326,9 +1001,59 @@ class ParentRepository:
         conn.close()
         return [r['student_id'] for r in rows]
 
+    def get_dashboard_data(self, parent_id: int, year: int) -> Optional[dict]:
+        """Dados do painel do responsável em 3 consultas, para todos os filhos.
+
+        Retorna None se o responsável não existir, senão um dict com:
+          'students':   [(student_id, name, registration, relationship_type)]
+          'grades':     [(student_id, subject, bimester, soma_nota_x_peso, soma_peso)]
+          'attendance': [(student_id, subject, total_aulas, presencas)]
+        """
+        start, end = self.db_manager.date_value(date(year, 1, 1)), self.db_manager.date_value(date(year, 12, 31))
+        conn = self.db_manager.get_read_connection()
+        conn.row_factory = None
+        try:
+            rows = conn.execute("""
+                SELECT p.parent_id, s.student_id, s.name, s.registration, sp.relationship_type
+                FROM parents p
+                LEFT JOIN student_parent sp ON sp.parent_id = p.parent_id
+                LEFT JOIN students s ON s.student_id = sp.student_id
+                WHERE p.parent_id = ?
+                ORDER BY s.name
+            """, (parent_id,)).fetchall()
+            if not rows:
+                return None
+            students = [r[1:] for r in rows if r[1] is not None]
+            if not students:
+                return {'students': [], 'grades': [], 'attendance': []}
+
+            schema = self.db_manager.attach_archive(conn, year)
+            grades = conn.execute(f"""
+                SELECT g.student_id, a.subject_id, a.bimester,
+                       SUM(g.score * a.weight), SUM(a.weight)
+                FROM student_parent sp
+                JOIN {schema}.grades g ON g.student_id = sp.student_id
+                JOIN {schema}.assessments a ON a.assessment_id = g.assessment_id
+                WHERE sp.parent_id = ? AND a.academic_year = ?
+                GROUP BY g.student_id, a.subject_id, a.bimester
+            """, (parent_id, year)).fetchall()
+            attendance = conn.execute(f"""
+                SELECT t.student_id, t.subject_id, COUNT(*), SUM(t.is_present)
+                FROM student_parent sp
+                JOIN {schema}.attendance t ON t.student_id = sp.student_id
+                WHERE sp.parent_id = ? AND t.attendance_date BETWEEN ? AND ?
+                GROUP BY t.student_id, t.subject_id
+            """, (parent_id, start, end)).fetchall()
+        finally:
+            conn.close()
+        subject_name = self.db_manager.subjects.name_for
+        grades = [(r[0], subject_name(r[1])) + r[2:] for r in grades]
+        attendance = [(r[0], subject_name(r[1])) + r[2:] for r in attendance]
+        return {'students': students, 'grades': grades, 'attendance': attendance}
+
     def get_parents_by_student(self, student_id: int) -> List[int]:
         """Retorna IDs dos responsáveis vinculados ao aluno."""
-        conn = self.db_manager.get_connection()
+        conn = self.db_manager.get_read_connection()
         cursor = conn.cursor()
         cursor.execute(
             "SELECT parent_id FROM student_parent WHERE student_id = ?",
@@ -339,9 +1064,13 @@ class ParentRepository:
         return [r['parent_id'] for r in rows]
 
 
-class ClassroomRepository:
+class ClassroomRepository(_Projection):
     """Repositório de Turmas."""
 
+    _TABLE = "classrooms"
+    _FIELDS = ("classroom_id", "year", "identifier", "shift", "education_level",
+               "teacher_id", "created_at")
+
     def __init__(self, db_manager):
         self.db_manager = db_manager
 
@@ -365,29 +1094,45 @@ class ClassroomRepository:
             classroom.id = cursor.lastrowid
         conn.commit()
         conn.close()
+        _remember(Classroom, classroom, loaded=False)
         return classroom
 
     def find_by_id(self, classroom_id: int) -> Optional[Classroom]:
-        conn = self.db_manager.get_connection()
+        cached = _cached(Classroom, classroom_id)
+        if cached is not None:
+            return cached
+        conn = self.db_manager.get_read_connection()
+        conn.row_factory = None
         cursor = conn.cursor()
         cursor.execute(
-            "SELECT classroom_id, year, identifier, shift, education_level, teacher_id FROM classrooms WHERE classroom_id = ?",
+            f"SELECT {_CLASSROOM_COLUMNS} FROM classrooms WHERE classroom_id = ?",
             (classroom_id,)
         )
         row = cursor.fetchone()
         conn.close()
-        if row:
-            return Classroom(
-                classroom_id=row['classroom_id'],
-                year=row['year'],
-                identifier=row['identifier'],
-                shift=Shift(row['shift']),
-                level=EducationLevel(row['education_level'])
-            )
-        return None
+        return _remember(Classroom, _classroom_from_row(row)) if row else None
+
+    def find_by_ids(self, classroom_ids: Iterable[int]) -> Dict[int, Classroom]:
+        """Várias turmas de uma vez (sem roster; ver load_rosters): {id: Classroom}."""
+        ids = list(dict.fromkeys(classroom_ids))
+        found, missing = _cached_many(Classroom, ids)
+        if not missing:
+            return {i: found[i] for i in ids if i in found}
+        conn = self.db_manager.get_read_connection()
+        conn.row_factory = None
+        try:
+            rows = _rows_by_ids(conn, f"SELECT {_CLASSROOM_COLUMNS} FROM classrooms", "classroom_id", missing)
+        finally:
+            conn.close()
+        for r in rows:
+            found[r[0]] = _remember(Classroom, _classroom_from_row(r))
+        return {i: found[i] for i in ids if i in found}
 
-    def add_student_to_classroom(self, classroom_id: int, student_id: int, academic_year: int):
-        """Matricula estudante na turma (insere em classroom_enrollments)."""
+    def add_student_to_classroom(self, classroom_id: int, student_id: int, academic_year: int) -> bool:
+        """Matricula estudante na turma (insere em classroom_enrollments).
+
+        Retorna False se a matrícula já existir.
+        """
         conn = self.db_manager.get_connection()
         cursor = conn.cursor()
         try:
@@ -396,122 +1141,363 @@ class ClassroomRepository:
                 VALUES (?, ?, ?)
             """, (student_id, classroom_id, academic_year))
             conn.commit()
+            conn.close()
+            return True
         except sqlite3.IntegrityError:
-            pass
-        conn.close()
+            conn.close()
+            return False
 
     def list_all(self) -> List[Classroom]:
-        conn = self.db_manager.get_connection()
+        conn = self.db_manager.get_report_connection()
+        conn.row_factory = None
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT {_CLASSROOM_COLUMNS} FROM classrooms ORDER BY year, identifier")
+        rows = cursor.fetchall()
+        conn.close()
+        return [_hydrate(Classroom, r[0], _classroom_from_row, r) for r in rows]
+
+    # --- Roster (matrículas por turma/ano) ---
+
+    def get_student_ids(self, classroom_id: int, academic_year: int, status: str = 'ACTIVE') -> List[int]:
+        """IDs dos alunos da turma no ano (lido só do índice idx_enrollment_roster)."""
+        conn = self.db_manager.get_read_connection()
+        schema = self.db_manager.attach_archive(conn, academic_year)
         cursor = conn.cursor()
-        cursor.execute("SELECT classroom_id, year, identifier, shift, education_level, teacher_id FROM classrooms ORDER BY year, identifier")
+        cursor.execute(f"""
+            SELECT student_id FROM {schema}.classroom_enrollments
+            WHERE classroom_id = ? AND academic_year = ? AND status = ?
+            ORDER BY student_id
+        """, (classroom_id, academic_year, status))
+        ids = [r[0] for r in cursor.fetchall()]
+        conn.close()
+        return ids
+
+    def get_roster(self, classroom_id: int, academic_year: int, status: str = 'ACTIVE') -> List[RosterEntry]:
+        """Roster leve da turma: (student_id, registration, name, status)."""
+        conn = self.db_manager.get_read_connection()
+        schema = self.db_manager.attach_archive(conn, academic_year)
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT s.student_id, s.registration, s.name, e.status
+            FROM {schema}.classroom_enrollments e
+            JOIN students s ON s.student_id = e.student_id
+            WHERE e.classroom_id = ? AND e.academic_year = ? AND e.status = ?
+            ORDER BY s.name
+        """, (classroom_id, academic_year, status))
+        rows = cursor.fetchall()
+        conn.close()
+        return [RosterEntry(*r) for r in rows]
+
+    def get_students(self, classroom_id: int, academic_year: int, status: str = 'ACTIVE') -> List[Student]:
+        """Alunos completos da turma no ano, ordenados por nome."""
+        conn = self.db_manager.get_read_connection()
+        schema = self.db_manager.attach_archive(conn, academic_year)
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT s.student_id, s.name, s.registration, s.email, s.active
+            FROM {schema}.classroom_enrollments e
+            JOIN students s ON s.student_id = e.student_id
+            WHERE e.classroom_id = ? AND e.academic_year = ? AND e.status = ?
+            ORDER BY s.name
+        """, (classroom_id, academic_year, status))
         rows = cursor.fetchall()
         conn.close()
         return [
-            Classroom(
-                classroom_id=r['classroom_id'],
-                year=r['year'], identifier=r['identifier'],
-                shift=Shift(r['shift']),
-                level=EducationLevel(r['education_level'])
-            )
+            Student(student_id=r['student_id'], name=r['name'],
+                    registration=r['registration'], email=r['email'],
+                    active=bool(r['active']), classroom_id=classroom_id)
             for r in rows
         ]
 
+    def get_current_classroom_id(self, student_id: int, academic_year: Optional[int] = None) -> Optional[int]:
+        """Turma com matrícula ACTIVE do aluno no ano (ou no ano mais recente)."""
+        conn = self.db_manager.get_read_connection()
+        cursor = conn.cursor()
+        if academic_year is None:
+            cursor.execute("""
+                SELECT classroom_id FROM classroom_enrollments
+                WHERE student_id = ? AND status = 'ACTIVE'
+                ORDER BY academic_year DESC LIMIT 1
+            """, (student_id,))
+        else:
+            schema = self.db_manager.attach_archive(conn, academic_year)
+            cursor.execute(f"""
+                SELECT classroom_id FROM {schema}.classroom_enrollments
+                WHERE student_id = ? AND academic_year = ? AND status = 'ACTIVE'
+                LIMIT 1
+            """, (student_id, academic_year))
+        row = cursor.fetchone()
+        conn.close()
+        return row[0] if row else None
+
+    def load_rosters(self, classroom_ids: Iterable[int], academic_year: int,
+                     status: str = 'ACTIVE') -> Dict[int, Classroom]:
+        """Carrega várias turmas com `Classroom.students` preenchido.
+
+        Uma consulta para as turmas e uma para todos os rosters (por bloco
+        de IDs), em vez de uma por turma.
+        """
+        ids = list(dict.fromkeys(classroom_ids))
+        conn = self.db_manager.get_read_connection()
+        schema = self.db_manager.attach_archive(conn, academic_year)
+        cursor = conn.cursor()
+        classrooms: Dict[int, Classroom] = {}
+        for chunk in _chunked(ids):
+            marks = ",".join("?" * len(chunk))
+            cursor.execute(f"""
+                SELECT {_CLASSROOM_COLUMNS}
+                FROM classrooms WHERE classroom_id IN ({marks})
+            """, chunk)
+            for r in cursor.fetchall():
+                classrooms[r[0]] = _classroom_from_row(r)
+            cursor.execute(f"""
+                SELECT classroom_id, student_id FROM {schema}.classroom_enrollments
+                WHERE classroom_id IN ({marks}) AND academic_year = ? AND status = ?
+                ORDER BY classroom_id, student_id
+            """, chunk + [academic_year, status])
+            for classroom_id, student_id in cursor.fetchall():
+                classrooms[classroom_id].students.append(student_id)
+        conn.close()
+        # Mantém a ordem pedida
+        return {cid: classrooms[cid] for cid in ids if cid in classrooms}
+
+    # --- Operações em lote (matrículas) ---
+
+    def existing_ids(self, classroom_ids: Iterable[int]) -> set:
+        """Subconjunto dos IDs informados que existem em classrooms."""
+        ids = list(dict.fromkeys(classroom_ids))
+        conn = self.db_manager.get_read_connection()
+        cursor = conn.cursor()
+        found = set()
+        for chunk in _chunked(ids):
+            cursor.execute(
+                f"SELECT classroom_id FROM classrooms WHERE classroom_id IN ({','.join('?' * len(chunk))})",
+                chunk
+            )
+            found.update(r[0] for r in cursor.fetchall())
+        conn.close()
+        return found
+
+    def enroll_many(self, pairs: List[tuple], academic_year: int):
+        """Matricula vários (student_id, classroom_id) numa única transação.
 
-class AssessmentRepository:
+        Retorna (inseridos, duplicados); duplicado é o par que já existia no
+        ano ou que se repete na própria lista.
+        """
+        conn = self.db_manager.get_connection()
+        conn.isolation_level = None
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            existing = self._enrollment_keys(conn, [p[0] for p in pairs], academic_year)
+            inserted, duplicates = [], []
+            for pair in pairs:
+                if pair in existing:
+                    duplicates.append(pair)
+                else:
+                    existing[pair] = 'ACTIVE'
+                    inserted.append(pair)
+            conn.executemany("""
+                INSERT INTO classroom_enrollments (student_id, classroom_id, academic_year)
+                VALUES (?, ?, ?)
+            """, [(sid, cid, academic_year) for sid, cid in inserted])
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return inserted, duplicates
+
+    def set_status_many(self, pairs: List[tuple], academic_year: int, new_status: str,
+                        from_status: str = 'ACTIVE'):
+        """Muda a situação de várias matrículas (student_id, classroom_id).
+
+        Só altera matrículas que estão em `from_status`. Retorna
+        (alterados, não_encontrados).
+        """
+        if new_status not in ENROLLMENT_STATUSES:
+            raise ValueError(f"Situação de matrícula inválida: {new_status}")
+        conn = self.db_manager.get_connection()
+        conn.isolation_level = None
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            existing = self._enrollment_keys(conn, [p[0] for p in pairs], academic_year)
+            updated, missing = [], []
+            for pair in dict.fromkeys(pairs):
+                (updated if existing.get(pair) == from_status else missing).append(pair)
+            conn.executemany("""
+                UPDATE classroom_enrollments SET status = ?
+                WHERE student_id = ? AND classroom_id = ? AND academic_year = ?
+            """, [(new_status, sid, cid, academic_year) for sid, cid in updated])
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return updated, missing
+
+    def transfer_many(self, moves: List[tuple], academic_year: int):
+        """Transfere vários (student_id, turma_origem, turma_destino) de uma vez.
+
+        Numa só transação: a matrícula ACTIVE de origem vira TRANSFERRED e a
+        de destino é criada. Retorna (transferidos, rejeitados), com o motivo
+        em cada rejeitado: (student_id, origem, destino, motivo).
+        """
+        conn = self.db_manager.get_connection()
+        conn.isolation_level = None
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            existing = self._enrollment_keys(conn, [m[0] for m in moves], academic_year)
+            done, rejected = [], []
+            for sid, origin, target in moves:
+                if existing.get((sid, origin)) != 'ACTIVE':
+                    rejected.append((sid, origin, target, "sem matrícula ativa na turma de origem"))
+                elif (sid, target) in existing:
+                    rejected.append((sid, origin, target, "já matriculado na turma de destino"))
+                else:
+                    existing[(sid, origin)] = 'TRANSFERRED'
+                    existing[(sid, target)] = 'ACTIVE'
+                    done.append((sid, origin, target))
+            conn.executemany("""
+                UPDATE classroom_enrollments SET status = 'TRANSFERRED'
+                WHERE student_id = ? AND classroom_id = ? AND academic_year = ?
+            """, [(sid, origin, academic_year) for sid, origin, _ in done])
+            conn.executemany("""
+                INSERT INTO classroom_enrollments (student_id, classroom_id, academic_year)
+                VALUES (?, ?, ?)
+            """, [(sid, target, academic_year) for sid, _, target in done])
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return done, rejected
+
+    @staticmethod
+    def _enrollment_keys(conn, student_ids: List[int], academic_year: int) -> Dict[tuple, str]:
+        """{(student_id, classroom_id): status} das matrículas no ano."""
+        keys: Dict[tuple, str] = {}
+        for chunk in _chunked(list(dict.fromkeys(student_ids))):
+            rows = conn.execute(f"""
+                SELECT student_id, classroom_id, status FROM classroom_enrollments
+                WHERE academic_year = ? AND student_id IN ({','.join('?' * len(chunk))})
+            """, [academic_year] + chunk)
+            keys.update(((r[0], r[1]), r[2]) for r in rows)
+        return keys
+
+
+class AssessmentRepository(_Projection):
     """Repositório de Avaliações."""
 
+    _TABLE = "assessments"
+    _FIELDS = ("assessment_id", "title", "subject", "subject_id", "description", "max_score", "weight",
+               "assessment_type", "bimester", "academic_year", "assessment_date", "created_at")
+
     def __init__(self, db_manager):
         self.db_manager = db_manager
+        # Chamados após cada save (ex: invalidação do AverageCache)
+        self.save_listeners: List[Callable] = []
 
     def save(self, assessment: Assessment) -> Assessment:
+        subject_id = self.db_manager.subjects.id_for(assessment.subject, create=True)
+        assessment_date = self.db_manager.date_value(assessment.assessment_date)
         conn = self.db_manager.get_connection()
         cursor = conn.cursor()
         if assessment.id:
+            # UPDATE em vez de REPLACE: a avaliação pode já ter notas (FK RESTRICT)
             cursor.execute("""
-                INSERT OR REPLACE INTO assessments (
-                    assessment_id, title, subject, description, max_score, weight,
+                INSERT INTO assessments (
+                    assessment_id, title, subject_id, description, max_score, weight,
                     assessment_type, bimester, academic_year, assessment_date
                 ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (assessment.id, assessment.title, assessment.subject,
+                ON CONFLICT(assessment_id) DO UPDATE SET
+                    title = excluded.title, subject_id = excluded.subject_id,
+                    description = excluded.description, max_score = excluded.max_score,
+                    weight = excluded.weight, assessment_type = excluded.assessment_type,
+                    bimester = excluded.bimester, academic_year = excluded.academic_year,
+                    assessment_date = excluded.assessment_date
+            """, (assessment.id, assessment.title, subject_id,
                   assessment.description, float(assessment.max_score),
                   float(assessment.weight), assessment.assessment_type.value,
                   assessment.bimester.value, assessment.academic_year,
-                  assessment.assessment_date.isoformat() if assessment.assessment_date else None))
+                  assessment_date))
         else:
             cursor.execute("""
                 INSERT INTO assessments (
-                    title, subject, description, max_score, weight,
+                    title, subject_id, description, max_score, weight,
                     assessment_type, bimester, academic_year, assessment_date
                 ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (assessment.title, assessment.subject,
+            """, (assessment.title, subject_id,
                   assessment.description, float(assessment.max_score),
                   float(assessment.weight), assessment.assessment_type.value,
                   assessment.bimester.value, assessment.academic_year,
-                  assessment.assessment_date.isoformat() if assessment.assessment_date else None))
+                  assessment_date))
             assessment.id = cursor.lastrowid
         conn.commit()
         conn.close()
+        for listener in self.save_listeners:
+            listener(assessment)
+        _remember(Assessment, assessment, loaded=False)
         return assessment
 
     def find_by_id(self, assessment_id: int) -> Optional[Assessment]:
-        conn = self.db_manager.get_connection()
+        cached = _cached(Assessment, assessment_id)
+        if cached is not None:
+            return cached
+        conn = self.db_manager.get_read_connection()
+        conn.row_factory = None
         cursor = conn.cursor()
-        cursor.execute("""
-            SELECT assessment_id, title, subject, description,
-                   max_score, weight, assessment_type, bimester,
-                   academic_year, assessment_date
-            FROM assessments WHERE assessment_id = ?
-        """, (assessment_id,))
+        cursor.execute(f"SELECT {_ASSESSMENT_COLUMNS} FROM assessments WHERE assessment_id = ?",
+                       (assessment_id,))
         row = cursor.fetchone()
         conn.close()
-        if row:
-            return Assessment(
-                assessment_id=row['assessment_id'],
-                title=row['title'],
-                subject=row['subject'],
-                description=row['description'] or "",
-                max_score=float(row['max_score']),
-                weight=float(row['weight']),
-                assessment_type=AssessmentType(row['assessment_type']),
-                bimester=Bimester(row['bimester']),
-                academic_year=row['academic_year'],
-                assessment_date=datetime.fromisoformat(row['assessment_date']).date() if row['assessment_date'] else None
-            )
-        return None
+        if not row:
+            return None
+        return _remember(Assessment, _assessment_from_row(row, 0, self.db_manager.subjects.name_for))
+
+    def find_by_ids(self, assessment_ids: Iterable[int]) -> Dict[int, Assessment]:
+        """Várias avaliações de uma vez: {id: Assessment} na ordem pedida."""
+        ids = list(dict.fromkeys(assessment_ids))
+        found, missing = _cached_many(Assessment, ids)
+        if not missing:
+            return {i: found[i] for i in ids if i in found}
+        conn = self.db_manager.get_read_connection()
+        conn.row_factory = None
+        try:
+            rows = _rows_by_ids(conn, f"SELECT {_ASSESSMENT_COLUMNS} FROM assessments", "assessment_id", missing)
+        finally:
+            conn.close()
+        subject_name = self.db_manager.subjects.name_for
+        for r in rows:
+            found[r[0]] = _remember(Assessment, _assessment_from_row(r, 0, subject_name))
+        return {i: found[i] for i in ids if i in found}
 
     def list_all(self) -> List[Assessment]:
-        conn = self.db_manager.get_connection()
+        conn = self.db_manager.get_report_connection()
+        conn.row_factory = None
         cursor = conn.cursor()
-        cursor.execute("""
-            SELECT assessment_id, title, subject, description,
-                   max_score, weight, assessment_type, bimester,
-                   academic_year, assessment_date
-            FROM assessments ORDER BY assessment_date DESC
-        """)
+        cursor.execute(f"SELECT {_ASSESSMENT_COLUMNS} FROM assessments ORDER BY assessment_date DESC")
         rows = cursor.fetchall()
         conn.close()
-        return [
-            Assessment(
-                assessment_id=r['assessment_id'],
-                title=r['title'],
-                subject=r['subject'],
-                description=r['description'] or "",
-                max_score=float(r['max_score']),
-                weight=float(r['weight']),
-                assessment_type=AssessmentType(r['assessment_type']),
-                bimester=Bimester(r['bimester']),
-                academic_year=r['academic_year'],
-                assessment_date=datetime.fromisoformat(r['assessment_date']).date() if r['assessment_date'] else None
-            )
-            for r in rows
-        ]
+        subject_name = self.db_manager.subjects.name_for
+        return [_hydrate(Assessment, r[0], _assessment_from_row, r, 0, subject_name) for r in rows]
 
 
-class GradeRepository:
+class GradeRepository(_Projection):
     """Repositório de Notas."""
 
+    _TABLE = "grades"
+    _FIELDS = ("grade_id", "student_id", "assessment_id", "score", "graded_at")
+
     def __init__(self, db_manager):
         self.db_manager = db_manager
+        # Chamados após cada save (ex: invalidação do AverageCache)
+        self.save_listeners: List[Callable] = []
 
     def save(self, grade: Grade) -> Grade:
         conn = self.db_manager.get_connection()
@@ -533,10 +1519,12 @@ class GradeRepository:
             grade.id = cursor.lastrowid
         conn.commit()
         conn.close()
+        for listener in self.save_listeners:
+            listener(grade)
         return grade
 
     def find_by_student_and_assessment(self, student_id: int, assessment_id: int) -> Optional[Grade]:
-        conn = self.db_manager.get_connection()
+        conn = self.db_manager.get_read_connection()
         cursor = conn.cursor()
         cursor.execute(
             "SELECT grade_id, student_id, assessment_id, score FROM grades WHERE student_id = ? AND assessment_id = ?",
@@ -548,46 +1536,135 @@ class GradeRepository:
             return Grade(grade_id=row['grade_id'], score=float(row['score']))
         return None
 
-    def find_by_student_and_bimester(self, student_id: int, subject: str, bimester, year: int) -> List[Grade]:
-        """Busca notas do aluno na disciplina/bimestre, com assessment populado (para peso)."""
+    def find_by_ids(self, grade_ids: Iterable[int]) -> Dict[int, Grade]:
+        """Várias notas de uma vez: {id: Grade} na ordem pedida, com aluno e
+        avaliação populados (ex.: reler as linhas do change_log)."""
+        ids = list(dict.fromkeys(grade_ids))
+        if not ids:
+            return {}
+        conn = self.db_manager.get_read_connection()
+        conn.row_factory = None
+        try:
+            rows = _rows_by_ids(conn, f"""
+                SELECT g.grade_id, g.score,
+                       s.student_id, s.name, s.registration, s.email, s.active,
+                       a.assessment_id, a.title, a.subject_id, a.description, a.max_score, a.weight,
+                       a.assessment_type, a.bimester, a.academic_year, a.assessment_date
+                FROM grades g
+                JOIN students s ON s.student_id = g.student_id
+                JOIN assessments a ON a.assessment_id = g.assessment_id
+            """, "g.grade_id", ids)
+        finally:
+            conn.close()
+        subject_name = self.db_manager.subjects.name_for
+        found = {
+            r[0]: Grade(grade_id=r[0], score=float(r[1]),
+                        student=_hydrate(Student, r[2], _student_from_row, r[2:7]),
+                        assessment=_hydrate(Assessment, r[7], _assessment_from_row, r, 7, subject_name))
+            for r in rows
+        }
+        return {i: found[i] for i in ids if i in found}
+
+    def find_by_student_and_bimester(self, student_id: int, subject: str, bimester, year: int,
+                                     fresh: bool = False) -> List[Grade]:
+        """Busca notas do aluno na disciplina/bimestre, com assessment populado (para peso).
+
+        Lê da réplica, se ativa; fresh=True lê do arquivo (sem atraso).
+        """
         bim_value = bimester.value if hasattr(bimester, 'value') else str(bimester)
+        subject_id = self.db_manager.subjects.id_for(subject)
+        if subject_id is None:
+            return []  # disciplina sem nenhuma avaliação cadastrada
 
-        conn = self.db_manager.get_connection()
+        if fresh:
+            conn = self.db_manager.get_read_connection()
+        else:
+            conn = self.db_manager.get_report_connection()
+        conn.row_factory = None
+        schema = self.db_manager.attach_archive(conn, year)
         cursor = conn.cursor()
-        cursor.execute("""
-            SELECT g.grade_id, g.student_id, g.assessment_id, g.score,
-                   a.title, a.subject, a.description, a.max_score, a.weight,
+        cursor.execute(f"""
+            SELECT g.grade_id, g.score,
+                   a.assessment_id, a.title, a.subject_id, a.description, a.max_score, a.weight,
                    a.assessment_type, a.bimester, a.academic_year, a.assessment_date
-            FROM grades g
-            JOIN assessments a ON g.assessment_id = a.assessment_id
-            WHERE g.student_id = ? AND a.subject = ? AND a.bimester = ? AND a.academic_year = ?
-        """, (student_id, subject, bim_value, year))
-
-        grades = []
-        for row in cursor.fetchall():
-            assessment = Assessment(
-                assessment_id=row['assessment_id'],
-                title=row['title'], subject=row['subject'],
-                description=row['description'] or "",
-                max_score=float(row['max_score']),
-                weight=float(row['weight']),
-                assessment_type=AssessmentType(row['assessment_type']),
-                bimester=Bimester(row['bimester']),
-                academic_year=row['academic_year'],
-                assessment_date=datetime.fromisoformat(row['assessment_date']).date() if row['assessment_date'] else None
-            )
-            grade = Grade(
-                grade_id=row['grade_id'],
-                assessment=assessment,
-                score=float(row['score'])
-            )
-            grades.append(grade)
-
+            FROM {schema}.grades g
+            JOIN {schema}.assessments a ON g.assessment_id = a.assessment_id
+            WHERE g.student_id = ? AND a.subject_id = ? AND a.bimester = ? AND a.academic_year = ?
+        """, (student_id, subject_id, bim_value, year))
+
+        subject_name = self.db_manager.subjects.name_for
+        grades = [
+            Grade(grade_id=row[0], score=float(row[1]),
+                  # Notas da mesma avaliação compartilham o objeto dentro de unit_of_work
+                  assessment=_hydrate(Assessment, row[2], _assessment_from_row, row, 2, subject_name))
+            for row in cursor.fetchall()
+        ]
         conn.close()
         return grades
 
+    def iter_missing(self, academic_year: int, classroom_id: Optional[int] = None,
+                     batch_size: int = 1000) -> Iterator[tuple]:
+        """Notas que faltam lançar: alunos ativos x avaliações do ano, sem nota.
+
+        Uma consulta (anti-join com NOT EXISTS no índice UNIQUE de grades),
+        lida em lotes com fetchmany. Linhas ordenadas por professor e
+        disciplina, para agrupar sem carregar tudo:
+          (teacher_id, teacher_name, subject, classroom_id, student_id,
+           student_name, assessment_id, title, bimester)
+
+        O professor de (turma, disciplina) é o da turma, se ele leciona a
+        disciplina; senão o único professor da disciplina; senão None.
+        """
+        conn = self.db_manager.get_read_connection()
+        conn.row_factory = None
+        try:
+            schema = self.db_manager.attach_archive(conn, academic_year)
+            cursor = conn.execute(f"""
+                WITH turmas AS (
+                    SELECT classroom_id, teacher_id FROM classrooms
+                    WHERE ?1 IS NULL OR classroom_id = ?1
+                ),
+                provas AS (
+                    SELECT assessment_id, subject_id, title, bimester FROM {schema}.assessments
+                    WHERE academic_year = ?2
+                ),
+                responsaveis AS (
+                    SELECT t.classroom_id, d.subject_id, COALESCE(
+                        (SELECT ts.teacher_id FROM teacher_subjects ts
+                         WHERE ts.teacher_id = t.teacher_id AND ts.subject_id = d.subject_id),
+                        (SELECT CASE WHEN COUNT(*) = 1 THEN MIN(ts.teacher_id) END
+                         FROM teacher_subjects ts WHERE ts.subject_id = d.subject_id)
+                    ) AS teacher_id
+                    FROM turmas t CROSS JOIN (SELECT DISTINCT subject_id FROM provas) d
+                )
+                SELECT r.teacher_id, tc.name, sb.name, e.classroom_id, e.student_id, s.name,
+                       p.assessment_id, p.title, p.bimester
+                FROM turmas t
+                JOIN {schema}.classroom_enrollments e
+                     ON e.classroom_id = t.classroom_id AND e.academic_year = ?2 AND e.status = 'ACTIVE'
+                JOIN provas p
+                JOIN responsaveis r ON r.classroom_id = e.classroom_id AND r.subject_id = p.subject_id
+                JOIN subjects sb ON sb.subject_id = p.subject_id
+                JOIN students s ON s.student_id = e.student_id
+                LEFT JOIN teachers tc ON tc.teacher_id = r.teacher_id
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM {schema}.grades g
+                    WHERE g.student_id = e.student_id AND g.assessment_id = p.assessment_id
+                )
+                ORDER BY r.teacher_id IS NULL, r.teacher_id, sb.name, e.classroom_id, s.name, e.student_id,
+                         CASE p.bimester WHEN 'PRIMEIRO' THEN 1 WHEN 'SEGUNDO' THEN 2
+                                         WHEN 'TERCEIRO' THEN 3 ELSE 4 END, p.assessment_id
+            """, (classroom_id, academic_year))
+            while True:
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    return
+                yield from batch
+        finally:
+            conn.close()
+
     def list_all(self) -> List[Grade]:
-        conn = self.db_manager.get_connection()
+        conn = self.db_manager.get_report_connection()
         cursor = conn.cursor()
         cursor.execute("SELECT grade_id, student_id, assessment_id, score FROM grades ORDER BY graded_at DESC")
         rows = cursor.fetchall()
@@ -595,37 +1672,43 @@ class GradeRepository:
         return [Grade(grade_id=r['grade_id'], score=float(r['score'])) for r in rows]
 
 
-class AttendanceRepository:
+class AttendanceRepository(_Projection):
     """Repositório de Frequência."""
 
+    _TABLE = "attendance"
+    _FIELDS = ("attendance_id", "student_id", "subject", "subject_id", "attendance_date",
+               "is_present", "is_justified", "justification", "created_at")
+
     def __init__(self, db_manager):
         self.db_manager = db_manager
 
     def save(self, attendance: Attendance) -> Attendance:
+        subject_id = self.db_manager.subjects.id_for(attendance.subject, create=True)
+        attendance_date = self.db_manager.date_value(attendance.attendance_date)
         conn = self.db_manager.get_connection()
         cursor = conn.cursor()
         student_id = attendance.student.id if attendance.student else None
         if attendance.id:
             cursor.execute("""
-                INSERT INTO attendance (attendance_id, student_id, subject, attendance_date, is_present, is_justified, justification)
+                INSERT INTO attendance (attendance_id, student_id, subject_id, attendance_date, is_present, is_justified, justification)
                 VALUES (?, ?, ?, ?, ?, ?, ?)
-                ON CONFLICT(student_id, subject, attendance_date) DO UPDATE SET
+                ON CONFLICT(student_id, subject_id, attendance_date) DO UPDATE SET
                     is_present = excluded.is_present, is_justified = excluded.is_justified,
                     justification = excluded.justification
-            """, (attendance.id, student_id, attendance.subject,
-                  attendance.attendance_date.isoformat() if attendance.attendance_date else None,
+            """, (attendance.id, student_id, subject_id,
+                  attendance_date,
                   1 if attendance.is_present else 0,
                   1 if attendance.justified else 0,
                   attendance.justification))
         else:
             cursor.execute("""
-                INSERT INTO attendance (student_id, subject, attendance_date, is_present, is_justified, justification)
+                INSERT INTO attendance (student_id, subject_id, attendance_date, is_present, is_justified, justification)
                 VALUES (?, ?, ?, ?, ?, ?)
-                ON CONFLICT(student_id, subject, attendance_date) DO UPDATE SET
+                ON CONFLICT(student_id, subject_id, attendance_date) DO UPDATE SET
                     is_present = excluded.is_present, is_justified = excluded.is_justified,
                     justification = excluded.justification
-            """, (student_id, attendance.subject,
-                  attendance.attendance_date.isoformat() if attendance.attendance_date else None,
+            """, (student_id, subject_id,
+                  attendance_date,
                   1 if attendance.is_present else 0,
                   1 if attendance.justified else 0,
                   attendance.justification))
@@ -634,46 +1717,65 @@ class AttendanceRepository:
         conn.close()
         return attendance
 
+    def find_by_ids(self, attendance_ids: Iterable[int]) -> Dict[int, Attendance]:
+        """Vários registros de uma vez: {id: Attendance} na ordem pedida, com o
+        aluno populado (ex.: reler as linhas do change_log)."""
+        ids = list(dict.fromkeys(attendance_ids))
+        if not ids:
+            return {}
+        conn = self.db_manager.get_read_connection()
+        conn.row_factory = None
+        try:
+            rows = _rows_by_ids(conn, """
+                SELECT t.attendance_id, t.student_id, t.subject_id, t.attendance_date,
+                       t.is_present, t.is_justified, t.justification,
+                       s.student_id, s.name, s.registration, s.email, s.active
+                FROM attendance t
+                JOIN students s ON s.student_id = t.student_id
+            """, "t.attendance_id", ids)
+        finally:
+            conn.close()
+        subject_name = self.db_manager.subjects.name_for
+        found = {}
+        for r in rows:
+            attendance = _attendance_from_row(r, subject_name)
+            attendance.student = _hydrate(Student, r[7], _student_from_row, r[7:12])
+            found[r[0]] = attendance
+        return {i: found[i] for i in ids if i in found}
+
     def find_by_student_and_period(self, student_id: int, subject: str, start_date: date, end_date: date) -> List[Attendance]:
-        conn = self.db_manager.get_connection()
+        subject_id = self.db_manager.subjects.id_for(subject)
+        if subject_id is None:
+            return []
+        start, end = self.db_manager.date_value(start_date), self.db_manager.date_value(end_date)
+        conn = self.db_manager.get_report_connection()
+        conn.row_factory = None
+        # Anos do período que estão em arquivo morto são lidos do arquivo anexado
+        schemas = []
+        for year in range(start_date.year, end_date.year + 1):
+            schema = self.db_manager.attach_archive(conn, year)
+            if schema not in schemas:
+                schemas.append(schema)
         cursor = conn.cursor()
-        cursor.execute("""
-            SELECT attendance_id, student_id, subject, attendance_date, is_present, is_justified, justification
-            FROM attendance
-            WHERE student_id = ? AND subject = ? AND attendance_date BETWEEN ? AND ?
-            ORDER BY attendance_date
-        """, (student_id, subject, start_date.isoformat(), end_date.isoformat()))
-        rows = cursor.fetchall()
+        rows = []
+        for schema in schemas:
+            cursor.execute(f"""
+                SELECT {_ATTENDANCE_COLUMNS}
+                FROM {schema}.attendance
+                WHERE student_id = ? AND subject_id = ? AND attendance_date BETWEEN ? AND ?
+                ORDER BY attendance_date
+            """, (student_id, subject_id, start, end))
+            rows.extend(cursor.fetchall())
         conn.close()
-        return [
-            Attendance(
-                attendance_id=r['attendance_id'],
-                subject=r['subject'],
-                attendance_date=datetime.fromisoformat(r['attendance_date']).date() if r['attendance_date'] else None,
-                is_present=bool(r['is_present']),
-                justified=bool(r['is_justified']),
-                justification=r['justification']
-            )
-            for r in rows
-        ]
+        if len(schemas) > 1:
+            rows.sort(key=lambda r: r[3])
+        return [_attendance_from_row(r, lambda _: subject) for r in rows]
 
     def list_all(self) -> List[Attendance]:
-        conn = self.db_manager.get_connection()
+        conn = self.db_manager.get_report_connection()
+        conn.row_factory = None
         cursor = conn.cursor()
-        cursor.execute("""
-            SELECT attendance_id, student_id, subject, attendance_date, is_present, is_justified, justification
-            FROM attendance ORDER BY attendance_date DESC
-        """)
+        cursor.execute(f"SELECT {_ATTENDANCE_COLUMNS} FROM attendance ORDER BY attendance_date DESC")
         rows = cursor.fetchall()
         conn.close()
-        return [
-            Attendance(
-                attendance_id=r['attendance_id'],
-                subject=r['subject'],
-                attendance_date=datetime.fromisoformat(r['attendance_date']).date() if r['attendance_date'] else None,
-                is_present=bool(r['is_present']),
-                justified=bool(r['is_justified']),
-                justification=r['justification']
-            )
-            for r in rows
-        ]
+        return [_attendance_from_row(r, self.db_manager.subjects.name_for) for r in rows]
@@ -0,0 +1,173 @@
+"""
+Formato de gravação das datas de frequência e de avaliações.
+
+Por padrão `attendance.attendance_date` e `assessments.assessment_date` são
+texto ISO ('2024-03-01', 10 bytes em cada linha e em cada entrada de
+índice). No modo "days" viram o número do dia juliano, um inteiro que o
+SQLite grava em 3 bytes: índices menores, BETWEEN comparando inteiros e
+leitura sem parse de texto. O número é o mesmo das funções de data do
+SQLite (date(2460371) = '2024-03-01'), então date(), strftime() etc.
+funcionam nos dois modos.
+
+O modo vale para o banco inteiro, arquivos mortos incluídos, e fica em
+`db_settings`. Os repositórios convertem os parâmetros com
+DatabaseManager.date_value() e leem os dois formatos. Converta com a
+aplicação parada (quem já leu o modo antigo continuaria gravando texto):
+
+    converter_datas(get_database(), "days")
+
+    python -m src dates status
+    python -m src dates convert --to days
+"""
+import argparse
+import sqlite3
+import sys
+from datetime import date
+from typing import Dict, Optional, Union
+
+STORAGE_MODES = ("iso", "days")
+
+# tabela -> colunas de data afetadas pelo modo
+DATE_COLUMNS = {
+    'attendance': ('attendance_date',),
+    'assessments': ('assessment_date',),
+}
+
+# date.toordinal() + _JULIAN_OFFSET = dia juliano (o de date() do SQLite)
+_JULIAN_OFFSET = 1721425
+
+# Expressões de conversão (só mexem em valores no formato oposto)
+_TO_SQL = {
+    'days': "CASE WHEN typeof({c}) = 'text' THEN CAST(julianday({c}) + 0.5 AS INTEGER) ELSE {c} END",
+    'iso': "CASE WHEN typeof({c}) = 'integer' THEN date({c}) ELSE {c} END",
+}
+_OTHER_TYPE = {'days': 'text', 'iso': 'integer'}
+
+
+def to_day_number(value: date) -> int:
+    return value.toordinal() + _JULIAN_OFFSET
+
+
+def from_day_number(number: int) -> date:
+    return date.fromordinal(number - _JULIAN_OFFSET)
+
+
+def to_db(value: Optional[date], storage: str) -> Union[str, int, None]:
+    """Data no formato gravado: texto ISO ou número do dia."""
+    if value is None:
+        return None
+    return to_day_number(value) if storage == 'days' else value.isoformat()
+
+
+def read_storage(conn) -> str:
+    """Modo gravado no banco ('iso' em bancos anteriores à migração 6)."""
+    try:
+        row = conn.execute("SELECT value FROM db_settings WHERE name = 'date_storage'").fetchone()
+    except sqlite3.OperationalError:
+        return 'iso'
+    return row[0] if row else 'iso'
+
+
+def converter_datas(db_manager, storage: str, vacuum: bool = True) -> Dict[str, int]:
+    """Regrava as datas no modo `storage`; retorna linhas convertidas por tabela.
+
+    Exige o banco na versão 6 (tabela db_settings). Roda numa transação só;
+    arquivos mortos são reescritos ao lado e trocados em archived_years no
+    mesmo COMMIT. O change_log não recebe os UPDATEs: o dado não mudou, só
+    a forma de guardar.
+    """
+    # Caminho raro (manutenção): migrations/archive só são importados aqui
+    from src.infrastructure.archive import _change_log_position
+    from src.infrastructure.migrations import (
+        _archived_files, _plain_archive, _remove_archives, _rewrite_archive
+    )
+
+    if storage not in STORAGE_MODES:
+        raise ValueError(f"Modo de datas inválido: {storage} (use {', '.join(STORAGE_MODES)})")
+
+    def column_sql(table, column):
+        if column in DATE_COLUMNS.get(table, ()):
+            return f"{_TO_SQL[storage].format(c=column)} AS {column}"
+        return column
+
+    conn = db_manager.get_connection()
+    conn.isolation_level = None
+    converted, replaced = {}, []
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            change_seq = _change_log_position(conn)
+            for table, columns in DATE_COLUMNS.items():
+                converted[table] = 0
+                for column in columns:
+                    converted[table] += conn.execute(
+                        f"UPDATE {table} SET {column} = {_TO_SQL[storage].format(c=column)} "
+                        f"WHERE typeof({column}) = '{_OTHER_TYPE[storage]}'").rowcount
+            if change_seq is not None:
+                conn.execute("DELETE FROM change_log WHERE seq > ?", (change_seq,))
+
+            for year, path in sorted(_archived_files(conn).items()):
+                stem = _plain_archive(path).stem
+                for mode in STORAGE_MODES:
+                    stem = stem.removesuffix(f"_{mode}")
+                new_path = _rewrite_archive(path, f"{stem}_{storage}", column_sql)
+                conn.execute("UPDATE archived_years SET path = ? WHERE academic_year = ?",
+                             (str(new_path.resolve()), year))
+                replaced.append(path)
+
+            conn.execute("INSERT OR REPLACE INTO db_settings (name, value) VALUES ('date_storage', ?)",
+                         (storage,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        db_manager._date_storage = storage
+        _remove_archives(replaced)
+        if vacuum:
+            # Índices regravados por UPDATE ficam com páginas pela metade
+            conn.execute("VACUUM")
+    finally:
+        conn.close()
+    return converted
+
+
+# =============================================
+# LINHA DE COMANDO
+# =============================================
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.infrastructure.date_storage",
+        description="Formato de gravação das datas (texto ISO ou número do dia)."
+    )
+    parser.add_argument("--db", help="arquivo do banco (padrão: school.db do projeto)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("status", help="modo atual")
+    convert = sub.add_parser("convert", help="regrava as datas em outro modo")
+    convert.add_argument("--to", required=True, choices=STORAGE_MODES, dest="storage")
+    convert.add_argument("--no-vacuum", action="store_true", help="não compacta o arquivo no final")
+    return parser
+
+
+def run(args) -> int:
+    from src.infrastructure.database import DatabaseManager
+
+    db_manager = DatabaseManager(args.db)
+    if args.command == "status":
+        print(f"Datas gravadas como: {db_manager.date_storage}")
+        return 0
+    if db_manager.date_storage == args.storage:
+        print(f"Datas já estão no modo {args.storage}")
+        return 0
+    converted = converter_datas(db_manager, args.storage, vacuum=not args.no_vacuum)
+    for table, rows in converted.items():
+        print(f"{table:<12} {rows:>10} linha(s) convertida(s)")
+    return 0
+
+
+def main(argv=None) -> int:
+    return run(build_parser().parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
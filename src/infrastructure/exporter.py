@@ -0,0 +1,287 @@
+"""
+Exportação em streaming de notas, frequência e boletins.
+
+As linhas vêm direto do cursor (fetchmany) para o arquivo CSV ou JSON Lines,
+então a memória usada não cresce com o tamanho do ano exportado. Aceita
+filtro por ano letivo e turma e compressão gzip durante a escrita. Anos
+encerrados (arquivo morto) só são lidos quando pedidos com --year.
+
+Execução:
+    python -m src.infrastructure.exporter grades --year 2024 -o notas.csv.gz --gzip
+    python -m src.infrastructure.exporter attendance --year 2024 --classroom 3 --format jsonl -o -
+"""
+import argparse
+import csv
+import gzip
+import io
+import json
+import sys
+from contextlib import contextmanager
+from datetime import date
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from src.infrastructure.database import DatabaseManager
+
+
+DATASETS = ('grades', 'attendance', 'report_cards')
+FORMATS = ('csv', 'jsonl')
+
+# Turma do aluno no ano: prefere a matrícula ACTIVE, depois a mais recente
+_CLASSROOM_OF = """
+    (SELECT e.classroom_id FROM {{s}}.classroom_enrollments e
+     WHERE e.student_id = {student} AND e.academic_year = {year}
+     ORDER BY e.status = 'ACTIVE' DESC, e.enrollment_id DESC LIMIT 1)
+"""
+
+_GRADES_SQL = """
+    SELECT g.grade_id, g.student_id, s.registration, s.name AS student_name,
+           c.classroom_id, c.year || ' ' || c.identifier AS classroom,
+           a.assessment_id, a.title AS assessment, sj.name AS subject, a.assessment_type,
+           a.bimester, a.academic_year, date(a.assessment_date) AS assessment_date,
+           g.score, a.max_score, a.weight, g.graded_at
+    FROM {s}.grades g
+    JOIN {s}.assessments a ON a.assessment_id = g.assessment_id
+    JOIN subjects sj ON sj.subject_id = a.subject_id
+    JOIN students s ON s.student_id = g.student_id
+    LEFT JOIN classrooms c ON c.classroom_id = {classroom}
+    WHERE 1 = 1 {filters}
+    ORDER BY a.academic_year, g.student_id, sj.name, a.assessment_date
+""".format(classroom=_CLASSROOM_OF.format(student="g.student_id", year="a.academic_year"),
+           filters="{filters}", s="{s}")
+
+_ATTENDANCE_SQL = """
+    SELECT t.attendance_id, t.student_id, s.registration, s.name AS student_name,
+           c.classroom_id, c.year || ' ' || c.identifier AS classroom,
+           sj.name AS subject, date(t.attendance_date) AS attendance_date,
+           t.is_present, t.is_justified, t.justification
+    FROM {s}.attendance t
+    JOIN subjects sj ON sj.subject_id = t.subject_id
+    JOIN students s ON s.student_id = t.student_id
+    LEFT JOIN classrooms c ON c.classroom_id = {classroom}
+    WHERE 1 = 1 {filters}
+    ORDER BY t.attendance_date, t.student_id, sj.name
+""".format(classroom=_CLASSROOM_OF.format(
+    student="t.student_id", year="CAST(strftime('%Y', t.attendance_date) AS INTEGER)"),
+    filters="{filters}", s="{s}")
+
+# Somatórios por bimestre; a média (e o arredondamento) é feita em Python,
+# com a mesma regra de ServicosDoAluno.gerar_boletim.
+_REPORT_CARDS_SQL = """
+    SELECT g.student_id, s.registration, s.name AS student_name,
+           c.classroom_id, c.year || ' ' || c.identifier AS classroom,
+           sj.name AS subject, a.academic_year,
+           SUM(CASE WHEN a.bimester = 'PRIMEIRO' THEN g.score * a.weight END),
+           SUM(CASE WHEN a.bimester = 'PRIMEIRO' THEN a.weight END),
+           SUM(CASE WHEN a.bimester = 'SEGUNDO' THEN g.score * a.weight END),
+           SUM(CASE WHEN a.bimester = 'SEGUNDO' THEN a.weight END),
+           SUM(CASE WHEN a.bimester = 'TERCEIRO' THEN g.score * a.weight END),
+           SUM(CASE WHEN a.bimester = 'TERCEIRO' THEN a.weight END),
+           SUM(CASE WHEN a.bimester = 'QUARTO' THEN g.score * a.weight END),
+           SUM(CASE WHEN a.bimester = 'QUARTO' THEN a.weight END)
+    FROM {s}.grades g
+    JOIN {s}.assessments a ON a.assessment_id = g.assessment_id
+    JOIN subjects sj ON sj.subject_id = a.subject_id
+    JOIN students s ON s.student_id = g.student_id
+    LEFT JOIN classrooms c ON c.classroom_id = {classroom}
+    WHERE 1 = 1 {filters}
+    GROUP BY g.student_id, a.academic_year, sj.name
+    ORDER BY a.academic_year, g.student_id, sj.name
+""".format(classroom=_CLASSROOM_OF.format(student="g.student_id", year="a.academic_year"),
+           filters="{filters}", s="{s}")
+
+_REPORT_CARD_COLUMNS = [
+    'student_id', 'registration', 'student_name', 'classroom_id', 'classroom',
+    'subject', 'academic_year',
+    'media_1bim', 'media_2bim', 'media_3bim', 'media_4bim', 'media_anual', 'situacao'
+]
+
+
+class Exporter:
+    """Exporta conjuntos de dados do banco em streaming."""
+
+    def __init__(self, db_manager, batch_size: int = 1000, media_aprovacao: float = 6.0):
+        self.db_manager = db_manager
+        self.batch_size = batch_size
+        self.media_aprovacao = media_aprovacao
+
+    def iter_rows(self, dataset: str, year: Optional[int] = None,
+                  classroom_id: Optional[int] = None) -> Tuple[List[str], Iterator[tuple]]:
+        """Retorna (colunas, iterador de tuplas) sem materializar o resultado.
+
+        A conexão volta ao pool quando o iterador se esgota ou em rows.close();
+        quem pode parar no meio deve chamar close().
+        """
+        if dataset not in DATASETS:
+            raise ValueError(f"Conjunto de dados inválido: {dataset}")
+
+        # Só leitura: o dump do ano não prende uma conexão de escrita
+        conn = self.db_manager.get_read_connection()
+        try:
+            conn.row_factory = None  # tuplas puras, sem sqlite3.Row
+            # Ano encerrado é lido do arquivo morto anexado
+            schema = self.db_manager.attach_archive(conn, year) if year is not None else "main"
+            sql, params = self._build_query(dataset, year, classroom_id, schema, self.db_manager.date_value)
+            cursor = conn.execute(sql, params)
+        except BaseException:
+            conn.close()
+            raise
+        if dataset == 'report_cards':
+            columns = list(_REPORT_CARD_COLUMNS)
+            rows = self._fetch(conn, cursor, self._report_card_row)
+        else:
+            columns = [d[0] for d in cursor.description]
+            rows = self._fetch(conn, cursor)
+        next(rows)  # entra no try de _fetch: a partir daqui close() fecha a conexão
+        return columns, rows
+
+    def export(self, dataset: str, output, fmt: str = 'csv', year: Optional[int] = None,
+               classroom_id: Optional[int] = None, compress: bool = False) -> int:
+        """Exporta para `output` (caminho, '-' para stdout, ou arquivo texto aberto).
+
+        Retorna o número de linhas escritas.
+        """
+        if fmt not in FORMATS:
+            raise ValueError(f"Formato inválido: {fmt}")
+        # Saída aberta antes da consulta: caminho inválido não chega a pegar conexão
+        with _open_output(output, compress) as out:
+            columns, rows = self.iter_rows(dataset, year, classroom_id)
+            try:
+                if fmt == 'csv':
+                    return _write_csv(out, columns, rows)
+                return _write_jsonl(out, columns, rows)
+            finally:
+                rows.close()
+
+    # --- Consultas ---
+
+    @staticmethod
+    def _build_query(dataset: str, year: Optional[int], classroom_id: Optional[int], schema: str,
+                     date_value):
+        filters = []
+        params: list = []
+        if dataset == 'attendance':
+            if year is not None:
+                filters.append("AND t.attendance_date BETWEEN ? AND ?")
+                params += [date_value(date(year, 1, 1)), date_value(date(year, 12, 31))]
+            if classroom_id is not None:
+                filters.append("AND c.classroom_id = ?")
+                params.append(classroom_id)
+            template = _ATTENDANCE_SQL
+        else:
+            if year is not None:
+                filters.append("AND a.academic_year = ?")
+                params.append(year)
+            if classroom_id is not None:
+                filters.append("AND c.classroom_id = ?")
+                params.append(classroom_id)
+            template = _GRADES_SQL if dataset == 'grades' else _REPORT_CARDS_SQL
+        return template.format(filters=" ".join(filters), s=schema), params
+
+    def _fetch(self, conn, cursor, convert=None) -> Iterator[tuple]:
+        """Lê o cursor em lotes e fecha a conexão ao terminar (ou no close()).
+
+        O primeiro next() só posiciona o gerador dentro do try.
+        """
+        try:
+            yield
+            while True:
+                batch = cursor.fetchmany(self.batch_size)
+                if not batch:
+                    return
+                yield from (batch if convert is None else map(convert, batch))
+        finally:
+            conn.close()
+
+    def _report_card_row(self, row: Sequence) -> tuple:
+        medias = []
+        for i in range(7, 15, 2):
+            total_nota, total_peso = row[i], row[i + 1]
+            medias.append(round(total_nota / total_peso, 2) if total_peso else None)
+
+        validas = [m for m in medias if m is not None]
+        if not validas:
+            media_anual, situacao = None, "Incompleto"
+        elif len(validas) < 4:
+            media_anual, situacao = round(sum(validas) / len(validas), 2), "Incompleto"
+        else:
+            media_anual = round(sum(validas) / 4, 2)
+            situacao = "Aprovado" if media_anual >= self.media_aprovacao else "Reprovado"
+        return tuple(row[:7]) + tuple(medias) + (media_anual, situacao)
+
+
+# =============================================
+# ESCRITA
+# =============================================
+
+@contextmanager
+def _open_output(output, compress: bool):
+    if hasattr(output, 'write'):
+        yield output
+    elif output == '-':
+        if compress:
+            with gzip.open(sys.stdout.buffer, 'wt', encoding='utf-8', newline='') as out:
+                yield out
+        else:
+            yield sys.stdout
+    elif compress:
+        with gzip.open(output, 'wt', encoding='utf-8', newline='') as out:
+            yield out
+    else:
+        with open(output, 'w', encoding='utf-8', newline='') as out:
+            yield out
+
+
+def _write_csv(out: io.TextIOBase, columns: List[str], rows: Iterator[tuple]) -> int:
+    writer = csv.writer(out)
+    writer.writerow(columns)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def _write_jsonl(out: io.TextIOBase, columns: List[str], rows: Iterator[tuple]) -> int:
+    count = 0
+    dumps = json.JSONEncoder(ensure_ascii=False).encode
+    for row in rows:
+        out.write(dumps(dict(zip(columns, row))))
+        out.write("\n")
+        count += 1
+    return count
+
+
+# =============================================
+# LINHA DE COMANDO
+# =============================================
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.infrastructure.exporter",
+        description="Exporta notas, frequência ou boletins em CSV/JSON Lines."
+    )
+    parser.add_argument("dataset", choices=DATASETS)
+    parser.add_argument("--db", help="arquivo do banco (padrão: school.db do projeto)")
+    parser.add_argument("--year", type=int, help="ano letivo")
+    parser.add_argument("--classroom", type=int, help="ID da turma")
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--gzip", action="store_true", help="comprime a saída com gzip")
+    parser.add_argument("-o", "--output", default="-", help="arquivo de saída ('-' = stdout)")
+    return parser
+
+
+def run(args) -> int:
+    exporter = Exporter(DatabaseManager(args.db))
+    count = exporter.export(args.dataset, args.output, fmt=args.format, year=args.year,
+                            classroom_id=args.classroom, compress=args.gzip)
+    if args.output != '-':
+        print(f"{count} linhas exportadas para {args.output}")
+    return 0
+
+
+def main(argv=None) -> int:
+    return run(build_parser().parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""
+Identity map por unidade de trabalho (requisição).
+
+Dentro de `with unit_of_work():` cada entidade (tipo, id) é montada uma
+única vez e o mesmo objeto é devolvido a todas as consultas do escopo:
+find_by_id repetido não volta ao banco e as notas de uma mesma avaliação
+compartilham o mesmo Assessment. Fora de um escopo nada muda.
+
+O escopo fica num ContextVar, então cada thread (ou tarefa asyncio) tem o
+seu. Escopos aninhados reaproveitam o de fora.
+
+Uso:
+    with unit_of_work() as uow:
+        for aluno_id in turma.students:
+            servicos.gerar_boletim(aluno_id, "Matemática", 2024)
+    print(uow.stats())   # {'requested': ..., 'dedupe_ratio': ...}
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+
+class IdentityMap:
+    """Objetos já carregados no escopo, por (tipo, id), com contadores."""
+
+    def __init__(self):
+        self._objects: Dict[Tuple[type, int], object] = {}
+        self.requested = 0      # pedidos de hidratação/busca
+        self.materialized = 0   # objetos de fato montados
+        self._by_type: Dict[str, list] = {}  # nome -> [pedidos, montados]
+
+    def get(self, cls: type, key: int):
+        """Objeto já carregado ou None (conta como pedido)."""
+        self._count(cls, requested=1)
+        return self._objects.get((cls, key))
+
+    def get_or_build(self, cls: type, key: int, build: Callable, *args):
+        """Devolve o objeto do escopo ou monta com build(*args) e registra."""
+        self._count(cls, requested=1)
+        obj = self._objects.get((cls, key))
+        if obj is None:
+            obj = build(*args)
+            self.add(cls, key, obj)
+        return obj
+
+    def add(self, cls: type, key: int, obj, loaded: bool = True) -> None:
+        """Registra um objeto; loaded=False para objetos recém-salvos."""
+        if key is None:
+            return
+        if loaded and (cls, key) not in self._objects:
+            self._count(cls, materialized=1)
+        self._objects[(cls, key)] = obj
+
+    def discard(self, cls: type, key: int) -> None:
+        self._objects.pop((cls, key), None)
+
+    def __contains__(self, item: Tuple[type, int]) -> bool:
+        return item in self._objects
+
+    def __len__(self):
+        return len(self._objects)
+
+    # --- Métricas ---
+
+    @property
+    def reused(self) -> int:
+        return max(self.requested - self.materialized, 0)
+
+    @property
+    def dedupe_ratio(self) -> float:
+        """Fração dos pedidos atendidos sem montar objeto novo."""
+        return self.reused / self.requested if self.requested else 0.0
+
+    def stats(self) -> dict:
+        return {
+            'requested': self.requested,
+            'materialized': self.materialized,
+            'reused': self.reused,
+            'dedupe_ratio': round(self.dedupe_ratio, 4),
+            'by_type': {
+                name: {'requested': req, 'materialized': mat}
+                for name, (req, mat) in sorted(self._by_type.items())
+            },
+        }
+
+    def _count(self, cls: type, requested: int = 0, materialized: int = 0) -> None:
+        counters = self._by_type.setdefault(cls.__name__, [0, 0])
+        self.requested += requested
+        self.materialized += materialized
+        counters[0] += requested
+        counters[1] += materialized
+
+
+_current: ContextVar[Optional[IdentityMap]] = ContextVar("identity_map", default=None)
+
+
+def current_identity_map() -> Optional[IdentityMap]:
+    """Identity map do escopo atual (None fora de unit_of_work)."""
+    return _current.get()
+
+
+@contextmanager
+def unit_of_work() -> Iterator[IdentityMap]:
+    """Abre um escopo de identity map (ou reaproveita o que já está aberto)."""
+    existing = _current.get()
+    if existing is not None:
+        yield existing
+        return
+    imap = IdentityMap()
+    token = _current.set(imap)
+    try:
+        yield imap
+    finally:
+        _current.reset(token)
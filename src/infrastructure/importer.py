@@ -0,0 +1,449 @@
+"""
+Importação em massa (CSV) de alunos, responsáveis, vínculos e matrículas.
+
+Lê os arquivos em blocos (`chunk_size` linhas), valida cada bloco sem
+construir objetos do domínio, junta os erros por linha em vez de lançar
+exceção e grava cada bloco com `executemany` numa única transação.
+Matrículas e CPFs são resolvidos para IDs por mapas em memória. Emails são
+comparados em minúsculas, dos dois lados (CSV e banco).
+
+Formato esperado (cabeçalho na primeira linha):
+    alunos.csv       name,registration,email[,active]
+    responsaveis.csv name,email,cpf
+    vinculos.csv     registration,cpf[,relationship_type]
+    matriculas.csv   registration,classroom_id,academic_year[,status]
+
+Execução:
+    python -m src.infrastructure.importer --db school.db \\
+        --students alunos.csv --parents responsaveis.csv \\
+        --links vinculos.csv --enrollments matriculas.csv
+"""
+import argparse
+import csv
+import sqlite3
+import sys
+import time
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from src.domain.models import RELATIONSHIP_TYPES
+from src.infrastructure.database import DatabaseManager, ENROLLMENT_STATUSES
+from src.utils import validar_cpfs, validar_emails, normalizar_cpf
+
+
+_TRUE_VALUES = ('1', 'true', 'sim', 's', 'yes', 'y')
+
+# Tipo de vínculo sem diferenciar maiúsculas: "mãe" -> "Mãe"
+_RELATIONSHIPS = {t.lower(): t for t in RELATIONSHIP_TYPES}
+
+
+@dataclass
+class RowError:
+    """Erro de validação/gravação de uma linha do CSV."""
+    file: str
+    line: int
+    message: str
+
+    def __str__(self):
+        return f"{self.file}:{self.line}: {self.message}"
+
+
+@dataclass
+class ImportReport:
+    """Resultado da importação de um arquivo."""
+    file: str
+    inserted: int = 0
+    errors: List[RowError] = field(default_factory=list)
+    seconds: float = 0.0
+
+    def __str__(self):
+        return (
+            f"{self.file}: {self.inserted} inseridos, "
+            f"{len(self.errors)} erros ({self.seconds:.2f}s)"
+        )
+
+
+# Uma linha válida pronta para o INSERT: (número da linha, chaves para os
+# mapas em memória, parâmetros sem o ID)
+_Candidate = Tuple[int, tuple, tuple]
+
+
+class BulkImporter:
+    """Importa CSVs em blocos usando executemany e mapas em memória."""
+
+    def __init__(self, db_manager, chunk_size: int = 5000, delimiter: str = ","):
+        if chunk_size < 1:
+            raise ValueError("chunk_size deve ser pelo menos 1.")
+        self.db_manager = db_manager
+        self.chunk_size = chunk_size
+        self.delimiter = delimiter
+        self._conn: Optional[sqlite3.Connection] = None
+
+        # Mapas carregados sob demanda na primeira utilização
+        self._student_ids: Optional[Dict[str, int]] = None
+        self._student_emails: Optional[Set[str]] = None
+        self._parent_ids: Optional[Dict[str, int]] = None
+        self._parent_emails: Optional[Set[str]] = None
+        self._links: Optional[Set[Tuple[int, int]]] = None
+        self._classroom_ids: Optional[Set[int]] = None
+        self._enrollments: Optional[Set[Tuple[int, int, int]]] = None
+
+    # --- Conexão ---
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = self.db_manager.get_connection()
+            self._conn.isolation_level = None  # transações por bloco, manuais
+        return self._conn
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # --- Importações públicas ---
+
+    def import_students(self, path: str) -> ImportReport:
+        """Importa alunos (name, registration, email[, active])."""
+        self._load_students()
+        return self._import(
+            path, ('name', 'registration', 'email'), self._validate_student,
+            table='students', id_column='student_id',
+            sql="INSERT INTO students (student_id, name, registration, email, active) VALUES (?, ?, ?, ?, ?)",
+            remember=self._remember_student
+        )
+
+    def import_parents(self, path: str) -> ImportReport:
+        """Importa responsáveis (name, email, cpf)."""
+        self._load_parents()
+        return self._import(
+            path, ('name', 'email', 'cpf'), self._validate_parent,
+            table='parents', id_column='parent_id',
+            sql="INSERT INTO parents (parent_id, name, email, cpf) VALUES (?, ?, ?, ?)",
+            remember=self._remember_parent
+        )
+
+    def import_links(self, path: str) -> ImportReport:
+        """Importa vínculos responsável-aluno (registration, cpf[, relationship_type])."""
+        self._load_students()
+        self._load_parents()
+        self._load_links()
+        return self._import(
+            path, ('registration', 'cpf'), self._validate_link,
+            sql="INSERT INTO student_parent (student_id, parent_id, relationship_type) VALUES (?, ?, ?)",
+            remember=lambda keys, _id: self._links.add(keys)
+        )
+
+    def import_enrollments(self, path: str) -> ImportReport:
+        """Importa matrículas (registration, classroom_id, academic_year[, status])."""
+        self._load_students()
+        self._load_enrollments()
+        return self._import(
+            path, ('registration', 'classroom_id', 'academic_year'), self._validate_enrollment,
+            sql="INSERT INTO classroom_enrollments (student_id, classroom_id, academic_year, status) VALUES (?, ?, ?, ?)",
+            remember=lambda keys, _id: self._enrollments.add(keys)
+        )
+
+    # --- Mapas em memória ---
+
+    def _load_students(self) -> None:
+        if self._student_ids is None:
+            rows = self._connection().execute("SELECT student_id, registration, email FROM students").fetchall()
+            self._student_ids = {r['registration']: r['student_id'] for r in rows}
+            # Minúsculas, como os emails do CSV (_validate_student)
+            self._student_emails = {(r['email'] or '').lower() for r in rows}
+
+    def _load_parents(self) -> None:
+        if self._parent_ids is None:
+            rows = self._connection().execute("SELECT parent_id, email, cpf FROM parents").fetchall()
+            self._parent_ids = {r['cpf']: r['parent_id'] for r in rows}
+            self._parent_emails = {(r['email'] or '').lower() for r in rows}
+
+    def _load_links(self) -> None:
+        if self._links is None:
+            rows = self._connection().execute("SELECT student_id, parent_id FROM student_parent")
+            self._links = {(r['student_id'], r['parent_id']) for r in rows}
+
+    def _load_enrollments(self) -> None:
+        if self._enrollments is None:
+            conn = self._connection()
+            self._classroom_ids = {r[0] for r in conn.execute("SELECT classroom_id FROM classrooms")}
+            rows = conn.execute("SELECT student_id, classroom_id, academic_year FROM classroom_enrollments")
+            self._enrollments = {(r[0], r[1], r[2]) for r in rows}
+
+    def _remember_student(self, keys: tuple, new_id: int) -> None:
+        registration, email = keys
+        self._student_ids[registration] = new_id
+        self._student_emails.add(email)
+
+    def _remember_parent(self, keys: tuple, new_id: int) -> None:
+        cpf, email = keys
+        self._parent_ids[cpf] = new_id
+        self._parent_emails.add(email)
+
+    # --- Validação por bloco ---
+    # Cada validador recebe o bloco [(linha, dict)] e devolve candidatos e
+    # erros. Emails e CPFs são validados de uma vez (validar_emails /
+    # validar_cpfs); `seen_*` guarda as chaves já aceitas no bloco atual.
+
+    def _validate_student(self, chunk, file: str):
+        candidates: List[_Candidate] = []
+        errors: List[RowError] = []
+        seen_regs: Set[str] = set()
+        seen_emails: Set[str] = set()
+        emails = [(row.get('email') or '').strip().lower() for _, row in chunk]
+        emails_ok = validar_emails(emails)
+        for (line, row), email, email_ok in zip(chunk, emails, emails_ok):
+            name = (row.get('name') or '').strip()
+            registration = (row.get('registration') or '').strip()
+            if len(name) < 3:
+                errors.append(RowError(file, line, "Nome deve ter pelo menos 3 caracteres."))
+            elif len(registration) < 3:
+                errors.append(RowError(file, line, "Matrícula deve ter pelo menos 3 caracteres."))
+            elif not email_ok:
+                errors.append(RowError(file, line, f"Email inválido: '{row.get('email')}'"))
+            elif registration in self._student_ids or registration in seen_regs:
+                errors.append(RowError(file, line, f"Matrícula já cadastrada: {registration}"))
+            elif email in self._student_emails or email in seen_emails:
+                errors.append(RowError(file, line, f"Email já cadastrado: {email}"))
+            else:
+                seen_regs.add(registration)
+                seen_emails.add(email)
+                active = (row.get('active') or '1').strip().lower() in _TRUE_VALUES
+                candidates.append((line, (registration, email), (name, registration, email, 1 if active else 0)))
+        return candidates, errors
+
+    def _validate_parent(self, chunk, file: str):
+        candidates: List[_Candidate] = []
+        errors: List[RowError] = []
+        seen_cpfs: Set[str] = set()
+        seen_emails: Set[str] = set()
+        emails = [(row.get('email') or '').strip().lower() for _, row in chunk]
+        raw_cpfs = [(row.get('cpf') or '').strip() for _, row in chunk]
+        emails_ok = validar_emails(emails)
+        cpfs_ok = validar_cpfs(raw_cpfs)
+        for (line, row), email, raw_cpf, email_ok, cpf_ok in zip(chunk, emails, raw_cpfs, emails_ok, cpfs_ok):
+            name = (row.get('name') or '').strip()
+            if len(name) < 3:
+                errors.append(RowError(file, line, "Nome deve ter pelo menos 3 caracteres."))
+            elif not email_ok:
+                errors.append(RowError(file, line, f"Email inválido: '{row.get('email')}'"))
+            elif not cpf_ok:
+                errors.append(RowError(file, line, f"CPF inválido: '{raw_cpf}'"))
+            else:
+                cpf = normalizar_cpf(raw_cpf)
+                if cpf in self._parent_ids or cpf in seen_cpfs:
+                    errors.append(RowError(file, line, f"CPF já cadastrado: {cpf}"))
+                elif email in self._parent_emails or email in seen_emails:
+                    errors.append(RowError(file, line, f"Email já cadastrado: {email}"))
+                else:
+                    seen_cpfs.add(cpf)
+                    seen_emails.add(email)
+                    candidates.append((line, (cpf, email), (name, email, cpf)))
+        return candidates, errors
+
+    def _validate_link(self, chunk, file: str):
+        candidates: List[_Candidate] = []
+        errors: List[RowError] = []
+        seen: Set[Tuple[int, int]] = set()
+        for line, row in chunk:
+            registration = (row.get('registration') or '').strip()
+            cpf = normalizar_cpf(row.get('cpf') or '')
+            raw_relationship = (row.get('relationship_type') or '').strip() or "Responsável"
+            relationship = _RELATIONSHIPS.get(raw_relationship.lower())
+            student_id = self._student_ids.get(registration)
+            parent_id = self._parent_ids.get(cpf)
+            if relationship is None:
+                errors.append(RowError(file, line, f"Tipo de relacionamento inválido: '{raw_relationship}'"))
+            elif student_id is None:
+                errors.append(RowError(file, line, f"Aluno não encontrado: matrícula {registration}"))
+            elif parent_id is None:
+                errors.append(RowError(file, line, f"Responsável não encontrado: CPF {cpf}"))
+            elif (student_id, parent_id) in self._links or (student_id, parent_id) in seen:
+                errors.append(RowError(file, line, "Vínculo já existe."))
+            else:
+                seen.add((student_id, parent_id))
+                candidates.append((line, (student_id, parent_id), (student_id, parent_id, relationship)))
+        return candidates, errors
+
+    def _validate_enrollment(self, chunk, file: str):
+        candidates: List[_Candidate] = []
+        errors: List[RowError] = []
+        seen: Set[Tuple[int, int, int]] = set()
+        for line, row in chunk:
+            registration = (row.get('registration') or '').strip()
+            status = (row.get('status') or '').strip().upper() or 'ACTIVE'
+            student_id = self._student_ids.get(registration)
+            try:
+                classroom_id = int(row.get('classroom_id') or '')
+                academic_year = int(row.get('academic_year') or '')
+            except ValueError:
+                errors.append(RowError(file, line, "classroom_id e academic_year devem ser inteiros."))
+                continue
+            keys = (student_id, classroom_id, academic_year)
+            if student_id is None:
+                errors.append(RowError(file, line, f"Aluno não encontrado: matrícula {registration}"))
+            elif classroom_id not in self._classroom_ids:
+                errors.append(RowError(file, line, f"Turma {classroom_id} não encontrada."))
+            elif academic_year < 2000:
+                errors.append(RowError(file, line, f"Ano letivo inválido: {academic_year}"))
+            elif status not in ENROLLMENT_STATUSES:
+                errors.append(RowError(file, line, f"Status inválido: {status}"))
+            elif keys in self._enrollments or keys in seen:
+                errors.append(RowError(file, line, "Matrícula na turma já existe."))
+            else:
+                seen.add(keys)
+                candidates.append((line, keys, (student_id, classroom_id, academic_year, status)))
+        return candidates, errors
+
+    # --- Núcleo: leitura em blocos + gravação ---
+
+    def _read_chunks(self, path: str, required: Tuple[str, ...],
+                     report: ImportReport) -> Iterator[List[Tuple[int, dict]]]:
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.DictReader(f, delimiter=self.delimiter)
+            missing = [c for c in required if c not in (reader.fieldnames or [])]
+            if missing:
+                report.errors.append(RowError(path, 1, f"Colunas obrigatórias ausentes: {', '.join(missing)}"))
+                return
+            rows = enumerate(reader, start=2)
+            while True:
+                chunk = list(islice(rows, self.chunk_size))
+                if not chunk:
+                    return
+                yield chunk
+
+    def _import(self, path: str, required: Tuple[str, ...], validate: Callable,
+                sql: str, remember: Callable[[tuple, Optional[int]], None],
+                table: Optional[str] = None, id_column: Optional[str] = None) -> ImportReport:
+        report = ImportReport(file=path)
+        start = time.perf_counter()
+        for chunk in self._read_chunks(path, required, report):
+            candidates, errors = validate(chunk, path)
+            report.errors.extend(errors)
+            if candidates:
+                report.inserted += self._write_chunk(candidates, sql, remember, table, id_column, report)
+        report.seconds = time.perf_counter() - start
+        return report
+
+    def _write_chunk(self, candidates: List[_Candidate], sql: str, remember,
+                     table: Optional[str], id_column: Optional[str], report: ImportReport) -> int:
+        """Grava um bloco numa transação; se falhar, refaz linha a linha."""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            ids = self._next_ids(conn, table, id_column, len(candidates))
+            params = [(new_id,) + p if new_id is not None else p
+                      for new_id, (_, _, p) in zip(ids, candidates)]
+            # O executemany para na linha ruim com as anteriores já gravadas:
+            # desfaz o bloco inteiro antes de refazer linha a linha
+            conn.execute("SAVEPOINT bloco")
+            try:
+                conn.executemany(sql, params)
+                accepted = list(range(len(candidates)))
+            except sqlite3.IntegrityError:
+                conn.execute("ROLLBACK TO bloco")
+                accepted = self._write_one_by_one(conn, sql, candidates, params, report)
+            conn.execute("RELEASE bloco")
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+
+        # Só atualiza os mapas depois do COMMIT
+        for i in accepted:
+            remember(candidates[i][1], ids[i])
+        return len(accepted)
+
+    def _write_one_by_one(self, conn, sql, candidates, params, report) -> List[int]:
+        """Localiza as linhas problemáticas do bloco usando SAVEPOINTs."""
+        accepted = []
+        for i, (line, _, _) in enumerate(candidates):
+            conn.execute("SAVEPOINT linha")
+            try:
+                conn.execute(sql, params[i])
+                accepted.append(i)
+            except sqlite3.IntegrityError as e:
+                conn.execute("ROLLBACK TO linha")
+                report.errors.append(RowError(report.file, line, f"Rejeitado pelo banco: {e}"))
+            conn.execute("RELEASE linha")
+        return accepted
+
+    @staticmethod
+    def _next_ids(conn, table: Optional[str], id_column: Optional[str], count: int) -> List[Optional[int]]:
+        """Reserva IDs sequenciais (já com o lock de escrita do BEGIN IMMEDIATE)."""
+        if table is None:
+            return [None] * count
+        last = conn.execute(
+            f"SELECT MAX(COALESCE((SELECT seq FROM sqlite_sequence WHERE name = ?), 0), "
+            f"COALESCE((SELECT MAX({id_column}) FROM {table}), 0))",
+            (table,)
+        ).fetchone()[0]
+        return list(range(last + 1, last + 1 + count))
+
+
+# =============================================
+# LINHA DE COMANDO
+# =============================================
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.infrastructure.importer",
+        description="Importação em massa de alunos, responsáveis, vínculos e matrículas (CSV)."
+    )
+    parser.add_argument("--db", help="arquivo do banco (padrão: school.db do projeto)")
+    parser.add_argument("--students", help="CSV de alunos")
+    parser.add_argument("--parents", help="CSV de responsáveis")
+    parser.add_argument("--links", help="CSV de vínculos responsável-aluno")
+    parser.add_argument("--enrollments", help="CSV de matrículas")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--delimiter", default=",")
+    parser.add_argument("--errors", help="grava os erros por linha neste CSV")
+    return parser
+
+
+def run(args) -> int:
+    """Executa a importação descrita em `args`; retorna o código de saída."""
+    db = DatabaseManager(args.db)
+    reports: List[ImportReport] = []
+    with BulkImporter(db, chunk_size=args.chunk_size, delimiter=args.delimiter) as importer:
+        # Ordem importa: vínculos e matrículas resolvem IDs de alunos/responsáveis
+        if args.students:
+            reports.append(importer.import_students(args.students))
+        if args.parents:
+            reports.append(importer.import_parents(args.parents))
+        if args.links:
+            reports.append(importer.import_links(args.links))
+        if args.enrollments:
+            reports.append(importer.import_enrollments(args.enrollments))
+
+    all_errors = [e for r in reports for e in r.errors]
+    for r in reports:
+        print(r)
+    if args.errors:
+        with open(args.errors, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['file', 'line', 'message'])
+            writer.writerows((e.file, e.line, e.message) for e in all_errors)
+    else:
+        for e in all_errors[:20]:
+            print(f"   {e}")
+        if len(all_errors) > 20:
+            print(f"   ... mais {len(all_errors) - 20} erros (use --errors para gravar todos)")
+    return 1 if all_errors else 0
+
+
+def main(argv=None) -> int:
+    return run(build_parser().parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,490 @@
+"""
+Migrações do schema para bancos já existentes.
+
+O schema.sql sempre cria o banco na versão mais recente e grava
+`PRAGMA user_version`. Bancos criados antes recebem aqui, em ordem, só as
+migrações que faltam. Cada migração é idempotente (IF EXISTS/IF NOT EXISTS).
+
+Uso:
+    aplicadas = migrar(get_database())
+"""
+import gzip
+import os
+import shutil
+import sqlite3
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Union
+
+from src.infrastructure.archive import _ARCHIVE_INDEXES
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    # lista de SQL ou função(conn); a função pode devolver outra, chamada após o COMMIT
+    steps: Union[List[str], Callable]
+    # Recria tabelas (CREATE novo/INSERT/DROP/RENAME): roda com foreign_keys=OFF
+    # e confere PRAGMA foreign_key_check antes do COMMIT
+    rebuild: bool = False
+
+
+# tabela -> (pk, pk2) gravados no change_log (mesmos triggers do schema.sql)
+CHANGE_LOG_TABLES = {
+    'grades': ('grade_id', None),
+    'attendance': ('attendance_id', None),
+    'classroom_enrollments': ('enrollment_id', None),
+    'student_parent': ('student_id', 'parent_id'),
+}
+
+
+def _change_log(conn) -> None:
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS change_log (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name VARCHAR(50) NOT NULL,
+            op CHAR(1) NOT NULL,
+            pk INTEGER NOT NULL,
+            pk2 INTEGER,
+            student_id INTEGER,
+            changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            CONSTRAINT chk_change_op CHECK (op IN ('I', 'U', 'D'))
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS change_log_consumers (
+            consumer VARCHAR(100) PRIMARY KEY,
+            last_seq INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    insert = "INSERT INTO change_log (table_name, op, pk, pk2, student_id)"
+    for table, (pk, pk2) in CHANGE_LOG_TABLES.items():
+        def row(op, ref):
+            return f"'{table}', '{op}', {ref}.{pk}, {f'{ref}.{pk2}' if pk2 else 'NULL'}, {ref}.student_id"
+        key_changed = f"OLD.{pk} IS NOT NEW.{pk}" + (f" OR OLD.{pk2} IS NOT NEW.{pk2}" if pk2 else "")
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_change_log_{table}_ins AFTER INSERT ON {table}
+            BEGIN {insert} VALUES ({row('I', 'NEW')}); END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_change_log_{table}_upd AFTER UPDATE ON {table}
+            BEGIN
+                {insert} SELECT {row('D', 'OLD')} WHERE {key_changed};
+                {insert} VALUES ({row('U', 'NEW')});
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_change_log_{table}_del AFTER DELETE ON {table}
+            BEGIN {insert} VALUES ({row('D', 'OLD')}); END
+        """)
+
+
+# =============================================
+# Migração 5: catálogo de disciplinas (subject -> subject_id)
+# =============================================
+
+# Tabelas com a coluna subject (texto) -> DDL da versão com subject_id
+_SUBJECT_TABLES = {
+    'teacher_subjects': """
+        CREATE TABLE teacher_subjects_new (
+            teacher_id INTEGER NOT NULL,
+            subject_id INTEGER NOT NULL,
+            PRIMARY KEY (teacher_id, subject_id),
+            FOREIGN KEY (teacher_id) REFERENCES teachers(teacher_id) ON DELETE CASCADE,
+            FOREIGN KEY (subject_id) REFERENCES subjects(subject_id) ON DELETE RESTRICT
+        )
+    """,
+    'assessments': """
+        CREATE TABLE assessments_new (
+            assessment_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title VARCHAR(200) NOT NULL,
+            subject_id INTEGER NOT NULL,
+            description TEXT,
+            max_score DECIMAL(5,2) NOT NULL,
+            weight DECIMAL(5,2) NOT NULL DEFAULT 1.0,
+            assessment_type VARCHAR(30) NOT NULL,
+            bimester VARCHAR(20) NOT NULL,
+            academic_year INTEGER NOT NULL,
+            assessment_date DATE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            CONSTRAINT chk_max_score CHECK (max_score > 0 AND max_score <= 10.0),
+            CONSTRAINT chk_weight CHECK (weight > 0 AND weight <= 10.0),
+            CONSTRAINT chk_assessment_year CHECK (academic_year >= 2000),
+            CONSTRAINT chk_assessment_type CHECK (
+                assessment_type IN ('PROVA', 'TRABALHO', 'SEMINARIO', 'ATIVIDADE_PRATICA', 'PARTICIPACAO', 'PROJETO')
+            ),
+            CONSTRAINT chk_bimester CHECK (bimester IN ('PRIMEIRO', 'SEGUNDO', 'TERCEIRO', 'QUARTO')),
+            FOREIGN KEY (subject_id) REFERENCES subjects(subject_id) ON DELETE RESTRICT
+        )
+    """,
+    'attendance': """
+        CREATE TABLE attendance_new (
+            attendance_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER NOT NULL,
+            subject_id INTEGER NOT NULL,
+            attendance_date DATE NOT NULL,
+            is_present BOOLEAN NOT NULL DEFAULT 1,
+            is_justified BOOLEAN NOT NULL DEFAULT 0,
+            justification TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            CONSTRAINT chk_justification_logic CHECK (
+                (is_justified = 0 AND justification IS NULL) OR
+                (is_justified = 1 AND justification IS NOT NULL)
+            ),
+            FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE,
+            FOREIGN KEY (subject_id) REFERENCES subjects(subject_id) ON DELETE RESTRICT,
+            UNIQUE (student_id, subject_id, attendance_date)
+        )
+    """,
+    'report_cards': """
+        CREATE TABLE report_cards_new (
+            report_card_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER NOT NULL,
+            subject_id INTEGER NOT NULL,
+            bimester VARCHAR(20) NOT NULL,
+            academic_year INTEGER NOT NULL,
+            education_level VARCHAR(30) NOT NULL,
+            grade DECIMAL(5,2),
+            development_level VARCHAR(30),
+            description TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            CONSTRAINT chk_report_year CHECK (academic_year >= 2000),
+            CONSTRAINT chk_bimester_report CHECK (bimester IN ('PRIMEIRO', 'SEGUNDO', 'TERCEIRO', 'QUARTO')),
+            CONSTRAINT chk_level_report CHECK (education_level IN ('INFANTIL', 'FUNDAMENTAL_I', 'FUNDAMENTAL_II', 'MEDIO')),
+            CONSTRAINT chk_grade_range CHECK (grade IS NULL OR (grade >= 0 AND grade <= 10.0)),
+            FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE,
+            FOREIGN KEY (subject_id) REFERENCES subjects(subject_id) ON DELETE RESTRICT,
+            UNIQUE (student_id, subject_id, bimester, academic_year)
+        )
+    """,
+}
+
+# Índices que somem no DROP das tabelas antigas
+_SUBJECT_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_attendance_date ON attendance(attendance_date)",
+    "CREATE INDEX IF NOT EXISTS idx_attendance_student_subject ON attendance(student_id, subject_id)",
+    "CREATE INDEX IF NOT EXISTS idx_assessment_subject_bimester ON assessments(subject_id, bimester)",
+    "CREATE INDEX IF NOT EXISTS idx_report_student_year ON report_cards(student_id, academic_year)",
+]
+
+# Tabelas do arquivo morto que têm a coluna subject
+_ARCHIVE_SUBJECT_TABLES = ('assessments', 'attendance')
+
+
+def _columns(conn, table: str, schema: str = "main") -> List[str]:
+    return [r[1] for r in conn.execute(f"PRAGMA {schema}.table_info({table})")]
+
+
+def _subject_select(columns: List[str]) -> str:
+    """Colunas da tabela antiga com subject trocado pelo id do catálogo."""
+    return ", ".join(
+        "(SELECT subject_id FROM subjects WHERE name = subject)" if c == "subject" else c
+        for c in columns
+    )
+
+
+def _plain_archive(path: Path) -> Path:
+    """O próprio .db, ou a cópia descompactada ao lado do .db.gz."""
+    if path.suffix != ".gz":
+        return path
+    plain = path.with_suffix("")
+    if not plain.exists():
+        tmp = plain.with_suffix(".tmp")
+        with gzip.open(path, "rb") as src, open(tmp, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        tmp.replace(plain)
+    return plain
+
+
+def _open_archive(path: Path) -> sqlite3.Connection:
+    return sqlite3.connect(f"{_plain_archive(path).resolve().as_uri()}?mode=ro", uri=True)
+
+
+def _archived_files(conn) -> Dict[int, Path]:
+    try:
+        return {r[0]: Path(r[1]) for r in conn.execute("SELECT academic_year, path FROM archived_years")}
+    except sqlite3.OperationalError:
+        return {}
+
+
+def _archive_needs_conversion(path: Path) -> bool:
+    archive = _open_archive(path)
+    try:
+        return "subject" in _columns(archive, "attendance")
+    finally:
+        archive.close()
+
+
+def _archive_subject_names(path: Path) -> List[str]:
+    archive = _open_archive(path)
+    try:
+        return [r[0] for table in _ARCHIVE_SUBJECT_TABLES
+                for r in archive.execute(f"SELECT DISTINCT subject FROM {table}")]
+    finally:
+        archive.close()
+
+
+def _rewrite_archive(path: Path, stem: str, column_sql: Callable[[str, str], str],
+                     prepare: Optional[Callable] = None) -> Path:
+    """Copia o arquivo morto para `stem`.db(.gz), ao lado, reescrevendo as colunas.
+
+    column_sql(tabela, coluna) devolve o item do SELECT sobre o arquivo
+    antigo (ex.: "coluna" ou "expressão AS coluna"); prepare(conn) pode
+    criar tabelas auxiliares no main em memória. A cópia mantém a
+    compactação e fica somente leitura; retorna o caminho dela.
+    """
+    compressed = path.suffix == ".gz"
+    plain = _plain_archive(path)
+    target = plain.with_name(f"{stem}.db")
+    for leftover in (target, target.with_suffix(".db.gz")):
+        if leftover.exists():  # tentativa anterior que não chegou ao COMMIT
+            leftover.unlink()
+
+    conn = sqlite3.connect(":memory:", uri=True)
+    conn.isolation_level = None
+    try:
+        conn.execute("ATTACH DATABASE ? AS antigo", (f"{plain.resolve().as_uri()}?mode=ro",))
+        conn.execute("ATTACH DATABASE ? AS arq", (str(target),))
+        if prepare is not None:
+            prepare(conn)
+        conn.execute("BEGIN")
+        for table in ("assessments", "grades", "attendance", "classroom_enrollments"):
+            select = ", ".join(column_sql(table, c) for c in _columns(conn, table, "antigo"))
+            conn.execute(f"CREATE TABLE arq.{table} AS SELECT {select} FROM antigo.{table}")
+        for sql in _ARCHIVE_INDEXES:
+            conn.execute(sql)
+        conn.execute("COMMIT")
+        conn.execute("VACUUM arq")
+    finally:
+        conn.close()
+
+    if compressed:
+        with open(target, "rb") as src, gzip.open(target.with_suffix(".db.gz"), "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        target.unlink()
+        target = target.with_suffix(".db.gz")
+    os.chmod(target, 0o444)
+    return target
+
+
+def _remove_archives(paths: List[Path]) -> None:
+    """Apaga arquivos mortos substituídos (e a cópia descompactada do .db.gz)."""
+    for path in paths:
+        for old in (path, path.with_suffix("")) if path.suffix == ".gz" else (path,):
+            if old.exists():
+                old.unlink()
+
+
+def _convert_archive(path: Path, subject_ids: Dict[str, int]) -> Path:
+    """Arquivo morto com subject_id, ao lado do original; retorna o caminho."""
+    def prepare(conn):
+        conn.execute("CREATE TABLE subjects (subject_id INTEGER PRIMARY KEY, name TEXT UNIQUE)")
+        conn.executemany("INSERT INTO subjects VALUES (?, ?)", [(i, n) for n, i in subject_ids.items()])
+
+    def column_sql(table, column):
+        if column == "subject":
+            return "(SELECT subject_id FROM subjects WHERE name = subject) AS subject_id"
+        return column
+
+    return _rewrite_archive(path, f"{_plain_archive(path).stem}_v5", column_sql, prepare)
+
+
+def _subjects(conn) -> Optional[Callable]:
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS subjects (
+            subject_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name VARCHAR(100) NOT NULL UNIQUE,
+            CONSTRAINT chk_subject_name CHECK (LENGTH(TRIM(name)) >= 1)
+        )
+    """)
+    pending = [t for t in _SUBJECT_TABLES if "subject" in _columns(conn, t)]
+    archives = {year: path for year, path in _archived_files(conn).items()
+                if _archive_needs_conversion(path)}
+
+    # Catálogo em ordem alfabética: ids estáveis entre execuções
+    names = set()
+    for table in pending:
+        names.update(r[0] for r in conn.execute(f"SELECT DISTINCT subject FROM {table}"))
+    for path in archives.values():
+        names.update(_archive_subject_names(path))
+    conn.executemany("INSERT OR IGNORE INTO subjects (name) VALUES (?)", [(n,) for n in sorted(names)])
+
+    if pending:
+        # Triggers e cache de médias usam a coluna antiga; AverageCache recria os dois
+        for (trigger,) in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger' "
+                "AND name GLOB 'trg_average_cache_*'").fetchall():
+            conn.execute(f"DROP TRIGGER {trigger}")
+        conn.execute("DROP TABLE IF EXISTS average_cache")
+
+    for table in pending:
+        columns = _columns(conn, table)
+        sequence = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,)).fetchone()
+        conn.execute(_SUBJECT_TABLES[table])
+        conn.execute(f"INSERT INTO {table}_new SELECT {_subject_select(columns)} FROM {table}")
+        conn.execute(f"DROP TABLE {table}")
+        conn.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+        if sequence is not None:
+            # Ids apagados no fim da tabela antiga não voltam a ser usados
+            conn.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = ?", (sequence[0], table))
+    for sql in _SUBJECT_INDEXES:
+        conn.execute(sql)
+    if "attendance" in pending and conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'change_log'").fetchone():
+        _change_log(conn)  # os triggers da frequência foram junto com a tabela antiga
+
+    subject_ids = dict(conn.execute("SELECT name, subject_id FROM subjects"))
+    replaced = []
+    for year, path in sorted(archives.items()):
+        new_path = _convert_archive(path, subject_ids)
+        conn.execute("UPDATE archived_years SET path = ? WHERE academic_year = ?",
+                     (str(new_path.resolve()), year))
+        replaced.append(path)
+
+    # Depois do COMMIT: o archived_years já aponta para os arquivos novos
+    return lambda: _remove_archives(replaced)
+
+
+# =============================================
+# Migração 7: tabelas de ligação WITHOUT ROWID
+# =============================================
+
+# Tabela -> DDL da versão WITHOUT ROWID (mesma ordem de colunas: o arquivo
+# morto copia com SELECT *). Só tabelas sem id próprio: matrículas e
+# frequência expõem enrollment_id/attendance_id e seguem com rowid e
+# AUTOINCREMENT.
+_CLUSTERED_TABLES = {
+    'student_parent': """
+        CREATE TABLE student_parent_new (
+            student_id INTEGER NOT NULL,
+            parent_id INTEGER NOT NULL,
+            relationship_type VARCHAR(50) DEFAULT 'Responsável',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (student_id, parent_id),
+            FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE,
+            FOREIGN KEY (parent_id) REFERENCES parents(parent_id) ON DELETE CASCADE
+        ) WITHOUT ROWID
+    """,
+    'teacher_subjects': """
+        CREATE TABLE teacher_subjects_new (
+            teacher_id INTEGER NOT NULL,
+            subject_id INTEGER NOT NULL,
+            PRIMARY KEY (teacher_id, subject_id),
+            FOREIGN KEY (teacher_id) REFERENCES teachers(teacher_id) ON DELETE CASCADE,
+            FOREIGN KEY (subject_id) REFERENCES subjects(subject_id) ON DELETE RESTRICT
+        ) WITHOUT ROWID
+    """,
+}
+
+
+def _without_rowid(conn) -> None:
+    pending = [t for t in _CLUSTERED_TABLES if not conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ? AND sql LIKE '%WITHOUT ROWID%'",
+        (t,)).fetchone()]
+    for table in pending:
+        columns = ", ".join(_columns(conn, table))
+        conn.execute(_CLUSTERED_TABLES[table])
+        conn.execute(f"INSERT INTO {table}_new ({columns}) SELECT {columns} FROM {table}")
+        conn.execute(f"DROP TABLE {table}")
+        conn.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+    # O índice de filhos por responsável foi junto com a tabela antiga
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_student_parent_parent ON student_parent(parent_id, student_id)")
+    if "student_parent" in pending and conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'change_log'").fetchone():
+        _change_log(conn)  # os triggers dos vínculos foram com a tabela antiga
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "Tabela archived_years (encerramento do ano letivo)", [
+        """
+        CREATE TABLE IF NOT EXISTS archived_years (
+            academic_year INTEGER PRIMARY KEY,
+            path TEXT NOT NULL,
+            archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            CONSTRAINT chk_archived_year CHECK (academic_year >= 2000)
+        )
+        """,
+    ]),
+    Migration(2, "Índices de cobertura para roster e turma atual do aluno", [
+        "DROP INDEX IF EXISTS idx_enrollment_student",
+        "DROP INDEX IF EXISTS idx_enrollment_classroom",
+        "CREATE INDEX IF NOT EXISTS idx_enrollment_roster "
+        "ON classroom_enrollments(classroom_id, academic_year, status, student_id)",
+        "CREATE INDEX IF NOT EXISTS idx_enrollment_student_year "
+        "ON classroom_enrollments(student_id, academic_year, status, classroom_id)",
+    ]),
+    Migration(3, "Índice de filhos por responsável (painel do responsável)", [
+        "CREATE INDEX IF NOT EXISTS idx_student_parent_parent "
+        "ON student_parent(parent_id, student_id)",
+    ]),
+    Migration(4, "Feed de alterações (change_log) em notas, frequência, matrículas e vínculos",
+              _change_log),
+    Migration(5, "Catálogo de disciplinas: subject_id no lugar do nome (inclui arquivos mortos)",
+              _subjects, rebuild=True),
+    Migration(6, "Tabela db_settings (formato das datas; ver date_storage.py)", [
+        """
+        CREATE TABLE IF NOT EXISTS db_settings (
+            name VARCHAR(50) PRIMARY KEY,
+            value TEXT NOT NULL
+        )
+        """,
+        "INSERT OR IGNORE INTO db_settings (name, value) VALUES ('date_storage', 'iso')",
+    ]),
+    Migration(7, "Vínculos aluno-responsável e disciplinas do professor WITHOUT ROWID",
+              _without_rowid, rebuild=True),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def versao_atual(db_manager) -> int:
+    """Lê o PRAGMA user_version do banco."""
+    conn = db_manager.get_connection()
+    try:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def migrar(db_manager, target: Optional[int] = None, verbose: bool = False) -> List[int]:
+    """Aplica as migrações pendentes (até `target`); retorna as versões aplicadas."""
+    target = LATEST_VERSION if target is None else target
+    conn = db_manager.get_connection()
+    conn.isolation_level = None
+    applied = []
+    try:
+        current = conn.execute("PRAGMA user_version").fetchone()[0]
+        for migration in MIGRATIONS:
+            if migration.version <= current or migration.version > target:
+                continue
+            if migration.rebuild:
+                # Só tem efeito fora de transação
+                conn.execute("PRAGMA foreign_keys = OFF")
+            conn.execute("BEGIN IMMEDIATE")
+            after_commit = None
+            try:
+                if callable(migration.steps):
+                    after_commit = migration.steps(conn)
+                else:
+                    for sql in migration.steps:
+                        conn.execute(sql)
+                if migration.rebuild and conn.execute("PRAGMA foreign_key_check").fetchone():
+                    raise sqlite3.IntegrityError(
+                        f"Migração {migration.version} deixou chaves estrangeiras inválidas")
+                # PRAGMA não aceita parâmetro; a versão vem da lista acima
+                conn.execute(f"PRAGMA user_version = {int(migration.version)}")
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            finally:
+                if migration.rebuild:
+                    conn.execute("PRAGMA foreign_keys = ON")
+            if after_commit is not None:
+                after_commit()
+            applied.append(migration.version)
+            if verbose:
+                print(f"✅ Migração {migration.version}: {migration.description}")
+    finally:
+        conn.close()
+    return applied
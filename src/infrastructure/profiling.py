@@ -0,0 +1,327 @@
+"""
+Perfil dos serviços: tempo, statements, conexões, memória e cProfile por método.
+
+Os métodos públicos de ServicosDoAluno e ServicosSecretaria passam pelo
+decorador @profiled. Desligado (o padrão), o custo é um teste por chamada.
+Ligado, cada chamada registra:
+
+- tempo de parede;
+- statements SQL executados (trace callback das conexões; entram BEGIN/
+  COMMIT e os programas de trigger) e conexões obtidas do DatabaseManager;
+- pico de memória alocada durante a chamada (tracemalloc), se memory=True;
+- estatísticas do cProfile, se cprofile=True.
+
+Os números são somados por método num ServiceProfiler (relatório em
+processo) e o cProfile pode ser gravado em arquivos .pstats para análise
+offline (python -m pstats arquivo.pstats, snakeviz etc.).
+
+Chamada aninhada (um serviço que chama outro) entra na de fora. cProfile e
+tracemalloc são do processo (no 3.12 o cProfile usa sys.monitoring e só
+admite um perfilador ativo): uma chamada por vez faz essa captura. Chamadas
+concorrentes, ou com outro perfilador já ativo (python -m cProfile), medem
+só tempo, statements e conexões e somam em `capture_skipped` (o pico de
+memória de quem captura ainda inclui o que as outras threads alocaram).
+
+Uso:
+    with profile_services(cprofile=True, memory=True) as perfil:
+        servicos.gerar_boletim(aluno_id, "Matemática", 2024)
+    print(perfil.report())
+    perfil.dump_pstats("perfis/")
+
+    enable_profiling()          # para o processo todo (disable_profiling() desliga)
+
+    SCHOOL_PROFILE=1 python main.py                  # relatório no stderr ao sair
+    SCHOOL_PROFILE=cprofile,memory SCHOOL_PROFILE_DIR=perfis python main.py
+"""
+import atexit
+import functools
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from types import FunctionType
+from typing import Dict, Iterator, List, Optional
+
+ENV_VAR = "SCHOOL_PROFILE"
+ENV_DIR = "SCHOOL_PROFILE_DIR"
+
+# inspect.CO_GENERATOR (o módulo é importado pelo database: sem inspect/dataclasses)
+_CO_GENERATOR = 0x20
+
+
+class _Call:
+    """Contadores da chamada em andamento (um por thread/contexto)."""
+
+    __slots__ = ("statements", "connections")
+
+    def __init__(self):
+        self.statements = 0
+        self.connections = 0
+
+    def statement(self, _sql: str) -> None:
+        self.statements += 1
+
+
+_current_call: ContextVar[Optional[_Call]] = ContextVar("profiled_call", default=None)
+_scoped: ContextVar[Optional["ServiceProfiler"]] = ContextVar("service_profiler", default=None)
+_global: Optional["ServiceProfiler"] = None
+# Dono da captura de cProfile/tracemalloc (globais ao processo)
+_capture_lock = threading.Lock()
+
+
+def track_connection(conn):
+    """Conta a conexão e os statements dela na chamada perfilada (se houver).
+
+    Chamado pelo DatabaseManager ao entregar cada conexão; o pool remove o
+    trace callback na devolução.
+    """
+    call = _current_call.get()
+    if call is not None:
+        call.connections += 1
+        conn.set_trace_callback(call.statement)
+    return conn
+
+
+class MethodStats:
+    """Soma das chamadas de um método."""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.statements = 0
+        self.connections = 0
+        self.memory_peak = 0        # soma dos picos (bytes), para a média
+        self.max_memory_peak = 0
+        self.capture_skipped = 0    # chamadas sem cProfile/memória (captura ocupada)
+        self.pstats = None          # pstats.Stats somado, se cprofile=True
+
+    def summary(self) -> dict:
+        calls = self.calls or 1
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'total_ms': round(self.seconds * 1000, 3),
+            'avg_ms': round(self.seconds / calls * 1000, 3),
+            'max_ms': round(self.max_seconds * 1000, 3),
+            'statements': self.statements,
+            'avg_statements': round(self.statements / calls, 2),
+            'connections': self.connections,
+            'avg_connections': round(self.connections / calls, 2),
+            'avg_memory_peak_bytes': self.memory_peak // calls,
+            'max_memory_peak_bytes': self.max_memory_peak,
+            'capture_skipped': self.capture_skipped,
+        }
+
+
+class ServiceProfiler:
+    """Métricas dos serviços agregadas por método ("Classe.metodo")."""
+
+    def __init__(self, cprofile: bool = False, memory: bool = False):
+        self.cprofile = cprofile
+        self.memory = memory
+        self._lock = threading.Lock()
+        self._methods: Dict[str, MethodStats] = {}
+        self._started_tracemalloc = False
+        if memory:
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracemalloc = True
+
+    def close(self) -> None:
+        """Para o tracemalloc, se foi este perfil que o ligou."""
+        if self._started_tracemalloc:
+            import tracemalloc
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def run(self, name: str, func, args: tuple, kwargs: dict):
+        """Executa func(*args, **kwargs) medindo a chamada."""
+        call = _Call()
+        token = _current_call.set(call)
+        capture = (self.cprofile or self.memory) and _capture_lock.acquire(blocking=False)
+        skipped = (self.cprofile or self.memory) and not capture
+        profile = memory = None
+        failed, seconds = True, 0.0
+        try:
+            if capture and self.cprofile:
+                import cProfile
+                profile = cProfile.Profile()
+                try:
+                    profile.enable()
+                except ValueError:
+                    # Outro perfilador ativo (3.12+: "Another profiling tool is already active")
+                    profile, skipped = None, True
+            if capture and self.memory:
+                import tracemalloc
+                memory = tracemalloc
+                base = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            finally:
+                seconds = time.perf_counter() - start
+                if profile is not None:
+                    profile.disable()
+            failed = False
+            return result
+        finally:
+            peak = memory.get_traced_memory()[1] - base if memory is not None else 0
+            if capture:
+                _capture_lock.release()
+            _current_call.reset(token)
+            self._record(name, seconds, call, max(peak, 0), profile, failed, skipped)
+
+    def _record(self, name: str, seconds: float, call: _Call, peak: int, profile, failed: bool,
+                skipped: bool) -> None:
+        with self._lock:
+            stats = self._methods.get(name)
+            if stats is None:
+                stats = self._methods[name] = MethodStats()
+            stats.calls += 1
+            stats.errors += failed
+            stats.seconds += seconds
+            stats.max_seconds = max(stats.max_seconds, seconds)
+            stats.statements += call.statements
+            stats.connections += call.connections
+            stats.memory_peak += peak
+            stats.max_memory_peak = max(stats.max_memory_peak, peak)
+            stats.capture_skipped += skipped
+            if profile is not None:
+                if stats.pstats is None:
+                    import pstats
+                    stats.pstats = pstats.Stats(profile)
+                else:
+                    stats.pstats.add(profile)
+
+    def stats(self, name: str) -> Optional[MethodStats]:
+        return self._methods.get(name)
+
+    def summary(self) -> Dict[str, dict]:
+        """{método: métricas}, do maior tempo total para o menor."""
+        with self._lock:
+            items = sorted(self._methods.items(), key=lambda kv: kv[1].seconds, reverse=True)
+            return {name: stats.summary() for name, stats in items}
+
+    def report(self) -> str:
+        """Tabela em texto com as métricas de cada método."""
+        lines = [f"{'método':<50} {'chamadas':>8} {'total ms':>10} {'média ms':>9} {'máx ms':>9} "
+                 f"{'stmts/ch':>8} {'conex/ch':>8} {'pico KiB':>9}"]
+        for name, s in self.summary().items():
+            lines.append(
+                f"{name:<50} {s['calls']:>8} {s['total_ms']:>10.1f} {s['avg_ms']:>9.2f} {s['max_ms']:>9.2f} "
+                f"{s['avg_statements']:>8.1f} {s['avg_connections']:>8.1f} "
+                f"{s['max_memory_peak_bytes'] / 1024:>9.1f}")
+        return "\n".join(lines)
+
+    def dump_pstats(self, directory: str) -> List[Path]:
+        """Grava um <Classe.metodo>.pstats por método com cProfile; retorna os caminhos."""
+        folder = Path(directory)
+        folder.mkdir(parents=True, exist_ok=True)
+        paths = []
+        with self._lock:
+            for name, stats in self._methods.items():
+                if stats.pstats is not None:
+                    path = folder / f"{name}.pstats"
+                    stats.pstats.dump_stats(str(path))
+                    paths.append(path)
+        return paths
+
+    def reset(self) -> None:
+        with self._lock:
+            self._methods.clear()
+
+
+# =============================================
+# LIGA/DESLIGA
+# =============================================
+
+def enable_profiling(cprofile: bool = False, memory: bool = False) -> ServiceProfiler:
+    """Perfila os serviços em todas as threads até disable_profiling()."""
+    global _global
+    disable_profiling()
+    _global = ServiceProfiler(cprofile=cprofile, memory=memory)
+    return _global
+
+
+def disable_profiling() -> Optional[ServiceProfiler]:
+    """Desliga o perfil do processo; retorna o que estava ativo (com os dados)."""
+    global _global
+    profiler, _global = _global, None
+    if profiler is not None:
+        profiler.close()
+    return profiler
+
+
+def get_profiler() -> Optional[ServiceProfiler]:
+    """Perfil ativo no contexto atual (o do `with`, senão o do processo)."""
+    return _scoped.get() or _global
+
+
+@contextmanager
+def profile_services(cprofile: bool = False, memory: bool = False,
+                     profiler: Optional[ServiceProfiler] = None) -> Iterator[ServiceProfiler]:
+    """Perfila as chamadas de serviço feitas dentro do bloco (nesta thread/contexto)."""
+    own = profiler is None
+    if own:
+        profiler = ServiceProfiler(cprofile=cprofile, memory=memory)
+    token = _scoped.set(profiler)
+    try:
+        yield profiler
+    finally:
+        _scoped.reset(token)
+        if own:
+            profiler.close()
+
+
+def profiled(cls):
+    """Decorador de classe: perfila os métodos públicos (nome sem "_").
+
+    Métodos geradores ficam de fora: o trabalho acontece fora da chamada,
+    durante a iteração (use a versão que devolve lista).
+    """
+    for attr, func in list(vars(cls).items()):
+        if attr.startswith("_") or not isinstance(func, FunctionType) or func.__code__.co_flags & _CO_GENERATOR:
+            continue
+        setattr(cls, attr, _wrap(f"{cls.__name__}.{attr}", func))
+    return cls
+
+
+def _wrap(name: str, func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        profiler = _scoped.get() or _global
+        if profiler is None or _current_call.get() is not None:
+            return func(*args, **kwargs)
+        return profiler.run(name, func, args, kwargs)
+    return wrapper
+
+
+def _from_environment(environ=os.environ) -> Optional[ServiceProfiler]:
+    """Liga o perfil do processo conforme SCHOOL_PROFILE (1, cprofile, memory, all)."""
+    value = environ.get(ENV_VAR, "").strip().lower()
+    if value in ("", "0", "off", "false"):
+        return None
+    options = {v.strip() for v in value.split(",")}
+    profiler = enable_profiling(cprofile=bool(options & {"cprofile", "all"}),
+                                memory=bool(options & {"memory", "tracemalloc", "all"}))
+    atexit.register(_report_at_exit, profiler, environ.get(ENV_DIR))
+    return profiler
+
+
+def _report_at_exit(profiler: ServiceProfiler, directory: Optional[str]) -> None:
+    if not profiler.summary():
+        return
+    print(profiler.report(), file=sys.stderr)
+    if directory:
+        for path in profiler.dump_pstats(directory):
+            print(f"pstats: {path}", file=sys.stderr)
+
+
+_from_environment()
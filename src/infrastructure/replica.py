@@ -0,0 +1,148 @@
+"""
+Réplica de leitura em memória para relatórios.
+
+Uma cópia consistente do banco é carregada num SQLite em memória (API de
+backup) e as consultas de relatório (list_all, notas do bimestre, frequência
+do período, boletins) passam a ler dela em vez do arquivo. Assim o fechamento
+do bimestre não disputa trava com quem está lançando notas.
+
+A cópia é refeita quando `PRAGMA data_version` indica que outra conexão
+gravou no arquivo. A verificação acontece no máximo a cada
+`refresh_interval` segundos, numa thread própria (background=True) ou na
+próxima consulta. Cada recarga vai para um banco em memória novo; consultas
+em andamento terminam na cópia antiga, e as novas já abrem a nova.
+
+A réplica pode estar até `refresh_interval` segundos atrasada: não use para
+ler logo depois de gravar (ex.: conferir a nota que acabou de ser lançada).
+Por isso as médias que vão para o AverageCache são lidas do arquivo
+(fresh=True): o cache só é invalidado no save, não na recarga.
+
+Uso:
+    db = DatabaseManager()
+    replica = db.enable_read_replica(refresh_interval=5.0)
+    servicos.gerar_boletim(...)      # lê da réplica
+    print(replica.stats())
+"""
+import itertools
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+_names = itertools.count(1)
+
+
+class ReadReplica:
+    """Cópia em memória (cache compartilhado) do banco, recarregada quando ele muda."""
+
+    def __init__(self, db_path, refresh_interval: float = 5.0, background: bool = True):
+        if refresh_interval <= 0:
+            raise ValueError("refresh_interval deve ser > 0")
+        self.db_path = Path(db_path)
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()       # uma recarga por vez
+        self._swap_lock = threading.Lock()  # troca de cópia x abertura de conexão
+        # Conexão que só observa o data_version do arquivo (nunca grava)
+        self._watch = sqlite3.connect(str(self.db_path), timeout=30.0, check_same_thread=False)
+        self._data_version = None
+        self._uri = None
+        self._anchor = None  # mantém vivo o banco em memória atual
+        self._last_check = 0.0
+
+        self.refreshes = 0
+        self.last_refresh_seconds = 0.0
+        self.refreshed_at = 0.0
+
+        self.refresh()
+        self._stop = threading.Event()
+        self._thread = None
+        if background:
+            self._thread = threading.Thread(target=self._run, name="read-replica", daemon=True)
+            self._thread.start()
+
+    def get_connection(self) -> sqlite3.Connection:
+        """Conexão somente leitura com a cópia atual."""
+        if self._thread is None and time.monotonic() - self._last_check >= self.refresh_interval:
+            self.refresh_if_changed()
+        with self._swap_lock:
+            conn = sqlite3.connect(self._uri, uri=True, check_same_thread=False)
+        conn.execute("PRAGMA query_only = ON")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def refresh_if_changed(self) -> bool:
+        """Recarrega se alguém gravou no arquivo desde a última cópia."""
+        with self._lock:
+            self._last_check = time.monotonic()
+            if self._current_data_version() == self._data_version:
+                return False
+        self.refresh()
+        return True
+
+    def refresh(self) -> None:
+        """Copia o arquivo inteiro para um banco em memória novo e passa a usá-lo."""
+        with self._lock:
+            inicio = time.perf_counter()
+            uri = f"file:replica_{next(_names)}?mode=memory&cache=shared"
+            anchor = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            source = sqlite3.connect(str(self.db_path), timeout=30.0, isolation_level=None)
+            # Lido antes da cópia: uma escrita no meio só causa uma recarga a mais
+            data_version = self._current_data_version()
+            try:
+                source.execute("BEGIN")
+                source.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+                source.backup(anchor)
+                source.execute("COMMIT")
+            except BaseException:
+                anchor.close()
+                raise
+            finally:
+                source.close()
+            self._data_version = data_version
+            with self._swap_lock:
+                old, self._anchor, self._uri = self._anchor, anchor, uri
+                if old is not None:
+                    old.close()  # o banco antigo some quando a última consulta nele fechar
+            self.refreshes += 1
+            self.last_refresh_seconds = time.perf_counter() - inicio
+            self.refreshed_at = time.time()
+            self._last_check = time.monotonic()
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            if self._anchor is not None:
+                self._anchor.close()
+                self._anchor = None
+            self._watch.close()
+
+    # --- Métricas ---
+
+    @property
+    def age(self) -> float:
+        """Segundos desde a última recarga."""
+        return time.time() - self.refreshed_at
+
+    def stats(self) -> dict:
+        return {
+            'refreshes': self.refreshes,
+            'last_refresh_ms': round(self.last_refresh_seconds * 1000, 2),
+            'age_seconds': round(self.age, 2),
+            'refresh_interval': self.refresh_interval,
+        }
+
+    # --- Interno ---
+
+    def _current_data_version(self) -> int:
+        # fetchall: um cursor não esgotado deixaria a transação de leitura aberta
+        return self._watch.execute("PRAGMA data_version").fetchall()[0][0]
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.refresh_if_changed()
+            except sqlite3.Error:
+                pass  # arquivo ocupado: tenta de novo no próximo ciclo
@@ -26,6 +26,8 @@ CREATE TABLE parents (
 );
 
 -- Vínculo Estudante-Responsável
+-- Tabelas de ligação são WITHOUT ROWID: a própria chave primária é a
+-- árvore da tabela (uma busca só, sem o rowid e o índice da chave à parte)
 CREATE TABLE student_parent (
     student_id INTEGER NOT NULL,
     parent_id INTEGER NOT NULL,
@@ -35,7 +37,7 @@ CREATE TABLE student_parent (
     PRIMARY KEY (student_id, parent_id),
     FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE,
     FOREIGN KEY (parent_id) REFERENCES parents(parent_id) ON DELETE CASCADE
-);
+) WITHOUT ROWID;
 
 -- Professores
 CREATE TABLE teachers (
@@ -48,14 +50,23 @@ CREATE TABLE teachers (
     CONSTRAINT chk_teacher_email CHECK (email LIKE '%@%')
 );
 
+-- Disciplinas (as demais tabelas guardam só o subject_id; ver subjects.py)
+CREATE TABLE subjects (
+    subject_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name VARCHAR(100) NOT NULL UNIQUE,
+
+    CONSTRAINT chk_subject_name CHECK (LENGTH(TRIM(name)) >= 1)
+);
+
 -- Disciplinas do Professor
 CREATE TABLE teacher_subjects (
     teacher_id INTEGER NOT NULL,
-    subject VARCHAR(100) NOT NULL,
+    subject_id INTEGER NOT NULL,
     
-    PRIMARY KEY (teacher_id, subject),
-    FOREIGN KEY (teacher_id) REFERENCES teachers(teacher_id) ON DELETE CASCADE
-);
+    PRIMARY KEY (teacher_id, subject_id),
+    FOREIGN KEY (teacher_id) REFERENCES teachers(teacher_id) ON DELETE CASCADE,
+    FOREIGN KEY (subject_id) REFERENCES subjects(subject_id) ON DELETE RESTRICT
+) WITHOUT ROWID;
 
 -- Turmas (turno e nível como texto direto)
 CREATE TABLE classrooms (
@@ -97,7 +108,7 @@ CREATE TABLE classroom_enrollments (
 CREATE TABLE assessments (
     assessment_id INTEGER PRIMARY KEY AUTOINCREMENT,
     title VARCHAR(200) NOT NULL,
-    subject VARCHAR(100) NOT NULL,
+    subject_id INTEGER NOT NULL,
     description TEXT,
     max_score DECIMAL(5,2) NOT NULL,
     weight DECIMAL(5,2) NOT NULL DEFAULT 1.0,
@@ -115,7 +126,8 @@ CREATE TABLE assessments (
     ),
     CONSTRAINT chk_bimester CHECK (
         bimester IN ('PRIMEIRO', 'SEGUNDO', 'TERCEIRO', 'QUARTO')
-    )
+    ),
+    FOREIGN KEY (subject_id) REFERENCES subjects(subject_id) ON DELETE RESTRICT
 );
 
 -- Notas
@@ -137,7 +149,7 @@ CREATE TABLE grades (
 CREATE TABLE attendance (
     attendance_id INTEGER PRIMARY KEY AUTOINCREMENT,
     student_id INTEGER NOT NULL,
-    subject VARCHAR(100) NOT NULL,
+    subject_id INTEGER NOT NULL,
     attendance_date DATE NOT NULL,
     is_present BOOLEAN NOT NULL DEFAULT 1,
     is_justified BOOLEAN NOT NULL DEFAULT 0,
@@ -149,15 +161,16 @@ CREATE TABLE attendance (
         (is_justified = 1 AND justification IS NOT NULL)
     ),
     FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE,
+    FOREIGN KEY (subject_id) REFERENCES subjects(subject_id) ON DELETE RESTRICT,
     
-    UNIQUE (student_id, subject, attendance_date)
+    UNIQUE (student_id, subject_id, attendance_date)
 );
 
 -- Boletins (tabela única com campo opcional para descritivo)
 CREATE TABLE report_cards (
     report_card_id INTEGER PRIMARY KEY AUTOINCREMENT,
     student_id INTEGER NOT NULL,
-    subject VARCHAR(100) NOT NULL,
+    subject_id INTEGER NOT NULL,
     bimester VARCHAR(20) NOT NULL,
     academic_year INTEGER NOT NULL,
     education_level VARCHAR(30) NOT NULL,
@@ -171,10 +184,28 @@ CREATE TABLE report_cards (
     CONSTRAINT chk_level_report CHECK (education_level IN ('INFANTIL', 'FUNDAMENTAL_I', 'FUNDAMENTAL_II', 'MEDIO')),
     CONSTRAINT chk_grade_range CHECK (grade IS NULL OR (grade >= 0 AND grade <= 10.0)),
     FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE,
+    FOREIGN KEY (subject_id) REFERENCES subjects(subject_id) ON DELETE RESTRICT,
     
-    UNIQUE (student_id, subject, bimester, academic_year)
+    UNIQUE (student_id, subject_id, bimester, academic_year)
+);
+
+-- Anos letivos encerrados e movidos para arquivo morto (somente leitura)
+CREATE TABLE archived_years (
+    academic_year INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT chk_archived_year CHECK (academic_year >= 2000)
 );
 
+-- Configurações gravadas no próprio banco (ex.: date_storage, ver date_storage.py)
+CREATE TABLE db_settings (
+    name VARCHAR(50) PRIMARY KEY,
+    value TEXT NOT NULL
+);
+
+INSERT INTO db_settings (name, value) VALUES ('date_storage', 'iso');
+
 
 -- ============================================================
 -- Índices para consultas frequentes
@@ -188,24 +219,131 @@ CREATE INDEX idx_student_name ON students(name);
 -- Busca de responsáveis por nome
 CREATE INDEX idx_parent_name ON parents(name);
 
+-- Filhos de um responsável (a PK de student_parent começa por student_id)
+CREATE INDEX idx_student_parent_parent ON student_parent(parent_id, student_id);
+
 -- Busca de professores por nome
 CREATE INDEX idx_teacher_name ON teachers(name);
 
 -- Frequência: busca por data e por aluno+disciplina
 CREATE INDEX idx_attendance_date ON attendance(attendance_date);
-CREATE INDEX idx_attendance_student_subject ON attendance(student_id, subject);
+CREATE INDEX idx_attendance_student_subject ON attendance(student_id, subject_id);
 
 -- Notas: busca por aluno
 CREATE INDEX idx_grade_student ON grades(student_id);
 
 -- Avaliações: busca por disciplina e bimestre
-CREATE INDEX idx_assessment_subject_bimester ON assessments(subject, bimester);
+CREATE INDEX idx_assessment_subject_bimester ON assessments(subject_id, bimester);
 
--- Matrículas: busca por aluno e por turma
-CREATE INDEX idx_enrollment_student ON classroom_enrollments(student_id);
-CREATE INDEX idx_enrollment_classroom ON classroom_enrollments(classroom_id);
+-- Matrículas: roster da turma no ano e turma atual do aluno
+-- (índices de cobertura: a consulta é respondida só pelo índice)
+CREATE INDEX idx_enrollment_roster ON classroom_enrollments(classroom_id, academic_year, status, student_id);
+CREATE INDEX idx_enrollment_student_year ON classroom_enrollments(student_id, academic_year, status, classroom_id);
 
 -- Boletins: busca por aluno e ano
 CREATE INDEX idx_report_student_year ON report_cards(student_id, academic_year);
 
 
+-- ============================================================
+-- Feed de alterações (change_log)
+-- Triggers registram cada INSERT/UPDATE/DELETE em notas, frequência,
+-- matrículas e vínculos aluno-responsável. Consumidores (ver
+-- change_feed.py) leem a partir do seu cursor e o log consumido por
+-- todos é podado.
+-- ============================================================
+
+-- seq com AUTOINCREMENT: nunca é reaproveitado, mesmo depois da poda
+CREATE TABLE change_log (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    table_name VARCHAR(50) NOT NULL,
+    op CHAR(1) NOT NULL,
+    pk INTEGER NOT NULL,
+    pk2 INTEGER,
+    student_id INTEGER,
+    changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT chk_change_op CHECK (op IN ('I', 'U', 'D'))
+);
+
+-- Cursor durável de cada consumidor (último seq processado)
+CREATE TABLE change_log_consumers (
+    consumer VARCHAR(100) PRIMARY KEY,
+    last_seq INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Notas
+CREATE TRIGGER trg_change_log_grades_ins AFTER INSERT ON grades
+BEGIN
+    INSERT INTO change_log (table_name, op, pk, pk2, student_id) VALUES ('grades', 'I', NEW.grade_id, NULL, NEW.student_id);
+END;
+
+CREATE TRIGGER trg_change_log_grades_upd AFTER UPDATE ON grades
+BEGIN
+    INSERT INTO change_log (table_name, op, pk, pk2, student_id)
+    SELECT 'grades', 'D', OLD.grade_id, NULL, OLD.student_id WHERE OLD.grade_id IS NOT NEW.grade_id;
+    INSERT INTO change_log (table_name, op, pk, pk2, student_id) VALUES ('grades', 'U', NEW.grade_id, NULL, NEW.student_id);
+END;
+
+CREATE TRIGGER trg_change_log_grades_del AFTER DELETE ON grades
+BEGIN
+    INSERT INTO change_log (table_name, op, pk, pk2, student_id) VALUES ('grades', 'D', OLD.grade_id, NULL, OLD.student_id);
+END;
+
+-- Frequência
+CREATE TRIGGER trg_change_log_attendance_ins AFTER INSERT ON attendance
+BEGIN
+    INSERT INTO change_log (table_name, op, pk, pk2, student_id) VALUES ('attendance', 'I', NEW.attendance_id, NULL, NEW.student_id);
+END;
+
+CREATE TRIGGER trg_change_log_attendance_upd AFTER UPDATE ON attendance
+BEGIN
+    INSERT INTO change_log (table_name, op, pk, pk2, student_id)
+    SELECT 'attendance', 'D', OLD.attendance_id, NULL, OLD.student_id WHERE OLD.attendance_id IS NOT NEW.attendance_id;
+    INSERT INTO change_log (table_name, op, pk, pk2, student_id) VALUES ('attendance', 'U', NEW.attendance_id, NULL, NEW.student_id);
+END;
+
+CREATE TRIGGER trg_change_log_attendance_del AFTER DELETE ON attendance
+BEGIN
+    INSERT INTO change_log (table_name, op, pk, pk2, student_id) VALUES ('attendance', 'D', OLD.attendance_id, NULL, OLD.student_id);
+END;
+
+-- Matrículas
+CREATE TRIGGER trg_change_log_classroom_enrollments_ins AFTER INSERT ON classroom_enrollments
+BEGIN
+    INSERT INTO change_log (table_name, op, pk, pk2, student_id) VALUES ('classroom_enrollments', 'I', NEW.enrollment_id, NULL, NEW.student_id);
+END;
+
+CREATE TRIGGER trg_change_log_classroom_enrollments_upd AFTER UPDATE ON classroom_enrollments
+BEGIN
+    INSERT INTO change_log (table_name, op, pk, pk2, student_id)
+    SELECT 'classroom_enrollments', 'D', OLD.enrollment_id, NULL, OLD.student_id WHERE OLD.enrollment_id IS NOT NEW.enrollment_id;
+    INSERT INTO change_log (table_name, op, pk, pk2, student_id) VALUES ('classroom_enrollments', 'U', NEW.enrollment_id, NULL, NEW.student_id);
+END;
+
+CREATE TRIGGER trg_change_log_classroom_enrollments_del AFTER DELETE ON classroom_enrollments
+BEGIN
+    INSERT INTO change_log (table_name, op, pk, pk2, student_id) VALUES ('classroom_enrollments', 'D', OLD.enrollment_id, NULL, OLD.student_id);
+END;
+
+-- Vínculos aluno-responsável (pk = student_id, pk2 = parent_id)
+CREATE TRIGGER trg_change_log_student_parent_ins AFTER INSERT ON student_parent
+BEGIN
+    INSERT INTO change_log (table_name, op, pk, pk2, student_id) VALUES ('student_parent', 'I', NEW.student_id, NEW.parent_id, NEW.student_id);
+END;
+
+CREATE TRIGGER trg_change_log_student_parent_upd AFTER UPDATE ON student_parent
+BEGIN
+    INSERT INTO change_log (table_name, op, pk, pk2, student_id)
+    SELECT 'student_parent', 'D', OLD.student_id, OLD.parent_id, OLD.student_id WHERE OLD.student_id IS NOT NEW.student_id OR OLD.parent_id IS NOT NEW.parent_id;
+    INSERT INTO change_log (table_name, op, pk, pk2, student_id) VALUES ('student_parent', 'U', NEW.student_id, NEW.parent_id, NEW.student_id);
+END;
+
+CREATE TRIGGER trg_change_log_student_parent_del AFTER DELETE ON student_parent
+BEGIN
+    INSERT INTO change_log (table_name, op, pk, pk2, student_id) VALUES ('student_parent', 'D', OLD.student_id, OLD.parent_id, OLD.student_id);
+END;
+
+
+-- Versão do schema (ver migrations.py)
+PRAGMA user_version = 7;
@@ -0,0 +1,184 @@
+"""
+Multi-escola: um arquivo SQLite por escola (shard) e um roteador.
+
+Cada escola é identificada por uma chave (ex: "escola_centro") e tem seu
+próprio arquivo `<chave>.db` dentro de `base_dir`, com pool de conexões
+próprio. Consultas da rede inteira (fan-out) rodam em paralelo, uma por
+escola, em processos separados, e os resultados são juntados no final.
+
+Uso:
+    rede = ShardedDatabaseManager("dados/escolas")
+    alunos = ShardedRepository(rede, StudentRepository)
+    alunos.save("escola_centro", Student(...))
+    aluno = alunos.find_by_id("escola_centro", 10)
+
+    em_risco = rede.alunos_em_risco(2024, limite=75.0)
+"""
+import os
+import re
+import threading
+from datetime import date
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from src.infrastructure.database import DatabaseManager
+
+
+_SCHOOL_KEY = re.compile(r'^[a-z0-9][a-z0-9_-]{0,63}$')
+
+
+class ShardedDatabaseManager:
+    """Roteia cada escola para o seu próprio DatabaseManager (arquivo + pool)."""
+
+    def __init__(self, base_dir: str, pool_size: int = 4, max_workers: Optional[int] = None):
+        self.base_dir = Path(base_dir)
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        self.pool_size = pool_size
+        self.max_workers = max_workers
+        self._shards: Dict[str, DatabaseManager] = {}
+        self._lock = threading.Lock()
+
+    def shard_path(self, school_key: str) -> Path:
+        """Caminho do arquivo da escola (valida a chave)."""
+        if not _SCHOOL_KEY.match(school_key or ""):
+            raise ValueError(f"Chave de escola inválida: '{school_key}'")
+        return self.base_dir / f"{school_key}.db"
+
+    def shard(self, school_key: str) -> DatabaseManager:
+        """Retorna o DatabaseManager da escola, criando o banco se não existir."""
+        manager = self._shards.get(school_key)
+        if manager is not None:
+            return manager
+        with self._lock:
+            manager = self._shards.get(school_key)
+            if manager is None:
+                path = self.shard_path(school_key)
+                is_new = not path.exists()
+                manager = DatabaseManager(str(path), pool_size=self.pool_size)
+                if is_new and not manager.initialize_database(verbose=False):
+                    raise RuntimeError(f"Não foi possível criar o banco da escola '{school_key}'.")
+                self._shards[school_key] = manager
+        return manager
+
+    def school_keys(self) -> List[str]:
+        """Escolas com arquivo no diretório base, em ordem alfabética."""
+        return sorted(p.stem for p in self.base_dir.glob("*.db") if _SCHOOL_KEY.match(p.stem))
+
+    def repository(self, repo_class, school_key: str):
+        """Instancia `repo_class` ligado ao banco da escola."""
+        return repo_class(self.shard(school_key))
+
+    def close(self) -> None:
+        """Fecha as conexões ociosas de todos os shards."""
+        with self._lock:
+            for manager in self._shards.values():
+                manager.close()
+            self._shards.clear()
+
+    # --- Consultas na rede inteira ---
+
+    def fan_out(self, func: Callable, *args, school_keys: Optional[List[str]] = None,
+                processes: bool = True) -> Dict[str, object]:
+        """Executa `func(db_manager, *args)` em cada escola, em paralelo.
+
+        Com processes=True, `func` precisa ser uma função de módulo
+        (serializável por pickle); cada processo abre o próprio banco.
+        Retorna {chave_da_escola: resultado}.
+        """
+        keys = school_keys if school_keys is not None else self.school_keys()
+        if not keys:
+            return {}
+        paths = [str(self.shard_path(k)) for k in keys]
+        workers = self.max_workers or min(len(keys), os.cpu_count() or 1)
+        # Import aqui: concurrent.futures (multiprocessing) pesa na partida da CLI
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+        executor_class = ProcessPoolExecutor if processes else ThreadPoolExecutor
+        with executor_class(max_workers=workers) as executor:
+            futures = [executor.submit(_run_on_shard, path, func, args) for path in paths]
+            return {key: f.result() for key, f in zip(keys, futures)}
+
+    def alunos_em_risco(self, year: int, limite: float = 75.0,
+                        processes: bool = True) -> List[dict]:
+        """Lista da rede: alunos com frequência abaixo de `limite` (%) no ano.
+
+        Ordenada do menor percentual para o maior; cada item traz a escola.
+        """
+        resultados = self.fan_out(attendance_risk, year, limite, processes=processes)
+        merged = [
+            dict(item, school=key)
+            for key, itens in resultados.items()
+            for item in itens
+        ]
+        merged.sort(key=lambda r: (r['percentual_presenca'], r['school'], r['student_id']))
+        return merged
+
+
+class ShardedRepository:
+    """Repositório roteado: cada método recebe a chave da escola primeiro.
+
+    Ex: ShardedRepository(rede, GradeRepository).save("escola_a", nota)
+    """
+
+    def __init__(self, sharded: ShardedDatabaseManager, repo_class):
+        self.sharded = sharded
+        self.repo_class = repo_class
+        self._repos: Dict[str, object] = {}
+
+    def for_school(self, school_key: str):
+        repo = self._repos.get(school_key)
+        if repo is None:
+            repo = self._repos[school_key] = self.sharded.repository(self.repo_class, school_key)
+        return repo
+
+    def __getattr__(self, name: str):
+        if name.startswith('_') or not hasattr(self.repo_class, name):
+            raise AttributeError(name)
+
+        def routed(school_key: str, *args, **kwargs):
+            return getattr(self.for_school(school_key), name)(*args, **kwargs)
+        routed.__name__ = name
+        return routed
+
+
+# =============================================
+# CONSULTAS EXECUTADAS EM CADA SHARD
+# (funções de módulo para poderem rodar em outro processo)
+# =============================================
+
+def _run_on_shard(db_path: str, func: Callable, args: tuple):
+    manager = DatabaseManager(db_path)
+    return func(manager, *args)
+
+
+def attendance_risk(db_manager, year: int, limite: float = 75.0) -> List[dict]:
+    """Alunos/disciplinas com percentual de presença abaixo de `limite` no ano."""
+    start, end = db_manager.date_value(date(year, 1, 1)), db_manager.date_value(date(year, 12, 31))
+    conn = db_manager.get_connection()
+    try:
+        # Ano encerrado é lido do arquivo morto anexado
+        schema = db_manager.attach_archive(conn, year)
+        rows = conn.execute(f"""
+            SELECT t.student_id, s.registration, s.name, sj.name AS subject,
+                   COUNT(*) AS total_aulas,
+                   SUM(t.is_present) AS presencas
+            FROM {schema}.attendance t
+            JOIN students s ON s.student_id = t.student_id
+            JOIN subjects sj ON sj.subject_id = t.subject_id
+            WHERE t.attendance_date BETWEEN ? AND ? AND s.active = 1
+            GROUP BY t.student_id, t.subject_id
+            HAVING SUM(t.is_present) * 100.0 / COUNT(*) < ?
+        """, (start, end, limite)).fetchall()
+    finally:
+        conn.close()
+    return [
+        {
+            'student_id': r['student_id'],
+            'registration': r['registration'],
+            'name': r['name'],
+            'subject': r['subject'],
+            'total_aulas': r['total_aulas'],
+            'presencas': r['presencas'],
+            'percentual_presenca': round(r['presencas'] * 100.0 / r['total_aulas'], 1),
+        }
+        for r in rows
+    ]
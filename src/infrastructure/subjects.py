@@ -0,0 +1,99 @@
+"""
+Catálogo de disciplinas: nome <-> subject_id em memória.
+
+`assessments`, `attendance`, `teacher_subjects` e `report_cards` guardam só
+o `subject_id` (inteiro) em vez do nome repetido em cada linha e em cada
+índice. O domínio continua falando em nomes ("Matemática"); os repositórios
+traduzem pelo catálogo, que mantém a tabela `subjects` inteira em memória
+(são dezenas de linhas) e só volta ao banco quando encontra um nome ou id
+que ainda não conhece, ex.: disciplina criada por outro processo.
+
+Ids nunca são reaproveitados (AUTOINCREMENT) e o nome de uma disciplina não
+muda, então o que já está em memória nunca fica errado.
+
+Uso:
+    catalogo = db_manager.subjects
+    subject_id = catalogo.id_for("Matemática", create=True)
+    catalogo.name_for(subject_id)    # "Matemática", sem consulta
+"""
+import threading
+from typing import Dict, Iterable, Optional
+
+
+class SubjectCatalog:
+    """Cache nome <-> id da tabela subjects de um DatabaseManager."""
+
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+        self._by_name: Dict[str, int] = {}
+        self._by_id: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self.reloads = 0
+
+    def id_for(self, name: Optional[str], create: bool = False) -> Optional[int]:
+        """Id da disciplina (None se não existir e create=False).
+
+        Com create=True a disciplina é cadastrada na hora. Chame antes de
+        abrir a conexão de escrita: o cadastro usa uma conexão própria.
+        """
+        if name is None:
+            return None
+        subject_id = self._by_name.get(name)
+        if subject_id is None:
+            self.reload()
+            subject_id = self._by_name.get(name)
+            if subject_id is None and create:
+                subject_id = self._create(name)
+        return subject_id
+
+    def ids_for(self, names: Iterable[str], create: bool = False) -> Dict[str, int]:
+        """{nome: id} dos nomes conhecidos (ou cadastrados, com create=True)."""
+        ids = {}
+        for name in names:
+            subject_id = self.id_for(name, create)
+            if subject_id is not None:
+                ids[name] = subject_id
+        return ids
+
+    def name_for(self, subject_id: Optional[int]) -> Optional[str]:
+        """Nome da disciplina (None se o id não existir)."""
+        name = self._by_id.get(subject_id)
+        if name is None and subject_id is not None:
+            self.reload()
+            name = self._by_id.get(subject_id)
+        return name
+
+    def reload(self) -> None:
+        """Relê a tabela subjects inteira."""
+        conn = self.db_manager.get_read_connection()
+        try:
+            rows = conn.execute("SELECT subject_id, name FROM subjects").fetchall()
+        finally:
+            conn.close()
+        with self._lock:
+            # Dicionários novos: quem está lendo os antigos não vê troca pela metade
+            self._by_id = {r[0]: r[1] for r in rows}
+            self._by_name = {r[1]: r[0] for r in rows}
+            self.reloads += 1
+
+    def clear(self) -> None:
+        """Esquece tudo (ex.: banco recriado)."""
+        with self._lock:
+            self._by_id = {}
+            self._by_name = {}
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def _create(self, name: str) -> int:
+        conn = self.db_manager.get_connection()
+        try:
+            conn.execute("INSERT OR IGNORE INTO subjects (name) VALUES (?)", (name,))
+            subject_id = conn.execute("SELECT subject_id FROM subjects WHERE name = ?", (name,)).fetchone()[0]
+            conn.commit()
+        finally:
+            conn.close()
+        with self._lock:
+            self._by_id = {**self._by_id, subject_id: name}
+            self._by_name = {**self._by_name, name: subject_id}
+        return subject_id
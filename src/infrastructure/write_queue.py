@@ -0,0 +1,270 @@
+"""
+Fila de escrita única com group commit.
+
+Várias threads enviam notas, presenças e matrículas; uma única thread
+escritora junta tudo em lotes e grava cada lote em UMA transação
+(a cada `max_delay_ms` milissegundos ou `max_batch` registros, o que
+vier primeiro). Cada envio devolve um `Future` resolvido com o ID gerado.
+
+Disciplina nova numa presença é cadastrada pela própria escritora, dentro
+do lote: quem enfileira não grava nada fora da fila.
+
+As notas gravadas são repassadas a `grade_listeners` depois do COMMIT do
+lote e antes de o futuro resolver (é por ali que o AverageCache invalida as
+médias; ver AverageCache.attach). O journal_mode do arquivo só muda com
+wal=True, e a mudança para WAL é permanente.
+
+Uso:
+    with WriteQueue(get_database()) as fila:
+        futuro = fila.submit_grade(nota)
+        grade_id = futuro.result()
+"""
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Optional
+
+from src.domain.models import Grade, Attendance
+
+
+# O SQL usa RETURNING para obter o ID mesmo quando o ON CONFLICT
+# transforma o INSERT em UPDATE.
+_GRADE_SQL = """
+    INSERT INTO grades (student_id, assessment_id, score)
+    VALUES (?, ?, ?)
+    ON CONFLICT(student_id, assessment_id) DO UPDATE SET score = excluded.score
+    RETURNING grade_id
+"""
+
+# A disciplina vai pelo nome: o id é resolvido na transação do lote
+_ATTENDANCE_SQL = """
+    INSERT INTO attendance (student_id, subject_id, attendance_date, is_present, is_justified, justification)
+    VALUES (?, (SELECT subject_id FROM subjects WHERE name = ?), ?, ?, ?, ?)
+    ON CONFLICT(student_id, subject_id, attendance_date) DO UPDATE SET
+        is_present = excluded.is_present, is_justified = excluded.is_justified,
+        justification = excluded.justification
+    RETURNING attendance_id
+"""
+
+_SUBJECT_SQL = "INSERT OR IGNORE INTO subjects (name) VALUES (?)"
+
+_ENROLLMENT_SQL = """
+    INSERT INTO classroom_enrollments (student_id, classroom_id, academic_year)
+    VALUES (?, ?, ?)
+    RETURNING enrollment_id
+"""
+
+_STOP = object()
+
+
+class WriteQueue:
+    """Coalesce escritas de muitas threads em transações agrupadas."""
+
+    def __init__(self, db_manager, max_batch: int = 500, max_delay_ms: float = 5.0,
+                 wal: bool = False):
+        if max_batch < 1:
+            raise ValueError("max_batch deve ser pelo menos 1.")
+        self.db_manager = db_manager
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000.0
+        self.wal = wal
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        # Erro que derrubou a thread escritora (ex: sem conexão com o banco)
+        self._error: Optional[BaseException] = None
+        # Chamados com cada Grade gravada, depois do COMMIT do lote
+        self.grade_listeners: List[Callable[[Grade], None]] = []
+
+        # Métricas simples
+        self.batches_committed = 0
+        self.writes_committed = 0
+        self.writes_failed = 0
+        self.listener_errors = 0
+
+    # --- Ciclo de vida ---
+
+    def start(self) -> "WriteQueue":
+        """Inicia a thread escritora (idempotente)."""
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="school-db-writer", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Grava o que estiver pendente e encerra a thread escritora."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # --- Envio de escritas ---
+
+    def submit_grade(self, grade: Grade) -> Future:
+        """Enfileira uma nota; o futuro resolve com o grade_id."""
+        student_id = grade.student.id if grade.student else None
+        assessment_id = grade.assessment.id if grade.assessment else None
+        future = self._submit(_GRADE_SQL, (student_id, assessment_id, float(grade.score)), grade)
+        future.add_done_callback(_assign_id(grade))
+        return future
+
+    def submit_attendance(self, attendance: Attendance) -> Future:
+        """Enfileira uma presença/falta; o futuro resolve com o attendance_id."""
+        student_id = attendance.student.id if attendance.student else None
+        # Só consulta o catálogo; disciplina nova é cadastrada pela escritora
+        known = self.db_manager.subjects.id_for(attendance.subject) is not None
+        new_subject = None if known else attendance.subject
+        future = self._submit(_ATTENDANCE_SQL, (
+            student_id, attendance.subject, self.db_manager.date_value(attendance.attendance_date),
+            1 if attendance.is_present else 0,
+            1 if attendance.justified else 0,
+            attendance.justification
+        ), subject=new_subject)
+        future.add_done_callback(_assign_id(attendance))
+        return future
+
+    def submit_enrollment(self, classroom_id: int, student_id: int, academic_year: int) -> Future:
+        """Enfileira uma matrícula; o futuro resolve com o enrollment_id.
+
+        Matrícula duplicada resolve o futuro com sqlite3.IntegrityError.
+        """
+        return self._submit(_ENROLLMENT_SQL, (student_id, classroom_id, academic_year))
+
+    def _submit(self, sql: str, params: tuple, grade: Optional[Grade] = None,
+                subject: Optional[str] = None) -> Future:
+        if self._closed:
+            raise RuntimeError("WriteQueue já foi encerrada.")
+        if self._thread is None:
+            self.start()
+        future: Future = Future()
+        self._queue.put((sql, params, future, grade, subject))
+        if self._error is not None:
+            self._fail_pending()  # a escritora caiu entre o teste acima e o put
+        return future
+
+    # --- Thread escritora ---
+
+    def _run(self) -> None:
+        try:
+            conn = self.db_manager.get_connection()
+        except BaseException as e:
+            self._fail(e)
+            return
+        try:
+            conn.isolation_level = None  # transações controladas manualmente
+            if self.wal:
+                conn.execute("PRAGMA journal_mode = WAL")
+            stop = False
+            while not stop:
+                item = self._queue.get()
+                if item is _STOP:
+                    break
+                batch = [item]
+                deadline = time.monotonic() + self.max_delay
+                while len(batch) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    try:
+                        item = self._queue.get(timeout=remaining) if remaining > 0 \
+                            else self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        stop = True
+                        break
+                    batch.append(item)
+                self._flush(conn, batch)
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            conn.close()
+
+    def _fail(self, error: BaseException) -> None:
+        """Encerra a fila: os futuros pendentes e os próximos envios recebem o erro."""
+        self._error = error
+        self._closed = True
+        self._fail_pending()
+
+    def _fail_pending(self) -> None:
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not _STOP and item[2].set_running_or_notify_cancel():
+                item[2].set_exception(self._error)
+                self.writes_failed += 1
+
+    def _flush(self, conn: sqlite3.Connection, batch: List) -> None:
+        """Grava um lote numa transação; cada item tem seu SAVEPOINT."""
+        # Cancelados antes de começar ficam fora do lote (e das métricas)
+        batch = [item for item in batch if item[2].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        results = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for sql, params, future, grade, subject in batch:
+                conn.execute("SAVEPOINT item")
+                try:
+                    if subject is not None:
+                        conn.execute(_SUBJECT_SQL, (subject,))
+                    rows = conn.execute(sql, params).fetchall()
+                    conn.execute("RELEASE item")
+                    results.append((future, rows[0][0], None, grade))
+                except sqlite3.Error as e:
+                    conn.execute("ROLLBACK TO item")
+                    conn.execute("RELEASE item")
+                    results.append((future, None, e, grade))
+            conn.execute("COMMIT")
+        except BaseException as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            for item in batch:
+                item[2].set_exception(e)
+            self.writes_failed += len(batch)
+            if not isinstance(e, sqlite3.Error):
+                raise  # _run encerra a fila
+            return
+
+        # Só resolve os futuros depois do COMMIT (IDs já são duráveis) e
+        # depois dos listeners: quem espera o futuro já lê a média nova
+        self.batches_committed += 1
+        for _, _, error, grade in results:
+            if error is None and grade is not None:
+                self._notify(grade)
+        for future, new_id, error, _ in results:
+            if error is None:
+                self.writes_committed += 1
+                future.set_result(new_id)
+            else:
+                self.writes_failed += 1
+                future.set_exception(error)
+
+    def _notify(self, grade: Grade) -> None:
+        for listener in self.grade_listeners:
+            try:
+                listener(grade)
+            except Exception:
+                # A nota já está gravada: o erro só entra na métrica, sem
+                # derrubar a escritora nem deixar o futuro sem resposta
+                self.listener_errors += 1
+
+
+def _assign_id(entity) -> Callable[[Future], None]:
+    """Callback que copia o ID gerado para a entidade enviada."""
+    def callback(future: Future) -> None:
+        if not future.cancelled() and future.exception() is None:
+            entity.id = future.result()
+    return callback
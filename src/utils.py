@@ -3,6 +3,18 @@ Funções utilitárias para validação de dados.
 """
 import re
 from datetime import datetime
+from typing import Iterable
+
+
+# Padrões compilados uma única vez (usados a cada construção de Student,
+# Teacher e Parent, inclusive nas leituras do banco)
+_NAO_DIGITOS = re.compile(r'[^0-9]')
+_PADRAO_EMAIL = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+# Tabelas do dígito verificador: _TABELA_DVn[posição][byte ASCII] já traz o
+# produto dígito × peso, evitando int() por caractere.
+_TABELA_DV1 = [[(c - 48) * (10 - i) if 48 <= c <= 57 else 0 for c in range(58)] for i in range(9)]
+_TABELA_DV2 = [[(c - 48) * (11 - i) if 48 <= c <= 57 else 0 for c in range(58)] for i in range(10)]
 
 
 def validar_cpf(cpf: str) -> bool:
@@ -19,7 +31,7 @@ def validar_cpf(cpf: str) -> bool:
         return False
     
     # Remove caracteres não numéricos
-    numeros = re.sub(r'[^0-9]', '', cpf)
+    numeros = normalizar_cpf(cpf)
     
     # Verifica se tem 11 dígitos
     if len(numeros) != 11:
@@ -29,20 +41,13 @@ def validar_cpf(cpf: str) -> bool:
     if numeros == numeros[0] * 11:
         return False
     
-    # Calcula primeiro dígito verificador
-    soma = 0
-    for i in range(9):
-        soma += int(numeros[i]) * (10 - i)
-    primeiro_digito = (soma * 10 % 11) % 10
-    
-    # Calcula segundo dígito verificador
-    soma = 0
-    for i in range(10):
-        soma += int(numeros[i]) * (11 - i)
-    segundo_digito = (soma * 10 % 11) % 10
+    # Calcula os dígitos verificadores pela tabela de produtos
+    codigos = numeros.encode('ascii')
+    primeiro_digito = (sum(map(list.__getitem__, _TABELA_DV1, codigos)) * 10 % 11) % 10
+    segundo_digito = (sum(map(list.__getitem__, _TABELA_DV2, codigos)) * 10 % 11) % 10
     
     # Verifica se os dígitos calculados conferem
-    return int(numeros[9]) == primeiro_digito and int(numeros[10]) == segundo_digito
+    return codigos[9] - 48 == primeiro_digito and codigos[10] - 48 == segundo_digito
 
 
 def validar_email(email: str) -> bool:
@@ -58,12 +63,10 @@ def validar_email(email: str) -> bool:
     if not email:
         return False
     
-    # Padrão básico: algo@dominio.extensão
-    padrao = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    
     email = email.strip().lower()
     
-    if not re.match(padrao, email):
+    # Padrão básico: algo@dominio.extensão
+    if not _PADRAO_EMAIL.match(email):
         return False
     
     # Verifica tamanhos
@@ -71,13 +74,46 @@ def validar_email(email: str) -> bool:
         return False
     
     # Verifica parte local (antes do @)
-    local = email.split('@')[0]
-    if len(local) > 64:
+    if email.index('@') > 64:
         return False
     
     return True
 
 
+def validar_cpfs(cpfs: Iterable[str], somente_erros: bool = False):
+    """
+    Valida vários CPFs de uma vez (importação em massa).
+    
+    Args:
+        cpfs: Sequência de CPFs (com ou sem formatação)
+        somente_erros: Se True, retorna apenas os inválidos
+        
+    Returns:
+        Lista de bool (máscara, na ordem recebida) ou, com somente_erros,
+        lista de (índice, cpf) dos CPFs inválidos
+    """
+    if somente_erros:
+        return [(i, cpf) for i, cpf in enumerate(cpfs) if not validar_cpf(cpf)]
+    return list(map(validar_cpf, cpfs))
+
+
+def validar_emails(emails: Iterable[str], somente_erros: bool = False):
+    """
+    Valida vários emails de uma vez (importação em massa).
+    
+    Args:
+        emails: Sequência de emails
+        somente_erros: Se True, retorna apenas os inválidos
+        
+    Returns:
+        Lista de bool (máscara, na ordem recebida) ou, com somente_erros,
+        lista de (índice, email) dos emails inválidos
+    """
+    if somente_erros:
+        return [(i, email) for i, email in enumerate(emails) if not validar_email(email)]
+    return list(map(validar_email, emails))
+
+
 def normalizar_cpf(cpf: str) -> str:
     """
     Remove formatação do CPF, retornando apenas números.
@@ -88,7 +124,9 @@ def normalizar_cpf(cpf: str) -> str:
     Returns:
         CPF com apenas dígitos
     """
-    return re.sub(r'[^0-9]', '', cpf)
+    if cpf.isascii() and cpf.isdigit():
+        return cpf
+    return _NAO_DIGITOS.sub('', cpf)
 
 
 def formatar_cpf(cpf: str) -> str:
@@ -0,0 +1,61 @@
+"""Fixtures compartilhadas pelos testes de integração (banco SQLite real)."""
+import pytest
+from pathlib import Path
+
+from src.infrastructure.database import (
+    DatabaseManager,
+    StudentRepository, TeacherRepository, ParentRepository,
+    ClassroomRepository, AssessmentRepository, GradeRepository, AttendanceRepository
+)
+
+
+SCHEMA_FILE = Path(__file__).parent.parent.parent / "src" / "infrastructure" / "schema.sql"
+
+
+@pytest.fixture
+def db_manager(tmp_path):
+    """Cria banco temporário para testes."""
+    db_path = str(tmp_path / "test_school.db")
+    manager = DatabaseManager(db_path)
+    # Aplicar schema silenciosamente
+    conn = manager.get_connection()
+    with open(SCHEMA_FILE, 'r', encoding='utf-8') as f:
+        conn.executescript(f.read())
+    conn.commit()
+    conn.close()
+    yield manager
+
+
+@pytest.fixture
+def student_repo(db_manager):
+    return StudentRepository(db_manager)
+
+
+@pytest.fixture
+def teacher_repo(db_manager):
+    return TeacherRepository(db_manager)
+
+
+@pytest.fixture
+def parent_repo(db_manager):
+    return ParentRepository(db_manager)
+
+
+@pytest.fixture
+def classroom_repo(db_manager):
+    return ClassroomRepository(db_manager)
+
+
+@pytest.fixture
+def assessment_repo(db_manager):
+    return AssessmentRepository(db_manager)
+
+
+@pytest.fixture
+def grade_repo(db_manager):
+    return GradeRepository(db_manager)
+
+
+@pytest.fixture
+def attendance_repo(db_manager):
+    return AttendanceRepository(db_manager)
@@ -0,0 +1,87 @@
+"""
+Teste de Integração: encerramento do ano letivo (arquivo morto).
+"""
+from datetime import date
+
+import pytest
+
+from src.application.services import ServicosDoAluno
+from src.infrastructure.archive import encerrar_ano_letivo, listar_anos_arquivados
+from src.infrastructure.exporter import Exporter
+from src.domain.models import (
+    Student, Classroom, Assessment, Grade, Attendance,
+    EducationLevel, Shift, Bimester, AssessmentType
+)
+
+
+@pytest.fixture
+def dois_anos(student_repo, classroom_repo, assessment_repo, grade_repo, attendance_repo):
+    """Notas e presenças de 2023 e 2024 para o mesmo aluno."""
+    aluno = student_repo.save(Student(name="Ana Lima", registration="A001", email="ana@escola.com"))
+    turma = classroom_repo.save(Classroom(year="6º Ano", identifier="A", shift=Shift.MANHA,
+                                          level=EducationLevel.FUNDAMENTAL_II))
+    for year, score in ((2023, 6.0), (2024, 9.0)):
+        classroom_repo.add_student_to_classroom(turma.id, aluno.id, year)
+        prova = assessment_repo.save(Assessment(
+            title=f"Prova {year}", subject="Matemática", max_score=10.0, weight=1.0,
+            assessment_type=AssessmentType.PROVA, bimester=Bimester.PRIMEIRO, academic_year=year))
+        grade_repo.save(Grade(student=aluno, assessment=prova, score=score))
+        attendance_repo.save(Attendance(student=aluno, subject="Matemática",
+                                        attendance_date=date(year, 12, 15), is_present=True))
+    return aluno
+
+
+def _count(db_manager, table):
+    conn = db_manager.get_connection()
+    n = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    conn.close()
+    return n
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_ano_encerrado_sai_do_banco_principal_e_continua_consultavel(
+        tmp_path, db_manager, dois_anos, assessment_repo, grade_repo, attendance_repo, compress):
+    aluno = dois_anos
+    result = encerrar_ano_letivo(db_manager, 2023, archive_dir=str(tmp_path / "arq"), compress=compress)
+
+    assert result.rows == {"assessments": 1, "grades": 1, "attendance": 1, "classroom_enrollments": 1}
+    assert listar_anos_arquivados(db_manager) == [2023]
+    assert _count(db_manager, "grades") == 1
+    assert _count(db_manager, "assessments") == 1
+    # Mover para o arquivo morto não aparece como exclusão no feed de alterações
+    conn = db_manager.get_connection()
+    assert conn.execute("SELECT COUNT(*) FROM change_log WHERE op = 'D'").fetchone()[0] == 0
+    conn.close()
+
+    # Leituras de 2023 anexam o arquivo morto de forma transparente
+    grades = grade_repo.find_by_student_and_bimester(aluno.id, "Matemática", Bimester.PRIMEIRO, 2023)
+    assert [g.score for g in grades] == [6.0]
+    assert grade_repo.find_by_student_and_bimester(aluno.id, "Matemática", Bimester.PRIMEIRO, 2024)[0].score == 9.0
+    servicos = ServicosDoAluno(grade_repo, assessment_repo, None, None)
+    assert servicos.gerar_boletim(aluno.id, "Matemática", 2023).media_1bim == 6.0
+    assert servicos.gerar_boletim(aluno.id, "Matemática", 2024).media_1bim == 9.0
+
+    # Período que atravessa o ano arquivado e o atual
+    presencas = attendance_repo.find_by_student_and_period(
+        aluno.id, "Matemática", date(2023, 12, 1), date(2024, 12, 31))
+    assert [a.attendance_date for a in presencas] == [date(2023, 12, 15), date(2024, 12, 15)]
+
+    _, rows = Exporter(db_manager).iter_rows('grades', year=2023)
+    assert len(list(rows)) == 1
+
+
+def test_arquivo_morto_e_somente_leitura(tmp_path, db_manager, dois_anos):
+    encerrar_ano_letivo(db_manager, 2023, archive_dir=str(tmp_path / "arq"))
+    conn = db_manager.get_connection()
+    schema = db_manager.attach_archive(conn, 2023)
+    with pytest.raises(Exception, match="readonly"):
+        conn.execute(f"DELETE FROM {schema}.grades")
+    conn.close()
+
+
+def test_nao_encerra_ano_atual_nem_repete(tmp_path, db_manager, dois_anos):
+    with pytest.raises(ValueError, match="ainda não foi encerrado"):
+        encerrar_ano_letivo(db_manager, date.today().year)
+    encerrar_ano_letivo(db_manager, 2023, archive_dir=str(tmp_path / "arq"))
+    with pytest.raises(ValueError):
+        encerrar_ano_letivo(db_manager, 2023, archive_dir=str(tmp_path / "outro"))
@@ -0,0 +1,132 @@
+"""
+Teste de Integração: cache das médias bimestrais.
+"""
+import pytest
+
+from src.application.services import ServicosDoAluno
+from src.infrastructure.average_cache import AverageCache
+from src.infrastructure.database import AssessmentRepository, GradeRepository
+from src.domain.models import Student, Assessment, Grade, Bimester, AssessmentType
+
+
+@pytest.fixture
+def notas(student_repo, assessment_repo, grade_repo):
+    """Dois alunos com duas provas de Matemática no 1º bimestre de 2024."""
+    alunos = [
+        student_repo.save(Student(name=nome, registration=reg, email=f"{reg}@escola.com"))
+        for nome, reg in (("Ana", "C001"), ("Beto", "C002"))
+    ]
+    provas = [
+        assessment_repo.save(Assessment(
+            title=f"Prova {i}", subject="Matemática", max_score=10.0, weight=1.0,
+            assessment_type=AssessmentType.PROVA, bimester=Bimester.PRIMEIRO, academic_year=2024))
+        for i in range(2)
+    ]
+    for aluno, scores in zip(alunos, ((6.0, 8.0), (4.0, 10.0))):
+        for prova, score in zip(provas, scores):
+            grade_repo.save(Grade(student=aluno, assessment=prova, score=score))
+    return alunos, provas
+
+
+def _servicos(grade_repo, assessment_repo, student_repo, attendance_repo, cache):
+    return ServicosDoAluno(grade_repo, assessment_repo, student_repo, attendance_repo, media_cache=cache)
+
+
+def test_cache_hit_e_invalidacao_por_nota(grade_repo, assessment_repo, student_repo, attendance_repo, notas):
+    alunos, provas = notas
+    cache = AverageCache(max_entries=100)
+    srv = _servicos(grade_repo, assessment_repo, student_repo, attendance_repo, cache)
+
+    assert srv.calcular_media_bimestral(alunos[0].id, "Matemática", Bimester.PRIMEIRO, 2024) == 7.0
+    assert srv.calcular_media_bimestral(alunos[0].id, "Matemática", Bimester.PRIMEIRO, 2024) == 7.0
+    assert srv.calcular_media_bimestral(alunos[1].id, "Matemática", Bimester.PRIMEIRO, 2024) == 7.0
+    assert (cache.hits, cache.misses) == (1, 2)
+
+    # Nota nova do aluno 0 só derruba a média dele
+    grade_repo.save(Grade(student=alunos[0], assessment=provas[0], score=10.0))
+    assert len(cache) == 1
+    assert srv.calcular_media_bimestral(alunos[0].id, "Matemática", Bimester.PRIMEIRO, 2024) == 9.0
+    assert srv.calcular_media_bimestral(alunos[1].id, "Matemática", Bimester.PRIMEIRO, 2024) == 7.0
+    assert cache.stats()['hit_rate'] == 0.4
+
+
+def test_mudanca_de_peso_invalida_todos_os_alunos(grade_repo, assessment_repo, student_repo,
+                                                 attendance_repo, notas):
+    alunos, provas = notas
+    cache = AverageCache()
+    srv = _servicos(grade_repo, assessment_repo, student_repo, attendance_repo, cache)
+    for aluno in alunos:
+        srv.calcular_media_bimestral(aluno.id, "Matemática", Bimester.PRIMEIRO, 2024)
+
+    provas[1].weight = 3.0
+    assessment_repo.save(provas[1])  # avaliação com notas: UPDATE, não REPLACE
+
+    assert len(cache) == 0
+    assert srv.calcular_media_bimestral(alunos[0].id, "Matemática", Bimester.PRIMEIRO, 2024) == 7.5
+    assert srv.calcular_media_bimestral(alunos[1].id, "Matemática", Bimester.PRIMEIRO, 2024) == 8.5
+
+
+def test_limite_de_tamanho_descarta_o_menos_usado():
+    cache = AverageCache(max_entries=2)
+    cache.put((1, "Matemática", "PRIMEIRO", 2024), 7.0, [1])
+    cache.put((2, "Matemática", "PRIMEIRO", 2024), 8.0, [1])
+    cache.get((1, "Matemática", "PRIMEIRO", 2024))
+    cache.put((3, "Matemática", "PRIMEIRO", 2024), 9.0, [1])
+
+    assert cache.get((2, "Matemática", "PRIMEIRO", 2024)) is AverageCache.MISSING
+    assert cache.get((1, "Matemática", "PRIMEIRO", 2024)) == 7.0
+    assert cache.evictions == 1
+
+
+def test_persistencia_entre_reinicios(db_manager, student_repo, attendance_repo, notas):
+    alunos, provas = notas
+    grade_repo, assessment_repo = GradeRepository(db_manager), AssessmentRepository(db_manager)
+    primeiro = AverageCache(db_manager=db_manager, persist=True)
+    srv = _servicos(grade_repo, assessment_repo, student_repo, attendance_repo, primeiro)
+    for aluno in alunos:
+        srv.calcular_media_bimestral(aluno.id, "Matemática", Bimester.PRIMEIRO, 2024)
+    assert primeiro.stats()['pending'] == 2
+    assert primeiro.flush() == 2
+
+    # Escrita sem passar pelo cache (outro processo): o trigger limpa a tabela
+    outro_repo = GradeRepository(db_manager)
+    outro_repo.save(Grade(student=alunos[1], assessment=provas[0], score=10.0))
+
+    segundo = AverageCache(db_manager=db_manager, persist=True)
+    assert len(segundo) == 1
+    srv = _servicos(GradeRepository(db_manager), assessment_repo, student_repo, attendance_repo, segundo)
+    assert srv.calcular_media_bimestral(alunos[0].id, "Matemática", Bimester.PRIMEIRO, 2024) == 7.0
+    assert srv.calcular_media_bimestral(alunos[1].id, "Matemática", Bimester.PRIMEIRO, 2024) == 10.0
+    assert (segundo.hits, segundo.misses) == (1, 1)
+
+
+def test_persistencia_grava_em_lote_o_valor_do_banco(db_manager, student_repo, attendance_repo, notas):
+    """Nota alterada por outro processo entre o cálculo e a gravação não fica velha na tabela."""
+    alunos, provas = notas
+    cache = AverageCache(db_manager=db_manager, persist=True, flush_every=3)
+    srv = _servicos(GradeRepository(db_manager), AssessmentRepository(db_manager), student_repo,
+                    attendance_repo, cache)
+
+    def gravadas():
+        conn = db_manager.get_connection()
+        try:
+            return {(r[0], r[1]): r[2]
+                    for r in conn.execute("SELECT student_id, bimester, media FROM average_cache")}
+        finally:
+            conn.close()
+
+    for aluno in alunos:
+        assert srv.calcular_media_bimestral(aluno.id, "Matemática", Bimester.PRIMEIRO, 2024) == 7.0
+    assert gravadas() == {}  # leitura não abre transação de escrita
+
+    conn = db_manager.get_connection()
+    conn.execute("UPDATE grades SET score = 10.0 WHERE student_id = ? AND assessment_id = ?",
+                 (alunos[0].id, provas[0].id))
+    conn.commit()
+    conn.close()
+
+    # A terceira média completa o lote: grava as três numa transação
+    srv.calcular_media_bimestral(alunos[0].id, "Matemática", Bimester.SEGUNDO, 2024)
+    assert gravadas() == {(alunos[0].id, "PRIMEIRO"): 9.0, (alunos[1].id, "PRIMEIRO"): 7.0,
+                          (alunos[0].id, "SEGUNDO"): None}
+    assert cache.stats()['pending'] == 0
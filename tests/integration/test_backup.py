@@ -0,0 +1,104 @@
+"""
+Teste de Integração: backup a quente, rotação e restauração.
+"""
+import sqlite3
+import threading
+
+import pytest
+
+from src.infrastructure.backup import fazer_backup, listar_backups, restaurar_backup
+from src.infrastructure.database import DatabaseManager, StudentRepository
+from src.domain.models import Student
+
+
+def _popular(db_manager, n, inicio=0):
+    conn = db_manager.get_connection()
+    conn.executemany(
+        "INSERT INTO students (name, registration, email) VALUES (?, ?, ?)",
+        [(f"Aluno {i}", f"B{i:05d}", f"b{i}@escola.com") for i in range(inicio, inicio + n)])
+    conn.commit()
+    conn.close()
+
+
+def _contar(path):
+    conn = sqlite3.connect(str(path))
+    try:
+        return conn.execute("SELECT COUNT(*) FROM students").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_backup_em_passos_e_restauracao(db_manager, tmp_path):
+    _popular(db_manager, 2000)
+    resultado = fazer_backup(db_manager, pages=5, pause=0)
+
+    assert resultado.path.exists()
+    assert resultado.path.parent == db_manager.db_path.parent / "backups"
+    assert resultado.steps > 1
+    assert resultado.pages > 0 and resultado.pages_per_second > 0
+    assert 0 < resultado.max_lock_seconds <= resultado.locked_seconds
+    assert not list(resultado.path.parent.glob("*.partial"))
+
+    restaurado = restaurar_backup(resultado.path, tmp_path / "restaurado" / "school.db")
+    assert _contar(restaurado) == 2000
+    # O restaurado é um banco normal para o DatabaseManager
+    nomes = StudentRepository(DatabaseManager(str(restaurado))).select("name", where={"registration": "B00010"})
+    assert nomes == ["Aluno 10"]
+
+    with pytest.raises(ValueError, match="já existe"):
+        restaurar_backup(resultado.path, restaurado)
+
+
+def test_rotacao_mantem_os_mais_recentes(db_manager, tmp_path):
+    pasta = tmp_path / "copias"
+    feitos = [fazer_backup(db_manager, backup_dir=str(pasta), keep=2) for _ in range(4)]
+
+    assert listar_backups(db_manager, str(pasta)) == [feitos[2].path, feitos[3].path]
+    assert feitos[2].removed == [feitos[0].path]
+    assert feitos[3].removed == [feitos[1].path]
+
+
+def test_backup_nao_impede_escritas(db_manager):
+    _popular(db_manager, 3000)
+    repo = StudentRepository(db_manager)
+    erros = []
+
+    def lancar():
+        try:
+            for i in range(20):
+                repo.save(Student(name=f"Novo {i}", registration=f"N{i:04d}", email=f"n{i}@escola.com"))
+        except Exception as exc:  # pragma: no cover - falha do teste
+            erros.append(exc)
+
+    escritor = threading.Thread(target=lancar)
+    escritor.start()
+    resultado = fazer_backup(db_manager, pages=2, pause=0.001)
+    escritor.join()
+
+    assert not erros
+    assert _contar(db_manager.db_path) == 3020
+    # Retrato consistente: antes, no meio (recomeço) ou depois das escritas
+    assert 3000 <= _contar(resultado.path) <= 3020
+
+
+def test_backup_wal_usa_retrato_fixo(db_manager, monkeypatch):
+    _popular(db_manager, 3000)
+    conn = db_manager.get_connection()
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.close()
+    repo = StudentRepository(db_manager)
+    gravados = []
+
+    def escrever_na_pausa(_segundos):
+        # Outra conexão grava entre os passos da cópia
+        n = len(gravados)
+        gravados.append(repo.save(Student(name="Meio", registration=f"W{n:04d}", email=f"w{n}@escola.com")))
+
+    monkeypatch.setattr("src.infrastructure.backup.time.sleep", escrever_na_pausa)
+    resultado = fazer_backup(db_manager, pages=5, pause=0.001)
+    monkeypatch.undo()
+
+    assert resultado.journal_mode == "wal"
+    assert len(gravados) > 1 and resultado.restarts == 0
+    assert resultado.locked_seconds == 0.0
+    assert _contar(resultado.path) == 3000
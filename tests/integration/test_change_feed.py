@@ -0,0 +1,109 @@
+"""
+Teste de Integração: feed de alterações (change_log) e consumidores.
+"""
+from datetime import date
+
+import pytest
+
+from src.domain.models import Student, Parent, Assessment, Grade, Attendance, Bimester, AssessmentType
+from src.infrastructure.change_feed import ChangeFeed, latest, prune_change_log
+
+
+@pytest.fixture
+def prova(student_repo, assessment_repo):
+    aluno = student_repo.save(Student(name="Ana Lima", registration="CDC001", email="ana@escola.com"))
+    prova = assessment_repo.save(Assessment(
+        title="Prova 1", subject="Matemática", max_score=10.0, weight=1.0,
+        assessment_type=AssessmentType.PROVA, bimester=Bimester.PRIMEIRO, academic_year=2024))
+    return aluno, prova
+
+
+def test_triggers_registram_operacao_tabela_e_chave(db_manager, grade_repo, parent_repo, student_repo, prova):
+    aluno, avaliacao = prova
+    feed = ChangeFeed(db_manager, "warehouse")
+
+    nota = grade_repo.save(Grade(student=aluno, assessment=avaliacao, score=6.0))
+    grade_repo.save(Grade(student=aluno, assessment=avaliacao, score=8.5))  # correção (upsert)
+    mae = parent_repo.save(Parent(name="Carla Lima", email="carla@email.com", cpf="52998224725"))
+    parent_repo.link_to_student(mae.id, aluno.id)
+    student_repo.delete(aluno.id)  # cascata apaga nota e vínculo
+
+    mudancas = feed.read()
+    assert [(c.table, c.op, c.pk, c.pk2) for c in mudancas] == [
+        ("grades", "I", nota.id, None),
+        ("grades", "U", nota.id, None),
+        ("student_parent", "I", aluno.id, mae.id),
+        ("grades", "D", nota.id, None),
+        ("student_parent", "D", aluno.id, mae.id),
+    ]
+    assert [c.seq for c in mudancas] == sorted(c.seq for c in mudancas)
+    assert {c.student_id for c in mudancas} == {aluno.id}
+    # Linha apagada: só a última mudança de cada chave interessa
+    assert [(c.table, c.op) for c in latest(mudancas)] == [("grades", "D"), ("student_parent", "D")]
+    assert feed.pending() == 5
+
+
+def test_consumidor_rele_notas_e_presencas_pela_chave(db_manager, grade_repo, attendance_repo, prova):
+    aluno, avaliacao = prova
+    nota = grade_repo.save(Grade(student=aluno, assessment=avaliacao, score=6.0))
+    grade_repo.save(Grade(student=aluno, assessment=avaliacao, score=8.5))
+    falta = attendance_repo.save(Attendance(student=aluno, subject="Matemática",
+                                            attendance_date=date(2024, 3, 4), is_present=False))
+
+    mudancas = latest(ChangeFeed(db_manager, "warehouse").read())
+    chaves = {t: [c.pk for c in mudancas if c.table == t] for t in ("grades", "attendance")}
+    assert chaves == {"grades": [nota.id], "attendance": [falta.id]}
+
+    [atual] = grade_repo.find_by_ids(chaves["grades"] + [9999]).values()
+    assert (atual.score, atual.student.id, atual.assessment.subject) == (8.5, aluno.id, "Matemática")
+    [presenca] = attendance_repo.find_by_ids(chaves["attendance"]).values()
+    assert (presenca.student.id, presenca.subject, presenca.is_present) == (aluno.id, "Matemática", False)
+    assert grade_repo.find_by_ids([]) == {}
+
+
+def test_cursor_duravel_e_lote_reentregue_se_falhar(db_manager, grade_repo, student_repo, prova):
+    _, avaliacao = prova
+    for i in range(5):
+        aluno = student_repo.save(Student(name=f"Aluno {i}", registration=f"CDC1{i}", email=f"a{i}@escola.com"))
+        grade_repo.save(Grade(student=aluno, assessment=avaliacao, score=float(i)))
+
+    feed = ChangeFeed(db_manager, "sms", batch_size=2)
+    lotes = []
+    for lote in feed.batches():
+        lotes.append(lote)
+        if len(lotes) == 2:
+            break  # "falha" no segundo lote: ele não é confirmado
+    assert feed.position == lotes[0][-1].seq
+
+    # Outro processo, mesmo consumidor: retoma do cursor salvo no banco
+    retomado = ChangeFeed(db_manager, "sms", batch_size=2)
+    restantes = list(retomado.batches())
+    assert restantes[0] == lotes[1]
+    assert [c.pk for lote in restantes for c in lote] == [3, 4, 5]
+    assert retomado.pending() == 0
+
+
+def test_poda_respeita_consumidor_mais_atrasado(db_manager, grade_repo, student_repo, prova):
+    aluno, avaliacao = prova
+    rapido = ChangeFeed(db_manager, "warehouse")
+    lento = ChangeFeed(db_manager, "sms", tables=["grades"])
+    grade_repo.save(Grade(student=aluno, assessment=avaliacao, score=5.0))
+    grade_repo.save(Grade(student=aluno, assessment=avaliacao, score=6.0))
+
+    for _ in rapido.batches():
+        pass
+    assert prune_change_log(db_manager) == 0
+
+    primeira = lento.read(limit=1)[0]
+    lento.ack(primeira.seq)
+    assert prune_change_log(db_manager) == 1
+    assert [c.op for c in rapido.read(after=0)] == ["U"]
+
+    # Consumidor novo começando do fim não segura a poda
+    ChangeFeed(db_manager, "novo", from_end=True)
+    lento.unregister()
+    assert prune_change_log(db_manager) == 1
+    assert rapido.read(after=0) == []
+
+    with pytest.raises(ValueError):
+        ChangeFeed(db_manager, "x", tables=["students"])
@@ -0,0 +1,53 @@
+"""
+Teste de Integração: linha de comando (python -m src).
+"""
+from datetime import date
+
+from src.cli import main
+from src.infrastructure.database import DatabaseManager, StudentRepository, AttendanceRepository
+from src.infrastructure.migrations import LATEST_VERSION, versao_atual
+from src.domain.models import Student, Attendance
+
+
+def test_init_migrate_e_report_risk(tmp_path, capsys):
+    db = str(tmp_path / "cli.db")
+    assert main(["init", "--db", db, "-q"]) == 0
+    assert main(["init", "--db", db, "-q"]) == 1  # já existe
+    assert main(["migrate", "--db", db]) == 0
+    assert "já está na versão" in capsys.readouterr().out
+    assert versao_atual(DatabaseManager(db)) == LATEST_VERSION
+
+    manager = DatabaseManager(db)
+    aluno = StudentRepository(manager).save(Student(name="Ana", registration="C001", email="ana@escola.com"))
+    presencas = AttendanceRepository(manager)
+    for dia, presente in ((1, True), (2, False), (3, False), (4, True)):
+        presencas.save(Attendance(student=aluno, subject="História",
+                                  attendance_date=date(2024, 3, dia), is_present=presente))
+
+    assert main(["report", "risk", "--db", db, "--year", "2024"]) == 0
+    saida = capsys.readouterr()
+    assert saida.out.strip() == "C001\tAna\tHistória\t2/4\t50.0%"
+    assert "1 aluno(s)/disciplina(s)" in saida.err
+
+    assert main(["report", "missing", "--db", db, "--year", "2024"]) == 0
+    assert "0 nota(s) faltando em 2024" in capsys.readouterr().err
+
+
+def test_subcomandos_repassados(tmp_path, capsys):
+    db = str(tmp_path / "cli.db")
+    main(["init", "--db", db, "-q"])
+    saida_csv = tmp_path / "alunos.csv"
+    assert main(["export", "grades", "--db", db, "-o", str(saida_csv)]) == 0
+    assert saida_csv.read_text(encoding="utf-8").startswith("grade_id,")
+
+    assert main(["bench", "--list"]) == 0
+    assert "projection" in capsys.readouterr().out
+    assert main(["bench", "inexistente"]) == 2
+
+
+def test_importar_main_nao_executa_a_demonstracao(capsys):
+    import importlib
+    import main as demo
+    importlib.reload(demo)
+    assert capsys.readouterr().out == ""
+    assert callable(demo.main)
@@ -0,0 +1,80 @@
+"""
+Teste de Integração: datas gravadas como número do dia (date_storage "days").
+"""
+from datetime import date
+
+from src.application.services import ServicosDoAluno
+from src.domain.models import (
+    Student, Classroom, Assessment, Attendance,
+    EducationLevel, Shift, Bimester, AssessmentType
+)
+from src.infrastructure.archive import encerrar_ano_letivo
+from src.infrastructure.date_storage import converter_datas, from_day_number, to_day_number
+from src.infrastructure.exporter import Exporter
+
+
+def _tipos(db_manager, schema="main"):
+    conn = db_manager.get_connection()
+    if schema != "main":
+        schema = db_manager.attach_archive(conn, 2023)
+    tipos = {r[0] for r in conn.execute(f"SELECT typeof(attendance_date) FROM {schema}.attendance")}
+    tipos |= {r[0] for r in conn.execute(f"SELECT typeof(assessment_date) FROM {schema}.assessments")}
+    conn.close()
+    return tipos
+
+
+def test_numero_do_dia_e_o_dia_juliano_do_sqlite(db_manager):
+    conn = db_manager.get_connection()
+    dia = to_day_number(date(2024, 3, 1))
+    row = conn.execute("SELECT date(?), CAST(julianday('2024-03-01') + 0.5 AS INTEGER)", (dia,)).fetchone()
+    assert tuple(row) == ("2024-03-01", dia)
+    conn.close()
+    assert from_day_number(dia) == date(2024, 3, 1)
+
+
+def test_converte_banco_e_arquivo_morto_sem_mudar_leituras(tmp_path, db_manager, student_repo, classroom_repo,
+                                                         assessment_repo, attendance_repo, grade_repo):
+    aluno = student_repo.save(Student(name="Ana Lima", registration="A001", email="ana@escola.com"))
+    turma = classroom_repo.save(Classroom(year="6º Ano", identifier="A", shift=Shift.MANHA,
+                                          level=EducationLevel.FUNDAMENTAL_II))
+    for year in (2023, 2024):
+        classroom_repo.add_student_to_classroom(turma.id, aluno.id, year)
+        assessment_repo.save(Assessment(
+            title=f"Prova {year}", subject="Matemática", max_score=10.0, weight=1.0,
+            assessment_type=AssessmentType.PROVA, bimester=Bimester.PRIMEIRO, academic_year=year,
+            assessment_date=date(year, 3, 20)))
+        for dia in (4, 5, 6):
+            attendance_repo.save(Attendance(student=aluno, subject="Matemática",
+                                            attendance_date=date(year, 3, dia), is_present=dia != 5))
+    encerrar_ano_letivo(db_manager, 2023, archive_dir=str(tmp_path / "arq"), compress=True)
+    conn = db_manager.get_connection()
+    change_log = conn.execute("SELECT COUNT(*) FROM change_log").fetchone()[0]
+    conn.close()
+    servicos = ServicosDoAluno(grade_repo, assessment_repo, student_repo, attendance_repo)
+    antes = servicos.consultar_extrato(aluno.id, "Matemática", date(2023, 1, 1), date(2024, 12, 31))
+    _, linhas = Exporter(db_manager).iter_rows('attendance', year=2024)
+    exportado = list(linhas)
+
+    assert converter_datas(db_manager, "days") == {"attendance": 3, "assessments": 1}
+    assert db_manager.date_storage == "days"
+    assert _tipos(db_manager) == _tipos(db_manager, "arquivo") == {"integer"}
+    conn = db_manager.get_connection()
+    assert conn.execute("SELECT COUNT(*) FROM change_log").fetchone()[0] == change_log
+    conn.close()
+
+    # Mesmo extrato (atravessando o arquivo morto), mesma exportação em texto ISO
+    depois = servicos.consultar_extrato(aluno.id, "Matemática", date(2023, 1, 1), date(2024, 12, 31))
+    assert (depois.total_aulas, depois.faltas) == (antes.total_aulas, antes.faltas) == (6, 2)
+    _, linhas = Exporter(db_manager).iter_rows('attendance', year=2024)
+    assert list(linhas) == exportado
+    assert assessment_repo.list_all()[0].assessment_date == date(2024, 3, 20)
+    assert attendance_repo.select("attendance_id", where={"attendance_date": date(2024, 3, 5)}) != []
+
+    # Novas gravações já saem no modo do banco
+    attendance_repo.save(Attendance(student=aluno, subject="Matemática", attendance_date=date(2024, 3, 7)))
+    assert _tipos(db_manager) == {"integer"}
+
+    converter_datas(db_manager, "iso", vacuum=False)
+    assert _tipos(db_manager) == _tipos(db_manager, "arquivo") == {"text"}
+    assert len(attendance_repo.find_by_student_and_period(
+        aluno.id, "Matemática", date(2024, 3, 1), date(2024, 3, 31))) == 4
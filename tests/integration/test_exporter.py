@@ -0,0 +1,123 @@
+"""
+Teste de Integração: exportação em streaming (Exporter).
+"""
+import csv
+import gzip
+import io
+import json
+import sqlite3
+from datetime import date
+
+import pytest
+
+from src.infrastructure.exporter import Exporter
+from src.domain.models import (
+    Student, Classroom, Assessment, Grade, Attendance,
+    EducationLevel, Shift, Bimester, AssessmentType
+)
+
+
+@pytest.fixture
+def escola(student_repo, classroom_repo, assessment_repo, grade_repo, attendance_repo):
+    """Duas turmas, um aluno em cada, notas nos 4 bimestres e presenças."""
+    turma_a = classroom_repo.save(Classroom(year="6º Ano", identifier="A", shift=Shift.MANHA,
+                                            level=EducationLevel.FUNDAMENTAL_II))
+    turma_b = classroom_repo.save(Classroom(year="6º Ano", identifier="B", shift=Shift.TARDE,
+                                            level=EducationLevel.FUNDAMENTAL_II))
+    ana = student_repo.save(Student(name="Ana Lima", registration="A001", email="ana@escola.com"))
+    bruno = student_repo.save(Student(name="Bruno Reis", registration="B001", email="bruno@escola.com"))
+    classroom_repo.add_student_to_classroom(turma_a.id, ana.id, 2024)
+    classroom_repo.add_student_to_classroom(turma_b.id, bruno.id, 2024)
+
+    for bim in Bimester:
+        prova = assessment_repo.save(Assessment(
+            title=f"Prova {bim.value}", subject="Matemática", max_score=10.0, weight=2.0,
+            assessment_type=AssessmentType.PROVA, bimester=bim, academic_year=2024))
+        grade_repo.save(Grade(student=ana, assessment=prova, score=8.0))
+        grade_repo.save(Grade(student=bruno, assessment=prova, score=5.0))
+
+    antiga = assessment_repo.save(Assessment(
+        title="Prova antiga", subject="Matemática", max_score=10.0, weight=1.0,
+        assessment_type=AssessmentType.PROVA, bimester=Bimester.PRIMEIRO, academic_year=2023))
+    grade_repo.save(Grade(student=ana, assessment=antiga, score=9.0))
+
+    attendance_repo.save(Attendance(student=ana, subject="Matemática",
+                                    attendance_date=date(2024, 3, 1), is_present=True))
+    attendance_repo.save(Attendance(student=bruno, subject="Matemática",
+                                    attendance_date=date(2024, 3, 1), is_present=False))
+    attendance_repo.save(Attendance(student=ana, subject="Matemática",
+                                    attendance_date=date(2023, 3, 1), is_present=True))
+    return turma_a, turma_b, ana, bruno
+
+
+def test_exporta_notas_com_ids_e_filtro_de_ano(tmp_path, db_manager, escola):
+    turma_a, _, ana, _ = escola
+    path = tmp_path / "notas.csv"
+    count = Exporter(db_manager).export('grades', str(path), year=2024)
+    assert count == 8
+
+    with open(path, encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert {'student_id', 'assessment_id', 'score', 'bimester', 'classroom'} <= set(rows[0])
+    linha_ana = next(r for r in rows if r['student_id'] == str(ana.id))
+    assert linha_ana['classroom_id'] == str(turma_a.id)
+
+
+def test_exporta_frequencia_por_turma_em_jsonl_gzip(tmp_path, db_manager, escola):
+    _, turma_b, _, bruno = escola
+    path = tmp_path / "frequencia.jsonl.gz"
+    count = Exporter(db_manager).export('attendance', str(path), fmt='jsonl', year=2024,
+                                        classroom_id=turma_b.id, compress=True)
+    assert count == 1
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        rows = [json.loads(line) for line in f]
+    assert rows[0]['student_id'] == bruno.id
+    assert rows[0]['is_present'] == 0
+
+
+def test_boletins_seguem_regra_de_aprovacao(db_manager, escola):
+    _, _, ana, bruno = escola
+    columns, rows = Exporter(db_manager).iter_rows('report_cards', year=2024)
+    boletins = {r[0]: dict(zip(columns, r)) for r in rows}
+    assert boletins[ana.id]['media_anual'] == 8.0
+    assert boletins[ana.id]['situacao'] == "Aprovado"
+    assert boletins[bruno.id]['situacao'] == "Reprovado"
+
+
+def test_conjunto_invalido(db_manager):
+    with pytest.raises(ValueError):
+        Exporter(db_manager).iter_rows('students')
+
+
+def test_conexao_de_leitura_fechada_quando_a_exportacao_falha(tmp_path, db_manager, escola, monkeypatch):
+    abertas = []
+    get_read_connection = db_manager.get_read_connection
+    monkeypatch.setattr(db_manager, "get_read_connection",
+                        lambda: abertas.append(get_read_connection()) or abertas[-1])
+    exporter = Exporter(db_manager)
+
+    # Caminho inválido: falha antes de pegar conexão
+    with pytest.raises(OSError):
+        exporter.export('grades', str(tmp_path / "nao_existe" / "notas.csv"))
+    assert abertas == []
+
+    # Erro no meio da escrita
+    class SaidaQuebrada(io.StringIO):
+        def write(self, _):
+            raise OSError("disco cheio")
+
+    with pytest.raises(OSError):
+        exporter.export('grades', SaidaQuebrada(), year=2024)
+
+    # Iterador abandonado no meio e consulta que falha
+    _, rows = exporter.iter_rows('attendance')
+    next(rows)
+    rows.close()
+    monkeypatch.setattr(Exporter, "_build_query", staticmethod(lambda *args: ("SELECT * FROM nada", [])))
+    with pytest.raises(sqlite3.OperationalError):
+        exporter.iter_rows('grades')
+
+    assert len(abertas) == 3
+    for conn in abertas:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
@@ -0,0 +1,99 @@
+"""
+Teste de Integração: identity map por unidade de trabalho.
+"""
+import pytest
+
+from src.infrastructure.identity_map import IdentityMap, current_identity_map, unit_of_work
+from src.domain.models import Student, Assessment, Grade, Bimester, AssessmentType
+
+
+@pytest.fixture
+def notas(student_repo, assessment_repo, grade_repo):
+    """Três alunos com notas nas mesmas duas provas."""
+    alunos = [
+        student_repo.save(Student(name=f"Aluno {i}", registration=f"U{i:03d}", email=f"u{i}@escola.com"))
+        for i in range(3)
+    ]
+    provas = [
+        assessment_repo.save(Assessment(
+            title=f"Prova {i}", subject="Matemática", max_score=10.0, weight=1.0,
+            assessment_type=AssessmentType.PROVA, bimester=Bimester.PRIMEIRO, academic_year=2024))
+        for i in range(2)
+    ]
+    for aluno in alunos:
+        for prova in provas:
+            grade_repo.save(Grade(student=aluno, assessment=prova, score=7.0))
+    return alunos, provas
+
+
+def _contar_conexoes(monkeypatch, db_manager):
+    abertas = []
+    original = db_manager.get_connection
+
+    def get_connection():
+        abertas.append(1)
+        return original()
+    monkeypatch.setattr(db_manager, "get_connection", get_connection)
+    return abertas
+
+
+def test_find_by_id_repetido_nao_volta_ao_banco(student_repo, db_manager, notas, monkeypatch):
+    alunos, _ = notas
+    abertas = _contar_conexoes(monkeypatch, db_manager)
+    with unit_of_work() as uow:
+        primeiro = student_repo.find_by_id(alunos[0].id)
+        segundo = student_repo.find_by_id(alunos[0].id)
+        assert primeiro is segundo
+        assert len(abertas) == 1
+        # find_by_ids só busca o que ainda não está no escopo
+        varios = student_repo.find_by_ids([alunos[0].id, alunos[1].id])
+        assert varios[alunos[0].id] is primeiro
+        assert len(abertas) == 2
+        assert student_repo.find_by_ids([alunos[1].id])[alunos[1].id] is varios[alunos[1].id]
+        assert len(abertas) == 2
+    assert uow.stats()['by_type']['Student'] == {'requested': 5, 'materialized': 2}
+
+    # Fora do escopo: objetos novos a cada chamada
+    assert current_identity_map() is None
+    assert student_repo.find_by_id(alunos[0].id) is not student_repo.find_by_id(alunos[0].id)
+
+
+def test_notas_compartilham_avaliacao(grade_repo, assessment_repo, notas):
+    alunos, provas = notas
+    with unit_of_work() as uow:
+        por_aluno = [
+            grade_repo.find_by_student_and_bimester(a.id, "Matemática", Bimester.PRIMEIRO, 2024)
+            for a in alunos
+        ]
+        for notas_aluno in por_aluno[1:]:
+            for nota, referencia in zip(notas_aluno, por_aluno[0]):
+                assert nota.assessment is referencia.assessment
+        assert assessment_repo.find_by_id(provas[0].id) in [n.assessment for n in por_aluno[0]]
+    stats = uow.stats()
+    assert stats['by_type']['Assessment'] == {'requested': 7, 'materialized': 2}
+    assert stats['dedupe_ratio'] == round(5 / 7, 4)
+
+
+def test_escopos_aninhados_e_save(student_repo, notas):
+    alunos, _ = notas
+    with unit_of_work() as externo:
+        with unit_of_work() as interno:
+            assert interno is externo
+            novo = student_repo.save(Student(name="Nova", registration="U999", email="nova@escola.com"))
+        # Objeto salvo no escopo é o próprio devolvido, sem contar como carga
+        assert student_repo.find_by_id(novo.id) is novo
+        assert externo.materialized == 0
+        assert student_repo.delete(novo.id)
+        assert (Student, novo.id) not in externo
+    assert current_identity_map() is None
+
+
+def test_identity_map_metricas():
+    imap = IdentityMap()
+    assert imap.dedupe_ratio == 0.0
+    construidos = []
+    for _ in range(4):
+        imap.get_or_build(Student, 1, lambda: construidos.append(1) or object())
+    assert len(construidos) == 1
+    assert (imap.requested, imap.materialized, imap.reused) == (4, 1, 3)
+    assert imap.dedupe_ratio == 0.75
@@ -0,0 +1,128 @@
+"""
+Teste de Integração: importação em massa via CSV (BulkImporter).
+"""
+import pytest
+
+from src.infrastructure.importer import BulkImporter, main
+from src.domain.models import Student, Parent, Classroom, EducationLevel, Shift
+
+
+def _csv(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_text(content, encoding='utf-8')
+    return str(path)
+
+
+def test_importa_alunos_em_blocos_e_coleta_erros(tmp_path, db_manager, student_repo):
+    path = _csv(tmp_path, "alunos.csv",
+                "name,registration,email\n"
+                "João Silva,2024001,joao@escola.com\n"
+                "Maria Santos,2024002,MARIA@escola.com\n"
+                "Sem Email,2024003,invalido\n"
+                "Repetido,2024001,outro@escola.com\n"
+                "Pedro Costa,2024004,pedro@escola.com\n")
+
+    with BulkImporter(db_manager, chunk_size=2) as importer:
+        report = importer.import_students(path)
+
+    assert report.inserted == 3
+    assert [e.line for e in report.errors] == [4, 5]
+    assert "Email inválido" in report.errors[0].message
+    assert "Matrícula já cadastrada" in report.errors[1].message
+    assert {s.registration for s in student_repo.list_all()} == {"2024001", "2024002", "2024004"}
+
+
+def test_vinculos_e_matriculas_resolvem_ids(tmp_path, db_manager, parent_repo, classroom_repo):
+    turma = classroom_repo.save(Classroom(year="6º Ano", identifier="A", shift=Shift.MANHA,
+                                          level=EducationLevel.FUNDAMENTAL_II))
+    alunos = _csv(tmp_path, "alunos.csv",
+                  "name,registration,email\nLucas Lima,A001,lucas@escola.com\nBia Lima,A002,bia@escola.com\n")
+    pais = _csv(tmp_path, "pais.csv",
+                "name,email,cpf\nJosé Lima,jose@email.com,123.456.789-09\nCPF Ruim,ruim@email.com,11111111111\n")
+    vinculos = _csv(tmp_path, "vinculos.csv",
+                    "registration,cpf,relationship_type\nA001,12345678909,Pai\nA002,123.456.789-09,Pai\n"
+                    "A001,12345678909,Pai\nZ999,12345678909,Pai\n")
+    matriculas = _csv(tmp_path, "matriculas.csv",
+                      f"registration,classroom_id,academic_year\nA001,{turma.id},2024\nA002,999,2024\n")
+
+    with BulkImporter(db_manager) as importer:
+        assert importer.import_students(alunos).inserted == 2
+        report_pais = importer.import_parents(pais)
+        report_vinculos = importer.import_links(vinculos)
+        report_matriculas = importer.import_enrollments(matriculas)
+
+    assert report_pais.inserted == 1
+    assert "CPF inválido" in report_pais.errors[0].message
+    assert report_vinculos.inserted == 2
+    assert len(report_vinculos.errors) == 2
+    parent = parent_repo.list_all()[0]
+    assert len(parent_repo.get_students(parent.id)) == 2
+    assert report_matriculas.inserted == 1
+    assert "Turma 999" in report_matriculas.errors[0].message
+
+
+def test_tipo_de_vinculo_validado_e_emails_sem_diferenciar_maiusculas(tmp_path, db_manager, student_repo,
+                                                                      parent_repo):
+    student_repo.save(Student(name="Lucas Lima", registration="A001", email="lucas@escola.com"))
+    # Parent guarda o email como veio: o importador compara em minúsculas
+    parent_repo.save(Parent(name="José Lima", email="Jose@Email.com", cpf="12345678909"))
+    alunos = _csv(tmp_path, "alunos.csv", "name,registration,email\nOutro Lucas,A002,LUCAS@escola.com\n")
+    pais = _csv(tmp_path, "pais.csv", "name,email,cpf\nOutro José,jose@email.com,529.982.247-25\n")
+    vinculos = _csv(tmp_path, "vinculos.csv",
+                    "registration,cpf,relationship_type\nA001,12345678909,vizinho\nA001,12345678909,mãe\n")
+
+    with BulkImporter(db_manager) as importer:
+        report_alunos = importer.import_students(alunos)
+        report_pais = importer.import_parents(pais)
+        report_vinculos = importer.import_links(vinculos)
+
+    assert report_alunos.inserted == 0 and "Email já cadastrado" in report_alunos.errors[0].message
+    assert report_pais.inserted == 0 and "Email já cadastrado" in report_pais.errors[0].message
+    assert report_vinculos.inserted == 1
+    assert [(e.line, e.message) for e in report_vinculos.errors] == [
+        (2, "Tipo de relacionamento inválido: 'vizinho'")]
+    conn = db_manager.get_connection()
+    assert conn.execute("SELECT relationship_type FROM student_parent").fetchall()[0][0] == "Mãe"
+    conn.close()
+
+
+def test_conflito_no_banco_refaz_bloco_linha_a_linha(tmp_path, db_manager, student_repo):
+    """Conflito não previsto pelos mapas é isolado na linha, sem perder o bloco."""
+    path = _csv(tmp_path, "alunos.csv",
+                "name,registration,email\nAna Souza,B001,ana@escola.com\nCaio Souza,B002,caio@escola.com\n")
+    with BulkImporter(db_manager) as importer:
+        importer._load_students()
+        # Outro processo grava o mesmo email depois que os mapas foram carregados
+        student_repo.save(Student(name="Outra Ana", registration="X001", email="ana@escola.com"))
+        report = importer.import_students(path)
+
+    assert report.inserted == 1
+    assert report.errors[0].line == 2
+    assert "Rejeitado pelo banco" in report.errors[0].message
+
+
+def test_conflito_no_meio_do_bloco_nao_duplica_linhas(tmp_path, db_manager, student_repo):
+    """As linhas gravadas antes da falha do executemany são desfeitas e refeitas uma vez."""
+    path = _csv(tmp_path, "alunos.csv",
+                "name,registration,email\nRita Alves,R001,rita@escola.com\n"
+                "Rui Alves,R002,rui@escola.com\nRosa Alves,R003,rosa@escola.com\n")
+    with BulkImporter(db_manager) as importer:
+        importer._load_students()
+        student_repo.save(Student(name="Outro Rui", registration="X002", email="rui@escola.com"))
+        report = importer.import_students(path)
+        assert importer._student_ids.keys() >= {"R001", "R003"}
+        assert "R002" not in importer._student_ids
+
+    assert report.inserted == 2
+    assert [e.line for e in report.errors] == [3]
+    assert "Rejeitado pelo banco" in report.errors[0].message
+    registros = {s.registration: s.id for s in student_repo.list_all()}
+    assert set(registros) == {"R001", "R003", "X002"}
+    assert registros["R001"] == importer._student_ids["R001"]
+
+
+def test_cli_colunas_ausentes(tmp_path, db_manager, capsys):
+    path = _csv(tmp_path, "alunos.csv", "nome,matricula\nJoão,1\n")
+    code = main(["--db", str(db_manager.db_path), "--students", path])
+    assert code == 1
+    assert "Colunas obrigatórias ausentes" in capsys.readouterr().out
@@ -6,73 +6,19 @@ Valida que o SQL manual está correto:
 - Constraints funcionando
 - Conversões Python <-> SQLite
 - JOINs e agregações
+
+As fixtures (db_manager e repositórios) ficam em conftest.py.
 """
 import pytest
 import sqlite3
-from pathlib import Path
 from datetime import date, datetime
 
-from src.infrastructure.database import (
-    DatabaseManager,
-    StudentRepository, TeacherRepository, ParentRepository,
-    ClassroomRepository, AssessmentRepository, GradeRepository, AttendanceRepository
-)
 from src.domain.models import (
     Student, Teacher, Parent, Classroom, Assessment, Grade, Attendance,
     EducationLevel, Shift, Bimester, AssessmentType
 )
 
 
-@pytest.fixture
-def db_manager(tmp_path):
-    """Cria banco temporário para testes."""
-    db_path = str(tmp_path / "test_school.db")
-    manager = DatabaseManager(db_path)
-    # Aplicar schema silenciosamente
-    schema_file = Path(__file__).parent.parent.parent / "src" / "infrastructure" / "schema.sql"
-    conn = manager.get_connection()
-    with open(schema_file, 'r', encoding='utf-8') as f:
-        conn.executescript(f.read())
-    conn.commit()
-    conn.close()
-    yield manager
-
-
-@pytest.fixture
-def student_repo(db_manager):
-    return StudentRepository(db_manager)
-
-
-@pytest.fixture
-def teacher_repo(db_manager):
-    return TeacherRepository(db_manager)
-
-
-@pytest.fixture
-def parent_repo(db_manager):
-    return ParentRepository(db_manager)
-
-
-@pytest.fixture
-def classroom_repo(db_manager):
-    return ClassroomRepository(db_manager)
-
-
-@pytest.fixture
-def assessment_repo(db_manager):
-    return AssessmentRepository(db_manager)
-
-
-@pytest.fixture
-def grade_repo(db_manager):
-    return GradeRepository(db_manager)
-
-
-@pytest.fixture
-def attendance_repo(db_manager):
-    return AttendanceRepository(db_manager)
-
-
 # =============================================================================
 # STUDENT REPOSITORY
 # =============================================================================
@@ -107,6 +53,82 @@ def test_student_crud(student_repo):
     assert deleted is None
 
 
+def test_student_select_projecoes(student_repo):
+    """select(): valores, tuplas e namedtuples, com filtro, IN, ordem e limite."""
+    for i, (nome, ativo) in enumerate((("Carla", True), ("Ana", True), ("Bruno", False))):
+        student_repo.save(Student(name=nome, registration=f"P{i:03d}", email=f"p{i}@escola.com", active=ativo))
+
+    assert student_repo.select("name", where={"active": 1}, order_by="name") == ["Ana", "Carla"]
+    assert student_repo.select(("registration", "name"), order_by="-name", limit=1) == [("P000", "Carla")]
+
+    linhas = student_repo.select(("student_id", "name"), where={"registration": ["P001", "P002"]},
+                                 order_by="name", named=True)
+    assert [l.name for l in linhas] == ["Ana", "Bruno"]
+    assert type(linhas[0]) is type(student_repo.select(("student_id", "name"), named=True)[0])
+    assert student_repo.select("name", where={"email": None}) == []
+
+    with pytest.raises(ValueError):
+        student_repo.select("name; DROP TABLE students")
+    with pytest.raises(ValueError):
+        student_repo.select("name", where={"senha": 1})
+
+
+def test_select_devolve_conexao_com_row_factory_original(student_repo, db_manager, monkeypatch):
+    """select() tira o row_factory da conexão emprestada e restaura no fim, mesmo com erro."""
+    student_repo.save(Student(name="Ana", registration="P000", email="p0@escola.com"))
+    emprestadas = []
+    get_read_connection = db_manager.get_read_connection
+    monkeypatch.setattr(db_manager, "get_read_connection",
+                        lambda: emprestadas.append(get_read_connection()) or emprestadas[-1])
+
+    assert student_repo.select("name") == ["Ana"]
+    with pytest.raises(sqlite3.Error):
+        student_repo.select("name", where={"student_id": object()})
+    assert [conn.row_factory for conn in emprestadas] == [sqlite3.Row, sqlite3.Row]
+
+
+def test_find_by_ids_preserva_ordem(student_repo, teacher_repo, parent_repo, classroom_repo, assessment_repo):
+    """find_by_ids: dict na ordem pedida, sem duplicados nem IDs inexistentes."""
+    alunos = [student_repo.save(Student(name=f"Aluno {i}", registration=f"F{i:03d}", email=f"f{i}@escola.com"))
+              for i in range(3)]
+    pedidos = [alunos[2].id, 9999, alunos[0].id, alunos[2].id]
+    encontrados = student_repo.find_by_ids(pedidos)
+    assert list(encontrados) == [alunos[2].id, alunos[0].id]
+    assert encontrados[alunos[0].id].name == "Aluno 0"
+
+    prof = Teacher(name="Rita", email="rita@escola.com")
+    prof.add_subject("Física")
+    teacher_repo.save(prof)
+    assert teacher_repo.find_by_ids([prof.id])[prof.id].subjects == ["Física"]
+
+    mae = parent_repo.save(Parent(name="Lia", email="lia@email.com", cpf="52998224725"))
+    assert parent_repo.find_by_ids([mae.id, 123])[mae.id].cpf == "52998224725"
+
+    turma = classroom_repo.save(Classroom(year="8º Ano", identifier="C", shift=Shift.TARDE,
+                                          level=EducationLevel.FUNDAMENTAL_II))
+    assert classroom_repo.find_by_ids([turma.id])[turma.id].shift == Shift.TARDE
+
+    prova = assessment_repo.save(Assessment(title="Prova 1", subject="Física", max_score=10.0, weight=1.0,
+                                            assessment_type=AssessmentType.PROVA, bimester=Bimester.SEGUNDO,
+                                            academic_year=2024))
+    assert assessment_repo.find_by_ids([prova.id])[prova.id].bimester == Bimester.SEGUNDO
+
+
+def test_find_by_ids_conjunto_grande_usa_tabela_temporaria(student_repo, db_manager):
+    """Acima de TEMP_TABLE_THRESHOLD os IDs vão para uma tabela temporária."""
+    from src.infrastructure.database import TEMP_TABLE_THRESHOLD
+
+    conn = db_manager.get_connection()
+    conn.executemany("INSERT INTO students (student_id, name, registration, email) VALUES (?, ?, ?, ?)",
+                     [(i, f"Aluno {i}", f"G{i:06d}", f"g{i}@escola.com") for i in range(1, 201)])
+    conn.commit()
+    conn.close()
+
+    pedidos = list(range(TEMP_TABLE_THRESHOLD + 50, 0, -1))  # muitos IDs, a maioria inexistente
+    encontrados = student_repo.find_by_ids(pedidos)
+    assert list(encontrados) == list(range(200, 0, -1))
+
+
 def test_student_find_by_id_inexistente(student_repo):
     """find_by_id retorna None para ID inexistente."""
     assert student_repo.find_by_id(999) is None
@@ -208,6 +230,55 @@ def test_classroom_add_student(classroom_repo, student_repo):
     # Sem exceção = sucesso
 
 
+def test_classroom_roster(classroom_repo, student_repo):
+    """Roster da turma: IDs, projeção leve, alunos completos e turma atual."""
+    turma = classroom_repo.save(Classroom(year="7º Ano", identifier="B", shift=Shift.TARDE,
+                                          level=EducationLevel.FUNDAMENTAL_II))
+    outra = classroom_repo.save(Classroom(year="8º Ano", identifier="A", shift=Shift.TARDE,
+                                          level=EducationLevel.FUNDAMENTAL_II))
+    bia = student_repo.save(Student(name="Bia", registration="2024010", email="bia@escola.com"))
+    ana = student_repo.save(Student(name="Ana", registration="2024011", email="ana@escola.com"))
+    classroom_repo.add_student_to_classroom(turma.id, bia.id, 2024)
+    classroom_repo.add_student_to_classroom(turma.id, ana.id, 2024)
+    classroom_repo.add_student_to_classroom(outra.id, ana.id, 2025)
+
+    assert classroom_repo.get_student_ids(turma.id, 2024) == sorted([bia.id, ana.id])
+    assert [r.name for r in classroom_repo.get_roster(turma.id, 2024)] == ["Ana", "Bia"]
+    alunos = classroom_repo.get_students(turma.id, 2024)
+    assert [s.registration for s in alunos] == ["2024011", "2024010"]
+    assert classroom_repo.get_current_classroom_id(ana.id, 2024) == turma.id
+    assert classroom_repo.get_current_classroom_id(ana.id) == outra.id
+    assert classroom_repo.get_current_classroom_id(999) is None
+
+
+def test_classroom_load_rosters(classroom_repo, student_repo):
+    """load_rosters preenche Classroom.students de várias turmas de uma vez."""
+    turmas = [
+        classroom_repo.save(Classroom(year="9º Ano", identifier=letra, shift=Shift.MANHA,
+                                      level=EducationLevel.FUNDAMENTAL_II))
+        for letra in "ABC"
+    ]
+    for i in range(6):
+        aluno = student_repo.save(Student(name=f"Aluno {i}", registration=f"R{i:04d}", email=f"a{i}@escola.com"))
+        classroom_repo.add_student_to_classroom(turmas[i % 2].id, aluno.id, 2024)
+
+    rosters = classroom_repo.load_rosters([turmas[1].id, turmas[0].id, turmas[2].id, 999], 2024)
+    assert list(rosters) == [turmas[1].id, turmas[0].id, turmas[2].id]
+    assert len(rosters[turmas[0].id].students) == 3
+    assert len(rosters[turmas[1].id].students) == 3
+    assert rosters[turmas[2].id].students == []
+
+
+def test_roster_usa_indice_de_cobertura(db_manager):
+    conn = db_manager.get_connection()
+    plan = " ".join(r[3] for r in conn.execute("""
+        EXPLAIN QUERY PLAN SELECT student_id FROM classroom_enrollments
+        WHERE classroom_id = 1 AND academic_year = 2024 AND status = 'ACTIVE'
+    """))
+    conn.close()
+    assert "COVERING INDEX idx_enrollment_roster" in plan
+
+
 # =============================================================================
 # ASSESSMENT REPOSITORY
 # =============================================================================
@@ -231,6 +302,20 @@ def test_assessment_crud(assessment_repo):
     assert found.assessment_date == date(2024, 3, 15)
 
 
+def test_row_mapper_datas_e_enums():
+    """Mapeadores posicionais: lookup de enums e datas (com ou sem hora)."""
+    from src.infrastructure.database import _assessment_from_row, _to_date
+
+    row = (7, "Prova", "Matemática", None, 10, 2, "PROVA", "TERCEIRO", 2024, "2024-08-20T10:30:00")
+    assessment = _assessment_from_row(row)
+    assert assessment.id == 7 and assessment.description == ""
+    assert assessment.assessment_type is AssessmentType.PROVA
+    assert assessment.bimester is Bimester.TERCEIRO
+    assert assessment.assessment_date == date(2024, 8, 20)
+    assert _to_date("2024-08-20") is _to_date("2024-08-20")  # cache de datas
+    assert _to_date(None) is None
+
+
 def test_assessment_list_all(assessment_repo):
     """Lista todas as avaliações."""
     assessment_repo.save(Assessment(title="Prova 1", subject="Português", max_score=10.0, weight=2.0,
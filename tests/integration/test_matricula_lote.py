@@ -0,0 +1,106 @@
+"""
+Teste de Integração: matrícula, transferência e mudança de situação em lote.
+"""
+import pytest
+
+from src.application.services import ServicosSecretaria
+from src.domain.models import Student, Classroom, EducationLevel, Shift
+
+
+@pytest.fixture
+def secretaria(student_repo, classroom_repo, parent_repo):
+    return ServicosSecretaria(student_repo, classroom_repo, parent_repo)
+
+
+@pytest.fixture
+def cenario(student_repo, classroom_repo):
+    alunos = [
+        student_repo.save(Student(name=f"Aluno {i}", registration=f"L{i:03d}",
+                                  email=f"a{i}@escola.com", active=(i < 3)))
+        for i in range(4)
+    ]
+    turmas = [
+        classroom_repo.save(Classroom(year="7º Ano", identifier=ident, shift=Shift.MANHA,
+                                      level=EducationLevel.FUNDAMENTAL_II))
+        for ident in ("A", "B")
+    ]
+    return [a.id for a in alunos], [t.id for t in turmas]
+
+
+def test_matricular_em_lote(secretaria, classroom_repo, cenario):
+    alunos, turmas = cenario
+    classroom_repo.add_student_to_classroom(turmas[0], alunos[0], 2024)
+
+    resultado = secretaria.matricular_em_lote([
+        (alunos[0], turmas[0]),   # já existia
+        (alunos[1], turmas[0]),
+        (alunos[2], turmas[1]),
+        (alunos[2], turmas[1]),   # repetido na lista
+        (alunos[3], turmas[0]),   # inativo
+        (9999, turmas[0]),        # aluno inexistente
+        (alunos[1], 9999),        # turma inexistente
+    ], academic_year=2024)
+
+    assert resultado.processados == [(alunos[1], turmas[0]), (alunos[2], turmas[1])]
+    assert resultado.duplicados == [(alunos[0], turmas[0]), (alunos[2], turmas[1])]
+    assert [item for item, _ in resultado.erros] == [(alunos[3], turmas[0]), (9999, turmas[0]), (alunos[1], 9999)]
+    assert sorted(classroom_repo.get_student_ids(turmas[0], 2024)) == sorted([alunos[0], alunos[1]])
+
+
+def test_matricular_em_lote_usa_duas_consultas_de_validacao(secretaria, db_manager, cenario):
+    alunos, turmas = cenario
+    statements = []
+    original = db_manager.get_connection
+
+    def traced():
+        conn = original()
+        conn.set_trace_callback(statements.append)
+        return conn
+    db_manager.get_connection = traced
+
+    secretaria.matricular_em_lote([(a, t) for a in alunos[:3] for t in turmas], academic_year=2024)
+
+    selects = [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+    inserts = [s for s in statements if "INSERT INTO classroom_enrollments" in s]
+    # alunos + turmas + matrículas existentes
+    assert len(selects) == 3
+    # O trace repete o INSERT para cada programa de trigger (change_log) que ele dispara
+    assert len(set(inserts)) == 6
+
+
+def test_transferir_em_lote(secretaria, classroom_repo, cenario):
+    alunos, turmas = cenario
+    secretaria.matricular_em_lote([(alunos[0], turmas[0]), (alunos[1], turmas[0]), (alunos[2], turmas[1])], 2024)
+
+    resultado = secretaria.transferir_em_lote([
+        (alunos[0], turmas[0], turmas[1]),
+        (alunos[1], turmas[1], turmas[0]),   # não está ativo na origem
+        (alunos[2], turmas[1], 9999),        # destino inexistente
+    ], academic_year=2024)
+
+    assert resultado.processados == [(alunos[0], turmas[0], turmas[1])]
+    assert len(resultado.erros) == 2
+    assert classroom_repo.get_current_classroom_id(alunos[0], 2024) == turmas[1]
+    assert classroom_repo.get_student_ids(turmas[0], 2024, status='TRANSFERRED') == [alunos[0]]
+
+    # Voltar para a turma de origem no mesmo ano é duplicidade
+    volta = secretaria.transferir_em_lote([(alunos[0], turmas[1], turmas[0])], academic_year=2024)
+    assert volta.duplicados == [(alunos[0], turmas[1], turmas[0])]
+
+
+def test_alterar_situacao_em_lote(secretaria, classroom_repo, cenario):
+    alunos, turmas = cenario
+    secretaria.matricular_em_lote([(alunos[0], turmas[0]), (alunos[1], turmas[0])], 2024)
+
+    resultado = secretaria.alterar_situacao_em_lote(
+        [(alunos[0], turmas[0]), (alunos[1], turmas[0]), (alunos[2], turmas[0])], 'COMPLETED', 2024)
+
+    assert resultado.processados == [(alunos[0], turmas[0]), (alunos[1], turmas[0])]
+    assert [item for item, _ in resultado.erros] == [(alunos[2], turmas[0])]
+    assert classroom_repo.get_student_ids(turmas[0], 2024) == []
+
+    # Só matrículas ACTIVE mudam de situação
+    de_novo = secretaria.alterar_situacao_em_lote([(alunos[0], turmas[0])], 'WITHDRAWN', 2024)
+    assert de_novo.processados == []
+    with pytest.raises(ValueError):
+        secretaria.alterar_situacao_em_lote([(alunos[0], turmas[0])], 'ACTIVE', 2024)
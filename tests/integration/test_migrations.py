@@ -0,0 +1,245 @@
+"""
+Teste de Integração: migrações de schema (PRAGMA user_version).
+"""
+import gzip
+import shutil
+import sqlite3
+from datetime import date
+from pathlib import Path
+
+from src.domain.models import Bimester
+from src.infrastructure.database import (
+    DatabaseManager, AttendanceRepository, GradeRepository, TeacherRepository
+)
+from src.infrastructure.migrations import LATEST_VERSION, migrar, versao_atual
+
+
+def _indices(manager):
+    conn = manager.get_connection()
+    names = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    conn.close()
+    return names
+
+
+def test_schema_novo_ja_esta_na_ultima_versao(db_manager):
+    assert versao_atual(db_manager) == LATEST_VERSION
+    assert migrar(db_manager) == []
+
+
+def test_banco_antigo_recebe_migracoes_pendentes(tmp_path):
+    """Banco criado antes das migrações (user_version 0, índices antigos)."""
+    manager = DatabaseManager(str(tmp_path / "antigo.db"))
+    conn = manager.get_connection()
+    conn.executescript("""
+        CREATE TABLE classroom_enrollments (
+            enrollment_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER NOT NULL, classroom_id INTEGER NOT NULL,
+            academic_year INTEGER NOT NULL, status VARCHAR(20) NOT NULL DEFAULT 'ACTIVE'
+        );
+        CREATE INDEX idx_enrollment_student ON classroom_enrollments(student_id);
+        CREATE INDEX idx_enrollment_classroom ON classroom_enrollments(classroom_id);
+    """)
+    conn.close()
+
+    assert migrar(manager, target=2) == [1, 2]
+    assert versao_atual(manager) == 2
+    indices = _indices(manager)
+    assert "idx_enrollment_roster" in indices
+    assert "idx_enrollment_classroom" not in indices
+    assert migrar(manager, target=2) == []
+
+
+def test_migracao_4_cria_change_log_em_banco_existente(db_manager):
+    """Banco na versão 3 (sem change_log) passa a registrar alterações."""
+    conn = db_manager.get_connection()
+    names = [r[0] for r in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'trg_change_log_%'")]
+    for name in names:
+        conn.execute(f"DROP TRIGGER {name}")
+    conn.execute("DROP TABLE change_log")
+    conn.execute("DROP TABLE change_log_consumers")
+    conn.execute("PRAGMA user_version = 3")
+    conn.commit()
+    conn.close()
+
+    assert migrar(db_manager, target=4) == [4]
+    conn = db_manager.get_connection()
+    conn.execute("INSERT INTO students (name, registration, email) VALUES ('Ana', 'MIG001', 'ana@escola.com')")
+    conn.executemany("INSERT INTO parents (name, email, cpf) VALUES (?, ?, ?)", [
+        ("Carla", "carla@email.com", "52998224725"), ("Rui Lima", "rui@email.com", "11144477735")])
+    conn.execute("INSERT INTO student_parent (student_id, parent_id) VALUES (1, 1)")
+    conn.execute("UPDATE student_parent SET parent_id = 2 WHERE student_id = 1")
+    rows = conn.execute("SELECT table_name, op, pk, pk2 FROM change_log ORDER BY seq").fetchall()
+    conn.close()
+    assert len(names) == 12
+    assert [tuple(r) for r in rows] == [
+        ("student_parent", "I", 1, 1), ("student_parent", "D", 1, 1), ("student_parent", "U", 1, 2),
+    ]
+
+
+# Tabelas com disciplina em texto, como eram até a versão 4
+_V4_SUBJECT_TABLES = """
+    CREATE TABLE teacher_subjects (
+        teacher_id INTEGER NOT NULL, subject VARCHAR(100) NOT NULL,
+        PRIMARY KEY (teacher_id, subject),
+        FOREIGN KEY (teacher_id) REFERENCES teachers(teacher_id) ON DELETE CASCADE
+    );
+    CREATE TABLE assessments (
+        assessment_id INTEGER PRIMARY KEY AUTOINCREMENT, title VARCHAR(200) NOT NULL,
+        subject VARCHAR(100) NOT NULL, description TEXT, max_score DECIMAL(5,2) NOT NULL,
+        weight DECIMAL(5,2) NOT NULL DEFAULT 1.0, assessment_type VARCHAR(30) NOT NULL,
+        bimester VARCHAR(20) NOT NULL, academic_year INTEGER NOT NULL, assessment_date DATE,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE attendance (
+        attendance_id INTEGER PRIMARY KEY AUTOINCREMENT, student_id INTEGER NOT NULL,
+        subject VARCHAR(100) NOT NULL, attendance_date DATE NOT NULL,
+        is_present BOOLEAN NOT NULL DEFAULT 1, is_justified BOOLEAN NOT NULL DEFAULT 0,
+        justification TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE,
+        UNIQUE (student_id, subject, attendance_date)
+    );
+    CREATE TABLE report_cards (
+        report_card_id INTEGER PRIMARY KEY AUTOINCREMENT, student_id INTEGER NOT NULL,
+        subject VARCHAR(100) NOT NULL, bimester VARCHAR(20) NOT NULL, academic_year INTEGER NOT NULL,
+        education_level VARCHAR(30) NOT NULL, grade DECIMAL(5,2), development_level VARCHAR(30),
+        description TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE (student_id, subject, bimester, academic_year)
+    );
+    CREATE INDEX idx_attendance_student_subject ON attendance(student_id, subject);
+"""
+
+
+def _banco_v4(manager, archive_path):
+    """Banco e arquivo morto (2023, .db.gz) com a disciplina em texto."""
+    conn = manager.get_connection()
+    conn.execute("PRAGMA foreign_keys = OFF")
+    for table in ("teacher_subjects", "report_cards", "attendance", "assessments", "subjects"):
+        conn.execute(f"DROP TABLE {table}")
+    conn.executescript(_V4_SUBJECT_TABLES + """
+        INSERT INTO students (name, registration, email) VALUES ('Ana Lima', 'A001', 'ana@escola.com');
+        INSERT INTO teachers (name, email) VALUES ('Rita Souza', 'rita@escola.com');
+        INSERT INTO teacher_subjects VALUES (1, 'Matemática'), (1, 'Física');
+        INSERT INTO assessments (assessment_id, title, subject, max_score, weight, assessment_type, bimester,
+                                 academic_year)
+        VALUES (5, 'Prova', 'Matemática', 10, 1, 'PROVA', 'PRIMEIRO', 2024);
+        INSERT INTO grades (student_id, assessment_id, score) VALUES (1, 5, 8.5);
+        INSERT INTO attendance (student_id, subject, attendance_date, is_present)
+        VALUES (1, 'Física', '2024-03-01', 0), (1, 'Matemática', '2024-03-01', 1);
+        INSERT INTO report_cards (student_id, subject, bimester, academic_year, education_level, grade)
+        VALUES (1, 'Matemática', 'PRIMEIRO', 2024, 'FUNDAMENTAL_II', 8.5);
+        PRAGMA user_version = 4;
+    """)
+    conn.close()
+
+    plain = archive_path.with_suffix("")
+    archive = sqlite3.connect(str(plain))
+    archive.executescript("""
+        CREATE TABLE assessments AS SELECT * FROM (SELECT 1 AS assessment_id, 'Prova 2023' AS title,
+            'História' AS subject, NULL AS description, 10 AS max_score, 1 AS weight,
+            'PROVA' AS assessment_type, 'PRIMEIRO' AS bimester, 2023 AS academic_year,
+            NULL AS assessment_date, NULL AS created_at);
+        CREATE TABLE grades AS SELECT 1 AS grade_id, 1 AS student_id, 1 AS assessment_id, 6.0 AS score,
+            NULL AS graded_at;
+        CREATE TABLE attendance AS SELECT 1 AS attendance_id, 1 AS student_id, 'História' AS subject,
+            '2023-05-02' AS attendance_date, 1 AS is_present, 0 AS is_justified, NULL AS justification,
+            NULL AS created_at;
+        CREATE TABLE classroom_enrollments AS SELECT 1 AS enrollment_id, 1 AS student_id,
+            1 AS classroom_id, 2023 AS academic_year, '2023-02-01' AS enrollment_date, 'COMPLETED' AS status;
+    """)
+    archive.close()
+    with open(plain, "rb") as src, gzip.open(archive_path, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    plain.unlink()
+    conn = manager.get_connection()
+    conn.execute("INSERT INTO archived_years (academic_year, path) VALUES (2023, ?)", (str(archive_path),))
+    conn.commit()
+    conn.close()
+
+
+def test_migracao_5_troca_nome_da_disciplina_por_id(db_manager, tmp_path):
+    archive_path = tmp_path / "test_school_2023.db.gz"
+    _banco_v4(db_manager, archive_path)
+
+    assert migrar(db_manager, target=5) == [5]
+    assert "idx_attendance_student_subject" in _indices(db_manager)
+    conn = db_manager.get_connection()
+    assert dict(conn.execute("SELECT name, subject_id FROM subjects")) == {
+        "Física": 1, "História": 2, "Matemática": 3}
+    assert conn.execute("SELECT subject_id FROM attendance WHERE is_present = 0").fetchone()[0] == 1
+    assert conn.execute("SELECT subject_id FROM report_cards").fetchone()[0] == 3
+    # Ids antigos preservados: a nota continua apontando para a avaliação 5
+    assert conn.execute("SELECT a.subject_id FROM grades g JOIN assessments a USING (assessment_id)"
+                        ).fetchone()[0] == 3
+    new_path = Path(conn.execute("SELECT path FROM archived_years").fetchone()[0])
+    conn.close()
+
+    # Arquivo morto convertido ao lado do antigo, que é apagado
+    assert new_path.name == "test_school_2023_v5.db.gz"
+    assert not archive_path.exists() and not archive_path.with_suffix("").exists()
+    grades = GradeRepository(db_manager).find_by_student_and_bimester(1, "História", Bimester.PRIMEIRO, 2023)
+    assert [g.score for g in grades] == [6.0]
+    assert grades[0].assessment.subject == "História"
+    teacher = TeacherRepository(db_manager).find_by_id(1)
+    assert sorted(teacher.subjects) == ["Física", "Matemática"]
+    faltas = AttendanceRepository(db_manager).find_by_student_and_period(
+        1, "Física", date(2024, 1, 1), date(2024, 12, 31))
+    assert [a.is_present for a in faltas] == [False]
+
+    # Triggers do change_log da frequência recriados junto com a tabela
+    conn = db_manager.get_connection()
+    conn.execute("DELETE FROM attendance WHERE is_present = 0")
+    assert tuple(conn.execute("SELECT table_name, op FROM change_log ORDER BY seq DESC").fetchone()) == (
+        "attendance", "D")
+    conn.close()
+    assert migrar(db_manager, target=5) == []
+
+
+# Tabelas de ligação com rowid, como eram até a versão 6
+_V6_ROWID_TABLES = """
+    CREATE TABLE student_parent (
+        student_id INTEGER NOT NULL, parent_id INTEGER NOT NULL,
+        relationship_type VARCHAR(50) DEFAULT 'Responsável', created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (student_id, parent_id)
+    );
+    CREATE TABLE teacher_subjects (
+        teacher_id INTEGER NOT NULL, subject_id INTEGER NOT NULL,
+        PRIMARY KEY (teacher_id, subject_id)
+    );
+"""
+
+
+def test_migracao_7_agrupa_tabelas_de_ligacao_pela_chave(db_manager):
+    conn = db_manager.get_connection()
+    conn.execute("PRAGMA foreign_keys = OFF")
+    for table in ("student_parent", "teacher_subjects"):
+        conn.execute(f"DROP TABLE {table}")
+    conn.executescript(_V6_ROWID_TABLES + """
+        INSERT INTO students (name, registration, email) VALUES ('Ana Lima', 'A001', 'ana@escola.com');
+        INSERT INTO parents (name, email, cpf) VALUES ('Carla', 'carla@email.com', '52998224725');
+        INSERT INTO student_parent (student_id, parent_id, relationship_type) VALUES (1, 1, 'Mãe');
+        PRAGMA user_version = 6;
+    """)
+    conn.close()
+
+    assert migrar(db_manager) == [7]
+    conn = db_manager.get_connection()
+    ddl = dict(conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'table'"))
+    for table in ("student_parent", "teacher_subjects"):
+        assert ddl[table].rstrip().endswith("WITHOUT ROWID"), table
+    # Matrículas e frequência seguem com rowid (ids da API pelo AUTOINCREMENT)
+    for table in ("classroom_enrollments", "attendance"):
+        assert "AUTOINCREMENT" in ddl[table], table
+    assert "idx_student_parent_parent" in _indices(db_manager)
+    plan = " ".join(r[3] for r in conn.execute(
+        "EXPLAIN QUERY PLAN SELECT relationship_type FROM student_parent WHERE student_id = 1"))
+    assert "USING PRIMARY KEY" in plan
+    assert tuple(conn.execute("SELECT student_id, parent_id, relationship_type FROM student_parent").fetchone()) \
+        == (1, 1, 'Mãe')
+
+    # Triggers do change_log recriados junto com a tabela
+    conn.execute("DELETE FROM student_parent")
+    conn.commit()
+    assert [tuple(r) for r in conn.execute("SELECT table_name, op FROM change_log")] == [("student_parent", "D")]
+    conn.close()
+    assert migrar(db_manager) == []
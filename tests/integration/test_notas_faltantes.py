@@ -0,0 +1,95 @@
+"""
+Teste de Integração: detector de notas faltantes por professor e disciplina.
+"""
+import pytest
+
+from src.application.services import ServicosDoAluno
+from src.domain.models import (
+    Student, Teacher, Classroom, Assessment, Grade,
+    EducationLevel, Shift, Bimester, AssessmentType
+)
+
+
+@pytest.fixture
+def servicos(grade_repo, assessment_repo, student_repo, attendance_repo):
+    return ServicosDoAluno(grade_repo, assessment_repo, student_repo, attendance_repo)
+
+
+@pytest.fixture
+def escola(student_repo, teacher_repo, classroom_repo, assessment_repo, grade_repo):
+    """Turma A (professora Rita: Matemática) e turma B; Português sem professor."""
+    rita = teacher_repo.save(Teacher(name="Rita Souza", email="rita@escola.com", subjects=["Matemática"]))
+    turma_a = classroom_repo.save(Classroom(year="6º Ano", identifier="A", shift=Shift.MANHA,
+                                            level=EducationLevel.FUNDAMENTAL_II, teacher_id=rita.id))
+    turma_b = classroom_repo.save(Classroom(year="6º Ano", identifier="B", shift=Shift.TARDE,
+                                            level=EducationLevel.FUNDAMENTAL_II))
+    ana = student_repo.save(Student(name="Ana Lima", registration="A001", email="ana@escola.com"))
+    bruno = student_repo.save(Student(name="Bruno Reis", registration="B001", email="bruno@escola.com"))
+    caio = student_repo.save(Student(name="Caio Dias", registration="C001", email="caio@escola.com"))
+    classroom_repo.add_student_to_classroom(turma_a.id, ana.id, 2024)
+    classroom_repo.add_student_to_classroom(turma_a.id, bruno.id, 2024)
+    classroom_repo.add_student_to_classroom(turma_b.id, caio.id, 2024)
+
+    provas = {}
+    for subject in ("Matemática", "Português"):
+        for bim in (Bimester.PRIMEIRO, Bimester.SEGUNDO):
+            provas[(subject, bim)] = assessment_repo.save(Assessment(
+                title=f"{subject} {bim.value}", subject=subject, max_score=10.0, weight=1.0,
+                assessment_type=AssessmentType.PROVA, bimester=bim, academic_year=2024))
+    # Avaliação de outro ano não entra na conta
+    assessment_repo.save(Assessment(
+        title="Antiga", subject="Matemática", max_score=10.0, weight=1.0,
+        assessment_type=AssessmentType.PROVA, bimester=Bimester.PRIMEIRO, academic_year=2023))
+
+    # Ana tem tudo; Bruno falta Matemática 2º bim; Caio só tem Matemática 1º bim
+    for prova in provas.values():
+        grade_repo.save(Grade(student=ana, assessment=prova, score=8.0))
+    for key in (("Matemática", Bimester.PRIMEIRO), ("Português", Bimester.PRIMEIRO),
+                ("Português", Bimester.SEGUNDO)):
+        grade_repo.save(Grade(student=bruno, assessment=provas[key], score=7.0))
+    grade_repo.save(Grade(student=caio, assessment=provas[("Matemática", Bimester.PRIMEIRO)], score=6.0))
+    return rita, turma_a, turma_b, (ana, bruno, caio), provas
+
+
+def test_pendencias_agrupadas_por_professor_e_disciplina(servicos, escola):
+    rita, turma_a, turma_b, (ana, bruno, caio), provas = escola
+
+    pendencias = servicos.detectar_notas_faltantes(2024)
+
+    assert [(p.teacher_id, p.disciplina) for p in pendencias] == [
+        (rita.id, "Matemática"),  # professora da turma A, única que leciona Matemática
+        (None, "Português"),
+    ]
+    matematica, portugues = pendencias
+    assert [(f.aluno, f.classroom_id, f.bimestre) for f in matematica.faltantes] == [
+        ("Bruno Reis", turma_a.id, Bimester.SEGUNDO),
+        ("Caio Dias", turma_b.id, Bimester.SEGUNDO),
+    ]
+    assert matematica.professor == "Rita Souza"
+    assert [(f.student_id, f.bimestre) for f in portugues.faltantes] == [
+        (caio.id, Bimester.PRIMEIRO), (caio.id, Bimester.SEGUNDO)]
+    assert portugues.alunos == 1
+    assert ana.id not in {f.student_id for p in pendencias for f in p.faltantes}
+    assert str(portugues) == "Sem professor - Português: 2 nota(s) faltando, 1 aluno(s)"
+
+
+def test_filtra_turma_e_ignora_matricula_inativa(servicos, escola, classroom_repo):
+    rita, turma_a, turma_b, (ana, bruno, caio), provas = escola
+
+    por_turma = servicos.detectar_notas_faltantes(2024, classroom_id=turma_a.id)
+    assert [(p.disciplina, [f.assessment_id for f in p.faltantes]) for p in por_turma] == [
+        ("Matemática", [provas[("Matemática", Bimester.SEGUNDO)].id])]
+
+    classroom_repo.set_status_many([(caio.id, turma_b.id)], 2024, "TRANSFERRED")
+    assert [f.aluno for p in servicos.detectar_notas_faltantes(2024) for f in p.faltantes] == ["Bruno Reis"]
+    assert servicos.detectar_notas_faltantes(2025) == []
+
+
+def test_streaming_le_em_lotes(servicos, escola, grade_repo):
+    linhas = grade_repo.iter_missing(2024, batch_size=1)
+    assert next(linhas)[2] == "Matemática"
+    assert len(list(linhas)) == 3
+
+    grupos = servicos.iterar_notas_faltantes(2024)
+    assert next(grupos).disciplina == "Matemática"
+    grupos.close()
@@ -0,0 +1,125 @@
+"""
+Teste de Integração: painel do responsável (todos os filhos em uma chamada).
+"""
+from datetime import date
+
+import pytest
+
+from src.application.services import ServicosDoAluno, ServicosSecretaria
+from src.domain.models import (
+    Student, Parent, Assessment, Grade, Attendance, Bimester, AssessmentType
+)
+
+
+@pytest.fixture
+def familia(student_repo, parent_repo, assessment_repo, grade_repo, attendance_repo):
+    """Responsável com dois filhos, notas em Matemática e Português."""
+    mae = parent_repo.save(Parent(name="Carla Souza", email="carla@email.com", cpf="52998224725"))
+    filhos = [
+        student_repo.save(Student(name=nome, registration=reg, email=f"{reg}@escola.com"))
+        for nome, reg in (("Bruno Souza", "S001"), ("Alice Souza", "S002"))
+    ]
+    for filho in filhos:
+        parent_repo.link_to_student(mae.id, filho.id, "Mãe")
+
+    provas = {}
+    for subject in ("Matemática", "Português"):
+        for bimester in Bimester:
+            for weight in (1.0, 2.0):
+                provas[(subject, bimester, weight)] = assessment_repo.save(Assessment(
+                    title=f"{subject} {bimester.value} {weight}", subject=subject, max_score=10.0,
+                    weight=weight, assessment_type=AssessmentType.PROVA, bimester=bimester,
+                    academic_year=2024))
+    for i, filho in enumerate(filhos):
+        for (subject, bimester, weight), prova in provas.items():
+            if subject == "Português" and bimester == Bimester.QUARTO:
+                continue  # 4º bimestre ainda sem nota
+            grade_repo.save(Grade(student=filho, assessment=prova, score=5.0 + i + weight))
+        for dia in range(1, 5):
+            attendance_repo.save(Attendance(student=filho, subject="Matemática",
+                                            attendance_date=date(2024, 3, dia),
+                                            is_present=(dia != 1 or i == 0)))
+    return mae, filhos
+
+
+@pytest.fixture
+def servicos(student_repo, classroom_repo, parent_repo, grade_repo, assessment_repo, attendance_repo):
+    aluno = ServicosDoAluno(grade_repo, assessment_repo, student_repo, attendance_repo)
+    secretaria = ServicosSecretaria(student_repo, classroom_repo, parent_repo)
+    return aluno, secretaria
+
+
+def test_painel_igual_ao_boletim(servicos, familia):
+    srv_aluno, secretaria = servicos
+    mae, filhos = familia
+
+    painel = secretaria.painel_do_responsavel(mae.id, 2024)
+
+    assert [a.nome for a in painel.alunos] == ["Alice Souza", "Bruno Souza"]
+    for item in painel.alunos:
+        assert item.parentesco == "Mãe"
+        assert [b.disciplina for b in item.boletins] == ["Matemática", "Português"]
+        for boletim in item.boletins:
+            assert boletim == srv_aluno.gerar_boletim(item.student_id, boletim.disciplina, 2024)
+    bruno = next(a for a in painel.alunos if a.nome == "Bruno Souza")
+    alice = next(a for a in painel.alunos if a.nome == "Alice Souza")
+    assert bruno.frequencia == {"Matemática": 100.0}
+    assert alice.frequencia == {"Matemática": 75.0}
+    assert alice.boletins[1].situacao == "Incompleto"
+
+
+def test_painel_usa_numero_fixo_de_consultas(servicos, familia, db_manager):
+    _, secretaria = servicos
+    mae, _ = familia
+    statements = []
+    original = db_manager.get_connection
+
+    def traced():
+        conn = original()
+        conn.set_trace_callback(statements.append)
+        return conn
+    db_manager.get_connection = traced
+
+    secretaria.painel_do_responsavel(mae.id, 2024)
+    selects = [s for s in statements if s.lstrip().upper().startswith("SELECT")
+               and "archived_years" not in s]  # verificação do arquivo morto
+    assert len(selects) == 3
+
+
+def test_painel_cache_ttl(student_repo, classroom_repo, parent_repo, familia):
+    mae, _ = familia
+    secretaria = ServicosSecretaria(student_repo, classroom_repo, parent_repo, painel_ttl=60)
+
+    primeiro = secretaria.painel_do_responsavel(mae.id, 2024)
+    assert secretaria.painel_do_responsavel(mae.id, 2024) is primeiro
+
+    secretaria.limpar_cache_painel(mae.id)
+    assert secretaria.painel_do_responsavel(mae.id, 2024) is not primeiro
+
+
+def test_painel_cache_limitado_e_sem_vencidos(student_repo, classroom_repo, parent_repo, familia, monkeypatch):
+    mae, _ = familia
+    relogio = [1000.0]
+    monkeypatch.setattr("src.application.services.time.monotonic", lambda: relogio[0])
+    secretaria = ServicosSecretaria(student_repo, classroom_repo, parent_repo, painel_ttl=60,
+                                    painel_max_entries=2)
+
+    p2023 = secretaria.painel_do_responsavel(mae.id, 2023)
+    secretaria.painel_do_responsavel(mae.id, 2024)
+    assert secretaria.painel_do_responsavel(mae.id, 2023) is p2023  # 2023 vira o mais recente
+    secretaria.painel_do_responsavel(mae.id, 2022)
+    assert list(secretaria._cache_painel) == [(mae.id, 2023), (mae.id, 2022)]
+
+    # Vencidos saem do cache, não só deixam de ser usados
+    relogio[0] += 61
+    assert secretaria.painel_do_responsavel(mae.id, 2023) is not p2023
+    assert list(secretaria._cache_painel) == [(mae.id, 2023)]
+
+
+def test_painel_responsavel_sem_filhos_e_inexistente(servicos, parent_repo):
+    _, secretaria = servicos
+    pai = parent_repo.save(Parent(name="Rui Lima", email="rui@email.com", cpf="11144477735"))
+
+    assert secretaria.painel_do_responsavel(pai.id, 2024).alunos == []
+    with pytest.raises(ValueError):
+        secretaria.painel_do_responsavel(9999, 2024)
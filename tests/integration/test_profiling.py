@@ -0,0 +1,133 @@
+"""
+Teste de Integração: perfil dos serviços (tempo, statements, conexões, memória, cProfile).
+"""
+import pstats
+import threading
+
+from src.application.services import ServicosDoAluno, ServicosSecretaria
+from src.domain.models import Student, Assessment, Grade, Bimester, AssessmentType
+from src.infrastructure.database import (
+    AssessmentRepository, AttendanceRepository, DatabaseManager, GradeRepository, StudentRepository
+)
+from src.infrastructure.profiling import (
+    _from_environment, disable_profiling, enable_profiling, get_profiler, profile_services, profiled
+)
+
+
+def _servicos(db_manager):
+    return ServicosDoAluno(GradeRepository(db_manager), AssessmentRepository(db_manager),
+                           StudentRepository(db_manager), AttendanceRepository(db_manager))
+
+
+def _aluno_com_nota(student_repo, assessment_repo, grade_repo):
+    aluno = student_repo.save(Student(name="Ana Lima", registration="A001", email="ana@escola.com"))
+    prova = assessment_repo.save(Assessment(
+        title="Prova 1", subject="Matemática", max_score=10.0, weight=1.0,
+        assessment_type=AssessmentType.PROVA, bimester=Bimester.PRIMEIRO, academic_year=2024))
+    grade_repo.save(Grade(student=aluno, assessment=prova, score=8.0))
+    return aluno
+
+
+def test_perfil_por_metodo_com_cprofile_e_memoria(tmp_path, db_manager, student_repo, assessment_repo,
+                                                   grade_repo):
+    aluno = _aluno_com_nota(student_repo, assessment_repo, grade_repo)
+    servicos = _servicos(db_manager)
+
+    with profile_services(cprofile=True, memory=True) as perfil:
+        for _ in range(2):
+            assert servicos.gerar_boletim(aluno.id, "Matemática", 2024).media_1bim == 8.0
+    assert get_profiler() is None
+
+    resumo = perfil.summary()
+    assert list(resumo) == ["ServicosDoAluno.gerar_boletim"]
+    boletim = resumo["ServicosDoAluno.gerar_boletim"]
+    assert boletim["calls"] == 2 and boletim["errors"] == 0
+    assert boletim["avg_connections"] == 2          # avaliações do ano + notas do aluno
+    assert boletim["avg_statements"] >= 2
+    assert boletim["max_memory_peak_bytes"] > 0
+    assert "ServicosDoAluno.gerar_boletim" in perfil.report()
+
+    [arquivo] = perfil.dump_pstats(str(tmp_path / "perfis"))
+    assert arquivo.name == "ServicosDoAluno.gerar_boletim.pstats"
+    funcoes = {f[2] for f in pstats.Stats(str(arquivo)).stats}
+    assert "select" in funcoes and "find_by_student_and_bimester" not in funcoes
+
+
+def test_perfil_do_processo_com_pool_e_erros(tmp_path):
+    db = DatabaseManager(str(tmp_path / "pool.db"), pool_size=2)
+    db.initialize_database(verbose=False)
+    servicos = _servicos(db)
+    secretaria = ServicosSecretaria(StudentRepository(db), None, None)
+
+    # Desligado: o decorador só repassa a chamada
+    servicos.gerar_boletim(1, "Matemática", 2024)
+
+    perfil = enable_profiling()
+    try:
+        servicos.gerar_boletim(1, "Matemática", 2024)
+        try:
+            secretaria.matricular_aluno(999, 1, 2024)
+        except ValueError:
+            pass
+    finally:
+        assert disable_profiling() is perfil
+
+    resumo = perfil.summary()
+    assert resumo["ServicosSecretaria.matricular_aluno"]["errors"] == 1
+    statements = resumo["ServicosDoAluno.gerar_boletim"]["statements"]
+
+    # A conexão do pool volta sem o contador: uso fora do perfil não soma
+    conn = db.get_connection()
+    conn.execute("SELECT 1").fetchall()
+    conn.close()
+    servicos.gerar_boletim(1, "Matemática", 2024)
+    assert perfil.summary()["ServicosDoAluno.gerar_boletim"]["statements"] == statements
+    db.close()
+
+
+@profiled
+class _Lento:
+    def __init__(self):
+        self.dentro = threading.Event()
+        self.solta = threading.Event()
+
+    def esperar(self):
+        self.dentro.set()
+        assert self.solta.wait(5)
+        return "lento"
+
+    def rapido(self):
+        return "rápido"
+
+
+def test_captura_de_cprofile_e_memoria_uma_chamada_por_vez():
+    servico = _Lento()
+    perfil = enable_profiling(cprofile=True, memory=True)
+    try:
+        lenta = threading.Thread(target=servico.esperar)
+        lenta.start()
+        assert servico.dentro.wait(5)
+        # Outra thread com a captura ocupada: a chamada roda, só sem cProfile/memória
+        assert servico.rapido() == "rápido"
+        servico.solta.set()
+        lenta.join()
+        assert servico.rapido() == "rápido"
+    finally:
+        disable_profiling()
+
+    resumo = perfil.summary()
+    assert resumo["_Lento.esperar"]["capture_skipped"] == 0
+    assert resumo["_Lento.rapido"]["calls"] == 2
+    assert resumo["_Lento.rapido"]["capture_skipped"] == 1
+    assert perfil.stats("_Lento.rapido").pstats is not None
+
+
+def test_variavel_de_ambiente(monkeypatch):
+    monkeypatch.setattr("atexit.register", lambda *args: None)
+    assert _from_environment({}) is None
+    assert _from_environment({"SCHOOL_PROFILE": "0"}) is None
+    try:
+        perfil = _from_environment({"SCHOOL_PROFILE": "cprofile"})
+        assert get_profiler() is perfil and perfil.cprofile and not perfil.memory
+    finally:
+        disable_profiling()
@@ -0,0 +1,91 @@
+"""
+Teste de Integração: pool de leitura (mode=ro + query_only) e escritor dedicado.
+"""
+import sqlite3
+import threading
+
+import pytest
+
+from src.infrastructure.database import DatabaseManager, StudentRepository, TEMP_TABLE_THRESHOLD
+from src.domain.models import Student
+from tests.integration.conftest import SCHEMA_FILE
+
+
+def _manager(tmp_path, **kwargs) -> DatabaseManager:
+    path = tmp_path / "leitura.db"
+    conn = sqlite3.connect(str(path))
+    conn.executescript(SCHEMA_FILE.read_text(encoding="utf-8"))
+    conn.close()
+    return DatabaseManager(str(path), **kwargs)
+
+
+def test_leituras_no_pool_read_only(tmp_path):
+    manager = _manager(tmp_path, read_pool_size=2)
+    repo = StudentRepository(manager)
+
+    aluno = repo.save(Student(name="Ana", registration="L001", email="ana@escola.com"))
+    # Lê logo depois de gravar (mesmo arquivo, sem atraso)
+    assert repo.find_by_id(aluno.id).name == "Ana"
+    assert repo.select("name") == ["Ana"]
+
+    conn = manager.get_read_connection()
+    assert conn.read_only
+    with pytest.raises(sqlite3.OperationalError, match="readonly"):
+        conn.execute("DELETE FROM students")
+    conn.close()
+
+    # Escritor dedicado: a mesma conexão volta a cada escrita
+    escritor = manager.get_connection()
+    escritor.close()
+    assert manager.get_connection() is escritor
+    assert not escritor.read_only
+    manager.close()
+
+
+def test_find_by_ids_grande_em_conexao_query_only(tmp_path):
+    manager = _manager(tmp_path, read_pool_size=1)
+    conn = manager.get_connection()
+    conn.executemany("INSERT INTO students (name, registration, email) VALUES (?, ?, ?)",
+                     [(f"Aluno {i}", f"G{i:06d}", f"g{i}@escola.com") for i in range(50)])
+    conn.commit()
+    conn.close()
+
+    # Sem tabela temporária (query_only): IDs vão num array JSON
+    ids = list(range(1, TEMP_TABLE_THRESHOLD + 2))
+    encontrados = StudentRepository(manager).find_by_ids(ids)
+    assert list(encontrados) == list(range(1, 51))
+    manager.close()
+
+
+def test_wal_leitores_em_threads_com_escritor(tmp_path):
+    manager = _manager(tmp_path, read_pool_size=4, journal_mode="wal")
+    repo = StudentRepository(manager)
+    conn = manager.get_connection()
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    conn.close()
+    aluno = repo.save(Student(name="Ana", registration="L001", email="ana@escola.com"))
+
+    erros = []
+
+    def ler():
+        try:
+            for _ in range(50):
+                assert repo.find_by_id(aluno.id).registration == "L001"
+        except Exception as exc:  # pragma: no cover - falha do teste
+            erros.append(exc)
+
+    leitores = [threading.Thread(target=ler) for _ in range(4)]
+    for t in leitores:
+        t.start()
+    for i in range(20):
+        repo.save(Student(name=f"Novo {i}", registration=f"W{i:04d}", email=f"w{i}@escola.com"))
+    for t in leitores:
+        t.join()
+    assert not erros
+    assert len(repo.select("student_id")) == 21
+    manager.close()
+
+
+def test_journal_mode_invalido(tmp_path):
+    with pytest.raises(ValueError):
+        _manager(tmp_path, journal_mode="rapido")
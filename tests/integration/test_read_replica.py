@@ -0,0 +1,103 @@
+"""
+Teste de Integração: réplica de leitura em memória para relatórios.
+"""
+import time
+
+import pytest
+
+from src.application.services import ServicosDoAluno
+from src.infrastructure.average_cache import AverageCache
+from src.domain.models import Student, Assessment, Grade, Bimester, AssessmentType
+
+
+@pytest.fixture
+def replica(db_manager):
+    replica = db_manager.enable_read_replica(refresh_interval=0.05, background=False)
+    yield replica
+    db_manager.close()
+
+
+def _novo_aluno(student_repo, n):
+    return student_repo.save(Student(name=f"Aluno {n}", registration=f"R{n:04d}", email=f"r{n}@escola.com"))
+
+
+def test_relatorios_leem_da_replica(db_manager, student_repo, replica):
+    _novo_aluno(student_repo, 1)
+    replica.refresh()
+    assert [a.name for a in student_repo.list_all()] == ["Aluno 1"]
+
+    # Gravação nova só aparece depois da recarga (checada a cada refresh_interval)
+    _novo_aluno(student_repo, 2)
+    replica._last_check = time.monotonic()
+    assert len(student_repo.list_all()) == 1
+    time.sleep(0.06)
+    assert len(student_repo.list_all()) == 2
+    assert replica.refreshes == 3
+
+    # Sem escrita no arquivo, a verificação não recarrega
+    assert replica.refresh_if_changed() is False
+
+    conn = db_manager.get_report_connection()
+    with pytest.raises(Exception, match="readonly"):
+        conn.execute("DELETE FROM students")
+    conn.close()
+
+
+def test_boletim_na_replica_com_arquivo_travado(db_manager, student_repo, assessment_repo, grade_repo,
+                                                attendance_repo, replica):
+    aluno = _novo_aluno(student_repo, 1)
+    prova = assessment_repo.save(Assessment(
+        title="Prova 1", subject="Matemática", max_score=10.0, weight=1.0,
+        assessment_type=AssessmentType.PROVA, bimester=Bimester.PRIMEIRO, academic_year=2024))
+    grade_repo.save(Grade(student=aluno, assessment=prova, score=8.0))
+    replica.refresh()
+
+    # Escritor segurando o arquivo: o relatório não espera por ele
+    escritor = db_manager.get_connection()
+    escritor.isolation_level = None
+    escritor.execute("BEGIN EXCLUSIVE")
+    try:
+        inicio = time.perf_counter()
+        servicos = ServicosDoAluno(grade_repo, assessment_repo, student_repo, attendance_repo)
+        boletim = servicos.gerar_boletim(aluno.id, "Matemática", 2024)
+        assert time.perf_counter() - inicio < 1.0
+    finally:
+        escritor.execute("ROLLBACK")
+        escritor.close()
+    assert boletim.media_1bim == 8.0
+
+
+def test_media_em_cache_nao_vem_da_replica_atrasada(db_manager, student_repo, assessment_repo, grade_repo,
+                                                   attendance_repo, replica):
+    aluno = _novo_aluno(student_repo, 1)
+    provas = [assessment_repo.save(Assessment(
+        title=f"Prova {i}", subject="Matemática", max_score=10.0, weight=1.0,
+        assessment_type=AssessmentType.PROVA, bimester=Bimester.PRIMEIRO, academic_year=2024))
+        for i in range(2)]
+    grade_repo.save(Grade(student=aluno, assessment=provas[0], score=8.0))
+    replica.refresh()
+    servicos = ServicosDoAluno(grade_repo, assessment_repo, student_repo, attendance_repo,
+                               media_cache=AverageCache())
+    assert servicos.calcular_media_bimestral(aluno.id, "Matemática", Bimester.PRIMEIRO, 2024) == 8.0
+
+    # A réplica ainda não viu a segunda nota; o cache invalidado não pode guardar 8.0
+    grade_repo.save(Grade(student=aluno, assessment=provas[1], score=2.0))
+    replica._last_check = time.monotonic()
+    assert servicos.calcular_media_bimestral(aluno.id, "Matemática", Bimester.PRIMEIRO, 2024) == 5.0
+    assert servicos.gerar_boletim(aluno.id, "Matemática", 2024).media_1bim == 5.0
+    replica.refresh()
+    assert servicos.calcular_media_bimestral(aluno.id, "Matemática", Bimester.PRIMEIRO, 2024) == 5.0
+
+
+def test_recarga_em_segundo_plano(db_manager, student_repo):
+    replica = db_manager.enable_read_replica(refresh_interval=0.02)
+    try:
+        _novo_aluno(student_repo, 1)
+        prazo = time.monotonic() + 2.0
+        while replica.refreshes < 2 and time.monotonic() < prazo:
+            time.sleep(0.01)
+        assert [a.name for a in student_repo.list_all()] == ["Aluno 1"]
+        assert replica.stats()['refreshes'] == 2
+    finally:
+        db_manager.disable_read_replica()
+    assert db_manager.replica is None
@@ -0,0 +1,80 @@
+"""
+Teste de Integração: um banco por escola (ShardedDatabaseManager).
+"""
+from datetime import date
+
+import pytest
+
+from src.infrastructure.archive import encerrar_ano_letivo
+from src.infrastructure.database import DatabaseManager, StudentRepository, AttendanceRepository
+from src.infrastructure.sharding import ShardedDatabaseManager, ShardedRepository
+from src.domain.models import Student, Attendance
+
+
+@pytest.fixture
+def rede(tmp_path):
+    sharded = ShardedDatabaseManager(str(tmp_path / "escolas"), pool_size=2, max_workers=2)
+    yield sharded
+    sharded.close()
+
+
+def _registrar_aulas(rede, escola, aluno, presencas, total):
+    attendance = ShardedRepository(rede, AttendanceRepository)
+    for day in range(1, total + 1):
+        attendance.save(escola, Attendance(student=aluno, subject="Matemática",
+                                           attendance_date=date(2024, 3, day),
+                                           is_present=day <= presencas))
+
+
+def test_escolas_ficam_isoladas(rede):
+    alunos = ShardedRepository(rede, StudentRepository)
+    a = alunos.save("escola_a", Student(name="Ana Lima", registration="2024001", email="ana@a.com"))
+    # Mesma matrícula em outra escola não conflita
+    b = alunos.save("escola_b", Student(name="Bia Lima", registration="2024001", email="bia@b.com"))
+
+    assert rede.school_keys() == ["escola_a", "escola_b"]
+    assert alunos.find_by_id("escola_a", a.id).name == "Ana Lima"
+    assert alunos.find_by_id("escola_b", b.id).name == "Bia Lima"
+    assert len(alunos.list_all("escola_a")) == 1
+
+
+def test_chave_invalida(rede):
+    with pytest.raises(ValueError, match="Chave de escola inválida"):
+        rede.shard("../fora")
+
+
+def test_pool_reaproveita_conexoes(rede):
+    manager = rede.shard("escola_a")
+    conn = manager.get_connection()
+    conn.row_factory = None
+    conn.close()
+    again = manager.get_connection()
+    assert again is conn
+    assert again.row_factory is not None  # ajustes são desfeitos ao devolver
+    again.close()
+
+
+@pytest.mark.parametrize("processes", [False, True])
+def test_alunos_em_risco_na_rede(rede, processes):
+    alunos = ShardedRepository(rede, StudentRepository)
+    ana = alunos.save("escola_a", Student(name="Ana Lima", registration="A001", email="ana@a.com"))
+    caio = alunos.save("escola_b", Student(name="Caio Reis", registration="B001", email="caio@b.com"))
+    davi = alunos.save("escola_b", Student(name="Davi Reis", registration="B002", email="davi@b.com"))
+    _registrar_aulas(rede, "escola_a", ana, presencas=7, total=10)    # 70%
+    _registrar_aulas(rede, "escola_b", caio, presencas=5, total=10)   # 50%
+    _registrar_aulas(rede, "escola_b", davi, presencas=10, total=10)  # 100%
+
+    risco = rede.alunos_em_risco(2024, limite=75.0, processes=processes)
+
+    assert [(r['school'], r['name']) for r in risco] == [("escola_b", "Caio Reis"), ("escola_a", "Ana Lima")]
+    assert risco[0]['percentual_presenca'] == 50.0
+
+
+def test_alunos_em_risco_de_ano_arquivado(rede, tmp_path):
+    alunos = ShardedRepository(rede, StudentRepository)
+    ana = alunos.save("escola_a", Student(name="Ana Lima", registration="A001", email="ana@a.com"))
+    _registrar_aulas(rede, "escola_a", ana, presencas=6, total=10)
+    encerrar_ano_letivo(rede.shard("escola_a"), 2024, archive_dir=str(tmp_path / "arquivo"))
+
+    risco = rede.alunos_em_risco(2024, limite=75.0, processes=False)
+    assert [(r['name'], r['percentual_presenca']) for r in risco] == [("Ana Lima", 60.0)]
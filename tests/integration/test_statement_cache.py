@@ -0,0 +1,65 @@
+"""
+Teste de Integração: reaproveitamento de statements preparados por conexão.
+"""
+from datetime import date
+
+import pytest
+
+from src.infrastructure.database import (
+    AttendanceRepository, DatabaseManager, StudentRepository, InstrumentedConnection
+)
+from src.domain.models import Student, Attendance
+from tests.integration.conftest import SCHEMA_FILE
+
+
+def _manager(tmp_path, **kwargs) -> DatabaseManager:
+    manager = DatabaseManager(str(tmp_path / "stmt.db"), **kwargs)
+    conn = manager.get_connection()
+    conn.executescript(SCHEMA_FILE.read_text(encoding="utf-8"))
+    conn.commit()
+    conn.close()
+    # Disciplina no catálogo e formato das datas já lidos: a medição fica só
+    # com o caminho do save
+    manager.subjects.id_for("Matemática", create=True)
+    manager.date_storage
+    if manager.statement_stats is not None:
+        manager.statement_stats.reset()
+    return manager
+
+
+def _gravar_presencas(manager, n=20):
+    aluno = StudentRepository(manager).save(Student(name="Ana", registration="S001", email="ana@escola.com"))
+    repo = AttendanceRepository(manager)
+    for dia in range(1, n + 1):
+        repo.save(Attendance(student=aluno, subject="Matemática",
+                             attendance_date=date(2024, 3, dia), is_present=True))
+    return aluno
+
+
+def test_pool_reaproveita_statements(tmp_path):
+    manager = _manager(tmp_path, pool_size=1, statement_stats=True)
+    _gravar_presencas(manager)
+
+    conn = manager.get_connection()
+    assert isinstance(conn, InstrumentedConnection)
+    conn.close()
+    stats = manager.statement_stats.summary()
+    # INSERT e PRAGMA preparados uma vez; o resto reaproveitado
+    assert stats['prepared'] <= 3
+    assert stats['reuse_rate'] > 0.9
+
+
+def test_sem_pool_ou_sem_cache_sempre_prepara(tmp_path):
+    for kwargs in ({'pool_size': 0}, {'pool_size': 1, 'cached_statements': 0}):
+        manager = _manager(tmp_path / str(len(kwargs)), statement_stats=True, **kwargs)
+        _gravar_presencas(manager, n=5)
+        assert manager.statement_stats.summary()['reused'] == 0
+
+
+@pytest.mark.parametrize("statement_stats", [False, True])
+def test_resultados_iguais_com_instrumentacao(tmp_path, statement_stats):
+    manager = _manager(tmp_path, pool_size=2, statement_stats=statement_stats)
+    aluno = _gravar_presencas(manager, n=3)
+    registros = AttendanceRepository(manager).find_by_student_and_period(
+        aluno.id, "Matemática", date(2024, 3, 1), date(2024, 3, 31))
+    assert [r.attendance_date.day for r in registros] == [1, 2, 3]
@@ -0,0 +1,61 @@
+"""
+Teste de Integração: catálogo de disciplinas (nome <-> subject_id).
+"""
+from datetime import date
+
+from src.infrastructure.database import DatabaseManager
+from src.domain.models import Student, Teacher, Assessment, Attendance, Bimester, AssessmentType
+
+
+def _prova(subject, bimester=Bimester.PRIMEIRO):
+    return Assessment(title=f"Prova de {subject}", subject=subject, max_score=10.0, weight=1.0,
+                      assessment_type=AssessmentType.PROVA, bimester=bimester, academic_year=2024)
+
+
+def test_catalogo_so_volta_ao_banco_para_nome_ou_id_novo(db_manager):
+    catalogo = db_manager.subjects
+    assert catalogo.id_for("Matemática") is None
+    matematica = catalogo.id_for("Matemática", create=True)
+    reloads = catalogo.reloads
+
+    assert catalogo.id_for("Matemática", create=True) == matematica
+    assert catalogo.name_for(matematica) == "Matemática"
+    assert catalogo.reloads == reloads
+
+    # Disciplina cadastrada por outro processo aparece no primeiro id desconhecido
+    outro = DatabaseManager(str(db_manager.db_path))
+    fisica = outro.subjects.id_for("Física", create=True)
+    assert catalogo.name_for(fisica) == "Física"
+    assert catalogo.reloads == reloads + 1
+    assert catalogo.ids_for(["Física", "Química"]) == {"Física": fisica}
+    assert len(catalogo) == 2
+
+
+def test_repositorios_gravam_id_e_devolvem_nome(db_manager, student_repo, teacher_repo,
+                                                assessment_repo, attendance_repo):
+    aluno = student_repo.save(Student(name="Ana Lima", registration="A001", email="ana@escola.com"))
+    prof = teacher_repo.save(Teacher(name="Rita Souza", email="rita@escola.com", subjects=["Física", "Matemática"]))
+    prova = assessment_repo.save(_prova("Matemática"))
+    assessment_repo.save(_prova("Física", Bimester.SEGUNDO))
+    for subject, presente in (("Matemática", True), ("Física", False)):
+        attendance_repo.save(Attendance(student=aluno, subject=subject, attendance_date=date(2024, 3, 4),
+                                        is_present=presente))
+
+    conn = db_manager.get_connection()
+    assert "subject" not in {r[1] for r in conn.execute("PRAGMA table_info(attendance)")}
+    assert conn.execute("SELECT COUNT(*) FROM subjects").fetchone()[0] == 2
+    conn.close()
+
+    assert sorted(teacher_repo.find_by_id(prof.id).subjects) == ["Física", "Matemática"]
+    assert assessment_repo.find_by_id(prova.id).subject == "Matemática"
+    assert {a.subject for a in attendance_repo.list_all()} == {"Matemática", "Física"}
+    faltas = attendance_repo.find_by_student_and_period(aluno.id, "Física", date(2024, 3, 1), date(2024, 3, 31))
+    assert [a.is_present for a in faltas] == [False]
+    assert attendance_repo.find_by_student_and_period(aluno.id, "Química", date(2024, 3, 1),
+                                                      date(2024, 3, 31)) == []
+
+    # select(): "subject" é o nome, também no filtro e na ordenação
+    assert assessment_repo.select("subject", order_by="subject") == ["Física", "Matemática"]
+    assert attendance_repo.select(("subject", "is_present"), where={"subject": "Física"}) == [("Física", 0)]
+    assert attendance_repo.select("attendance_id", where={"subject": ["Física", "Química"]}) != []
+    assert attendance_repo.select("attendance_id", where={"subject": "Química"}) == []
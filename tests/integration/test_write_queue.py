@@ -0,0 +1,165 @@
+"""
+Teste de Integração: fila de escrita com group commit (WriteQueue).
+"""
+import sqlite3
+import threading
+from concurrent.futures import Future
+from datetime import date
+
+import pytest
+
+from src.application.services import ServicosDoAluno
+from src.infrastructure.average_cache import AverageCache
+from src.infrastructure.write_queue import WriteQueue, _GRADE_SQL
+from src.domain.models import (
+    Student, Classroom, Assessment, Grade, Attendance,
+    EducationLevel, Shift, Bimester, AssessmentType
+)
+
+
+@pytest.fixture
+def alunos(student_repo):
+    students = [
+        Student(name=f"Aluno {i:02d}", registration=f"2024{i:03d}", email=f"aluno{i}@escola.com")
+        for i in range(20)
+    ]
+    for s in students:
+        student_repo.save(s)
+    return students
+
+
+@pytest.fixture
+def prova(assessment_repo):
+    assessment = Assessment(title="Prova", subject="Matemática", max_score=10.0, weight=1.0,
+                            assessment_type=AssessmentType.PROVA, bimester=Bimester.PRIMEIRO,
+                            academic_year=2024)
+    return assessment_repo.save(assessment)
+
+
+def test_notas_de_varias_threads_em_lotes(db_manager, alunos, prova, grade_repo):
+    """Escritas concorrentes são agrupadas e cada futuro recebe seu ID."""
+    grades = [Grade(student=s, assessment=prova, score=7.0) for s in alunos]
+
+    with WriteQueue(db_manager, max_batch=50, max_delay_ms=20) as fila:
+        futures = []
+        lock = threading.Lock()
+
+        def enviar(parte):
+            for g in parte:
+                f = fila.submit_grade(g)
+                with lock:
+                    futures.append(f)
+
+        threads = [threading.Thread(target=enviar, args=(grades[i::4],)) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        ids = [f.result(timeout=5) for f in futures]
+
+    assert len(set(ids)) == len(alunos)
+    assert all(g.id is not None for g in grades)
+    assert fila.writes_committed == len(alunos)
+    assert fila.batches_committed < len(alunos)
+    assert grade_repo.find_by_student_and_assessment(alunos[0].id, prova.id).score == 7.0
+
+
+def test_presenca_e_upsert_devolve_mesmo_id(db_manager, alunos):
+    """Regravar a mesma presença (ON CONFLICT) devolve o ID da linha existente."""
+    with WriteQueue(db_manager) as fila:
+        falta = Attendance(student=alunos[0], subject="Inglês",
+                           attendance_date=date(2024, 4, 1), is_present=False)
+        first_id = fila.submit_attendance(falta).result(timeout=5)
+        falta.justify("Atestado médico")
+        second_id = fila.submit_attendance(falta).result(timeout=5)
+    assert first_id == second_id
+
+
+def test_disciplina_nova_e_cadastrada_pela_escritora(db_manager, alunos, monkeypatch):
+    """Quem enfileira não grava: a disciplina nova entra na transação do lote."""
+    def fora_da_fila(name):
+        raise AssertionError(f"cadastro de {name} fora da escritora")
+
+    monkeypatch.setattr(db_manager.subjects, "_create", fora_da_fila)
+    with WriteQueue(db_manager, max_delay_ms=20) as fila:
+        futuros = [fila.submit_attendance(Attendance(student=s, subject="Robótica",
+                                                     attendance_date=date(2024, 4, 1), is_present=True))
+                   for s in alunos[:3]]
+        assert all(f.result(timeout=5) for f in futuros)
+    assert fila.writes_failed == 0
+    subject_id = db_manager.subjects.id_for("Robótica")
+    conn = db_manager.get_connection()
+    assert conn.execute("SELECT COUNT(*) FROM attendance WHERE subject_id = ?", (subject_id,)).fetchone()[0] == 3
+    conn.close()
+
+
+def test_matricula_duplicada_falha_so_no_proprio_futuro(db_manager, alunos, classroom_repo):
+    """Um erro de integridade não derruba o resto do lote."""
+    turma = classroom_repo.save(Classroom(year="6º Ano", identifier="A", shift=Shift.MANHA,
+                                          level=EducationLevel.FUNDAMENTAL_II))
+    with WriteQueue(db_manager, max_delay_ms=50) as fila:
+        ok = fila.submit_enrollment(turma.id, alunos[0].id, 2024)
+        dup = fila.submit_enrollment(turma.id, alunos[0].id, 2024)
+        other = fila.submit_enrollment(turma.id, alunos[1].id, 2024)
+        assert ok.result(timeout=5) is not None
+        assert other.result(timeout=5) is not None
+        with pytest.raises(sqlite3.IntegrityError):
+            dup.result(timeout=5)
+
+
+def test_fila_encerrada_rejeita_envios(db_manager, alunos, prova):
+    fila = WriteQueue(db_manager).start()
+    fila.close()
+    with pytest.raises(RuntimeError):
+        fila.submit_grade(Grade(student=alunos[0], assessment=prova, score=5.0))
+
+
+def test_nota_da_fila_invalida_cache_de_medias(db_manager, alunos, prova, grade_repo, assessment_repo,
+                                               student_repo, attendance_repo):
+    cache = AverageCache()
+    servicos = ServicosDoAluno(grade_repo, assessment_repo, student_repo, attendance_repo, media_cache=cache)
+    with WriteQueue(db_manager) as fila:
+        cache.attach(write_queue=fila)
+        fila.submit_grade(Grade(student=alunos[0], assessment=prova, score=4.0)).result(timeout=5)
+        assert servicos.calcular_media_bimestral(alunos[0].id, "Matemática", Bimester.PRIMEIRO, 2024) == 4.0
+        fila.submit_grade(Grade(student=alunos[0], assessment=prova, score=9.0)).result(timeout=5)
+        # O listener roda antes de o futuro resolver
+        assert servicos.calcular_media_bimestral(alunos[0].id, "Matemática", Bimester.PRIMEIRO, 2024) == 9.0
+    assert cache.invalidations == 1
+
+
+def test_fila_nao_muda_journal_mode_por_padrao(db_manager, alunos, prova):
+    with WriteQueue(db_manager) as fila:
+        fila.submit_grade(Grade(student=alunos[0], assessment=prova, score=5.0)).result(timeout=5)
+    conn = db_manager.get_connection()
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] != "wal"
+    conn.close()
+
+
+def test_escritora_sem_conexao_falha_os_futuros(db_manager, alunos, prova, monkeypatch):
+    def sem_conexao():
+        raise sqlite3.OperationalError("unable to open database file")
+
+    monkeypatch.setattr(db_manager, "get_connection", sem_conexao)
+    fila = WriteQueue(db_manager)
+    futuro = fila.submit_grade(Grade(student=alunos[0], assessment=prova, score=5.0))
+    with pytest.raises(sqlite3.OperationalError):
+        futuro.result(timeout=5)
+    fila._thread.join(timeout=5)
+    with pytest.raises(RuntimeError):
+        fila.submit_grade(Grade(student=alunos[1], assessment=prova, score=5.0))
+    assert fila.writes_failed == 1
+    fila.close()
+
+
+def test_cancelado_nao_conta_como_falha(db_manager, alunos, prova):
+    fila = WriteQueue(db_manager)
+    cancelado, gravado = Future(), Future()
+    cancelado.cancel()
+    conn = db_manager.get_connection()
+    conn.isolation_level = None
+    fila._flush(conn, [(_GRADE_SQL, (alunos[0].id, prova.id, 5.0), cancelado, None, None),
+                       (_GRADE_SQL, (alunos[1].id, prova.id, 6.0), gravado, None, None)])
+    conn.close()
+    assert gravado.result(timeout=5) is not None
+    assert (fila.writes_committed, fila.writes_failed) == (1, 0)
@@ -2,7 +2,7 @@
 Testes de validação de CPF.
 Verifica o algoritmo de dígitos verificadores em src/utils.py.
 """
-from src.utils import validar_cpf, normalizar_cpf, formatar_cpf
+from src.utils import validar_cpf, validar_cpfs, validar_emails, normalizar_cpf, formatar_cpf
 
 
 def test_cpf_valido_aceito():
@@ -37,3 +37,21 @@ def test_normalizar_cpf():
 def test_formatar_cpf():
     """Formata como XXX.XXX.XXX-XX."""
     assert formatar_cpf("12345678909") == "123.456.789-09"
+
+
+def test_cpf_com_digitos_nao_ascii_rejeitado():
+    """Dígitos Unicode (ex: árabe-índicos) não contam como dígitos do CPF."""
+    assert validar_cpf("١٢٣٤٥٦٧٨٩٠٩") is False
+
+
+def test_validar_cpfs_mascara_e_erros():
+    """Validação em lote devolve máscara ou lista de (índice, cpf) inválidos."""
+    cpfs = ["123.456.789-09", "11111111111", "52998224725", ""]
+    assert validar_cpfs(cpfs) == [True, False, True, False]
+    assert validar_cpfs(cpfs, somente_erros=True) == [(1, "11111111111"), (3, "")]
+
+
+def test_validar_emails_em_lote():
+    emails = ["joao@escola.com", "invalido", " MARIA@ESCOLA.COM ", "a" * 65 + "@escola.com"]
+    assert validar_emails(emails) == [True, False, True, False]
+    assert validar_emails(iter(emails), somente_erros=True) == [(1, "invalido"), (3, emails[3])]
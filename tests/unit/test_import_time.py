@@ -0,0 +1,62 @@
+"""
+Orçamento de tempo de import da linha de comando (python -X importtime).
+
+Tarefas curtas de cron rodam `python -m src report risk`; elas não devem
+carregar serviços, importador/exportador, benchmarks nem multiprocessing.
+"""
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent.parent
+SCHEMA_FILE = ROOT / "src" / "infrastructure" / "schema.sql"
+
+# Imports disparados pelo comando (sem a partida do interpretador), em ms.
+# Hoje fica em torno de 50 ms; o limite tem folga para máquinas lentas.
+IMPORT_BUDGET_MS = 150
+
+PROIBIDOS = (
+    "src.application.services",
+    "src.infrastructure.importer",
+    "src.infrastructure.exporter",
+    "src.infrastructure.write_queue",
+    "concurrent.futures",
+    "benchmarks",
+)
+
+
+def _importtime(*args):
+    """({módulo: tempo acumulado em µs} dos imports de nível mais alto, todos os módulos)."""
+    result = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    tempos, todos = {}, set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        todos.add(name.strip())
+        if not name[1:].startswith(" "):  # nível mais alto (sem indentação)
+            tempos[name.strip()] = int(cumulative)
+    return tempos, todos
+
+
+def test_import_da_cli_nao_carrega_o_banco():
+    _, carregados = _importtime("-c", "import src.cli")
+    assert "src.cli" in carregados
+    assert "sqlite3" not in carregados and "src.infrastructure.database" not in carregados
+
+
+def test_report_risk_dentro_do_orcamento(tmp_path):
+    db = tmp_path / "cron.db"
+    conn = sqlite3.connect(str(db))
+    conn.executescript(SCHEMA_FILE.read_text(encoding="utf-8"))
+    conn.close()
+
+    base, _ = _importtime("-c", "pass")
+    tempos, carregados = _importtime("-m", "src", "report", "risk", "--db", str(db), "--year", "2024")
+    for proibido in PROIBIDOS:
+        assert not any(m == proibido or m.startswith(proibido + ".") for m in carregados), proibido
+
+    total_ms = sum(us for nome, us in tempos.items() if nome not in base) / 1000
+    assert total_ms < IMPORT_BUDGET_MS, f"imports da CLI levaram {total_ms:.1f} ms"